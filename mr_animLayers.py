@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_animLayers.py
-# VERSION: 0010
+# VERSION: 0014
 #
 # CREATORS: Maria Robertson
 # ---------------------------------------
@@ -45,9 +45,7 @@ mr_animLayers.remove_inactive_object_attributes(
 import maya.cmds as cmds
 import maya.mel as mel
 
-import importlib
 import mr_utilities
-importlib.reload(mr_utilities)
 
 # ------------------------------------------------------------------------------ #
 def bake_to_selected_override_animation_layer(simulation=True, preserveOutsideKeys=True):
@@ -361,11 +359,14 @@ def remove_inactive_object_attributes(use_only_selected_animation_layers=True, u
         if was_BaseAnimation_locked:
             cmds.animLayer("BaseAnimation", edit=True, lock=False, forceUIRefresh=True)
 
+        # Query every animation layer's attributes once, rather than again for each object.
+        layer_index = mr_utilities.AnimationLayerIndex()
+
         for obj in selection:
             # ------------------------------------------------------------------- 
             # 03. GET OBJECT ATTRIBUTES CONNECTED TO ANIMATION LAYERS.
             # -------------------------------------------------------------------
-            layered_attributes_dict = mr_utilities.get_layered_attributes(obj, filter_selected_animation_layers=True)
+            layered_attributes_dict = mr_utilities.get_layered_attributes(obj, filter_selected_animation_layers=True, layer_index=layer_index)
 
             if layered_attributes_dict:
                 for layer, attributes in layered_attributes_dict.items():
@@ -611,6 +612,9 @@ def nullify_animation_layer_keys(
     if not selection:
         mr_utilities.print_warning_from_caller("Nothing is selected.")
 
+    # Query every animation layer's attributes once, rather than again for each object.
+    layer_index = mr_utilities.AnimationLayerIndex()
+
     for obj in selection:
         # ---------------------------------------
         # 02. IF NO ATTRIBUTES SPECIFIED, USE ALL KEYABLE.
@@ -629,9 +633,9 @@ def nullify_animation_layer_keys(
             # 03. OPTIONAL - FILTER FOR ATTRIBUTES ON SELECTED ANIMATON LAYERS.
             # ---------------------------------------    
             if nullify_only_selected_animation_layers:
-                layered_attributes = mr_utilities.get_layered_attributes(obj, filter_selected_animation_layers=True)
+                layered_attributes = mr_utilities.get_layered_attributes(obj, filter_selected_animation_layers=True, layer_index=layer_index)
             else:
-                layered_attributes = mr_utilities.get_layered_attributes(obj, filter_selected_animation_layers=False)
+                layered_attributes = mr_utilities.get_layered_attributes(obj, filter_selected_animation_layers=False, layer_index=layer_index)
 
             if layered_attributes:
                 for layer, attributes in layered_attributes.items():
@@ -677,7 +681,7 @@ def is_object_attribute_offset(animBlend_node, object_attribute, keyframes):
     attribute = object_attribute.split('.')[-1]
     node = object_attribute.split('.')[0]
 
-    default_value = cmds.attributeQuery(attribute, node=node, listDefault=True)[0]
+    default_value = mr_utilities.get_attribute_metadata_cache().default(node, attribute)[0]
     # print(f"\nDefault Value: {default_value}")
 
     for f in keyframes:
@@ -710,6 +714,17 @@ def remove_object_attribute(animation_layer, object_attribute):
 # CHANGELOG:
 # ---------------------------------------
 #
+# 2026-10-17 - 0014:
+#   - mr_utilities is imported without reloading it, so its caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0013:
+#   - is_object_attribute_offset():
+#       - Get default values from mr_utilities.get_attribute_metadata_cache(), instead of querying every attribute on every object.
+#
+# 2026-10-17 - 0012:
+#   - remove_inactive_object_attributes() and nullify_animation_layer_keys():
+#       - Build one mr_utilities.AnimationLayerIndex per run, instead of querying every connected animation layer again for each object.
+#
 # 2025-08-04 - 0011:
 #   - Added function:
 #       - toggle_mute_selected_animation_layers()
@@ -0,0 +1,2562 @@
+"""
+# ------------------------------------------------------------------------------ #
+# SCRIPT: mr_bakeEngine.py
+# VERSION: 0021
+#
+# CREATORS: Maria Robertson
+# ---------------------------------------
+# Last tested for Autodesk Maya 2023.3
+# ---------------------------------------
+# DESCRIPTION:
+# ---------------------------------------
+# Support functions for baking worldspace animation without constraints.
+#
+# Instead of constraining locators and running bakeResults, which steps the whole scene through every frame:
+#   - Each object's worldMatrix is read at every frame with mr_utilities.sample_plugs(),
+#     which evaluates each frame through an OpenMaya.MDGContext without changing the current time.
+#   - The matrices are split into translate and rotate values with NumPy, all frames and objects at once.
+#   - Rotations are filtered to stay continuous from frame to frame, like bakeResults(minimizeRotation=True).
+#   - Each channel's keys are written to its animation curve with one setAttr.
+#
+# No constraints or extra DG nodes are made, apart from the animation curves themselves.
+#
+# This can't replace a simulated bake, as dynamics need the time to actually change.
+#
+# ---------------------------------------
+# RUN COMMAND:
+# ---------------------------------------
+import importlib
+import mr_bakeEngine
+importlib.reload(mr_bakeEngine)
+
+# Bake the world position and rotation of pSphere1 onto locator1, over the playback range.
+mr_bakeEngine.bake_worldspace(["pSphere1"], ["locator1"])
+
+# Remove keys locator1 can do without, keeping its curves within the default tolerances.
+mr_bakeEngine.reduce_object_curves(["locator1"])
+
+# Bake again after editing pSphere1's keys, only resampling frames near the keys that changed.
+mr_bakeEngine.bake_worldspace(["pSphere1"], ["locator1"], incremental=True)
+
+# Switch hand_L_ctrl to its third space (index 2) from frame 1 to 240, keeping its world motion, without temp locators or a bake.
+mr_bakeEngine.switch_space(["hand_L_ctrl"], ["hand_L_ctrl.space"], 2, 1, 240)
+
+# ---------------------------------------
+# REQUIREMENTS:
+# ---------------------------------------
+# NumPy, which ships with Autodesk Maya 2022 and later.
+#
+# The mr_utilities.py file, for support functions:
+# https://github.com/maria137-art/MayaAnimScripts/blob/main/mr_utilities.py
+#
+# ------------------------------------------------------------------------------ #
+"""
+
+import collections
+import hashlib
+import re
+
+import maya.cmds as cmds
+
+import mr_utilities
+
+# NumPy ships with Maya 2022 and later.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Index of each axis, for each rotateOrder enum value.
+ROTATE_ORDER_AXES = {
+    0: (0, 1, 2),  # xyz
+    1: (1, 2, 0),  # yzx
+    2: (2, 0, 1),  # zxy
+    3: (0, 2, 1),  # xzy
+    4: (1, 0, 2),  # yxz
+    5: (2, 1, 0),  # zyx
+}
+
+# Values closer together than this are treated as a static channel, so get no animation curve.
+STATIC_TOLERANCE = 1e-6
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                          SAMPLING FUNCTIONS                          #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def get_frames(start_time=None, end_time=None, sample_by=1):
+    """
+    Get the frames to sample, from start to end. Defaults to the playback range.
+
+    :param start_time: First frame. If None, the start of the playback range.
+    :type start_time: float, optional
+    :param end_time: Last frame. If None, the end of the playback range.
+    :type end_time: float, optional
+    :param sample_by: Step between frames.
+    :type sample_by: float
+    :return: The frames, always including the start and end.
+    :rtype: numpy.ndarray
+
+    """
+    _check_numpy()
+    if start_time is None:
+        start_time = cmds.playbackOptions(query=True, min=True)
+    if end_time is None:
+        end_time = cmds.playbackOptions(query=True, max=True)
+    return mr_utilities.get_sample_frames((start_time, end_time, sample_by))
+
+# ------------------------------------------------------------------------------ #
+def sample_world_matrices(nodes, frames):
+    """
+    Read the world matrix of each node at each frame, without changing the current time.
+    Uses mr_utilities.sample_plugs(), which evaluates every node through one MDGContext per frame.
+
+    :param nodes: Transforms to sample.
+    :type nodes: list(str)
+    :param frames: Frames to sample at.
+    :type frames: list(float) or numpy.ndarray
+    :return: Matrices, shaped (nodes, frames, 4, 4). Translations are in centimetres, like Maya stores them.
+    :rtype: numpy.ndarray
+
+    """
+    _check_numpy()
+    samples = mr_utilities.sample_plugs(nodes, np.asarray(frames, dtype=float))
+    return samples.reshape(len(frames), len(nodes), 4, 4).transpose(1, 0, 2, 3)
+
+# ------------------------------------------------------------------------------ #
+def sample_adaptive(sample_function, frames, tolerance, initial_step=8, prepare=None):
+    """
+    Sample motion only as densely as it needs, and pick the frames each channel needs keys on.
+
+    Keys start every initial_step frames. Then each gap between keys is checked on its middle frame.
+    Where a straight line between the keys misses the evaluated value by more than the tolerance,
+    the sampled frame that misses by the most becomes a key, splitting the gap in two. Gaps that pass aren't sampled any further.
+    Channels get their own keys, but each frame is evaluated for every channel at once.
+
+    Keys should be written with linear tangents, so what plays back between them is exactly what was checked.
+
+    :param sample_function: Gives the values of every channel at a list of frames, shaped (frames, channels).
+    :type sample_function: function
+    :param frames: Every frame that could get a key, in order, e.g. from get_frames().
+    :type frames: numpy.ndarray
+    :param tolerance: Largest allowed difference between the keyed curve and the evaluated motion, on every sampled frame.
+    :type tolerance: float
+    :param initial_step: How many frames apart the first keys are.
+    :type initial_step: int
+    :param prepare: Optional function run on the sampled values in frame order before they're checked,
+                    e.g. to unwrap rotations. Takes and returns an array shaped (frames, channels).
+    :type prepare: function, optional
+    :return: The sampled frames, their values shaped (frames, channels), and a mask of the same shape that's True where a channel needs a key.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+
+    """
+    _check_numpy()
+    frames = np.asarray(frames, dtype=float)
+    frame_count = len(frames)
+    sampled = np.zeros(frame_count, dtype=bool)
+    raw_values = None
+    keys = None
+    new_indices = np.unique(np.append(np.arange(0, frame_count, max(int(initial_step), 1)), frame_count - 1))
+
+    while True:
+        # ---------------------------------------
+        # 01. EVALUATE FRAMES THAT HAVEN'T BEEN SAMPLED YET.
+        # ---------------------------------------
+        if len(new_indices):
+            new_values = np.asarray(sample_function(frames[new_indices]), dtype=float)
+            if raw_values is None:
+                raw_values = np.empty((frame_count, new_values.shape[1]))
+                keys = np.zeros((frame_count, new_values.shape[1]), dtype=bool)
+                keys[new_indices] = True
+            raw_values[new_indices] = new_values
+            sampled[new_indices] = True
+
+        sampled_indices = np.flatnonzero(sampled)
+        sampled_frames = frames[sampled_indices]
+        values = raw_values[sampled_indices]
+        if prepare is not None:
+            values = prepare(values)
+
+        # ---------------------------------------
+        # 01. KEY THE WORST FRAME OF EVERY GAP THAT MISSES, AND FIND MIDDLES TO CHECK NEXT.
+        # ---------------------------------------
+        keys_added = False
+        middles = set()
+        for channel in range(values.shape[1]):
+            key_positions = np.flatnonzero(keys[sampled_indices, channel])
+            line = np.interp(sampled_frames, sampled_frames[key_positions], values[key_positions, channel])
+            errors = np.abs(line - values[:, channel])
+            missing = np.flatnonzero(errors > tolerance)
+            if len(missing):
+                # Sort by gap, then worst first, so the first frame of each gap is its worst.
+                gaps = np.searchsorted(key_positions, missing, side="right") - 1
+                order = np.lexsort((-errors[missing], gaps))
+                _, first_in_gap = np.unique(gaps[order], return_index=True)
+                keys[sampled_indices[missing[order[first_in_gap]]], channel] = True
+                keys_added = True
+
+            key_indices = np.flatnonzero(keys[:, channel])
+            gap_middles = (key_indices[:-1] + key_indices[1:]) // 2
+            gap_middles = gap_middles[np.diff(key_indices) > 1]
+            middles.update(gap_middles[~sampled[gap_middles]].tolist())
+
+        new_indices = np.array(sorted(middles), dtype=int)
+        if not len(new_indices) and not keys_added:
+            return sampled_frames, values, keys[sampled_indices]
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                           MATRIX FUNCTIONS                           #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def get_world_positions(matrices, pivots=None):
+    """
+    Get world positions from world matrices, at an optional pivot in each object's local space.
+
+    :param matrices: World matrices, shaped (..., 4, 4).
+    :type matrices: numpy.ndarray
+    :param pivots: A local point per object, shaped (..., 3) to match the leading axes of matrices, or broadcastable to them.
+                   e.g. the rotatePivot, which is what pointConstraint follows.
+    :type pivots: numpy.ndarray, optional
+    :return: World positions, shaped (..., 3).
+    :rtype: numpy.ndarray
+
+    """
+    positions = matrices[..., 3, :3]
+    if pivots is None:
+        return positions.copy()
+    # Row vectors, like Maya: world point = local point * matrix.
+    return positions + np.einsum("...i,...ij->...j", pivots, matrices[..., :3, :3])
+
+# ------------------------------------------------------------------------------ #
+def get_euler_rotations(matrices, rotate_order=0):
+    """
+    Get Euler rotations in degrees from matrices, ignoring their scale.
+
+    :param matrices: Matrices, shaped (..., 4, 4) or (..., 3, 3).
+    :type matrices: numpy.ndarray
+    :param rotate_order: A rotateOrder enum value, from 0 (xyz) to 5 (zyx).
+    :type rotate_order: int
+    :return: Rotations in degrees, shaped (..., 3), in x, y, z order.
+    :rtype: numpy.ndarray
+
+    """
+    rows = np.array(matrices[..., :3, :3], dtype=float)
+
+    # ---------------------------------------
+    # 01. REMOVE SCALE.
+    # ---------------------------------------
+    lengths = np.linalg.norm(rows, axis=-1, keepdims=True)
+    rows /= np.where(lengths == 0.0, 1.0, lengths)
+    # Negative scale leaves a mirrored matrix, which has no rotation, so flip it back.
+    mirrored = np.linalg.det(rows) < 0.0
+    rows[mirrored] *= -1.0
+
+    # ---------------------------------------
+    # 01. SPLIT INTO ANGLES.
+    # ---------------------------------------
+    # Maya uses row vectors, so transpose to the column vector form most formulas are written for.
+    r = np.swapaxes(rows, -1, -2)
+    i, j, k = ROTATE_ORDER_AXES[rotate_order]
+    parity = 1.0 if (j - i) % 3 == 1 else -1.0
+
+    sin_middle = np.clip(-parity * r[..., k, i], -1.0, 1.0)
+    first = np.arctan2(parity * r[..., k, j], r[..., k, k])
+    middle = np.arcsin(sin_middle)
+    last = np.arctan2(parity * r[..., j, i], r[..., i, i])
+
+    # In gimbal lock the first and last axes line up, so put all of that rotation into the first.
+    gimbal = np.abs(sin_middle) > 0.9999999
+    first = np.where(gimbal, np.arctan2(-parity * r[..., j, k], r[..., j, j]), first)
+    last = np.where(gimbal, 0.0, last)
+
+    rotations = np.empty(rows.shape[:-2] + (3,))
+    rotations[..., i] = first
+    rotations[..., j] = middle
+    rotations[..., k] = last
+    return np.degrees(rotations)
+
+# ------------------------------------------------------------------------------ #
+def get_rotation_matrices(rotations, rotate_order=0):
+    """
+    Build rotation matrices from Euler rotations in degrees. The opposite of get_euler_rotations().
+
+    :param rotations: Rotations in degrees, shaped (..., 3), in x, y, z order.
+    :type rotations: numpy.ndarray
+    :param rotate_order: A rotateOrder enum value, from 0 (xyz) to 5 (zyx).
+    :type rotate_order: int
+    :return: Rotation matrices, shaped (..., 3, 3).
+    :rtype: numpy.ndarray
+
+    """
+    radians = np.radians(np.asarray(rotations, dtype=float))
+    cosines, sines = np.cos(radians), np.sin(radians)
+
+    # One matrix per axis, in Maya's row vector form.
+    axis_matrices = []
+    for axis in range(3):
+        following, last = (axis + 1) % 3, (axis + 2) % 3
+        matrix = np.zeros(radians.shape[:-1] + (3, 3))
+        matrix[..., axis, axis] = 1.0
+        matrix[..., following, following] = matrix[..., last, last] = cosines[..., axis]
+        matrix[..., following, last] = sines[..., axis]
+        matrix[..., last, following] = -sines[..., axis]
+        axis_matrices.append(matrix)
+
+    # Row vectors are rotated by the first axis of the rotate order first.
+    i, j, k = ROTATE_ORDER_AXES[rotate_order]
+    return axis_matrices[i] @ axis_matrices[j] @ axis_matrices[k]
+
+# ------------------------------------------------------------------------------ #
+def get_pivot_matrices(matrices, pivots):
+    """
+    Get the matrices point and orient constraints would match: each world matrix's rotation without scale, at its rotate pivot.
+
+    :param matrices: World matrices, shaped (objects, ..., 4, 4), in centimetres.
+    :type matrices: numpy.ndarray
+    :param pivots: Each object's rotatePivot in centimetres, shaped (objects, 3).
+    :type pivots: numpy.ndarray
+    :return: Matrices with no scale, the same shape.
+    :rtype: numpy.ndarray
+
+    """
+    pivots = np.asarray(pivots, dtype=float).reshape((len(pivots),) + (1,) * (matrices.ndim - 3) + (3,))
+    pivot_matrices = np.zeros(matrices.shape)
+    pivot_matrices[..., :3, :3] = get_rotation_matrices(get_euler_rotations(matrices))
+    pivot_matrices[..., 3, :3] = get_world_positions(matrices, pivots)
+    pivot_matrices[..., 3, 3] = 1.0
+    return pivot_matrices
+
+# ------------------------------------------------------------------------------ #
+def get_local_channels(objects, matrices):
+    """
+    Solve the translate and rotate values that give each object a local matrix, allowing for its pivots, rotateAxis and jointOrient.
+
+    Rotations sit between the rotateAxis and jointOrient, which don't change, so those are taken off either side.
+    Translations put the rotate pivot where the matrix puts it, at translate + rotatePivot + rotatePivotTranslate, which holds while scale is 1.
+    Matrices skewed by a parent's non-uniform scale or shear use their nearest rotation, with a warning.
+
+    :param objects: Transforms or joints the matrices are for, to read their pivots, rotateAxis, jointOrient and rotateOrder from.
+    :type objects: list(str)
+    :param matrices: Local matrices, i.e. world matrices times the inverse parent matrix, shaped (objects, ..., 4, 4), in centimetres.
+    :type matrices: numpy.ndarray
+    :return: Translate values in the current linear unit and rotate values in degrees, shaped (objects, ..., 6). Rotations aren't unwrapped.
+    :rtype: numpy.ndarray
+
+    """
+    linear_scale = mr_utilities.LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    metadata_cache = mr_utilities.get_attribute_metadata_cache()
+
+    def get_vectors(attribute):
+        # An attribute of each object as a vector, or zeros for objects without it.
+        vectors = [cmds.getAttr(f"{obj}.{attribute}")[0] if metadata_cache.exists(obj, attribute) else (0.0, 0.0, 0.0) for obj in objects]
+        return np.array(vectors, dtype=float).reshape((len(objects),) + (1,) * (matrices.ndim - 3) + (3,))
+
+    # Pivots are in the current linear unit, but matrices are in centimetres.
+    rotate_pivots = get_vectors("rotatePivot") / linear_scale
+    rotate_pivot_translates = get_vectors("rotatePivotTranslate") / linear_scale
+    rotate_axes = get_rotation_matrices(get_vectors("rotateAxis"))
+    joint_orients = get_rotation_matrices(get_vectors("jointOrient"))
+
+    # Under a parent with non-uniform scale or shear, a local matrix can be skewed, which no rotation and scale gives.
+    # Its rotation is taken as the nearest one, from a polar decomposition, which leaves unskewed matrices as they are.
+    rows = np.array(matrices[..., :3, :3], dtype=float)
+    left, _, right = np.linalg.svd(rows)
+    nearest_rotations = left @ right
+    lengths = np.linalg.norm(rows, axis=-1, keepdims=True)
+    unit_rows = rows / np.where(lengths == 0.0, 1.0, lengths)
+    skew = np.abs(unit_rows @ np.swapaxes(unit_rows, -1, -2) - np.eye(3)).reshape(len(objects), -1).max(axis=-1)
+    skewed_objects = [obj for obj, object_skew in zip(objects, skew) if object_skew > 1e-3]
+    if skewed_objects:
+        cmds.warning(f"Parent scale or shear skews {', '.join(skewed_objects)}, so their rotations can only follow approximately.")
+
+    rotations = np.swapaxes(rotate_axes, -1, -2) @ get_rotation_matrices(get_euler_rotations(nearest_rotations)) @ np.swapaxes(joint_orients, -1, -2)
+    channels = np.empty(matrices.shape[:-2] + (6,))
+    for object_index, obj in enumerate(objects):
+        channels[object_index, ..., 3:] = get_euler_rotations(rotations[object_index], cmds.getAttr(obj + ".rotateOrder"))
+
+    translations = get_world_positions(matrices, rotate_pivots) - rotate_pivots - rotate_pivot_translates
+    channels[..., :3] = translations * linear_scale
+    return channels
+
+# ------------------------------------------------------------------------------ #
+def filter_euler_rotations(rotations, full_turn=360.0):
+    """
+    Make Euler rotations continuous over time, so there are no sudden 360 degree jumps between frames.
+    Matches bakeResults(minimizeRotation=True), which unwraps each channel without flipping between Euler solutions.
+
+    :param rotations: Rotations, shaped (..., frames, channels).
+    :type rotations: numpy.ndarray
+    :param full_turn: One whole turn in the rotations' unit. Use 2 * pi for radians.
+    :type full_turn: float
+    :return: Filtered rotations, the same shape.
+    :rtype: numpy.ndarray
+
+    """
+    rotations = np.array(rotations, dtype=float)
+
+    # Each frame gets the whole turns that bring it closest to the frame before, summed along the curve.
+    jumps = np.diff(rotations, axis=-2)
+    turns = np.cumsum(-full_turn * np.round(jumps / full_turn), axis=-2)
+    rotations[..., 1:, :] += turns
+
+    return rotations
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                      ANIMATION CURVE FUNCTIONS                       #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def write_animation_curve(object_attribute, frames, values, curve_type, tangent_types=None, slopes=None, preserve_outside_keys=False):
+    """
+    Key an object attribute at every frame, replacing any keys it already has.
+    Static values are set without an animation curve, like cmds.delete(staticChannels=True) would leave them.
+    With preserve_outside_keys, like bakeResults(preserveOutsideKeys=True), only keys within the frames are replaced.
+
+    :param object_attribute: The object attribute to key, e.g. "locator1.translateX".
+    :type object_attribute: str
+    :param frames: Times of the keys.
+    :type frames: numpy.ndarray
+    :param values: Values of the keys, in Maya's current units.
+    :type values: numpy.ndarray
+    :param curve_type: The type of curve to make if there isn't one, e.g. "animCurveTL" or "animCurveTA".
+    :type curve_type: str
+    :param tangent_types: In and out tangent types for the keys. If None, Maya's default tangents are used.
+    :type tangent_types: tuple(str, str), optional
+    :param slopes: If given, each key gets fixed tangents with this slope, in value per frame. Overrides tangent_types.
+    :type slopes: numpy.ndarray, optional
+    :param preserve_outside_keys: If True, keys before the first frame and after the last are kept.
+    :type preserve_outside_keys: bool
+    :return: The animation curve, or None if the value was static.
+    :rtype: str or None
+
+    """
+    values = np.asarray(values, dtype=float)
+    existing_curves = cmds.listConnections(object_attribute, source=True, destination=False, type="animCurve")
+
+    outside_keys = None
+    if existing_curves and preserve_outside_keys:
+        old_keys = mr_utilities.get_keyframe_arrays(existing_curves[0])[existing_curves[0]]
+        outside_keys = old_keys[(old_keys["time"] < frames[0]) | (old_keys["time"] > frames[-1])]
+
+    # With keys kept outside the frames, a static value still needs keying.
+    if np.ptp(values) <= STATIC_TOLERANCE and (outside_keys is None or not len(outside_keys)):
+        if existing_curves:
+            cmds.delete(existing_curves)
+        cmds.setAttr(object_attribute, float(values[0]))
+        return None
+
+    if existing_curves:
+        curve = existing_curves[0]
+    else:
+        curve = cmds.createNode(curve_type, name=object_attribute.replace(".", "_"), skipSelect=True)
+        cmds.connectAttr(curve + ".output", object_attribute)
+
+    if slopes is not None:
+        # Tangent angles are measured against time in seconds.
+        fields = [field for field in mr_utilities.KEYFRAME_ARRAY_FIELDS if field[0] != "selected"]
+        keys = np.zeros(len(frames), dtype=fields)
+        keys["in_tangent_type"] = keys["out_tangent_type"] = "fixed"
+        keys["in_angle"] = keys["out_angle"] = np.degrees(np.arctan(np.asarray(slopes) * mr_utilities.get_frames_per_second()))
+        keys["in_weight"] = keys["out_weight"] = 1.0
+    else:
+        if tangent_types is None:
+            tangent_types = get_default_tangent_types()
+
+        # Only times, values and tangent types, as there are no fixed tangents to set angles for.
+        fields = [field for field in mr_utilities.KEYFRAME_ARRAY_FIELDS if field[0] in ("time", "value", "in_tangent_type", "out_tangent_type")]
+        keys = np.zeros(len(frames), dtype=fields)
+        keys["in_tangent_type"], keys["out_tangent_type"] = tangent_types
+
+    keys["time"] = frames
+    keys["value"] = values
+    if outside_keys is not None and len(outside_keys):
+        new_keys = np.zeros(len(keys), dtype=outside_keys.dtype)
+        for field in keys.dtype.names:
+            new_keys[field] = keys[field]
+        keys = np.sort(np.concatenate([outside_keys, new_keys]), order="time")
+    mr_utilities.set_keyframe_arrays(curve, keys)
+    return curve
+
+# ------------------------------------------------------------------------------ #
+def get_default_tangent_types():
+    """
+    Get Maya's default in and out tangent types, from the animation preferences.
+    """
+    in_tangent_type = cmds.keyTangent(query=True, global_=True, inTangentType=True)[0]
+    out_tangent_type = cmds.keyTangent(query=True, global_=True, outTangentType=True)[0]
+    return in_tangent_type, out_tangent_type
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                        KEY REDUCTION FUNCTIONS                       #
+#                                                                      #
+########################################################################
+
+# Default tolerances for reduce_animation_curves(), per kind of animation curve.
+REDUCTION_TOLERANCES = {
+    "translate": 0.01,  # Current linear unit.
+    "rotate": 0.1,      # Degrees.
+    "other": 0.001,     # Scale and everything else.
+}
+
+# ------------------------------------------------------------------------------ #
+def evaluate_spline_keys(times, values, keep, tangent_type="auto", return_slopes=False):
+    """
+    Evaluate curves made only of the kept keys, at the time of every key, for many curves at once.
+
+    Tangents are modelled from each kept key's kept neighbours:
+        - "spline": Slope from the key before to the key after. End keys point at their neighbour.
+        - "auto": The same, but flat on peaks and troughs, and at both ends of the curve.
+        - "linear": Straight lines between keys.
+
+    These only approximate Maya's own spline and auto tangents, so curves that need to match should be keyed with the slopes
+    this gives, as fixed tangents.
+
+    :param times: Key times, shaped (curves, keys). Padding after the last key of shorter curves should be NaN.
+    :type times: numpy.ndarray
+    :param values: Key values, the same shape.
+    :type values: numpy.ndarray
+    :param keep: Which keys the evaluated curves have, the same shape. Each curve needs its first and last key.
+    :type keep: numpy.ndarray
+    :param tangent_type: "auto", "spline" or "linear".
+    :type tangent_type: str
+    :param return_slopes: If True, also return the in and out slope of every kept key, in value per frame.
+    :type return_slopes: bool
+    :return: The kept keys' curves evaluated at every key's time, the same shape, and the slopes if return_slopes is True.
+    :rtype: numpy.ndarray or tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+
+    """
+    curve_count, key_count = values.shape
+    positions = np.broadcast_to(np.arange(key_count), (curve_count, key_count))
+
+    # ---------------------------------------
+    # 01. FIND THE KEPT KEYS EITHER SIDE OF EVERY KEY.
+    # ---------------------------------------
+    # At or before, and at or after. -1 and key_count mean there isn't one.
+    previous_kept = np.maximum.accumulate(np.where(keep, positions, -1), axis=1)
+    next_kept = np.minimum.accumulate(np.where(keep, positions, key_count)[:, ::-1], axis=1)[:, ::-1]
+    # Strictly before and after, which are a kept key's neighbours.
+    before = np.concatenate([np.full((curve_count, 1), -1), previous_kept[:, :-1]], axis=1)
+    after = np.concatenate([next_kept[:, 1:], np.full((curve_count, 1), key_count)], axis=1)
+
+    # Gather with flat indices, which is quicker than np.take_along_axis().
+    row_starts = (np.arange(curve_count) * key_count)[:, None]
+    times_flat, values_flat = np.ascontiguousarray(times).ravel(), np.ascontiguousarray(values).ravel()
+    flat_before, flat_after, flat_previous, flat_next = (
+        row_starts + np.clip(indices, 0, key_count - 1) for indices in (before, after, previous_kept, next_kept)
+    )
+
+    # ---------------------------------------
+    # 01. GET THE SLOPE AT EVERY KEPT KEY.
+    # ---------------------------------------
+    has_before = before >= 0
+    has_after = after < key_count
+    time_before, value_before = times_flat[flat_before], values_flat[flat_before]
+    time_after, value_after = times_flat[flat_after], values_flat[flat_after]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if tangent_type == "linear":
+            slopes_in = np.where(has_before, (values - value_before) / (times - time_before), 0.0)
+            slopes_out = np.where(has_after, (value_after - values) / (time_after - times), 0.0)
+        else:
+            middle = (value_after - value_before) / (time_after - time_before)
+            one_sided = np.where(has_before, (values - value_before) / (times - time_before), (value_after - values) / (time_after - times))
+            slopes_in = np.where(has_before & has_after, middle, one_sided)
+            if tangent_type == "auto":
+                is_extreme = (values - value_before) * (value_after - values) <= 0.0
+                slopes_in = np.where(~(has_before & has_after) | is_extreme, 0.0, slopes_in)
+            slopes_out = slopes_in
+    slopes_in = np.nan_to_num(slopes_in)
+    slopes_out = np.nan_to_num(slopes_out)
+
+    # ---------------------------------------
+    # 01. EVALUATE THE HERMITE SEGMENT EACH KEY FALLS IN.
+    # ---------------------------------------
+    start_time, start_value, start_slope = times_flat[flat_previous], values_flat[flat_previous], slopes_out.ravel()[flat_previous]
+    end_time, end_value, end_slope = times_flat[flat_next], values_flat[flat_next], slopes_in.ravel()[flat_next]
+    span = end_time - start_time
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(span > 0.0, (times - start_time) / span, 0.0)
+    s2 = s * s
+    s3 = s2 * s
+    curves = (
+        (2 * s3 - 3 * s2 + 1) * start_value
+        + (s3 - 2 * s2 + s) * span * start_slope
+        + (-2 * s3 + 3 * s2) * end_value
+        + (s3 - s2) * span * end_slope
+    )
+    curves = np.where(keep, values, curves)
+    if return_slopes:
+        return curves, slopes_in, slopes_out
+    return curves
+
+# ------------------------------------------------------------------------------ #
+def reduce_keys(times, values, tolerances, tangent_type="auto", initial_step=4):
+    """
+    Pick the fewest keys that keep each curve within its tolerance of every original key, for many curves at once.
+
+    Starts from every initial_step-th key and the last. Every pass, the key that misses by the most in each gap between kept keys is kept too,
+    until the curve made from the kept keys is within tolerance on every original key.
+    Then kept keys are tried without, every fifth one at a time so their changes don't overlap, and dropped if the curve stays within tolerance.
+
+    :param times: Key times, shaped (curves, keys). Padding after the last key of shorter curves should be NaN.
+    :type times: numpy.ndarray
+    :param values: Key values, the same shape.
+    :type values: numpy.ndarray
+    :param tolerances: Largest allowed error of each curve, shaped (curves,).
+    :type tolerances: numpy.ndarray
+    :param tangent_type: The tangents the reduced curves are modelled with, as "auto", "spline" or "linear",
+                         with evaluate_spline_keys(). The errors are only guaranteed for curves keyed with its slopes.
+    :type tangent_type: str
+    :param initial_step: Keep every this many keys to begin with. Starting from a few keys needs fewer passes than starting from 2.
+    :type initial_step: int
+    :return: Which keys to keep, the same shape as values.
+    :rtype: numpy.ndarray
+
+    :Example:
+
+    >>> times = np.array([[1.0, 2.0, 3.0, 4.0, 5.0]])
+    >>> reduce_keys(times, times * 2.0, np.array([0.01]), "spline")
+    array([[ True, False, False, False,  True]])
+
+    """
+    _check_numpy()
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    curve_count, key_count = values.shape
+    valid = ~np.isnan(times)
+    # Padding is filled in with the last key, so it never misses and never splits a gap.
+    last_positions = np.maximum(valid.sum(axis=1) - 1, 0)
+    times = np.where(valid, times, np.take_along_axis(times, last_positions[:, None], axis=1))
+    values = np.where(valid, values, np.take_along_axis(values, last_positions[:, None], axis=1))
+
+    keep = np.zeros((curve_count, key_count), dtype=bool)
+    keep[:, ::max(int(initial_step), 1)] = True
+    keep[np.arange(curve_count), last_positions] = True
+    positions = np.broadcast_to(np.arange(key_count), (curve_count, key_count))
+    tolerances = np.broadcast_to(np.asarray(tolerances, dtype=float).reshape(-1, 1), (curve_count, 1))
+
+    # ---------------------------------------
+    # 01. ADD KEYS UNTIL EVERY CURVE IS WITHIN TOLERANCE.
+    # ---------------------------------------
+    # Curves only affect themselves, so each pass only evaluates the curves still changing.
+    active = np.arange(curve_count)
+    while len(active):
+        errors = np.abs(evaluate_spline_keys(times[active], values[active], keep[active], tangent_type) - values[active])
+        missing = valid[active] & (errors > tolerances[active])
+        changing = missing.any(axis=1)
+        active, errors, missing = active[changing], errors[changing], missing[changing]
+        if not len(active):
+            break
+
+        # Key the worst of each gap: number gaps by curve and the kept key they start from, then sort worst first within each.
+        active_keep = keep[active]
+        missing = np.flatnonzero(missing)
+        gaps = (missing // key_count) * key_count + np.maximum.accumulate(np.where(active_keep, positions[:len(active)], 0), axis=1).ravel()[missing]
+        order = np.lexsort((-errors.ravel()[missing], gaps))
+        _, first_in_gap = np.unique(gaps[order], return_index=True)
+        active_keep.ravel()[missing[order[first_in_gap]]] = True
+        keep[active] = active_keep
+
+    # ---------------------------------------
+    # 01. DROP KEYS THE CURVES CAN DO WITHOUT.
+    # ---------------------------------------
+    # Dropping a key changes the curve from 2 kept keys before it to 2 after, as their tangents depend on it.
+    # So every fifth kept key can be tried at once, without their changes overlapping.
+    active = np.arange(curve_count)
+    while len(active):
+        dropped_any = np.zeros(len(active), dtype=bool)
+        for phase in range(5):
+            active_keep = keep[active]
+            # Which kept key each key is at or after, counting from 0.
+            ranks = np.cumsum(active_keep, axis=1) - 1
+            candidates = active_keep & (ranks % 5 == phase) & (ranks > 0) & (ranks < ranks[:, -1:])
+            if not candidates.any():
+                continue
+
+            errors = np.abs(evaluate_spline_keys(times[active], values[active], active_keep & ~candidates, tangent_type) - values[active])
+            missing = valid[active] & (errors > tolerances[active])
+
+            # A key that misses is in the changed part of the curve of the candidate 2 ranks after it to 1 rank before it.
+            offsets = (ranks - phase) % 5
+            owner_ranks = np.where(offsets <= 1, ranks - offsets, ranks + 5 - offsets)
+            in_changed_part = missing & (offsets != 2)
+            rejected = np.zeros((len(active), key_count + 5), dtype=bool)
+            rows = np.nonzero(in_changed_part)[0]
+            rejected[rows, np.clip(owner_ranks[in_changed_part], 0, key_count + 4)] = True
+
+            dropped = candidates & ~np.take_along_axis(rejected, np.clip(ranks, 0, key_count + 4), axis=1)
+            keep[active] = active_keep & ~dropped
+            dropped_any |= dropped.any(axis=1)
+        active = active[dropped_any]
+
+    return keep & valid
+
+# ------------------------------------------------------------------------------ #
+def reduce_animation_curves(animation_curves, tolerances=None, tangent_type="auto"):
+    """
+    Remove every key an animation curve can do without, keeping it within a tolerance of how it was.
+    Meant for baked curves, to use after or instead of cmds.filterCurve() and cmds.delete(staticChannels=True).
+
+    All curves are read with mr_utilities.get_keyframe_arrays() and reduced together with reduce_keys().
+    Only curves that lose keys are written back, with mr_utilities.set_keyframe_arrays().
+    Kept keys get fixed tangents, at the slopes evaluate_spline_keys() checked the reduced curve with,
+    as Maya's own spline and auto tangents differ slightly and could take the curve out of tolerance. Linear tangents are kept linear.
+    Weighted curves are made non-weighted, so the fixed tangents give the same Hermite curve.
+
+    :param animation_curves: Animation curves to reduce.
+    :type animation_curves: list(str)
+    :param tolerances: Largest allowed error for "translate", "rotate" and "other" curves, in the current linear unit, degrees,
+                       and plain values. Missing ones use REDUCTION_TOLERANCES.
+    :type tolerances: dict, optional
+    :param tangent_type: Tangents the reduced curves are modelled with, as "auto", "spline" or "linear".
+    :type tangent_type: str
+    :return: A summary, as {"curves": curves changed, "keys_removed": keys removed, "keys_remaining": keys left on every curve}.
+    :rtype: dict
+
+    :Example:
+
+    >>> reduce_animation_curves(cmds.listConnections("locator1", source=True, type="animCurve"), {"rotate": 0.05})
+    {'curves': 6, 'keys_removed': 612, 'keys_remaining': 114}
+
+    """
+    _check_numpy()
+    summary = {"curves": 0, "keys_removed": 0, "keys_remaining": 0}
+    key_arrays = mr_utilities.get_keyframe_arrays(animation_curves)
+    if not key_arrays:
+        return summary
+
+    # ---------------------------------------
+    # 01. PUT EVERY CURVE IN ONE PADDED ARRAY.
+    # ---------------------------------------
+    tolerances = dict(REDUCTION_TOLERANCES, **(tolerances or {}))
+    if cmds.currentUnit(query=True, angle=True) == "rad":
+        tolerances["rotate"] = np.radians(tolerances["rotate"])
+
+    connection_cache = mr_utilities.get_connection_cache()
+    curves = list(key_arrays)
+    key_count = max(len(keys) for keys in key_arrays.values())
+    times = np.full((len(curves), key_count), np.nan)
+    values = np.full((len(curves), key_count), np.nan)
+    curve_tolerances = np.empty(len(curves))
+    for curve_index, curve in enumerate(curves):
+        keys = key_arrays[curve]
+        times[curve_index, :len(keys)] = keys["time"]
+        values[curve_index, :len(keys)] = keys["value"]
+        curve_type = connection_cache.node_type(curve)
+        kind = {"animCurveTL": "translate", "animCurveTA": "rotate"}.get(curve_type, "other")
+        curve_tolerances[curve_index] = tolerances[kind]
+
+    # ---------------------------------------
+    # 01. REDUCE, AND WRITE BACK CURVES THAT CHANGED.
+    # ---------------------------------------
+    keep = reduce_keys(times, values, curve_tolerances, tangent_type)
+    if tangent_type != "linear":
+        # Padding is filled in with the last key, like reduce_keys() does, so it doesn't change the slopes.
+        last_positions = np.maximum((~np.isnan(times)).sum(axis=1) - 1, 0)[:, None]
+        padded_times = np.where(np.isnan(times), np.take_along_axis(times, last_positions, axis=1), times)
+        padded_values = np.where(np.isnan(values), np.take_along_axis(values, last_positions, axis=1), values)
+        _, slopes_in, slopes_out = evaluate_spline_keys(padded_times, padded_values, keep, tangent_type, return_slopes=True)
+        # Tangent angles are measured against time in seconds.
+        frames_per_second = mr_utilities.get_frames_per_second()
+        in_angles = np.degrees(np.arctan(slopes_in * frames_per_second))
+        out_angles = np.degrees(np.arctan(slopes_out * frames_per_second))
+
+    fields = [field for field in mr_utilities.KEYFRAME_ARRAY_FIELDS if field[0] != "selected"]
+    cmds.undoInfo(openChunk=True)
+    try:
+        for curve_index, curve in enumerate(curves):
+            kept_count = int(keep[curve_index].sum())
+            summary["keys_remaining"] += kept_count
+            if kept_count == len(key_arrays[curve]):
+                continue
+            kept = keep[curve_index]
+            kept_keys = np.zeros(kept_count, dtype=fields)
+            kept_keys["time"] = times[curve_index][kept]
+            kept_keys["value"] = values[curve_index][kept]
+            if tangent_type == "linear":
+                kept_keys["in_tangent_type"] = kept_keys["out_tangent_type"] = "linear"
+            else:
+                kept_keys["in_tangent_type"] = kept_keys["out_tangent_type"] = "fixed"
+                kept_keys["in_angle"] = in_angles[curve_index][kept]
+                kept_keys["out_angle"] = out_angles[curve_index][kept]
+                kept_keys["in_weight"] = kept_keys["out_weight"] = 1.0
+                if (cmds.keyTangent(curve, query=True, weightedTangents=True) or [False])[0]:
+                    cmds.keyTangent(curve, edit=True, weightedTangents=False)
+            mr_utilities.set_keyframe_arrays(curve, kept_keys)
+            summary["curves"] += 1
+            summary["keys_removed"] += len(key_arrays[curve]) - kept_count
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return summary
+
+# ------------------------------------------------------------------------------ #
+def reduce_object_curves(objects, tolerances=None, tangent_type="auto"):
+    """
+    Reduce every animation curve directly connected to some objects, with reduce_animation_curves().
+    For bake tools, to clean up the objects they just baked.
+
+    :param objects: Objects whose animation curves to reduce.
+    :type objects: list(str)
+    :param tolerances: Largest allowed error for "translate", "rotate" and "other" curves. Missing ones use REDUCTION_TOLERANCES.
+    :type tolerances: dict, optional
+    :param tangent_type: Tangents the reduced curves are modelled with, as "auto", "spline" or "linear".
+    :type tangent_type: str
+    :return: The summary from reduce_animation_curves().
+    :rtype: dict
+
+    """
+    animation_curves = cmds.listConnections(objects, source=True, destination=False, type="animCurve") or []
+    summary = reduce_animation_curves(list(dict.fromkeys(animation_curves)), tolerances, tangent_type)
+    print("Removed {} keys from {} curves, leaving {}.".format(summary["keys_removed"], summary["curves"], summary["keys_remaining"]))
+    return summary
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                          KEY TIMING FUNCTIONS                        #
+#                                                                      #
+########################################################################
+
+# How strongly each slope is pulled towards a spline tangent, for keys with no frames between them and their neighbours to fit.
+SLOPE_SMOOTHING = 1e-4
+
+# ------------------------------------------------------------------------------ #
+def get_key_times(objects, start_time=None, end_time=None, breakdowns=0):
+    """
+    Get every time any of the objects has a key, merged into one sorted list, to bake on the same key timing.
+
+    All key times come from one keyframe query, then get sorted and merged with NumPy.
+    The first and last frame are always included, so the whole range is covered.
+
+    :param objects: Objects whose key times to use.
+    :type objects: list(str)
+    :param start_time: First frame. If None, the start of the playback range.
+    :type start_time: float, optional
+    :param end_time: Last frame. If None, the end of the playback range.
+    :type end_time: float, optional
+    :param breakdowns: How many extra frames to add between each pair of key times, evenly spaced and rounded to whole frames.
+    :type breakdowns: int
+    :return: The key times, sorted.
+    :rtype: numpy.ndarray
+
+    :Example:
+
+    >>> get_key_times(["pSphere1", "pCube1"], 1, 24, breakdowns=1)
+    array([ 1.,  4.,  7., 10., 17., 24.])
+
+    """
+    _check_numpy()
+    frames = get_frames(start_time, end_time)
+    start_time, end_time = frames[0], frames[-1]
+
+    key_times = cmds.keyframe(objects, query=True, timeChange=True, time=(start_time, end_time)) or []
+    key_times = np.unique(np.concatenate([key_times, [start_time, end_time]]))
+
+    if breakdowns > 0:
+        fractions = np.arange(1, breakdowns + 1) / (breakdowns + 1.0)
+        gaps = np.diff(key_times)
+        extra_times = np.round(key_times[:-1, None] + gaps[:, None] * fractions[None, :])
+        key_times = np.unique(np.concatenate([key_times, extra_times.ravel()]))
+
+    return key_times
+
+# ------------------------------------------------------------------------------ #
+def fit_key_slopes(frames, values, key_indices):
+    """
+    Solve the tangent slope of every key, so the curve through the keys follows the values on every frame in between.
+
+    Each segment between keys is a Hermite curve, like Maya's, so each frame's value depends linearly on the slopes of the keys either side.
+    That makes one least squares problem per channel, which only links neighbouring keys.
+    Every channel shares the same keys and frames, so they're all solved at once.
+
+    :param frames: Every sampled frame, in order.
+    :type frames: numpy.ndarray
+    :param values: Values at every frame, shaped (frames, channels).
+    :type values: numpy.ndarray
+    :param key_indices: Indices of the frames to key, in order, including the first and last frame.
+    :type key_indices: numpy.ndarray
+    :return: Each key's slope in value per frame, shaped (keys, channels). Use the same slope for the in and out tangent.
+    :rtype: numpy.ndarray
+
+    """
+    _check_numpy()
+    frames = np.asarray(frames, dtype=float)
+    values = np.asarray(values, dtype=float)
+    key_indices = np.asarray(key_indices, dtype=int)
+    key_count = len(key_indices)
+    key_times = frames[key_indices]
+    key_values = values[key_indices]
+
+    # ---------------------------------------
+    # 01. FIND WHERE EACH FRAME IS IN ITS SEGMENT.
+    # ---------------------------------------
+    segments = np.clip(np.searchsorted(key_indices, np.arange(len(frames)), side="right") - 1, 0, max(key_count - 2, 0))
+    inbetween = np.ones(len(frames), dtype=bool)
+    inbetween[key_indices] = False
+    segments = segments[inbetween]
+    spans = np.diff(key_times)[segments]
+    s = (frames[inbetween] - key_times[segments]) / spans
+    s2 = s * s
+    s3 = s2 * s
+
+    # Each frame is start_weight * start value + end_weight * end value + in_weight * start slope + out_weight * end slope.
+    start_weights = (2 * s3 - 3 * s2 + 1)[:, None]
+    end_weights = (-2 * s3 + 3 * s2)[:, None]
+    in_weights = (s3 - 2 * s2 + s) * spans
+    out_weights = (s3 - s2) * spans
+    residuals = values[inbetween] - start_weights * key_values[segments] - end_weights * key_values[segments + 1]
+
+    # ---------------------------------------
+    # 01. BUILD AND SOLVE THE NORMAL EQUATIONS.
+    # ---------------------------------------
+    # Keys with no frames to fit lean towards a spline tangent, which barely changes keys that have some.
+    spline_slopes = np.gradient(key_values, key_times, axis=0) if key_count > 1 else np.zeros_like(key_values)
+    normal = np.eye(key_count) * SLOPE_SMOOTHING
+    right_side = spline_slopes * SLOPE_SMOOTHING
+
+    np.add.at(normal, (segments, segments), in_weights * in_weights)
+    np.add.at(normal, (segments + 1, segments + 1), out_weights * out_weights)
+    np.add.at(normal, (segments, segments + 1), in_weights * out_weights)
+    np.add.at(normal, (segments + 1, segments), in_weights * out_weights)
+    np.add.at(right_side, segments, in_weights[:, None] * residuals)
+    np.add.at(right_side, segments + 1, out_weights[:, None] * residuals)
+
+    return np.linalg.solve(normal, right_side)
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                            BAKE FUNCTIONS                            #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def bake_worldspace(sources, targets, start_time=None, end_time=None, sample_by=1, tolerance=None, initial_step=8, key_times=None,
+                    chunk_size=None, incremental=False):
+    """
+    Bake the world position and rotation of each source onto its target, without constraints or changing the current time.
+
+    Gives the same result as point and orient constraining each target to its source, then running bakeResults with minimizeRotation
+    and deleting static channels. The position followed is each source's rotate pivot, like a pointConstraint.
+
+    With a tolerance, frames are sampled and keyed adaptively with sample_adaptive(), so each channel only gets keys where it needs them.
+    With key_times, e.g. from get_key_times(), only those times are keyed, with tangents from fit_key_slopes() to follow every frame between them.
+    With a chunk_size, every frame is keyed with stream_bake(), a chunk at a time with a progress bar, for very long ranges.
+    With incremental, values are reused from the last bake of each source with sample_incrementally(),
+    and only frames reached by keys changed upstream since then are sampled again.
+
+    :param sources: Objects to follow.
+    :type sources: list(str)
+    :param targets: Objects to key, one per source. They should be in world space, i.e. not parented to anything.
+    :type targets: list(str)
+    :param start_time: First frame. If None, the start of the playback range.
+    :type start_time: float, optional
+    :param end_time: Last frame. If None, the end of the playback range.
+    :type end_time: float, optional
+    :param sample_by: Step between keys, or between frames that could get keys with a tolerance.
+    :type sample_by: float
+    :param tolerance: If given, the largest allowed error, in the current linear unit for translation and degrees for rotation.
+                      Keys get linear tangents. If None, every frame is keyed with the default tangents.
+    :type tolerance: float, optional
+    :param initial_step: With a tolerance, how many frames apart the first keys are.
+    :type initial_step: int
+    :param key_times: If given, the only times to key, with fixed tangents. Can't be used with a tolerance.
+    :type key_times: list(float) or numpy.ndarray, optional
+    :param chunk_size: If given, how many frames to sample and key at a time. Can't be used with a tolerance or key_times.
+    :type chunk_size: int, optional
+    :param incremental: If True, reuse values from earlier bakes of the same sources where their upstream animation hasn't changed.
+                        Can't be used with a tolerance or a chunk_size.
+    :type incremental: bool
+    :return: The animation curves made on each target, as {target: [curves]}.
+    :rtype: dict
+    :raises BakeCancelled: If a chunked bake was cancelled with Esc.
+
+    :Example:
+
+    >>> bake_worldspace(["pSphere1"], ["pSphere1_temp_worldspace_locator"], 1, 120)
+    {'pSphere1_temp_worldspace_locator': ['pSphere1_temp_worldspace_locator_translateX', ...]}
+
+    """
+    _check_numpy()
+    if len(sources) != len(targets):
+        raise ValueError("bake_worldspace() needs one target per source.")
+    if sum(option is not None for option in (tolerance, key_times, chunk_size)) > 1:
+        raise ValueError("bake_worldspace() can only use one of a tolerance, key_times or a chunk_size.")
+    if incremental and (tolerance is not None or chunk_size is not None):
+        raise ValueError("bake_worldspace() can't bake incrementally with a tolerance or a chunk_size.")
+
+    frames, key_indices = _get_key_timing(get_frames(start_time, end_time, sample_by), key_times)
+
+    # ---------------------------------------
+    # 01. GET WHAT'S NEEDED TO TURN MATRICES INTO CHANNELS.
+    # ---------------------------------------
+    linear_scale = mr_utilities.LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    # Pivots are in the current linear unit, but matrices are in centimetres.
+    pivots = np.array([cmds.getAttr(source + ".rotatePivot")[0] for source in sources]) / linear_scale
+    rotate_orders = [cmds.getAttr(target + ".rotateOrder") for target in targets]
+
+    # Channels are tx, ty, tz, rx, ry, rz of the first target, then the next, and so on.
+    def sample(sample_frames):
+        channels = _get_worldspace_channels(sources, sample_frames, pivots, rotate_orders, linear_scale)
+        return channels.reshape(len(sample_frames), -1)
+
+    if chunk_size is not None:
+        attributes = ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")
+        object_attributes = [f"{target}.{attribute}" for target in targets for attribute in attributes]
+        curve_types = ["animCurveTL", "animCurveTL", "animCurveTL", "animCurveTA", "animCurveTA", "animCurveTA"] * len(targets)
+        angle_channels = np.array([False, False, False, True, True, True] * len(targets))
+        angle_scale = np.pi / 180.0 if cmds.currentUnit(query=True, angle=True) == "rad" else 1.0
+
+        def sample_in_scene_units(sample_frames):
+            values = sample(sample_frames)
+            values[:, angle_channels] *= angle_scale
+            return values
+
+        baked = stream_bake(sample_in_scene_units, frames, object_attributes, curve_types, angle_channels, chunk_size,
+                            "Baking to worldspace...")
+        return {target: [baked[f"{target}.{attribute}"] for attribute in attributes if baked[f"{target}.{attribute}"]] for target in targets}
+
+    def unwrap(values):
+        rotations = np.swapaxes(values.reshape(len(values), len(sources), 6)[..., 3:], 0, 1)
+        channels = values.reshape(len(values), len(sources), 6).copy()
+        channels[..., 3:] = np.swapaxes(filter_euler_rotations(rotations), 0, 1)
+        return channels.reshape(len(values), -1)
+
+    # ---------------------------------------
+    # 01. SAMPLE EVERY FRAME, OR ONLY WHERE NEEDED.
+    # ---------------------------------------
+    slopes = None
+    if incremental:
+        def sample_sources(source_subset, sample_frames):
+            indices = [sources.index(source) for source in source_subset]
+            return _get_worldspace_channels(source_subset, sample_frames, pivots[indices], [rotate_orders[i] for i in indices], linear_scale)
+
+        def unwrap_source(channels):
+            channels = channels.copy()
+            channels[:, 3:] = filter_euler_rotations(channels[:, 3:])
+            return channels
+
+        linear_unit = cmds.currentUnit(query=True, linear=True)
+        cache_keys = [(rotate_order, linear_unit, "worldspace") for rotate_order in rotate_orders]
+        values, sampled_count = sample_incrementally(sources, frames, sample_sources, cache_keys, prepare=unwrap_source)
+        values = values.reshape(len(frames), -1)
+        print(f"Sampled {sampled_count} of {len(frames) * len(sources)} source frames, reusing the rest from the last bake.")
+
+    if tolerance is None:
+        key_frames = frames
+        if not incremental:
+            values = unwrap(sample(frames))
+        if key_indices is not None:
+            key_frames = frames[key_indices]
+            slopes = fit_key_slopes(frames, values, key_indices).reshape(len(key_frames), len(targets), 6)
+            values = values[key_indices]
+        keys = np.ones(values.shape, dtype=bool)
+        tangent_types = get_default_tangent_types()
+    else:
+        key_frames, values, keys = sample_adaptive(sample, frames, tolerance, initial_step, prepare=unwrap)
+        tangent_types = ("linear", "linear")
+
+    values = values.reshape(len(key_frames), len(targets), 6)
+    keys = keys.reshape(len(key_frames), len(targets), 6)
+    if cmds.currentUnit(query=True, angle=True) == "rad":
+        values[..., 3:] = np.radians(values[..., 3:])
+        if slopes is not None:
+            slopes[..., 3:] = np.radians(slopes[..., 3:])
+
+    # ---------------------------------------
+    # 01. WRITE ANIMATION CURVES.
+    # ---------------------------------------
+    curves = {}
+    cmds.undoInfo(openChunk=True)
+    try:
+        for target_index, target in enumerate(targets):
+            target_curves = []
+            for channel_index, attribute in enumerate(("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")):
+                channel_keys = keys[:, target_index, channel_index]
+                curve = write_animation_curve(
+                    f"{target}.{attribute}",
+                    key_frames[channel_keys],
+                    values[channel_keys, target_index, channel_index],
+                    "animCurveTL" if channel_index < 3 else "animCurveTA",
+                    tangent_types,
+                    None if slopes is None else slopes[channel_keys, target_index, channel_index]
+                )
+                if curve:
+                    target_curves.append(curve)
+            curves[target] = target_curves
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return curves
+
+# ------------------------------------------------------------------------------ #
+def _get_worldspace_channels(sources, frames, pivots, rotate_orders, linear_scale):
+    # World translate and rotate values, shaped (frames, sources, 6). Rotations are in degrees, and not unwrapped yet.
+    matrices = sample_world_matrices(sources, frames)
+    translations = get_world_positions(matrices, pivots[:, None, :]) * linear_scale
+
+    rotations = np.empty_like(translations)
+    for rotate_order in set(rotate_orders):
+        same_order = np.array([order == rotate_order for order in rotate_orders])
+        rotations[same_order] = get_euler_rotations(matrices[same_order], rotate_order)
+
+    return np.concatenate([translations, rotations], axis=-1).transpose(1, 0, 2)
+
+# ------------------------------------------------------------------------------ #
+def get_bake_source(object_attribute, connection_cache=None):
+    """
+    Find what drives an attribute, and whether bake_attributes() can key it directly.
+
+    Attributes that are free, keyed over time, or driven by a constraint can be keyed directly.
+    So can attributes driven by a pairBlend from a constraint, which Maya adds when constraining attributes that already had keys.
+    Anything else, e.g. animation layers, driven keys or expressions, can't.
+
+    :param object_attribute: The object attribute, e.g. "locator1.translateX".
+    :type object_attribute: str
+    :param connection_cache: Where to look up connections. If None, the shared mr_utilities connection cache.
+    :type connection_cache: mr_utilities.ConnectionGraphCache, optional
+    :return: The source plug driving the attribute, or None, and whether it can be keyed directly.
+    :rtype: tuple(str or None, bool)
+
+    """
+    connection_cache = connection_cache or mr_utilities.get_connection_cache()
+    source = connection_cache.source(object_attribute)
+    if not source:
+        return None, True
+
+    source_node, _, source_attribute = source.partition(".")
+    source_type = connection_cache.node_type(source_node)
+    if source_type.endswith("Constraint") or source_type.startswith("animCurveT"):
+        return source, True
+
+    if source_type == "pairBlend" and source_attribute.startswith("out"):
+        # The pairBlend's first input is the attribute's own keys, and its second the constraint.
+        channel = source_attribute[len("out"):]
+        keys_source = connection_cache.source(f"{source_node}.in{channel}1")
+        constraint_source = connection_cache.source(f"{source_node}.in{channel}2")
+        keys_bakeable = not keys_source or connection_cache.node_type(keys_source.split(".")[0]).startswith("animCurveT")
+        if keys_bakeable and constraint_source and connection_cache.node_type(constraint_source.split(".")[0]).endswith("Constraint"):
+            return source, True
+
+    return source, False
+
+# ------------------------------------------------------------------------------ #
+def release_bake_source(object_attribute, connection_cache=None):
+    """
+    Disconnect a constraint or pairBlend from an attribute about to be keyed, like bakeResults(disableImplicitControl=True) does.
+
+    Constraints are disconnected, but not deleted.
+    A pairBlend hands the attribute back to the keys it blended from, so they're the ones rekeyed, and is deleted once it drives nothing.
+    Animation curves are left connected.
+
+    :param object_attribute: The object attribute, e.g. "locator1.translateX".
+    :type object_attribute: str
+    :param connection_cache: Where to look up connections. If None, the shared mr_utilities connection cache.
+    :type connection_cache: mr_utilities.ConnectionGraphCache, optional
+
+    """
+    connection_cache = connection_cache or mr_utilities.get_connection_cache()
+    source = connection_cache.source(object_attribute)
+    if not source:
+        return
+
+    source_node, _, source_attribute = source.partition(".")
+    source_type = connection_cache.node_type(source_node)
+    if source_type.endswith("Constraint"):
+        cmds.disconnectAttr(source, object_attribute)
+
+    elif source_type == "pairBlend":
+        keys_source = connection_cache.source(f"{source_node}.in{source_attribute[len('out'):]}1")
+        if keys_source:
+            cmds.connectAttr(keys_source, object_attribute, force=True)
+        else:
+            cmds.disconnectAttr(source, object_attribute)
+        if not cmds.listConnections(source_node, source=False, destination=True):
+            cmds.delete(source_node)
+
+# ------------------------------------------------------------------------------ #
+def bake_attributes(object_attributes, start_time=None, end_time=None, sample_by=1, tolerance=None, initial_step=8, key_times=None,
+                    chunk_size=None, incremental=False):
+    """
+    Bake what attributes evaluate to over time onto their own animation curves, like bakeResults(disableImplicitControl=True).
+
+    Values are read with mr_utilities.TimeSampler, without changing the current time.
+    Constraints driving the attributes are disconnected before keying, but not deleted.
+    Where a constraint drives an attribute through a pairBlend, the pairBlend is removed and the attribute's own keys are replaced.
+    Attributes that can't be keyed directly, e.g. on animation layers or driven by expressions, are baked on every frame with bakeResults.
+    With incremental, values are reused from the last bake of each attribute with sample_incrementally(),
+    and only frames reached by keys changed upstream since then are sampled again.
+
+    :param object_attributes: Attributes to bake, e.g. ["locator1.translate", "locator1.rotateY"]. Compounds bake each child.
+    :type object_attributes: list(str)
+    :param start_time: First frame. If None, the start of the playback range.
+    :type start_time: float, optional
+    :param end_time: Last frame. If None, the end of the playback range.
+    :type end_time: float, optional
+    :param sample_by: Step between keys, or between frames that could get keys with a tolerance.
+    :type sample_by: float
+    :param tolerance: If given, the largest allowed error in each attribute's unit, using sample_adaptive() and linear tangents.
+                      If None, every frame is keyed with the default tangents.
+    :type tolerance: float, optional
+    :param initial_step: With a tolerance, how many frames apart the first keys are.
+    :type initial_step: int
+    :param key_times: If given, the only times to key, with fixed tangents from fit_key_slopes(). Can't be used with a tolerance.
+    :type key_times: list(float) or numpy.ndarray, optional
+    :param chunk_size: If given, key every frame with stream_bake(), this many frames at a time with a progress bar.
+                       Can't be used with a tolerance or key_times.
+    :type chunk_size: int, optional
+    :param incremental: If True, reuse values from earlier bakes of the same attributes where their upstream animation hasn't changed.
+                        Can't be used with a tolerance or a chunk_size.
+    :type incremental: bool
+    :return: The animation curve of each baked attribute, or None where it was static.
+    :rtype: dict
+    :raises BakeCancelled: If a chunked bake was cancelled with Esc.
+
+    """
+    _check_numpy()
+    if sum(option is not None for option in (tolerance, key_times, chunk_size)) > 1:
+        raise ValueError("bake_attributes() can only use one of a tolerance, key_times or a chunk_size.")
+    if incremental and (tolerance is not None or chunk_size is not None):
+        raise ValueError("bake_attributes() can't bake incrementally with a tolerance or a chunk_size.")
+
+    frames, key_indices = _get_key_timing(get_frames(start_time, end_time, sample_by), key_times)
+    sampler = mr_utilities.TimeSampler(object_attributes)
+
+    # Only channels that are free to key, keyed, or driven by a constraint are keyed directly.
+    bakeable = [get_bake_source(object_attribute)[1] for object_attribute in sampler.channels]
+    bakeable_indices = [channel_index for channel_index, is_bakeable in enumerate(bakeable) if is_bakeable]
+    unbakeable_attributes = [object_attribute for object_attribute, is_bakeable in zip(sampler.channels, bakeable) if not is_bakeable]
+
+    # ---------------------------------------
+    # 01. SAMPLE EVERY FRAME, OR ONLY WHERE NEEDED.
+    # ---------------------------------------
+    full_turn = 2.0 * np.pi if cmds.currentUnit(query=True, angle=True) == "rad" else 360.0
+    angle_channels = np.array([unit == "angle" for unit in sampler.units], dtype=bool)
+    curve_types = [{"linear": "animCurveTL", "angle": "animCurveTA"}.get(unit, "animCurveTU") for unit in sampler.units]
+
+    if chunk_size is not None:
+        curves = stream_bake(
+            lambda sample_frames: sampler.sample(sample_frames)[:, bakeable_indices],
+            frames,
+            [sampler.channels[i] for i in bakeable_indices],
+            [curve_types[i] for i in bakeable_indices],
+            angle_channels[bakeable_indices],
+            chunk_size
+        )
+        # Anything that couldn't be keyed directly is still baked, once the chunked bake is done.
+        curves.update(_bake_results(unbakeable_attributes, frames[0], frames[-1], sample_by))
+        return curves
+
+    def unwrap(values):
+        values = values.copy()
+        values[:, angle_channels] = filter_euler_rotations(values[:, angle_channels], full_turn)
+        return values
+
+    slopes = None
+    if tolerance is None:
+        key_frames = frames
+        if incremental:
+            # Each attribute is its own source, keyed in the cache by its plug, with its node's upstream animation.
+            def sample_channels(channel_subset, sample_frames):
+                return mr_utilities.TimeSampler(channel_subset).sample(sample_frames)[..., None]
+
+            linear_unit = cmds.currentUnit(query=True, linear=True)
+            angle_unit = cmds.currentUnit(query=True, angle=True)
+            cache_keys = [(linear_unit, angle_unit, "attribute")] * len(sampler.channels)
+            values, sampled_count = sample_incrementally(sampler.channels, frames, sample_channels, cache_keys,
+                                                         nodes=[channel.split(".")[0] for channel in sampler.channels])
+            values = unwrap(values[..., 0])
+            print(f"Sampled {sampled_count} of {len(frames) * len(sampler.channels)} attribute frames, reusing the rest from the last bake.")
+        else:
+            values = unwrap(sampler.sample(frames))
+        if key_indices is not None:
+            key_frames = frames[key_indices]
+            slopes = fit_key_slopes(frames, values, key_indices)
+            values = values[key_indices]
+        keys = np.ones(values.shape, dtype=bool)
+        tangent_types = get_default_tangent_types()
+    else:
+        key_frames, values, keys = sample_adaptive(sampler.sample, frames, tolerance, initial_step, prepare=unwrap)
+        tangent_types = ("linear", "linear")
+
+    # ---------------------------------------
+    # 01. DISCONNECT CONSTRAINTS, AND WRITE ANIMATION CURVES.
+    # ---------------------------------------
+    curves = {}
+    cmds.undoInfo(openChunk=True)
+    try:
+        for channel_index, object_attribute in enumerate(sampler.channels):
+            if not bakeable[channel_index]:
+                continue
+            release_bake_source(object_attribute)
+
+            channel_keys = keys[:, channel_index]
+            curves[object_attribute] = write_animation_curve(
+                object_attribute,
+                key_frames[channel_keys],
+                values[channel_keys, channel_index],
+                curve_types[channel_index],
+                tangent_types,
+                None if slopes is None else slopes[channel_keys, channel_index]
+            )
+
+        # Anything that couldn't be keyed directly is still baked.
+        curves.update(_bake_results(unbakeable_attributes, frames[0], frames[-1], sample_by))
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return curves
+
+# ------------------------------------------------------------------------------ #
+def bake_offset_groups(objects, groups, start_time=None, end_time=None, animate_groups=True):
+    """
+    Put each object into its own offset group, keeping how it moves in the world, from one sweep of sampled matrices.
+
+    Every object's world and parent matrix is read at every frame with one TimeSampler, before anything is reparented.
+    Each group gets the object's world rotation and rotate pivot position, in the space of the object's parent.
+    Each object then gets whatever translate and rotate is left over inside its group, allowing for its pivots, rotateAxis and jointOrient.
+    Both are keyed straight from the matrices, with no constraints or bakeResults.
+
+    :param objects: Transforms to put into offset groups.
+    :type objects: list(str)
+    :param groups: Empty transforms, one per object, already under the object's parent, or in world space if it has none.
+    :type groups: list(str)
+    :param start_time: First frame. If None, the start of the playback range.
+    :type start_time: float, optional
+    :param end_time: Last frame. If None, the end of the playback range.
+    :type end_time: float, optional
+    :param animate_groups: If True, groups are keyed to follow their objects, and objects' translate and rotate are left static.
+                           Static channels that are keyed keep their key times, with every key set to the new value.
+                           If False, groups hold the objects' pose at the current time, and objects are keyed to move inside them.
+    :type animate_groups: bool
+    :return: The animation curves made on each group and object, as {node: [curves]}.
+    :rtype: dict
+
+    :Example:
+
+    >>> bake_offset_groups(["arm_ctrl"], ["arm_ctrl_offset_grp"], 1, 120)
+    {'arm_ctrl_offset_grp': ['arm_ctrl_offset_grp_translateX', ...], 'arm_ctrl': []}
+
+    """
+    _check_numpy()
+    if len(objects) != len(groups):
+        raise ValueError("bake_offset_groups() needs one group per object.")
+
+    attributes = ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")
+    curve_types = ("animCurveTL", "animCurveTL", "animCurveTL", "animCurveTA", "animCurveTA", "animCurveTA")
+    frames = get_frames(start_time, end_time)
+    current_time = cmds.currentTime(query=True)
+
+    # ---------------------------------------
+    # 01. SAMPLE EVERY WORLD AND PARENT MATRIX IN ONE SWEEP.
+    # ---------------------------------------
+    # The current time is sampled too, for groups that hold the current pose.
+    sample_frames = np.union1d(frames, [current_time])
+    frame_indices = np.searchsorted(sample_frames, frames)
+    sources = list(objects) + [f"{obj}.parentMatrix[0]" for obj in objects]
+    samples = mr_utilities.sample_plugs(sources, sample_frames).reshape(len(sample_frames), 2, len(objects), 4, 4)
+    world_matrices, parent_matrices = samples.transpose(1, 2, 0, 3, 4)
+
+    # Pivots are in the current linear unit, but matrices are in centimetres.
+    linear_scale = mr_utilities.LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    rotate_pivots = np.array([cmds.getAttr(obj + ".rotatePivot")[0] for obj in objects]) / linear_scale
+
+    # ---------------------------------------
+    # 01. MATCH EACH GROUP TO ITS OBJECT'S ROTATION AND PIVOT.
+    # ---------------------------------------
+    group_worlds = get_pivot_matrices(world_matrices, rotate_pivots)
+    if not animate_groups:
+        current_index = np.searchsorted(sample_frames, current_time)
+        group_worlds[:] = group_worlds[:, current_index:current_index + 1]
+
+    group_locals = group_worlds @ np.linalg.inv(parent_matrices)
+    group_rotations = get_euler_rotations(group_locals)
+
+    # Groups don't take on their parents' scale, so rebuild where they really end up, for objects to move inside.
+    group_locals[..., :3, :3] = get_rotation_matrices(group_rotations)
+    object_locals = world_matrices @ np.linalg.inv(group_locals @ parent_matrices)
+
+    # ---------------------------------------
+    # 01. SPLIT GROUP AND OBJECT MATRICES INTO CHANNELS.
+    # ---------------------------------------
+    group_channels = np.concatenate([group_locals[..., 3, :3] * linear_scale, filter_euler_rotations(group_rotations)], axis=-1)
+    object_channels = get_local_channels(objects, object_locals)
+    object_channels[..., 3:] = filter_euler_rotations(object_channels[..., 3:])
+
+    group_channels = group_channels[:, frame_indices]
+    object_channels = object_channels[:, frame_indices]
+    if cmds.currentUnit(query=True, angle=True) == "rad":
+        group_channels[..., 3:] = np.radians(group_channels[..., 3:])
+        object_channels[..., 3:] = np.radians(object_channels[..., 3:])
+
+    # ---------------------------------------
+    # 01. PARENT OBJECTS INTO THEIR GROUPS, AND WRITE ANIMATION CURVES.
+    # ---------------------------------------
+    connection_cache = mr_utilities.get_connection_cache()
+    curves = {}
+    cmds.undoInfo(openChunk=True)
+    try:
+        for obj, group in zip(objects, groups):
+            # Every channel is set below, so there's no need for Maya to keep the world position.
+            cmds.parent(obj, group, relative=True)
+
+        # Static channels with keys are rekeyed on the same times, so read all of their keys at once.
+        static_curves = {}
+        for object_index, obj in enumerate(objects):
+            for channel_index, attribute in enumerate(attributes):
+                values = object_channels[object_index, :, channel_index]
+                source = connection_cache.source(f"{obj}.{attribute}")
+                if animate_groups and np.ptp(values) <= STATIC_TOLERANCE and source and \
+                        connection_cache.node_type(source.split(".")[0]).startswith("animCurve"):
+                    static_curves[source.split(".")[0]] = float(values[0])
+        key_arrays = mr_utilities.get_keyframe_arrays(list(static_curves))
+
+        for nodes, channels in ((groups, group_channels), (objects, object_channels)):
+            for node_index, node in enumerate(nodes):
+                node_curves = []
+                for channel_index, attribute in enumerate(attributes):
+                    source = connection_cache.source(f"{node}.{attribute}")
+                    curve = source.split(".")[0] if source else None
+                    if curve in static_curves:
+                        keys = key_arrays[curve].copy()
+                        keys["value"] = static_curves[curve]
+                        keys["in_tangent_type"] = keys["out_tangent_type"] = "flat"
+                        mr_utilities.set_keyframe_arrays(curve, keys)
+                        continue
+                    curve = write_animation_curve(
+                        f"{node}.{attribute}", frames, channels[node_index, :, channel_index], curve_types[channel_index]
+                    )
+                    if curve:
+                        node_curves.append(curve)
+                curves[node] = node_curves
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return curves
+
+# ------------------------------------------------------------------------------ #
+def key_world_matrices(objects, matrices, attributes=("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")):
+    """
+    Key objects on the current frame so they land on the given world matrices, solving every object's values at once.
+
+    Parent matrices and current rotations are read with one TimeSampler, and get_local_channels() solves every object together.
+    Objects under other objects being keyed are solved against where those will be, so the order they're given in doesn't matter.
+    Rotations are kept within half a turn of their current values, so keys don't spin the long way round. Locked attributes are skipped.
+
+    :param objects: Transforms to key.
+    :type objects: list(str)
+    :param matrices: A world matrix for each object, shaped (objects, 4, 4), in centimetres.
+    :type matrices: numpy.ndarray
+    :param attributes: Which of the translate and rotate attributes to key.
+    :type attributes: tuple(str)
+    :return: How many attributes were keyed.
+    :rtype: int
+
+    :Example:
+
+    >>> key_world_matrices(["arm_ctrl"], sample_world_matrices(["arm_ctrl_temp_locator"], [12])[:, 0])
+    6
+
+    """
+    _check_numpy()
+    current_time = cmds.currentTime(query=True)
+    all_attributes = ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")
+
+    # ---------------------------------------
+    # 01. READ EVERY PARENT AND WORLD MATRIX, AND CURRENT ROTATION, AT ONCE.
+    # ---------------------------------------
+    count = len(objects)
+    sources = [f"{obj}.parentMatrix[0]" for obj in objects] + list(objects) + [f"{obj}.rotate" for obj in objects]
+    samples = mr_utilities.sample_plugs(sources, [current_time])[0]
+    parent_matrices = samples[:16 * count].reshape(count, 4, 4)
+    world_matrices = samples[16 * count:32 * count].reshape(count, 4, 4)
+    current_rotations = samples[32 * count:].reshape(count, 3)
+
+    # Objects under others being keyed move with them, so solve them in the space their parents will have.
+    # Everything between an object and its nearest keyed ancestor stays the same, so carry that part over.
+    matrices = np.asarray(matrices, dtype=float)
+    for object_index, ancestor in enumerate(_get_nearest_ancestors(objects)):
+        if ancestor is not None:
+            parent_matrices[object_index] = parent_matrices[object_index] @ np.linalg.inv(world_matrices[ancestor]) @ matrices[ancestor]
+
+    # ---------------------------------------
+    # 01. SOLVE EVERY OBJECT'S CHANNELS.
+    # ---------------------------------------
+    channels = get_local_channels(objects, matrices @ np.linalg.inv(parent_matrices))
+    full_turn = 360.0
+    if cmds.currentUnit(query=True, angle=True) == "rad":
+        channels[:, 3:] = np.radians(channels[:, 3:])
+        full_turn = 2.0 * np.pi
+    channels[:, 3:] += full_turn * np.round((current_rotations - channels[:, 3:]) / full_turn)
+
+    # ---------------------------------------
+    # 01. KEY THE UNLOCKED ATTRIBUTES.
+    # ---------------------------------------
+    keyed_count = 0
+    cmds.undoInfo(openChunk=True)
+    try:
+        for object_index, obj in enumerate(objects):
+            for channel_index, attribute in enumerate(all_attributes):
+                if attribute not in attributes or cmds.getAttr(f"{obj}.{attribute}", lock=True):
+                    continue
+                cmds.setKeyframe(obj, attribute=attribute, value=float(channels[object_index, channel_index]))
+                keyed_count += 1
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return keyed_count
+
+# ------------------------------------------------------------------------------ #
+def switch_space(controls, switch_plugs, value, start_time=None, end_time=None):
+    """
+    Switch controls to another parent space over a frame range, keeping how they move in the world,
+    without temporary locators, constraints or a simulated bake.
+
+    Every control's world matrix is read over the range with one TimeSampler, in the space it's in now.
+    The switch attributes are then keyed to the new space, and every parent matrix is read again with one more TimeSampler.
+    The translate and rotate values that keep each control where it was are solved for all frames at once, and written
+    over the range, keeping keys outside it. Controls under other controls being switched are solved against where those will be.
+
+    :param controls: Transforms to switch.
+    :type controls: list(str)
+    :param switch_plugs: The attribute that picks each control's space, e.g. ["arm_ctrl.space"]. Controls can share one.
+    :type switch_plugs: list(str)
+    :param value: The value of the space to switch to.
+    :type value: float
+    :param start_time: First frame. If None, the start of the playback range.
+    :type start_time: float, optional
+    :param end_time: Last frame. If None, the end of the playback range.
+    :type end_time: float, optional
+    :return: The animation curves written on each control, as {control: [curves]}.
+    :rtype: dict
+
+    :Example:
+
+    >>> switch_space(["hand_L_ctrl", "hand_R_ctrl"], ["hand_L_ctrl.space", "hand_R_ctrl.space"], 2, 1, 240)
+    {'hand_L_ctrl': ['hand_L_ctrl_translateX', ...], 'hand_R_ctrl': [...]}
+
+    """
+    _check_numpy()
+    attributes = ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")
+    curve_types = ("animCurveTL", "animCurveTL", "animCurveTL", "animCurveTA", "animCurveTA", "animCurveTA")
+    frames = get_frames(start_time, end_time)
+    switch_plugs = list(collections.OrderedDict.fromkeys(switch_plugs))
+    count = len(controls)
+
+    # ---------------------------------------
+    # 01. SAMPLE WORLD MATRICES IN THE CURRENT SPACE.
+    # ---------------------------------------
+    # Rotations on the first frame are read too, to keep the new ones close to them.
+    samples = mr_utilities.sample_plugs(list(controls) + [f"{control}.rotate" for control in controls], frames)
+    world_matrices = samples[:, :16 * count].reshape(len(frames), count, 4, 4).swapaxes(0, 1)
+    first_rotations = samples[0, 16 * count:].reshape(count, 3)
+
+    # The switch and channel values just outside the range are read too, to hold them there.
+    outside_frames = [frames[0] - 1.0, frames[-1] + 1.0]
+    outside_samples = mr_utilities.sample_plugs(
+        switch_plugs + [f"{control}.{attribute}" for control in controls for attribute in attributes], outside_frames
+    )
+    outside_values = outside_samples[:, :len(switch_plugs)]
+    outside_channels = outside_samples[:, len(switch_plugs):].reshape(2, count, len(attributes))
+
+    # ---------------------------------------
+    # 01. KEY THE SWITCH, AND SAMPLE MATRICES IN THE NEW SPACE.
+    # ---------------------------------------
+    cmds.undoInfo(openChunk=True)
+    try:
+        for plug_index, plug in enumerate(switch_plugs):
+            # Stepped keys either side hold the old space outside the range, and the new one across it.
+            for key_time, key_value in zip(outside_frames, outside_values[:, plug_index]):
+                cmds.setKeyframe(plug, time=key_time, value=float(key_value), outTangentType="step")
+            cmds.cutKey(plug, time=(frames[0], frames[-1]), clear=True)
+            for key_time in (frames[0], frames[-1]):
+                cmds.setKeyframe(plug, time=key_time, value=float(value), outTangentType="step")
+
+        samples = mr_utilities.sample_plugs([f"{control}.parentMatrix[0]" for control in controls] + list(controls), frames)
+        samples = samples.reshape(len(frames), 2, count, 4, 4).transpose(1, 2, 0, 3, 4)
+        parent_matrices, switched_world_matrices = samples[0], samples[1]
+
+        # Controls under other controls being switched move with them, so solve them in the space their parents will have.
+        for control_index, ancestor in enumerate(_get_nearest_ancestors(controls)):
+            if ancestor is not None:
+                parent_matrices[control_index] = (parent_matrices[control_index] @ np.linalg.inv(switched_world_matrices[ancestor]) @
+                                                  world_matrices[ancestor])
+
+        # ---------------------------------------
+        # 01. SOLVE EVERY CONTROL'S CHANNELS, AND WRITE THEM OVER THE RANGE.
+        # ---------------------------------------
+        channels = get_local_channels(controls, world_matrices @ np.linalg.inv(parent_matrices))
+        channels[..., 3:] = filter_euler_rotations(channels[..., 3:])
+        full_turn = 360.0
+        if cmds.currentUnit(query=True, angle=True) == "rad":
+            channels[..., 3:] = np.radians(channels[..., 3:])
+            full_turn = 2.0 * np.pi
+        channels[..., 3:] += full_turn * np.round((first_rotations - channels[:, 0, 3:]) / full_turn)[:, np.newaxis]
+
+        connection_cache = mr_utilities.get_connection_cache()
+        curves = {}
+        for control_index, control in enumerate(controls):
+            curves[control] = []
+            for channel_index, attribute in enumerate(attributes):
+                # Skip locked channels, and ones driven by anything other than keys.
+                object_attribute = f"{control}.{attribute}"
+                source = connection_cache.source(object_attribute)
+                if cmds.getAttr(object_attribute, lock=True) or \
+                        (source and not connection_cache.node_type(source.split(".")[0]).startswith("animCurve")):
+                    continue
+
+                # Keys either side of the range hold the old values outside it. Keyed channels get them inserted, keeping their curve's shape.
+                # Unkeyed channels only need them if they change.
+                values = channels[control_index, :, channel_index]
+                if source:
+                    for key_time in outside_frames:
+                        cmds.setKeyframe(control, attribute=attribute, time=key_time, insert=True)
+                elif np.abs(values - outside_channels[0, control_index, channel_index]).max() > STATIC_TOLERANCE:
+                    for key_time in outside_frames:
+                        cmds.setKeyframe(control, attribute=attribute, time=key_time, value=float(outside_channels[0, control_index, channel_index]))
+
+                curve = write_animation_curve(object_attribute, frames, values, curve_types[channel_index], preserve_outside_keys=True)
+                if curve:
+                    curves[control].append(curve)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return curves
+
+# ------------------------------------------------------------------------------ #
+def bake_average_transform(objects, target, start_time=None, end_time=None):
+    """
+    Bake a target to the average position and orientation of objects, like point and orient constraining it to all of them and baking,
+    from one read of their world matrices with mr_utilities.get_average_transform(). No constraints are made.
+
+    :param objects: Objects to average.
+    :type objects: list(str)
+    :param target: Transform in world space to key.
+    :type target: str
+    :param start_time: First frame. If None, the start of the playback range.
+    :type start_time: float, optional
+    :param end_time: Last frame. If None, the end of the playback range.
+    :type end_time: float, optional
+    :return: The animation curves made. Static channels get none, and are set instead.
+    :rtype: list(str)
+
+    :Example:
+
+    >>> bake_average_transform(["hand_L_ctrl", "hand_R_ctrl"], "averagePivot_loc_offset", 1, 120)
+    ['averagePivot_loc_offset_translateX', ...]
+
+    """
+    _check_numpy()
+    attributes = ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")
+    curve_types = ("animCurveTL", "animCurveTL", "animCurveTL", "animCurveTA", "animCurveTA", "animCurveTA")
+    frames = get_frames(start_time, end_time)
+
+    # ---------------------------------------
+    # 01. AVERAGE EVERY FRAME AT ONCE.
+    # ---------------------------------------
+    positions, quaternions = mr_utilities.get_average_transform(objects, frames)
+    rotate_order = cmds.getAttr(target + ".rotateOrder")
+    rotations = filter_euler_rotations(get_euler_rotations(mr_utilities.get_matrices_from_quaternions(quaternions), rotate_order))
+    if cmds.currentUnit(query=True, angle=True) == "rad":
+        rotations = np.radians(rotations)
+    channels = np.concatenate([positions, rotations], axis=-1)
+
+    # ---------------------------------------
+    # 01. WRITE ANIMATION CURVES.
+    # ---------------------------------------
+    curves = []
+    cmds.undoInfo(openChunk=True)
+    try:
+        for channel_index, attribute in enumerate(attributes):
+            curve = write_animation_curve(f"{target}.{attribute}", frames, channels[:, channel_index], curve_types[channel_index])
+            if curve:
+                curves.append(curve)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return curves
+
+# ------------------------------------------------------------------------------ #
+def _bake_results(object_attributes, start_time, end_time, sample_by):
+    # Bake attributes that can't be keyed directly with bakeResults, and get the animation curve each one ends up with.
+    if not object_attributes:
+        return {}
+    cmds.bakeResults(
+        object_attributes,
+        time=(start_time, end_time),
+        sampleBy=sample_by,
+        disableImplicitControl=True,
+        preserveOutsideKeys=True,
+        minimizeRotation=True
+    )
+    curves = {}
+    for object_attribute in object_attributes:
+        found = cmds.listConnections(object_attribute, source=True, destination=False, type="animCurve")
+        curves[object_attribute] = found[0] if found else None
+    return curves
+
+# ------------------------------------------------------------------------------ #
+def _get_key_timing(frames, key_times):
+    # Add the key times to the sampled frames, and find where they are. No key times gives no indices, to key every frame.
+    if key_times is None:
+        return frames, None
+    key_times = np.asarray(key_times, dtype=float)
+    key_times = key_times[(key_times >= frames[0]) & (key_times <= frames[-1])]
+    frames = np.union1d(frames, key_times)
+    key_indices = np.union1d(np.searchsorted(frames, key_times), [0, len(frames) - 1])
+    return frames, key_indices
+
+# ------------------------------------------------------------------------------ #
+def _get_nearest_ancestors(objects):
+    # The index of each object's nearest ancestor that's also in objects, or None.
+    object_indices = {obj: index for index, obj in enumerate(objects)}
+    nearest_ancestors = []
+    for path in cmds.ls(objects, long=True):
+        ancestors = [object_indices[name] for name in reversed(path.split("|")[1:-1]) if name in object_indices]
+        nearest_ancestors.append(ancestors[0] if ancestors else None)
+    return nearest_ancestors
+
+# ------------------------------------------------------------------------------ #
+def _check_numpy():
+    if np is None:
+        raise ImportError("mr_bakeEngine needs NumPy, which ships with Maya 2022 and later.")
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                        STREAMING BAKE FUNCTIONS                      #
+#                                                                      #
+########################################################################
+
+# How many frames stream_bake() samples and keys at a time.
+STREAM_CHUNK_SIZE = 500
+
+
+class BakeCancelled(Exception):
+    """
+    Raised when a streaming bake is cancelled with Esc. Nothing it baked is kept.
+    """
+
+# ------------------------------------------------------------------------------ #
+def stream_bake(sample_function, frames, object_attributes, curve_types, angle_channels=None, chunk_size=STREAM_CHUNK_SIZE,
+                status="Baking..."):
+    """
+    Bake long frame ranges a chunk of frames at a time, showing progress on Maya's main progress bar. Esc cancels.
+
+    Each chunk is sampled, filtered and keyed onto new animation curves before the next, so only one chunk of values is held at a time.
+    The new curves aren't connected until every chunk is done, so what's sampled never changes partway,
+    and cancelling or an error deletes them, leaving the scene how it was.
+    When done, each new curve replaces whatever drove its attribute before, and static channels are just set.
+    A pairBlend from a constraint is removed, along with the keys it blended from, like release_bake_source().
+
+    :param sample_function: Gives the values of every channel at a list of frames, shaped (frames, channels), in the current units.
+    :type sample_function: function
+    :param frames: Every frame to key, in order, e.g. from get_frames().
+    :type frames: numpy.ndarray
+    :param object_attributes: The attribute to key for each channel, e.g. "locator1.translateX".
+    :type object_attributes: list(str)
+    :param curve_types: The animation curve type for each channel, e.g. "animCurveTL".
+    :type curve_types: list(str)
+    :param angle_channels: Which channels are rotations, to keep continuous across chunks like filter_euler_rotations().
+    :type angle_channels: list(bool), optional
+    :param chunk_size: How many frames to sample and key at a time.
+    :type chunk_size: int
+    :param status: Text shown next to the progress bar.
+    :type status: str
+    :return: The animation curve of each attribute, or None where it was static.
+    :rtype: dict
+    :raises BakeCancelled: If Esc was pressed.
+
+    :Example:
+
+    >>> sampler = mr_utilities.TimeSampler(["pSphere1.translateX"])
+    >>> stream_bake(sampler.sample, get_frames(1, 10000), ["locator1.translateX"], ["animCurveTL"])
+    {'locator1.translateX': 'locator1_translateX'}
+
+    """
+    _check_numpy()
+    frames = np.asarray(frames, dtype=float)
+    chunk_size = max(int(chunk_size), 1)
+    channel_count = len(object_attributes)
+    angle_channels = np.zeros(channel_count, dtype=bool) if angle_channels is None else np.asarray(angle_channels, dtype=bool)
+    full_turn = 2.0 * np.pi if cmds.currentUnit(query=True, angle=True) == "rad" else 360.0
+    tangent_types = get_default_tangent_types()
+
+    fields = [field for field in mr_utilities.KEYFRAME_ARRAY_FIELDS if field[0] in ("time", "value", "in_tangent_type", "out_tangent_type")]
+    first_values = None
+    previous_angles = None
+    lowest = np.full(channel_count, np.inf)
+    highest = np.full(channel_count, -np.inf)
+
+    new_curves = []
+    cmds.undoInfo(openChunk=True)
+    try:
+        for object_attribute, curve_type in zip(object_attributes, curve_types):
+            new_curves.append(cmds.createNode(curve_type, name=object_attribute.replace(".", "_"), skipSelect=True))
+
+        # ---------------------------------------
+        # 01. SAMPLE AND KEY ONE CHUNK AT A TIME.
+        # ---------------------------------------
+        chunk_starts = range(0, len(frames), chunk_size)
+        with mr_utilities.MainProgressBar(len(chunk_starts), status) as progress_bar:
+            for chunk_start in chunk_starts:
+                if progress_bar.is_cancelled():
+                    raise BakeCancelled("Bake cancelled. Nothing was changed.")
+
+                chunk_frames = frames[chunk_start:chunk_start + chunk_size]
+                values = np.asarray(sample_function(chunk_frames), dtype=float)
+
+                # Unwrap from the end of the last chunk, so rotations don't jump between chunks.
+                if angle_channels.any():
+                    angles = values[:, angle_channels]
+                    if previous_angles is not None:
+                        angles = filter_euler_rotations(np.vstack([previous_angles, angles]), full_turn)[1:]
+                    else:
+                        angles = filter_euler_rotations(angles, full_turn)
+                    previous_angles = angles[-1:]
+                    values[:, angle_channels] = angles
+
+                if first_values is None:
+                    first_values = values[0].copy()
+                lowest = np.minimum(lowest, values.min(axis=0))
+                highest = np.maximum(highest, values.max(axis=0))
+
+                keys = np.zeros(len(chunk_frames), dtype=fields)
+                keys["time"] = chunk_frames
+                keys["in_tangent_type"], keys["out_tangent_type"] = tangent_types
+                for channel_index, curve in enumerate(new_curves):
+                    keys["value"] = values[:, channel_index]
+                    mr_utilities.set_keyframe_arrays(curve, keys, start_index=chunk_start)
+
+                progress_bar.step()
+
+        # ---------------------------------------
+        # 01. SWAP THE NEW CURVES IN, OR SET STATIC VALUES.
+        # ---------------------------------------
+        curves = {}
+        static = (highest - lowest) <= STATIC_TOLERANCE
+        for channel_index, object_attribute in enumerate(object_attributes):
+            # A pairBlend hands the attribute back to its old keys first, so they're replaced along with it.
+            release_bake_source(object_attribute)
+            old_sources = cmds.listConnections(object_attribute, source=True, destination=False, plugs=True) or []
+            for old_source in old_sources:
+                cmds.disconnectAttr(old_source, object_attribute)
+                old_node = old_source.split(".")[0]
+                if cmds.nodeType(old_node).startswith("animCurve"):
+                    cmds.delete(old_node)
+
+            curve = new_curves[channel_index]
+            if static[channel_index]:
+                cmds.delete(curve)
+                cmds.setAttr(object_attribute, float(first_values[channel_index]))
+                curves[object_attribute] = None
+            else:
+                curve = cmds.rename(curve, object_attribute.replace(".", "_"))
+                cmds.connectAttr(curve + ".output", object_attribute)
+                curves[object_attribute] = curve
+        new_curves = []
+        return curves
+
+    finally:
+        # Anything left here wasn't swapped in, because the bake stopped early.
+        if new_curves:
+            cmds.delete([curve for curve in new_curves if cmds.objExists(curve)])
+        cmds.undoInfo(closeChunk=True)
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                       INCREMENTAL BAKE FUNCTIONS                     #
+#                                                                      #
+########################################################################
+
+# Attributes of upstream transforms that move them without being animated. Ones a node type doesn't have are skipped.
+UPSTREAM_TRANSFORM_ATTRIBUTES = (
+    "translate", "rotate", "scale", "shear", "rotateOrder", "rotateAxis", "jointOrient", "inheritsTransform", "segmentScaleCompensate",
+    "rotatePivot", "rotatePivotTranslate", "scalePivot", "scalePivotTranslate", "offsetParentMatrix",
+)
+
+# Upstream node types whose every input is covered by UPSTREAM_TRANSFORM_ATTRIBUTES.
+UPSTREAM_TRANSFORM_TYPES = ("transform", "joint")
+
+# Settings of other upstream nodes that change how they evaluate without being keys or transform values, by node type.
+# Constraint types are matched by their "Constraint" suffix, and animation layer blend nodes by their "animBlendNode" prefix.
+# Constraint target weights and offsets are read per target. Anything upstream with a type not listed here,
+# like an expression, can't be described, so its sources are always fully sampled.
+UPSTREAM_SETTING_ATTRIBUTES = {
+    "constraint": ("offset", "restTranslate", "restRotate", "enableRestPosition", "interpType",
+                   "aimVector", "upVector", "worldUpVector", "worldUpType"),
+    "animBlendNode": ("weightA", "weightB", "accumulationMode", "rotationInterpolation"),
+    "animLayer": ("mute", "solo", "lock", "weight", "override", "passthrough", "rotationAccumulationMode", "scaleAccumulationMode"),
+    "pairBlend": ("weight", "rotInterpolation"),
+    "unitConversion": ("conversionFactor",),
+    "mute": ("mute", "hold"),
+}
+
+# Settings of each constraint target, read for every target a ConstraintGraphIndex finds.
+UPSTREAM_CONSTRAINT_TARGET_ATTRIBUTES = ("targetOffsetTranslate", "targetOffsetRotate")
+
+
+class IncrementalBakeCache(object):
+    """
+    Values baked from each source, with a record of the upstream animation they came from, to rebake only what changed.
+
+    Each entry holds a signature of everything upstream that isn't a key (connections, node types, unanimated values,
+    curve infinity and the frames), a copy of every upstream animation curve's keys, and the baked values.
+    A source whose signature still matches only needs the frames its changed keys reach resampled.
+
+    :param max_entries: How many sources to remember. The least recently used are dropped first.
+    :type max_entries: int
+
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+
+    # ------------------------------------------------------------------------------ #
+    def invalidate(self, key=None):
+        """
+        Forget one source, or everything.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    # ------------------------------------------------------------------------------ #
+    def get(self, key):
+        """
+        Get a remembered entry, as {"signature", "curve_keys", "frames", "values"}, or None.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    # ------------------------------------------------------------------------------ #
+    def store(self, key, signature, curve_keys, frames, values):
+        """
+        Remember what a source baked to, and what it was baked from.
+        """
+        self._entries[key] = {"signature": signature, "curve_keys": curve_keys, "frames": frames, "values": values}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+# The shared IncrementalBakeCache. Kept if this module is reloaded by hand.
+_INCREMENTAL_BAKE_CACHE = globals().get("_INCREMENTAL_BAKE_CACHE")
+
+# ------------------------------------------------------------------------------ #
+def get_incremental_bake_cache():
+    """
+    Get the shared IncrementalBakeCache, which lasts until Maya closes, even if this module is reloaded.
+    """
+    global _INCREMENTAL_BAKE_CACHE
+    if _INCREMENTAL_BAKE_CACHE is None:
+        _INCREMENTAL_BAKE_CACHE = IncrementalBakeCache()
+    return _INCREMENTAL_BAKE_CACHE
+
+# ------------------------------------------------------------------------------ #
+def get_upstream_nodes(node):
+    """
+    Get every node that can change how a node moves: its DAG parents, and everything connected into them and into it, all the way up.
+
+    :param node: The node to start from.
+    :type node: str
+    :return: The node and everything upstream of it, nearest first.
+    :rtype: list(str)
+
+    """
+    connection_cache = mr_utilities.get_connection_cache()
+    upstream = [node]
+    found = {node}
+    for current in upstream:
+        # Animation layers list their members through dagSetMembers, which doesn't change how anything evaluates.
+        neighbours = [plug.split(".")[0] for attribute, plug in connection_cache.incoming(current).items()
+                      if not attribute.startswith("dagSetMembers")]
+        neighbours.extend(cmds.listRelatives(current, parent=True) or [])
+        for neighbour in neighbours:
+            if neighbour not in found:
+                found.add(neighbour)
+                upstream.append(neighbour)
+    return upstream
+
+# ------------------------------------------------------------------------------ #
+def _get_upstream_setting_attributes(node_type):
+    # The UPSTREAM_SETTING_ATTRIBUTES of a node type, or None if it isn't one get_upstream_signatures() can describe.
+    if node_type.endswith("Constraint"):
+        return UPSTREAM_SETTING_ATTRIBUTES["constraint"]
+    if node_type.startswith("animBlendNode"):
+        return UPSTREAM_SETTING_ATTRIBUTES["animBlendNode"]
+    return UPSTREAM_SETTING_ATTRIBUTES.get(node_type)
+
+# ------------------------------------------------------------------------------ #
+def get_upstream_signatures(nodes, frames):
+    """
+    Describe the upstream animation of each node, to tell later if it changed.
+
+    The signature is a hash of everything upstream except keys: each node's type and incoming connections,
+    the values of unanimated transform attributes and of unanimated attributes connected into the graph,
+    curve infinity and weighted tangents, and the frames.
+    Keys are returned separately, so get_changed_frame_spans() can find which frames they change.
+    All curves are read with one get_keyframe_arrays(), and all unanimated values with one TimeSampler.
+
+    Constraints, animation layers and their blend nodes, pairBlends and unit conversions add the UPSTREAM_SETTING_ATTRIBUTES
+    that aren't connected, and constraints add each target's weight and offsets, found with mr_utilities.ConstraintGraphIndex.
+    Their drivers and layer weight curves are upstream too, so they're covered like any other transform or curve.
+    Nodes with anything else upstream, like an expression, get no signature, as what it does can't be described.
+
+    :param nodes: Nodes to describe.
+    :type nodes: list(str)
+    :param frames: The frames being baked.
+    :type frames: numpy.ndarray
+    :return: {node: (signature or None, {animation curve: keys}, {animation curve: (node type, pre infinity, post infinity)})}.
+    :rtype: dict
+
+    """
+    _check_numpy()
+    connection_cache = mr_utilities.get_connection_cache()
+    metadata_cache = mr_utilities.get_attribute_metadata_cache()
+    upstream = {node: get_upstream_nodes(node) for node in nodes}
+    all_nodes = list(dict.fromkeys(upstream_node for node in nodes for upstream_node in upstream[node]))
+
+    # ---------------------------------------
+    # 01. READ EVERY UPSTREAM CURVE'S KEYS, INFINITY AND WEIGHTED TANGENTS.
+    # ---------------------------------------
+    curves = [node for node in all_nodes if connection_cache.node_type(node).startswith("animCurve")]
+    key_arrays = mr_utilities.get_keyframe_arrays(curves)
+    curve_keys = {curve: keys.copy() for curve, keys in key_arrays.items()}
+    curve_details = {}
+    weighted_tangents = {}
+    if curves:
+        pre_infinities = cmds.setInfinity(curves, query=True, preInfinite=True) or []
+        post_infinities = cmds.setInfinity(curves, query=True, postInfinite=True) or []
+        for curve, pre_infinity, post_infinity in zip(curves, pre_infinities, post_infinities):
+            curve_details[curve] = (connection_cache.node_type(curve), pre_infinity, post_infinity)
+            # Weights are only used once a curve has weighted tangents, so turning them on reshapes every segment.
+            if len(curve_keys.get(curve, ())):
+                weighted_tangents[curve] = bool((cmds.keyTangent(curve, query=True, weightedTangents=True) or [False])[0])
+
+    # ---------------------------------------
+    # 01. READ UNANIMATED VALUES OF EVERYTHING ELSE AT ONCE.
+    # ---------------------------------------
+    plugs = []
+    for node in all_nodes:
+        if node in curve_details:
+            continue
+        if connection_cache.node_type(node) in UPSTREAM_TRANSFORM_TYPES:
+            plugs.extend(f"{node}.{attribute}" for attribute in UPSTREAM_TRANSFORM_ATTRIBUTES if metadata_cache.exists(node, attribute))
+        # Unanimated attributes connected into the graph, e.g. a user defined attribute driving a curve or another transform.
+        for source_plug in connection_cache.incoming(node).values():
+            source_node, _, source_attribute = source_plug.partition(".")
+            if (source_node not in curve_details and connection_cache.source(source_plug) is None
+                    and metadata_cache.is_numeric(source_node, source_attribute)):
+                plugs.append(source_plug)
+    plugs = list(dict.fromkeys(plugs))
+
+    # ---------------------------------------
+    # 01. READ THE SETTINGS OF CONSTRAINTS, ANIMATION LAYERS AND OTHER KNOWN NODES.
+    # ---------------------------------------
+    setting_values = {}
+    constraint_index = None
+    for node in all_nodes:
+        setting_attributes = _get_upstream_setting_attributes(connection_cache.node_type(node))
+        if setting_attributes is None:
+            continue
+        values = []
+        for attribute in setting_attributes:
+            plug = f"{node}.{attribute}"
+            # Connected settings, like a blend node's layer weight, are covered by what drives them.
+            if metadata_cache.exists(node, attribute) and connection_cache.source(plug) is None:
+                values.append((attribute, cmds.getAttr(plug)))
+
+        if connection_cache.node_type(node).endswith("Constraint"):
+            if constraint_index is None:
+                constraint_index = mr_utilities.ConstraintGraphIndex()
+            for link in constraint_index.constraint_links(node):
+                target = f"target[{link.target_index}]"
+                values.append((target, link.driver, constraint_index.weight(link)))
+                for attribute in UPSTREAM_CONSTRAINT_TARGET_ATTRIBUTES:
+                    if metadata_cache.exists(node, attribute):
+                        values.append((f"{target}.{attribute}", cmds.getAttr(f"{node}.{target}.{attribute}")))
+        setting_values[node] = values
+
+    static_values = {}
+    if plugs:
+        sampler = mr_utilities.TimeSampler(plugs)
+        values = sampler.sample(frames[:1])[0]
+        for channel, value in zip(sampler.channels, values):
+            # Animated values are covered by their curves' keys. Matrix channels end in their element index.
+            if connection_cache.source(re.sub(r"\[\d+\]$", "", channel)) is None:
+                static_values.setdefault(channel.split(".")[0], []).append((channel, value))
+
+    # ---------------------------------------
+    # 01. HASH WHAT EACH NODE DEPENDS ON.
+    # ---------------------------------------
+    signatures = {}
+    for node in nodes:
+        node_curves = [upstream_node for upstream_node in upstream[node] if upstream_node in curve_details]
+        node_curve_keys = {curve: curve_keys[curve] for curve in node_curves if curve in curve_keys}
+        node_curve_details = {curve: curve_details[curve] for curve in node_curves}
+        if any(upstream_node not in curve_details and upstream_node not in setting_values
+               and connection_cache.node_type(upstream_node) not in UPSTREAM_TRANSFORM_TYPES
+               for upstream_node in upstream[node]):
+            signatures[node] = (None, node_curve_keys, node_curve_details)
+            continue
+
+        digest = hashlib.sha1(np.asarray(frames, dtype=float).tobytes())
+        for upstream_node in upstream[node]:
+            details = (
+                upstream_node,
+                connection_cache.node_type(upstream_node),
+                sorted(connection_cache.incoming(upstream_node).items()),
+                curve_details.get(upstream_node),
+                weighted_tangents.get(upstream_node),
+                static_values.get(upstream_node),
+                setting_values.get(upstream_node),
+            )
+            digest.update(repr(details).encode())
+        signatures[node] = (digest.hexdigest(), node_curve_keys, node_curve_details)
+    return signatures
+
+# ------------------------------------------------------------------------------ #
+def get_changed_frame_spans(old_curve_keys, new_curve_keys, curve_details=None):
+    """
+    Find the time spans where curves evaluate differently after their keys changed.
+
+    A changed key reshapes the segments either side of it, and through auto and spline tangents,
+    the segments either side of its neighbours too. So each changed key dirties two keys either way, in the old and new keys.
+    Changes to the first or last key also reach everything before or after it.
+    Keys count as changed if their time, value, or any tangent type, angle or weight differs, so broken and weighted tangents are covered.
+
+    A change to a curve that repeats past its keys, with a cycle, cycleRelative or oscillate infinity,
+    or that isn't driven by time, like a driven key's animCurveU*, can reach any frame, so everything is dirty.
+
+    :param old_curve_keys: {animation curve: keys} from before, as from get_keyframe_arrays().
+    :type old_curve_keys: dict
+    :param new_curve_keys: {animation curve: keys} from now. Should have the same curves.
+    :type new_curve_keys: dict
+    :param curve_details: {animation curve: (node type, pre infinity, post infinity)}, as from get_upstream_signatures().
+                          If None, they're queried for the curves that changed.
+    :type curve_details: dict, optional
+    :return: Sorted, merged (start, end) spans, which can be -inf and inf. Empty if nothing changed.
+    :rtype: list(tuple(float, float))
+
+    :Example:
+
+    >>> get_changed_frame_spans({"pSphere1_translateX": old_keys}, {"pSphere1_translateX": new_keys})
+    [(12.0, 36.0)]
+
+    """
+    _check_numpy()
+    spans = []
+    for curve in set(old_curve_keys) | set(new_curve_keys):
+        old_keys = old_curve_keys.get(curve)
+        new_keys = new_curve_keys.get(curve)
+        if old_keys is None or new_keys is None:
+            return [(-np.inf, np.inf)]
+
+        # ---------------------------------------
+        # 01. FIND KEYS THAT CHANGED, BY TIME, VALUE AND EVERY TANGENT FIELD.
+        # ---------------------------------------
+        fields = [field for field in new_keys.dtype.names if field != "selected"]
+        if len(old_keys) == len(new_keys):
+            changed = np.zeros(len(new_keys), dtype=bool)
+            for field in fields:
+                changed |= old_keys[field] != new_keys[field]
+            if not changed.any():
+                continue
+            changed_times = set(old_keys["time"][changed].tolist()) | set(new_keys["time"][changed].tolist())
+        else:
+            time_index = fields.index("time")
+            changed_times = {key[time_index] for key in set(old_keys[fields].tolist()) ^ set(new_keys[fields].tolist())}
+
+        # ---------------------------------------
+        # 01. CURVES THAT REPEAT OR AREN'T DRIVEN BY TIME CAN CHANGE ANY FRAME.
+        # ---------------------------------------
+        if curve_details is not None and curve in curve_details:
+            node_type, pre_infinity, post_infinity = curve_details[curve]
+        else:
+            node_type = mr_utilities.get_connection_cache().node_type(curve)
+            pre_infinity = (cmds.setInfinity(curve, query=True, preInfinite=True) or ["constant"])[0]
+            post_infinity = (cmds.setInfinity(curve, query=True, postInfinite=True) or ["constant"])[0]
+        if not node_type.startswith("animCurveT") or pre_infinity != "constant" or post_infinity != "constant":
+            return [(-np.inf, np.inf)]
+
+        for keys in (old_keys, new_keys):
+            times = np.concatenate([[-np.inf, -np.inf], keys["time"], [np.inf, np.inf]])
+            for changed_time in changed_times:
+                index = np.searchsorted(times, changed_time)
+                spans.append((times[max(index - 2, 0)], times[min(index + 2, len(times) - 1)]))
+
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+# ------------------------------------------------------------------------------ #
+def sample_incrementally(sources, frames, sample_function, cache_keys, prepare=None, nodes=None):
+    """
+    Sample each source's channels over the frames, reusing what the IncrementalBakeCache has for it,
+    and only sampling frames its changed keys reach. Sources with anything else changed upstream, or with nodes upstream
+    get_upstream_signatures() can't describe, are sampled at every frame.
+
+    :param sources: Nodes whose upstream animation decides their values, or anything else sample_function can sample, given nodes.
+    :type sources: list(str)
+    :param frames: Frames to sample.
+    :type frames: numpy.ndarray
+    :param sample_function: Gives the channels of some sources at some frames, as sample_function(sources, frames),
+                            shaped (frames, sources, channels).
+    :type sample_function: function
+    :param cache_keys: Anything else each source's values depend on, e.g. its rotate order and units, to keep apart in the cache.
+    :type cache_keys: list(tuple)
+    :param prepare: Optional function run on each source's whole (frames, channels) values after patching, e.g. to unwrap rotations.
+    :type prepare: function, optional
+    :param nodes: The node whose upstream animation decides each source's values, if the sources aren't nodes, e.g. attributes.
+                  If None, the sources are the nodes.
+    :type nodes: list(str), optional
+    :return: Values shaped (frames, sources, channels), and how many source frames had to be sampled.
+    :rtype: tuple(numpy.ndarray, int)
+
+    """
+    _check_numpy()
+    frames = np.asarray(frames, dtype=float)
+    bake_cache = get_incremental_bake_cache()
+    if nodes is None:
+        nodes = sources
+    node_signatures = get_upstream_signatures(list(dict.fromkeys(nodes)), frames)
+    signatures = {source: node_signatures[node] for source, node in zip(sources, nodes)}
+
+    # ---------------------------------------
+    # 01. FIND WHICH FRAMES OF EACH SOURCE NEED SAMPLING.
+    # ---------------------------------------
+    dirty = np.ones((len(sources), len(frames)), dtype=bool)
+    entries = []
+    for source_index, source in enumerate(sources):
+        signature, curve_keys, curve_details = signatures[source]
+        entry = bake_cache.get((source,) + tuple(cache_keys[source_index]))
+        if entry is None or signature is None or entry["signature"] != signature:
+            entry = None
+        else:
+            dirty[source_index] = False
+            for start, end in get_changed_frame_spans(entry["curve_keys"], curve_keys, curve_details):
+                dirty[source_index] |= (frames >= start) & (frames <= end)
+        entries.append(entry)
+
+    # ---------------------------------------
+    # 01. SAMPLE ONLY THE DIRTY FRAMES, AND PATCH THEM INTO THE CACHED VALUES.
+    # ---------------------------------------
+    values = None
+    dirty_sources = [source_index for source_index in range(len(sources)) if dirty[source_index].any()]
+    dirty_frames = np.flatnonzero(dirty[dirty_sources].any(axis=0)) if dirty_sources else np.array([], dtype=int)
+    if len(dirty_frames):
+        new_values = sample_function([sources[i] for i in dirty_sources], frames[dirty_frames])
+        values = np.empty((len(frames), len(sources), new_values.shape[-1]))
+        values[dirty_frames[:, None], np.array(dirty_sources)[None, :]] = new_values
+
+    for source_index, source in enumerate(sources):
+        entry = entries[source_index]
+        if entry is not None:
+            if values is None:
+                values = np.empty((len(frames), len(sources), entry["values"].shape[-1]))
+            clean = ~dirty[source_index]
+            values[clean, source_index] = entry["values"][clean]
+        if prepare is not None:
+            values[:, source_index] = prepare(values[:, source_index])
+        signature, curve_keys, _curve_details = signatures[source]
+        bake_cache.store((source,) + tuple(cache_keys[source_index]), signature, curve_keys, frames, values[:, source_index].copy())
+
+    return values, int(dirty.sum())
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                         DEPENDENCY FUNCTIONS                         #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def get_dependency_graph(objects, constraint_index=None):
+    """
+    Get everything the objects depend on to move, and what each of those depends on in turn.
+
+    A transform depends on its DAG parent, and on every driver of a constraint on it, found with mr_utilities.ConstraintGraphIndex.
+    The graph is followed out one wave at a time. Nodes are keyed by their shortest unique names, like the ConstraintGraphIndex,
+    so objects given as long DAG paths, or sharing a short name, are each their own node.
+
+    :param objects: Transforms to start from.
+    :type objects: list(str)
+    :param constraint_index: An index to look drivers up in. If None, one is built.
+    :type constraint_index: mr_utilities.ConstraintGraphIndex, optional
+    :return: Each node mapped to the nodes it depends on, as {node: [dependencies]}.
+    :rtype: dict
+
+    :Example:
+
+    >>> get_dependency_graph(["arm_ctrl"])
+    {'arm_ctrl': ['arm_ctrl_grp', 'arm_ctrl_temp_pin'], 'arm_ctrl_grp': [], 'arm_ctrl_temp_pin': ['TEMP_PIVOT_loc'], ...}
+
+    """
+    if constraint_index is None:
+        constraint_index = mr_utilities.ConstraintGraphIndex()
+
+    # Each node is resolved on its own, as ls() on a list can reorder, merge or drop names.
+    graph = {}
+    wave = list(collections.OrderedDict.fromkeys((cmds.ls(obj) or [obj])[0] for obj in objects))
+    while wave:
+        next_wave = []
+        for obj in wave:
+            dependencies = []
+            parent = cmds.listRelatives(obj, parent=True, fullPath=True)
+            if parent:
+                dependencies.append(cmds.ls(parent[0])[0])
+            for link in constraint_index.drivers(obj):
+                if link.driver not in dependencies:
+                    dependencies.append(link.driver)
+            graph[obj] = dependencies
+            next_wave.extend(node for node in dependencies if node not in graph and node not in next_wave)
+        wave = next_wave
+
+    return graph
+
+# ------------------------------------------------------------------------------ #
+def get_dependency_cycles(graph):
+    """
+    Find groups of nodes that depend on each other, going round in a loop, with Tarjan's strongly connected components.
+
+    :param graph: Nodes mapped to their dependencies, from get_dependency_graph().
+    :type graph: dict
+    :return: Every group of nodes, with dependencies before what depends on them, and which of those groups are cycles.
+    :rtype: tuple(list(list(str)), list(list(str)))
+
+    """
+    index_of = {}
+    lowest_link = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    # Iterative, so long chains don't reach Python's recursion limit.
+    for root in graph:
+        if root in index_of:
+            continue
+        work = [(root, iter(graph.get(root, ())))]
+        index_of[root] = lowest_link[root] = len(index_of)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, dependencies = work[-1]
+            for dependency in dependencies:
+                if dependency not in index_of:
+                    index_of[dependency] = lowest_link[dependency] = len(index_of)
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+                    work.append((dependency, iter(graph.get(dependency, ()))))
+                    break
+                if dependency in on_stack:
+                    lowest_link[node] = min(lowest_link[node], index_of[dependency])
+            else:
+                work.pop()
+                if work:
+                    lowest_link[work[-1][0]] = min(lowest_link[work[-1][0]], lowest_link[node])
+                if lowest_link[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component[::-1])
+
+    cycles = [component for component in components if len(component) > 1 or component[0] in graph.get(component[0], ())]
+    return components, cycles
+
+# ------------------------------------------------------------------------------ #
+def get_bake_order(objects, constraint_index=None):
+    """
+    Sort objects into groups that can each be baked without simulation, one group after another.
+
+    Objects that don't depend on any other object being baked go in the first group. Each later group only depends on
+    objects in groups before it, which will already be keyed to move the same way. Objects caught in, or driven by,
+    a constraint cycle can't be ordered, so are left to bake together with simulation.
+
+    :param objects: Transforms to bake.
+    :type objects: list(str)
+    :param constraint_index: An index to look drivers up in. If None, one is built.
+    :type constraint_index: mr_utilities.ConstraintGraphIndex, optional
+    :return: Groups to bake in order, objects that need simulation, and any cycles found.
+    :rtype: tuple(list(list(str)), list(str), list(list(str)))
+
+    :Example:
+
+    >>> get_bake_order(["arm_ctrl", "hand_ctrl", "leg_ctrl"])
+    ([['arm_ctrl', 'leg_ctrl'], ['hand_ctrl']], [], [])
+
+    """
+    graph = get_dependency_graph(objects, constraint_index)
+    components, cycles = get_dependency_cycles(graph)
+    # The graph is keyed by shortest unique names, while objects are given back as they were passed in.
+    names = {obj: (cmds.ls(obj) or [obj])[0] for obj in objects}
+    baked = set(names.values())
+    cyclic = set(node for cycle in cycles for node in cycle)
+
+    # ---------------------------------------
+    # 01. WORK OUT EACH NODE'S LEVEL, DEPENDENCIES FIRST.
+    # ---------------------------------------
+    # A node's level is how many baked objects are chained above it. Components come dependencies first, so each is solved once.
+    levels = {}
+    needs_simulation = {}
+    for component in components:
+        for node in component:
+            dependencies = graph.get(node, ())
+            needs_simulation[node] = node in cyclic or any(needs_simulation.get(dependency, False) for dependency in dependencies)
+            levels[node] = max([levels.get(dependency, 0) + (dependency in baked) for dependency in dependencies] or [0])
+
+    # ---------------------------------------
+    # 01. GROUP OBJECTS BY LEVEL, KEEPING THE ORDER GIVEN.
+    # ---------------------------------------
+    ordered = [obj for obj in collections.OrderedDict.fromkeys(objects) if names[obj] in graph]
+    simulated = [obj for obj in ordered if needs_simulation[names[obj]]]
+    groups = collections.OrderedDict()
+    for obj in sorted((obj for obj in ordered if not needs_simulation[names[obj]]), key=lambda obj: levels[names[obj]]):
+        groups.setdefault(levels[names[obj]], []).append(obj)
+
+    return list(groups.values()), simulated, cycles
+
+
+"""
+##################################################################################################################################################
+# ---------------------------------------
+# CHANGELOG:
+# ---------------------------------------
+# 2026-10-17 - 0021:
+#   - reduce_animation_curves() keys auto and spline reductions with fixed tangents at the slopes evaluate_spline_keys() checked them with,
+#     instead of Maya's own tangents, which it only approximates, so the tolerances hold on the written curves.
+#     Weighted curves are made non-weighted first.
+#
+# 2026-10-17 - 0020:
+#   - get_dependency_graph() resolves each node's parent on its own, keyed by shortest unique names like mr_utilities.ConstraintGraphIndex,
+#     instead of pairing names with one ls call's paths, which could reorder them or mix up nodes sharing a short name.
+#   - get_bake_order() gives objects back as they were passed in, including long DAG paths.
+#
+# 2026-10-17 - 0019:
+#   - Added incremental option to bake_attributes(), reusing each attribute's values from its last bake through sample_incrementally().
+#   - sample_incrementally() takes the nodes whose upstream animation decides each source, so sources can be attributes.
+#
+# 2026-10-17 - 0018:
+#   - get_upstream_signatures() describes constraints, animation layers and their blend nodes, pairBlends, unit conversions and mutes,
+#     from UPSTREAM_SETTING_ATTRIBUTES and each constraint target's driver, weight and offsets,
+#     so constrained and layered sources are baked incrementally instead of always fully.
+#   - get_upstream_nodes() doesn't follow animation layer membership connections.
+#
+# 2026-10-17 - 0017:
+#   - get_local_channels() takes rotations from the nearest rotation to each local matrix, by polar decomposition,
+#     so a parent's non-uniform scale or shear no longer throws them off, and warns about objects it skews.
+#
+# 2026-10-17 - 0016:
+#   - Updated the note on keeping the IncrementalBakeCache through reloads, as the tools no longer reload this module.
+#
+# 2026-10-17 - 0015:
+#   - get_changed_frame_spans() dirties every frame for changed curves with a cycle, cycleRelative or oscillate infinity,
+#     or that aren't animCurveT*, and compares keys field by field, tangents included.
+#   - get_upstream_signatures() also hashes weighted tangents, inheritsTransform, segmentScaleCompensate
+#     and unanimated attributes connected into the graph.
+#   - Sources with upstream nodes other than animation curves, transforms and joints are no longer baked incrementally,
+#     as their settings, like constraint offsets or expression text, aren't in the signature.
+#
+# 2026-10-17 - 0014:
+#   - Chunked bakes with bake_attributes() use get_bake_source() too, so they no longer drop attributes blended through a pairBlend.
+#   - stream_bake() removes pairBlends from a constraint along with the keys they blended from, when swapping its new curves in.
+#
+# 2026-10-17 - 0013:
+#   - Added get_bake_source() and release_bake_source(), to find and disconnect what drives an attribute before keying it.
+#   - bake_attributes() bakes attributes a constraint drives through a pairBlend, which Maya adds when constraining keyed attributes.
+#     The pairBlend is removed and the attribute's own keys are replaced, instead of the attribute being skipped.
+#   - bake_attributes() bakes anything else it can't key directly with bakeResults, instead of skipping it.
+#
+# 2026-10-17 - 0012:
+#   - Added switch_space(), to switch controls to another parent space over a frame range from two sweeps of sampled matrices.
+#   - write_animation_curve() takes preserve_outside_keys, to only replace keys within the frames given.
+#
+# 2026-10-17 - 0011:
+#   - Added get_dependency_graph(), get_dependency_cycles() and get_bake_order(), to bake chained objects one group at a time
+#     without simulation, and find constraint cycles before baking.
+#
+# 2026-10-17 - 0010:
+#   - Added bake_average_transform(), to bake the average position and orientation of objects onto a target without constraints.
+#
+# 2026-10-17 - 0009:
+#   - Added key_world_matrices(), to key objects on the current frame from world matrices, solving every object at once.
+#       - Objects under other objects being keyed are solved against where those will be.
+#   - Added get_local_channels(), to turn local matrices into translate and rotate values, allowing for pivots, rotateAxis and jointOrient.
+#   - Added get_pivot_matrices(), for the matrices point and orient constraints match.
+#   - bake_offset_groups() uses get_local_channels() and get_pivot_matrices().
+#
+# 2026-10-17 - 0008:
+#   - Added bake_offset_groups(), to put objects into offset groups from one sweep of sampled world and parent matrices.
+#   - Added get_rotation_matrices(), the opposite of get_euler_rotations().
+#
+# 2026-10-17 - 0007:
+#   - Added IncrementalBakeCache and sample_incrementally(), to reuse baked values where nothing upstream changed.
+#       - get_upstream_signatures() hashes everything upstream apart from keys, which are compared to find changed frame spans.
+#       - Only frames reached by changed keys are resampled. Anything else changing upstream resamples the whole source.
+#   - Added an incremental option to bake_worldspace().
+#
+# 2026-10-17 - 0006:
+#   - Added stream_bake(), to bake long ranges a chunk of frames at a time, with a progress bar and Esc to cancel.
+#       - Keys go onto new curves that only replace the old ones once every chunk is done, so cancelling changes nothing.
+#   - Added BakeCancelled, and a chunk_size option to bake_worldspace() and bake_attributes().
+#
+# 2026-10-17 - 0005:
+#   - Added get_key_times(), to merge the key times of many objects from one keyframe query, with optional breakdowns.
+#   - Added fit_key_slopes(), which solves each key's tangent so the curve follows every sampled frame between keys.
+#   - Added key_times option to bake_worldspace() and bake_attributes(), to bake only on given times with fixed tangents.
+#   - write_animation_curve() takes slopes, for fixed tangents.
+#
+# 2026-10-17 - 0004:
+#   - Added reduce_keys(), reduce_animation_curves() and reduce_object_curves(), to remove keys baked curves can do without.
+#       - Every curve is reduced at once with NumPy, checking the refitted auto or spline tangent curve at each key's time.
+#       - Tolerances are per kind of curve, in the current linear unit for translate and degrees for rotate.
+#
+# 2026-10-17 - 0003:
+#   - Added sample_adaptive(), which only samples and keys frames where a straight line between keys would miss by more than a tolerance.
+#   - Added tolerance and initial_step options to bake_worldspace().
+#   - Added bake_attributes(), to bake constrained attributes onto themselves without bakeResults.
+#   - filter_euler_rotations() takes any number of channels, and a full_turn for radians.
+#
+# 2026-10-17 - 0002:
+#   - Sampling and frame ranges now use mr_utilities.sample_plugs() and mr_utilities.get_sample_frames().
+#   - Moved LINEAR_UNITS_PER_CENTIMETRE to mr_utilities.
+#
+# 2026-10-17 - 0001:
+#   - First pass of constraint free worldspace baking.
+# ---------------------------------------
+##################################################################################################################################################
+"""
@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_bakeToWorldspace.py
-# VERSION: 0007
+# VERSION: 0016
 #
 # CREATORS: Maria Robertson
 # CREDIT: Richard Lico (for workflow)
@@ -54,6 +54,29 @@ mr_bakeToWorldspace.main(mode="both", constrain=False, simulate_bake=True)
 mr_bakeToWorldspace.main(mode="both", constrain=False, simulate_bake=True)
 mr_bakeToWorldspace.main(mode="both", constrain=False, simulate_bake=True)
 
+# Fastest version, sampling world matrices directly instead of using temporary constraints and bakeResults:
+mr_bakeToWorldspace.main(mode="both", constrain=True, direct_bake=True)
+mr_bakeToWorldspace.main(mode="translate", constrain=True, direct_bake=True)
+mr_bakeToWorldspace.main(mode="rotate", constrain=True, direct_bake=True)
+
+# Lighter curves, keyed only where needed to stay within a tolerance (in scene units and degrees):
+mr_bakeToWorldspace.main(mode="both", constrain=True, tolerance=0.01)
+
+# Remove the keys each baked curve can do without afterwards, instead of running filterCurve:
+mr_bakeToWorldspace.main(mode="both", constrain=True, reduce_keys=True)
+
+# Only key where the selected objects already have keys, with tangents solved to follow the motion in between.
+# Add breakdowns for evenly spaced extra keys between each pair, for motion the original keys can't follow:
+mr_bakeToWorldspace.main(mode="both", constrain=True, keep_key_timing=True)
+mr_bakeToWorldspace.main(mode="both", constrain=True, keep_key_timing=True, breakdowns=1)
+
+# For very long ranges, e.g. mocap takes, bake 500 frames at a time with a progress bar. Press Esc to cancel:
+mr_bakeToWorldspace.main(mode="both", constrain=True, chunk_size=500)
+
+# When rebaking the same objects while editing their animation, only resample frames near keys that changed since the last bake.
+# Best without constraining, as constraining the objects to their locators changes what they depend on:
+mr_bakeToWorldspace.main(mode="both", constrain=False, incremental=True)
+
 
 # ---------------------------------------
 # REQUIREMENTS:
@@ -61,6 +84,8 @@ mr_bakeToWorldspace.main(mode="both", constrain=False, simulate_bake=True)
 # The mr_utilities.py file, for support functions:
 # https://github.com/maria137-art/MayaAnimScripts/blob/main/mr_utilities.py
 #
+# For direct_bake, tolerance, reduce_keys, keep_key_timing, chunk_size and incremental, the mr_bakeEngine.py file and NumPy.
+#
 # ---------------------------------------
 # RESEARCH THAT HELPED:
 # ---------------------------------------
@@ -76,11 +101,11 @@ mr_bakeToWorldspace.main(mode="both", constrain=False, simulate_bake=True)
 import maya.cmds as cmds
 import maya.mel as mel
 
-import importlib
 import mr_utilities
-importlib.reload(mr_utilities)
+import mr_bakeEngine
 
-def main(mode=None, constrain=True, simulate_bake=False):
+def main(mode=None, constrain=True, simulate_bake=False, direct_bake=False, tolerance=None, reduce_keys=False, keep_key_timing=False, breakdowns=0,
+         chunk_size=None, incremental=False):
     # -------------------------------------------------------------------
     # 01. DEFINE TIMESLIDER RANGE.
     # -------------------------------------------------------------------
@@ -95,6 +120,21 @@ def main(mode=None, constrain=True, simulate_bake=False):
     locators = []
     constraints = []
 
+    # Tolerances, keeping key timing, chunked and incremental bakes need the direct bake, to sample frames without changing the current time.
+    # Simulated bakes need time to actually change, so they bake every frame with bakeResults and can't use these options.
+    direct_options = {
+        "tolerance": tolerance is not None,
+        "keep_key_timing": keep_key_timing,
+        "chunk_size": chunk_size,
+        "incremental": incremental,
+    }
+    direct_options = [name for name, value in direct_options.items() if value]
+    if direct_options:
+        if simulate_bake:
+            cmds.warning("Simulated bakes change the current time on every frame, so these options are ignored: " + ", ".join(direct_options))
+        else:
+            direct_bake = True
+
     # Store the lock state of the BaseAnimation animation layer.
     if cmds.objExists("BaseAnimation"):
         is_baseAnimation_locked = cmds.getAttr("BaseAnimation" + ".lock")  
@@ -111,7 +151,11 @@ def main(mode=None, constrain=True, simulate_bake=False):
         
         locator = cmds.spaceLocator(name=locator_name)[0]
         cmds.setAttr(locator + ".localScale", 18, 18, 18)
-        
+
+        # Dynamics need time to actually change, so simulated bakes always use constraints.
+        if direct_bake and not simulate_bake:
+            continue
+
         point_constraint = cmds.pointConstraint(item, locator)
         orient_constraint = cmds.orientConstraint(item, locator)
         
@@ -121,48 +165,72 @@ def main(mode=None, constrain=True, simulate_bake=False):
     # -------------------------------------------------------------------
     # 01. SELECT OBJECTS THAT ONLY HAVE KEYFRAMES.
     # -------------------------------------------------------------------
-    cmds.refresh(suspend=True)
-
-    attributes = ["translateX", "translateY", "translateZ","rotateX", "rotateY", "rotateZ"]
-
-    cmds.bakeResults(
-        locators,
-        attribute = attributes,
-        simulation=simulate_bake,
-        time=(start_time, end_time),
-        sampleBy=1,
-        disableImplicitControl=True,
-        preserveOutsideKeys=True,
-        minimizeRotation=True
-    )
-    # Delete static channels.
-    cmds.delete(locators, sc=True)
-    
-    # Filter curves and delete constraints.
-    for constraint in constraints:
-        cmds.filterCurve(constraint)
-        cmds.delete(constraint)
-    cmds.refresh(suspend=False)
+    try:
+        # Viewport refreshes are always turned back on, even if the bake fails.
+        with mr_utilities.suspended_refresh():
+            if direct_bake and not simulate_bake:
+                # Sample world matrices without constraints or changing the current time.
+                # Static channels are left unkeyed, the same as deleting them after bakeResults.
+                # With a tolerance, channels are only keyed where they need to be, to stay within it.
+                # With a chunk_size, long ranges are baked a chunk at a time, with a progress bar. Esc cancels.
+                # With incremental, values from the last bake are reused, except near keys changed since then.
+                key_times = None
+                if keep_key_timing:
+                    key_times = mr_bakeEngine.get_key_times(selection, start_time, end_time, breakdowns)
+                mr_bakeEngine.bake_worldspace(
+                    selection, locators, start_time, end_time, tolerance=tolerance, key_times=key_times, chunk_size=chunk_size,
+                    incremental=incremental
+                )
+
+            else:
+                attributes = ["translateX", "translateY", "translateZ","rotateX", "rotateY", "rotateZ"]
+
+                cmds.bakeResults(
+                    locators,
+                    attribute = attributes,
+                    simulation=simulate_bake,
+                    time=(start_time, end_time),
+                    sampleBy=1,
+                    disableImplicitControl=True,
+                    preserveOutsideKeys=True,
+                    minimizeRotation=True
+                )
+                # Delete static channels.
+                cmds.delete(locators, sc=True)
+
+                # Filter curves and delete constraints.
+                for constraint in constraints:
+                    if not reduce_keys:
+                        cmds.filterCurve(constraint)
+                    cmds.delete(constraint)
+
+            # Remove keys the baked curves can do without.
+            if reduce_keys:
+                mr_bakeEngine.reduce_object_curves(locators)
+
+    except mr_bakeEngine.BakeCancelled as error:
+        # Leave the scene how it was before running.
+        cmds.delete(locators)
+        if cmds.objExists("BaseAnimation") and is_baseAnimation_locked:
+            cmds.animLayer("BaseAnimation", edit=True, lock=True)
+        cmds.warning(str(error))
+        return
 
     if constrain == True:   
         # -------------------------------------------------------------------
         # 01. REVERSE CONSTRAINTS
         # -------------------------------------------------------------------
+        # Constrain every object to its locator at once, reading which attributes are locked once per object.
+        mr_utilities.constrain_unlocked_in_bulk(locators, selection, mode)
+
         for i, item in enumerate(selection):
             locator = locators[i]
-            if mode == "both":
-                mr_utilities.constrain_unlocked_translates(locator, item)
-                mr_utilities.constrain_unlocked_rotates(locator, item)
-
             if mode == "translate":  
-                mr_utilities.constrain_unlocked_translates(locator, item)
-
                 # End with the Translate manipulator on.
                 mel.eval("buildTranslateMM ;")
                 mel.eval("destroySTRSMarkingMenu MoveTool ;")
 
             if mode == "rotate":
-                mr_utilities.constrain_unlocked_rotates(locator, item)
                 cmds.pointConstraint(item, locator)
 
                 # End with Rotate manipulator active.
@@ -186,6 +254,37 @@ def main(mode=None, constrain=True, simulate_bake=False):
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0016:
+#   - A tolerance now switches to the direct bake too, like keep_key_timing, chunk_size and incremental, instead of being ignored.
+#   - Combining these options with simulate_bake warns that they're ignored, instead of silently baking every frame.
+#
+# 2026-10-17 - 0015:
+#   - mr_utilities and mr_bakeEngine are imported without reloading them, so their caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0014:
+#   - Reversed constraints are made with mr_utilities.constrain_unlocked_in_bulk(), for every object at once.
+#
+# 2026-10-17 - 0013:
+#   - Added incremental option, to reuse values from the last bake of each object and only resample frames near changed keys.
+#
+# 2026-10-17 - 0012:
+#   - Added chunk_size option, to bake long ranges a chunk at a time with a progress bar. Esc cancels, leaving the scene unchanged.
+#   - Viewport refreshes are turned back on even if baking fails.
+#
+# 2026-10-17 - 0011:
+#   - Added keep_key_timing and breakdowns options, to bake only on the selected objects' key times with mr_bakeEngine.get_key_times().
+#
+# 2026-10-17 - 0010:
+#   - Added reduce_keys option, using mr_bakeEngine.reduce_object_curves() on the baked locators instead of filterCurve.
+#
+# 2026-10-17 - 0009:
+#   - Added tolerance option for direct_bake, which keys each channel only where needed to stay within it.
+#
+# 2026-10-17 - 0008:
+#   - Added direct_bake option, using mr_bakeEngine.bake_worldspace().
+#       - Samples each object's world matrix at every frame, instead of creating constraints and running bakeResults.
+#       - Not used for simulated bakes.
+#
 # 2024-01-20- 0007:
 #   - Checking if the BaseAnimation animation layer is locked before running tool, to avoid potential bugs.
 #   - Moving changelog to the bottom.
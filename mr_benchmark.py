@@ -0,0 +1,419 @@
+"""
+# ------------------------------------------------------------------------------ #
+# SCRIPT: mr_benchmark.py
+# VERSION: 0001
+#
+# CREATORS: Maria Robertson
+# ---------------------------------------
+#
+# ---------------------------------------
+# DESCRIPTION:
+# ---------------------------------------
+# Scaling benchmarks for the public tool entry points, run outside of Maya with mr_mayaSimulator.
+#
+# Each benchmark case runs a tool on synthetic rigs of increasing size (more controls, frames or animation layers),
+# and records the number of maya.cmds calls and the time taken, using mr_cmdsProfiler.
+#
+# A complexity exponent is then fit for each case, from the slope of log(cost) over log(size):
+#   - Roughly 0 means the cost doesn't grow with size.
+#   - Roughly 1 means it grows linearly.
+#   - Roughly 2 means it's quadratic.
+#
+# The exponents are compared to the ones stored in mr_benchmark_baseline.json.
+# If any case now scales worse than its baseline, the benchmark fails.
+#
+# By default, only the call count exponent fails the benchmark, as it's the same on every machine.
+# The time exponent is always reported, and can also be checked with --gate-time.
+#
+# ---------------------------------------
+# RUN COMMANDS:
+# ---------------------------------------
+# From a terminal, in the repo folder:
+python mr_benchmark.py
+python mr_benchmark.py --cases mr_tempPin
+python mr_benchmark.py --update-baseline
+
+# ------------------------------------------------------------------------------ #
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import importlib
+import json
+import math
+import os
+import sys
+import time
+
+import mr_mayaSimulator
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mr_benchmark_baseline.json")
+
+# How much worse an exponent can get before the benchmark fails.
+CALL_EXPONENT_TOLERANCE = 0.15
+TIME_EXPONENT_TOLERANCE = 0.35
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                          SCENE SET-UP HELPERS                        #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def _tool(module_name):
+    # Tools are imported after the simulator is installed, so they pick up its maya.cmds.
+    return importlib.import_module(module_name)
+
+# ------------------------------------------------------------------------------ #
+def _commands():
+    return mr_mayaSimulator.get_commands()
+
+# ------------------------------------------------------------------------------ #
+def _rig_with_selection(controls, frames=30, layers=0, selected=None, **kwargs):
+    rig = mr_mayaSimulator.generate_rig(controls=controls, frames=frames, layers=layers, **kwargs)
+    _commands().select(rig["controls"][:selected or controls])
+    return rig
+
+# ------------------------------------------------------------------------------ #
+def _rig_with_layers(layers, controls=20, frames=30, override=False):
+    rig = mr_mayaSimulator.generate_rig(controls=controls, frames=frames, layers=layers)
+    if override:
+        for layer in rig["layers"]:
+            mr_mayaSimulator.get_scene().nodes[layer].attributes["override"].value = True
+    mr_mayaSimulator.set_ui_state(selected_animation_layers=rig["layers"])
+    _commands().select(rig["controls"])
+    return rig
+
+# World matrices the controls should end up with, from _rig_with_moved_pivot(), by (control, frame).
+_EXPECTED_WORLD_MATRICES = {}
+
+# ------------------------------------------------------------------------------ #
+def _rig_with_moved_pivot(controls, frames=20):
+    # Keyed controls constrained under a pivot that's been moved, ready for the last run of mr_pivot_worldspace.
+    # The rig adds pairBlends like Maya, as the controls already have keys when they're constrained.
+    rig = _rig_with_selection(controls=controls, frames=frames, pair_blends=True)
+    cmds = _commands()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        _tool("mr_pivot_worldspace").main("all")
+        cmds.select(rig["controls"])
+        _tool("mr_pivot_worldspace").main("all")
+    cmds.setAttr("TEMP_PIVOT_loc.rotateY", 30)
+    cmds.select("TEMP_PIVOT_loc")
+
+    scene = mr_mayaSimulator.get_scene()
+    _EXPECTED_WORLD_MATRICES.clear()
+    for control in rig["controls"]:
+        # Frames the rig has keys on, so bakes that only key on the controls' own key timing can be checked too.
+        for frame in (1.0, 11.0, float(frames)):
+            _EXPECTED_WORLD_MATRICES[(control, frame)] = scene.world_matrix(scene.nodes[control], frame)
+    return rig
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                            BENCHMARK CASES                           #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def _pivot_worldspace_and_bake():
+    # The first run creates the pivot, and the second bakes the selected objects under it.
+    cmds = _commands()
+    selection = cmds.ls(selection=True)
+    _tool("mr_pivot_worldspace").main("all")
+    cmds.select(selection)
+    _tool("mr_pivot_worldspace").main("all")
+
+# ------------------------------------------------------------------------------ #
+def _bake_moved_pivot(**options):
+    # Bake the controls under the moved pivot, then check they kept its motion and nothing was left driving them.
+    _tool("mr_pivot_worldspace").main("all", **options)
+
+    scene = mr_mayaSimulator.get_scene()
+    if any(node.type == "pairBlend" for node in scene.nodes.values()):
+        raise AssertionError("mr_pivot_worldspace left pairBlends behind after baking.")
+    for (control, frame), expected in _EXPECTED_WORLD_MATRICES.items():
+        actual = scene.world_matrix(scene.nodes[control], frame)
+        if max(abs(a - b) for a, b in zip(actual, expected)) > 0.05:
+            raise AssertionError(f"mr_pivot_worldspace lost the pivot's motion on {control}, at frame {frame:g}.")
+
+# ------------------------------------------------------------------------------ #
+def _scale_selected_keys():
+    cmds = _commands()
+    cmds.selectKey(cmds.ls(selection=True), attribute="rotateX")
+    _tool("mr_keyScaler").main(1.5)
+
+# ------------------------------------------------------------------------------ #
+def _bake_to_override_layer():
+    layer = mr_mayaSimulator.get_scene().selected_animation_layers[-1]
+    mr_mayaSimulator.set_ui_state(selected_animation_layers=[layer])
+    _tool("mr_animLayers").bake_to_selected_override_animation_layer()
+
+# ------------------------------------------------------------------------------ #
+def _snapshot_long_paths():
+    # Constrained objects given by their long DAG paths should still show what drives them.
+    cmds = _commands()
+    constrained = cmds.ls("constrained_????", long=True)
+    snapshot = _tool("mr_utilities").get_attribute_state_snapshot(constrained, ["translateX", "rotateY"])
+    for obj in constrained:
+        if "|" not in obj:
+            raise AssertionError(f"{obj} isn't a long DAG path, so it doesn't check anything.")
+        for attr in ("translateX", "rotateY"):
+            if not snapshot[f"{obj}.{attr}"]["constrained"]:
+                raise AssertionError(f"get_attribute_state_snapshot() missed the constraint on {obj}.{attr}.")
+
+
+# Each case: (name, size axis, sizes, set-up function, run function)
+CASES = [
+    ("mr_bakeToWorldspace.main/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n, frames=20),
+        lambda: _tool("mr_bakeToWorldspace").main("both")),
+    ("mr_bakeToWorldspace.main/frames", "frames", (25, 50, 100, 200),
+        lambda n: _rig_with_selection(controls=5, frames=n),
+        lambda: _tool("mr_bakeToWorldspace").main("both")),
+    ("mr_bakeToWorldspace.main/direct/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n, frames=20),
+        lambda: _tool("mr_bakeToWorldspace").main("both", direct_bake=True)),
+    ("mr_bakeToWorldspace.main/direct/frames", "frames", (25, 50, 100, 200),
+        lambda n: _rig_with_selection(controls=5, frames=n),
+        lambda: _tool("mr_bakeToWorldspace").main("both", direct_bake=True)),
+    ("mr_bakeToWorldspace.main/chunked/frames", "frames", (25, 50, 100, 200),
+        lambda n: _rig_with_selection(controls=5, frames=n),
+        lambda: _tool("mr_bakeToWorldspace").main("both", chunk_size=50)),
+    ("mr_tempPin.single/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n),
+        lambda: _tool("mr_tempPin").single("both")),
+    ("mr_tempPin.multiple/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n),
+        lambda: _tool("mr_tempPin").multiple("both", "average")),
+    ("mr_tempPin.single/matrix/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n),
+        lambda: _tool("mr_tempPin").single("both", use_constraints=False)),
+    ("mr_pivot_worldspace.main/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n, frames=20),
+        _pivot_worldspace_and_bake),
+    ("mr_pivot_worldspace.main/tolerance/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_moved_pivot(controls=n),
+        lambda: _bake_moved_pivot(tolerance=0.01)),
+    ("mr_pivot_worldspace.main/key_timing/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_moved_pivot(controls=n),
+        lambda: _bake_moved_pivot(keep_key_timing=True)),
+    ("mr_pivot_worldspace.main/chunked/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_moved_pivot(controls=n),
+        lambda: _bake_moved_pivot(chunk_size=10)),
+    ("mr_keyScaler.main/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n),
+        _scale_selected_keys),
+    ("mr_selectVisibleControls.select_visible_curves_and_keyed_locators_in_panel/controls", "controls", (25, 50, 100, 200),
+        lambda n: mr_mayaSimulator.generate_rig(controls=n, frames=10, constraints=n // 10),
+        lambda: _tool("mr_selectVisibleControls").select_visible_curves_and_keyed_locators_in_panel()),
+    ("mr_utilities.get_attribute_state_snapshot/long_paths/controls", "controls", (4, 8, 16, 32),
+        lambda n: mr_mayaSimulator.generate_rig(controls=n, frames=10, constraints=n),
+        _snapshot_long_paths),
+    ("mr_animLayers.reset_animation_layer_keys_at_currentTime/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n * 2, layers=1, selected=n),
+        lambda: _tool("mr_animLayers").reset_animation_layer_keys_at_currentTime()),
+    ("mr_animLayers.reset_animation_layer_keys_at_currentTime/layers", "layers", (1, 2, 4, 8),
+        lambda n: _rig_with_layers(layers=n),
+        lambda: _tool("mr_animLayers").reset_animation_layer_keys_at_currentTime()),
+    ("mr_animLayers.set_key_every_frame_on_animation_layers/frames", "frames", (10, 20, 40, 80),
+        lambda n: _rig_with_layers(layers=2, controls=6, frames=n),
+        lambda: _tool("mr_animLayers").set_key_every_frame_on_animation_layers()),
+    ("mr_animLayers.remove_inactive_object_attributes/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_layers(layers=1, controls=n),
+        lambda: _tool("mr_animLayers").remove_inactive_object_attributes()),
+    ("mr_animLayers.remove_inactive_object_attributes/layers", "layers", (1, 2, 4, 8),
+        lambda n: _rig_with_layers(layers=n, controls=16),
+        lambda: _tool("mr_animLayers").remove_inactive_object_attributes()),
+    ("mr_animLayers.create_animation_layer_with_baseAnimation_keyTiming/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_selection(controls=n),
+        lambda: _tool("mr_animLayers").create_animation_layer_with_baseAnimation_keyTiming()),
+    ("mr_animLayers.bake_to_selected_override_animation_layer/controls", "controls", (4, 8, 16, 32),
+        lambda n: _rig_with_layers(layers=1, controls=n, frames=20, override=True),
+        _bake_to_override_layer),
+    ("mr_animLayers.toggle_mute_selected_animation_layers/layers", "layers", (1, 2, 4, 8),
+        lambda n: _rig_with_layers(layers=n),
+        lambda: _tool("mr_animLayers").toggle_mute_selected_animation_layers()),
+]
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                               RUNNING                                #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def fit_exponent(sizes, costs):
+    """
+    Fit cost = a * size^k with least squares on a log-log scale, and return k.
+
+    :param sizes: Problem sizes.
+    :type sizes: list(float)
+    :param costs: Cost measured at each size. Values of 0 or less are ignored.
+    :type costs: list(float)
+    :return: The exponent k, or 0.0 if there aren't enough usable points.
+    :rtype: float
+
+    :Example:
+    >>> fit_exponent([1, 2, 4, 8], [3, 12, 48, 192])
+    2.0
+
+    """
+    points = [(math.log(size), math.log(cost)) for size, cost in zip(sizes, costs) if size > 0 and cost > 0]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _y in points) / len(points)
+    mean_y = sum(y for _x, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _y in points)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+# ------------------------------------------------------------------------------ #
+def run_case(case, repeats=1):
+    """
+    Run one benchmark case at each of its sizes.
+
+    :param case: An entry of CASES.
+    :type case: tuple
+    :param repeats: Times to run each size. The fastest time is kept.
+    :type repeats: int
+    :return: Results, with calls and times per size, and the fitted exponents.
+    :rtype: dict
+
+    """
+    import mr_cmdsProfiler
+
+    name, axis, sizes, set_up, run = case
+    calls = []
+    times = []
+    for size in sizes:
+        best_time = None
+        for _repeat in range(max(1, repeats)):
+            set_up(size)
+            profiler = mr_cmdsProfiler.Profiler(name)
+            start = time.perf_counter()
+            # The tools print as they go, which would bury the results.
+            with open(os.devnull, "w") as devnull, profiler, contextlib.redirect_stdout(devnull):
+                run()
+            elapsed = time.perf_counter() - start
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+        calls.append(sum(profiler.call_counts().values()))
+        times.append(best_time)
+
+    return {
+        "axis": axis,
+        "sizes": list(sizes),
+        "calls": calls,
+        "times": times,
+        "call_exponent": round(fit_exponent(sizes, calls), 3),
+        "time_exponent": round(fit_exponent(sizes, times), 3),
+    }
+
+# ------------------------------------------------------------------------------ #
+def run_benchmarks(patterns=None, repeats=1):
+    """
+    Run every benchmark case, or the ones matching any of the given patterns.
+
+    :param patterns: Glob patterns for case names, e.g. ["mr_tempPin*"].
+    :type patterns: list(str), optional
+    :return: Results of each case, by name.
+    :rtype: dict
+
+    """
+    mr_mayaSimulator.install()
+    results = {}
+    for case in CASES:
+        if patterns and not any(fnmatch.fnmatchcase(case[0], f"*{pattern}*") for pattern in patterns):
+            continue
+        results[case[0]] = run_case(case, repeats=repeats)
+    return results
+
+# ------------------------------------------------------------------------------ #
+def compare_to_baseline(results, baseline, gate_time=False):
+    """
+    Find the cases that scale worse than their baseline.
+
+    :return: A message for each regression.
+    :rtype: list(str)
+
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["call_exponent"] > expected["call_exponent"] + CALL_EXPONENT_TOLERANCE:
+            regressions.append(f"{name}: call count exponent {result['call_exponent']:.2f}, baseline {expected['call_exponent']:.2f}")
+        if gate_time and result["time_exponent"] > expected["time_exponent"] + TIME_EXPONENT_TOLERANCE:
+            regressions.append(f"{name}: time exponent {result['time_exponent']:.2f}, baseline {expected['time_exponent']:.2f}")
+    return regressions
+
+# ------------------------------------------------------------------------------ #
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+# ------------------------------------------------------------------------------ #
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path)
+    for name, result in results.items():
+        baseline[name] = {
+            "axis": result["axis"],
+            "sizes": result["sizes"],
+            "calls": result["calls"],
+            "call_exponent": result["call_exponent"],
+            "time_exponent": result["time_exponent"],
+        }
+    with open(path, "w") as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=4)
+        f.write("\n")
+
+# ------------------------------------------------------------------------------ #
+def print_results(results, baseline):
+    print(f"{'CASE':<90} {'CALLS k':>8} {'BASE':>6} {'TIME k':>8} {'BASE':>6}  CALLS")
+    for name, result in results.items():
+        expected = baseline.get(name, {})
+        base_calls = f"{expected['call_exponent']:.2f}" if expected else "-"
+        base_time = f"{expected['time_exponent']:.2f}" if expected else "-"
+        print(f"{name:<90} {result['call_exponent']:>8.2f} {base_calls:>6} {result['time_exponent']:>8.2f} {base_time:>6}  {result['calls']}")
+
+# ------------------------------------------------------------------------------ #
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check how each tool scales with scene size.")
+    parser.add_argument("--cases", nargs="*", help="Only run cases with names containing any of these.")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per size. The fastest time is kept.")
+    parser.add_argument("--update-baseline", action="store_true", help="Save these results as the new baseline.")
+    parser.add_argument("--gate-time", action="store_true", help="Also fail if a time exponent gets worse.")
+    parser.add_argument("--json", help="Also save the full results to this path.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.cases, repeats=args.repeats)
+    baseline = load_baseline()
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, gate_time=args.gate_time)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
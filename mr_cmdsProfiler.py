@@ -0,0 +1,425 @@
+"""
+# ------------------------------------------------------------------------------ #
+# SCRIPT: mr_cmdsProfiler.py
+# VERSION: 0002
+#
+# CREATORS: Maria Robertson
+# ---------------------------------------
+#
+# ---------------------------------------
+# DESCRIPTION:
+# ---------------------------------------
+# Opt-in profiler, to see which maya.cmds and maya.mel calls a tool spends its time on.
+#
+# While active, every command in maya.cmds (and maya.mel.eval) is wrapped, to record:
+#   - How many times each command was called, and the total time spent in it.
+#   - The call site of each call (file, line and function of the tool code that made it).
+#   - The stack of tool functions leading to each call.
+#
+# Calls are grouped by entry point, which is the tool function being profiled.
+# Results can be saved as:
+#   - JSON, for reading or comparing between releases.
+#   - Collapsed stacks, for flame graph viewers like speedscope or flamegraph.pl.
+#
+# Nothing is changed until a profiler is started, and the original commands are always restored afterwards.
+#
+# EXAMPLE USES:
+# ---------------------------------------
+# - Find which Maya round-trips make a tool slow on a heavy rig.
+# - Compare the number of commands a tool makes before and after a change.
+#
+# ---------------------------------------
+# RUN COMMANDS:
+# ---------------------------------------
+import importlib
+import mr_cmdsProfiler
+importlib.reload(mr_cmdsProfiler)
+
+import mr_bakeToWorldspace
+
+# USE ONE OF THE FOLLOWING.
+# As a context manager.
+with mr_cmdsProfiler.Profiler("mr_bakeToWorldspace.main") as profiler:
+    mr_bakeToWorldspace.main("both")
+profiler.print_summary()
+
+# Or profile a function call directly.
+profiler = mr_cmdsProfiler.Profiler()
+profiler.run(mr_bakeToWorldspace.main, "both")
+profiler.write_json("C:/temp/bakeToWorldspace_profile.json")
+profiler.write_collapsed_stacks("C:/temp/bakeToWorldspace_profile.folded")
+
+# ------------------------------------------------------------------------------ #
+"""
+
+import json
+import os
+import sys
+import time
+
+import maya.cmds as cmds
+import maya.mel as mel
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                               PROFILER                               #
+#                                                                      #
+########################################################################
+
+# Only one profiler can wrap the commands at a time. Nested entry points are recorded on the active one.
+_ACTIVE_PROFILER = None
+
+
+class Profiler(object):
+    """
+    Record every maya.cmds and maya.mel.eval call made while active.
+
+    :param entry_point: Name to record calls under. If None, calls are recorded under "session".
+    :type entry_point: str, optional
+    :param commands: Names of the commands to wrap. If None, all commands in maya.cmds are wrapped.
+    :type commands: list(str), optional
+
+    :Example:
+    >>> with Profiler("mr_keyScaler.main") as profiler:
+    ...     mr_keyScaler.main(2)
+    >>> profiler.report()["entry_points"]["mr_keyScaler.main"]["calls"]
+    48
+
+    """
+
+    def __init__(self, entry_point=None, commands=None):
+        self.entry_point = entry_point or "session"
+        self.command_names = commands
+        self.entry_points = {}
+        self.stacks = {}
+        self._entry_stack = []
+        self._root_frames = []
+        self._originals = {}
+        self._outer = None
+        self._nested_time = []
+
+    # ------------------------------------------------------------------------------ #
+    def __enter__(self):
+        self.start()
+        self._enter_entry_point(self.entry_point, sys._getframe(1))
+        return self
+
+    # ------------------------------------------------------------------------------ #
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._exit_entry_point()
+        self.stop()
+        return False
+
+    # ------------------------------------------------------------------------------ #
+    def run(self, function, *args, **kwargs):
+        """
+        Call a function with the profiler active, recording its calls under the function's name.
+
+        :param function: The tool function to profile.
+        :type function: function
+        :return: Whatever the function returns.
+
+        """
+        name = f"{function.__module__}.{function.__name__}"
+        self.start()
+        self._enter_entry_point(name, sys._getframe(0))
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._exit_entry_point()
+            self.stop()
+
+    # ------------------------------------------------------------------------------ #
+    def start(self):
+        """
+        Wrap the commands. Safe to call if the profiler is already active.
+        """
+        global _ACTIVE_PROFILER
+        if _ACTIVE_PROFILER is self:
+            return
+        # Another profiler is already wrapping the commands, so stack on top of it.
+        self._outer = _ACTIVE_PROFILER
+        if self._outer is not None:
+            self._outer.stop()
+        _ACTIVE_PROFILER = self
+
+        names = self.command_names or [name for name in dir(cmds) if not name.startswith("_")]
+        for name in names:
+            original = getattr(cmds, name, None)
+            if callable(original):
+                self._originals[(cmds, name)] = cmds.__dict__.get(name)
+                setattr(cmds, name, self._wrap(f"cmds.{name}", original))
+        self._originals[(mel, "eval")] = mel.__dict__.get("eval")
+        setattr(mel, "eval", self._wrap("mel.eval", mel.eval, is_mel=True))
+
+    # ------------------------------------------------------------------------------ #
+    def stop(self):
+        """
+        Restore the original commands.
+        """
+        global _ACTIVE_PROFILER
+        if _ACTIVE_PROFILER is not self:
+            return
+        for (module, name), original in self._originals.items():
+            if original is None:
+                # The command was found through the module's __getattr__, so remove the wrapper again.
+                module.__dict__.pop(name, None)
+            else:
+                setattr(module, name, original)
+        self._originals = {}
+        _ACTIVE_PROFILER = None
+        if self._outer is not None:
+            self._outer.start()
+            self._outer = None
+
+    # ------------------------------------------------------------------------------ #
+    def _enter_entry_point(self, name, root_frame):
+        self._entry_stack.append(name)
+        self._root_frames.append(root_frame)
+        entry = self._get_entry_point(name)
+        entry["runs"] += 1
+        entry["_started"].append(time.perf_counter())
+
+    # ------------------------------------------------------------------------------ #
+    def _exit_entry_point(self):
+        name = self._entry_stack.pop()
+        self._root_frames.pop()
+        entry = self.entry_points[name]
+        entry["wall_time"] += time.perf_counter() - entry["_started"].pop()
+
+    # ------------------------------------------------------------------------------ #
+    def _get_entry_point(self, name):
+        entry = self.entry_points.get(name)
+        if entry is None:
+            entry = self.entry_points[name] = {"runs": 0, "wall_time": 0.0, "commands": {}, "_started": []}
+        return entry
+
+    # ------------------------------------------------------------------------------ #
+    def _wrap(self, label, original, is_mel=False):
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            # Commands can run inside another command, e.g. a generator of tool code passed to cmds.select().
+            # Each is counted, and nested time is taken off the outer command, so time isn't counted twice.
+            profiler._nested_time.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self_time = elapsed - profiler._nested_time.pop()
+                if profiler._nested_time:
+                    profiler._nested_time[-1] += elapsed
+                command = label
+                if is_mel and args:
+                    command = f"mel.eval({str(args[0]).split()[0].split('(')[0]})" if str(args[0]).split() else label
+                profiler._record(command, self_time, sys._getframe(1))
+
+        wrapper.__name__ = getattr(original, "__name__", label)
+        wrapper.__doc__ = getattr(original, "__doc__", None)
+        wrapper.__wrapped__ = original
+        return wrapper
+
+    # ------------------------------------------------------------------------------ #
+    def _record(self, command, elapsed, frame):
+        entry_name = self._entry_stack[-1] if self._entry_stack else self.entry_point
+        root_frame = self._root_frames[-1] if self._root_frames else None
+        entry = self._get_entry_point(entry_name)
+
+        # ---------------------------------------
+        # 01. COMMAND TOTALS AND CALL SITE.
+        # ---------------------------------------
+        command_data = entry["commands"].get(command)
+        if command_data is None:
+            command_data = entry["commands"][command] = {"calls": 0, "time": 0.0, "call_sites": {}}
+        command_data["calls"] += 1
+        command_data["time"] += elapsed
+
+        call_site = format_frame(frame, with_line=True)
+        site_data = command_data["call_sites"].get(call_site)
+        if site_data is None:
+            site_data = command_data["call_sites"][call_site] = {"calls": 0, "time": 0.0}
+        site_data["calls"] += 1
+        site_data["time"] += elapsed
+
+        # ---------------------------------------
+        # 02. COLLAPSED STACK.
+        # ---------------------------------------
+        names = []
+        while frame is not None and frame is not root_frame:
+            names.append(format_frame(frame))
+            frame = frame.f_back
+        if not names or names[-1] != entry_name:
+            names.append(entry_name)
+        names.reverse()
+        names.append(command)
+        stack = ";".join(names)
+        stack_data = self.stacks.get(stack)
+        if stack_data is None:
+            stack_data = self.stacks[stack] = [0, 0.0]
+        stack_data[0] += 1
+        stack_data[1] += elapsed
+
+    ########################################################################
+    #                               REPORTS                                #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def report(self):
+        """
+        Get the recorded results, with commands sorted from slowest to fastest.
+
+        :return: {"entry_points": {name: {"runs", "wall_time", "calls", "command_time", "commands": {...}}}}
+        :rtype: dict
+
+        """
+        entry_points = {}
+        for name, entry in self.entry_points.items():
+            commands = {}
+            for command, data in sorted(entry["commands"].items(), key=lambda item: -item[1]["time"]):
+                commands[command] = {
+                    "calls": data["calls"],
+                    "time": data["time"],
+                    "call_sites": dict(sorted(data["call_sites"].items(), key=lambda item: -item[1]["time"])),
+                }
+            entry_points[name] = {
+                "runs": entry["runs"],
+                "wall_time": entry["wall_time"],
+                "calls": sum(data["calls"] for data in commands.values()),
+                "command_time": sum(data["time"] for data in commands.values()),
+                "commands": commands,
+            }
+        return {"entry_points": entry_points}
+
+    # ------------------------------------------------------------------------------ #
+    def call_counts(self, entry_point=None):
+        """
+        Get the number of calls of each command, for one entry point or all of them.
+
+        :rtype: dict
+
+        """
+        counts = {}
+        for name, entry in self.entry_points.items():
+            if entry_point and name != entry_point:
+                continue
+            for command, data in entry["commands"].items():
+                counts[command] = counts.get(command, 0) + data["calls"]
+        return counts
+
+    # ------------------------------------------------------------------------------ #
+    def write_json(self, path):
+        """
+        Save the report as JSON.
+
+        :param path: File path to write to.
+        :type path: str
+
+        """
+        _make_directory(path)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=4)
+        return path
+
+    # ------------------------------------------------------------------------------ #
+    def write_collapsed_stacks(self, path, weight="time"):
+        """
+        Save the call stacks in the collapsed format used by flame graph tools.
+        Each line is "entry_point;module.function;...;cmds.command value".
+
+        :param path: File path to write to.
+        :type path: str
+        :param weight: "time" to weight each stack by microseconds spent, or "calls" by number of calls.
+        :type weight: str
+
+        """
+        _make_directory(path)
+        with open(path, "w") as f:
+            for stack, (calls, elapsed) in sorted(self.stacks.items()):
+                value = calls if weight == "calls" else max(1, int(round(elapsed * 1000000)))
+                f.write(f"{stack} {value}\n")
+        return path
+
+    # ------------------------------------------------------------------------------ #
+    def print_summary(self, limit=10):
+        """
+        Print the slowest commands of each entry point to the Script Editor.
+        """
+        for name, entry in self.report()["entry_points"].items():
+            print(f"{name}: {entry['calls']} calls, {entry['command_time']:.4f}s in commands, {entry['wall_time']:.4f}s total")
+            for command, data in list(entry["commands"].items())[:limit]:
+                slowest_site = next(iter(data["call_sites"]), "")
+                print(f"    {command:<30} {data['calls']:>8} calls {data['time']:>10.4f}s    {slowest_site}")
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                          HELPER FUNCTIONS                            #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def format_frame(frame, with_line=False):
+    """
+    Get a readable name for a stack frame, like "mr_utilities.get_object_attributes".
+    """
+    module = frame.f_globals.get("__name__", "?")
+    if with_line:
+        return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}:{frame.f_code.co_name}"
+    return f"{module}.{frame.f_code.co_name}"
+
+# ------------------------------------------------------------------------------ #
+def _make_directory(path):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+# ------------------------------------------------------------------------------ #
+def profile(entry_point=None):
+    """
+    Decorator, to profile every call of a function.
+
+    :Example:
+    >>> @profile()
+    ... def main():
+    ...     ...
+
+    """
+    def decorator(function):
+        name = entry_point or f"{function.__module__}.{function.__name__}"
+
+        def wrapper(*args, **kwargs):
+            if _ACTIVE_PROFILER is not None:
+                # Record as a nested entry point of the running profiler.
+                _ACTIVE_PROFILER._enter_entry_point(name, sys._getframe(0))
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    _ACTIVE_PROFILER._exit_entry_point()
+            with Profiler(name) as profiler:
+                result = function(*args, **kwargs)
+            profiler.print_summary()
+            return result
+
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+    return decorator
+
+"""
+##################################################################################################################################################
+# ---------------------------------------
+# CHANGELOG:
+# ---------------------------------------
+# 2026-10-17 - 0002:
+#   - Commands run inside another command are now counted too, e.g. tool generators passed to cmds.select().
+#       - Their time is taken off the outer command, so each command reports only its own time.
+#
+# 2026-10-17 - 0001:
+#   - First version.
+# ---------------------------------------
+##################################################################################################################################################
+"""
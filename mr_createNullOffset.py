@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_createNullOffset.py
-# VERSION: 0005
+# VERSION: 0008
 #
 # CREATORS: Maria Robertson
 # ---------------------------------------
@@ -36,7 +36,8 @@ mr_createNullOffset.mr_createNullOffset_keyed()
 # ---------------------------------------
 # REQUIREMENTS: 
 # ---------------------------------------
-# mr_bakeToWorldspace.py
+# mr_bakeEngine.py and NumPy, for keyed objects.
+# mr_utilities.py
 # ---------------------------------------
 # RESEARCH THAT HELPED:
 # ---------------------------------------
@@ -53,6 +54,19 @@ mr_createNullOffset.mr_createNullOffset_keyed()
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0008:
+#   - mr_utilities and mr_bakeEngine are imported without reloading them, so their caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0007:
+#   - Keyed objects are moved into their offset groups with mr_bakeEngine.bake_offset_groups(), from one pass of sampled matrices.
+#       - Replaces baking to worldspace locators, constraining the nulls and running a second simulated bakeResults.
+#       - Keyed objects keep their key timing, with keys set to what's left over inside the null, instead of zeroed.
+#       - mr_createNullOffset_static() keys both translate and rotate of keyed objects inside their nulls.
+#   - Removed calls to mr_bakeToWorldspace.mr_bakeToWorldspace(), which no longer exists.
+#
+# 2026-10-17 - 0006:
+#   - Viewport refreshes are turned back on even if baking fails, using mr_utilities.suspended_refresh().
+#
 # 2023-07-19 - 0005:
 #   - Adding comments to script to make rereading easier.
 #   - Made bakeResults bake on both translate and rotate attributes, for mr_createNullOffset_keyed()
@@ -76,12 +90,9 @@ mr_createNullOffset.mr_createNullOffset_keyed()
 """
 
 import maya.cmds as cmds
-import importlib
 
-import mr_bakeToWorldspace
-importlib.reload(mr_bakeToWorldspace)
-import mr_find_constraint_targets_and_drivers
-importlib.reload(mr_find_constraint_targets_and_drivers)
+import mr_utilities
+import mr_bakeEngine
 
 def mr_createNullOffset_keyed():
     sel = cmds.ls(selection=True)
@@ -118,73 +129,35 @@ def mr_createNullOffset_keyed():
                 keyed_objects.append(item)
             else:
                 static_objects.append(item)
-    
-    # If keyed, bake them to spare locators, to hold their worldspace position while placing the item in a parent.
-    if keyed_objects:
-        cmds.select(keyed_objects)
-        mr_bakeToWorldspace.mr_bakeToWorldspace("both")
-                  
-    # Create null group.
-    
+
     # For each item,
     for item in valid_objects:
         # Create a null group.
         parent = cmds.listRelatives(item, parent=True)
         null = cmds.group(empty=True, name=item + "_offset_grp")
-        # Match the position and orientation.
-        cmds.parentConstraint(item, null)
-        
+
         # If item is keyed, add it to a variable to be baked later.
         if item in keyed_objects:
-            nulls_for_keyed_objects.append(null) 
-        # Otherwise, just delete the constraint.
-        elif item in static_objects:
-            cmds.delete(null + "_parentConstraint1")
-               
+            if parent:
+                cmds.parent(null, parent[0], relative=True)
+            nulls_for_keyed_objects.append(null)
+            continue
+
+        # Otherwise, match the position and orientation, then delete the constraint.
+        cmds.delete(cmds.parentConstraint(item, null))
+
         # If item has a parent, place the null under it too.
         if parent:
             cmds.parent(null, parent[0])
         # Parent item under the null.
         cmds.parent(item, null)
     
-    # For every item with keys, bake their constrained nulls.
+    # For every item with keys, key their nulls to follow them, and keep their own keys static inside.
+    # Everything is worked out from one pass of sampled world and parent matrices, instead of baking twice.
     if nulls_for_keyed_objects:
-        cmds.refresh(suspend=True)
-        cmds.bakeResults(
-            nulls_for_keyed_objects,
-            simulation=True,
-            attribute=['translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ' ],  # Only key translate attributes
-            time=(start_time, end_time),
-            sampleBy=1,
-            disableImplicitControl=True,
-            preserveOutsideKeys=True,
-            sparseAnimCurveBake=False,
-            removeBakedAttributeFromLayer=False,
-            removeBakedAnimFromLayer=False,
-            bakeOnOverrideLayer=False,
-            minimizeRotation=True,
-            controlPoints=False
-        )
-        cmds.filterCurve()
-        # Delete constraints on the nulls after baking.
-        cmds.delete(nulls_for_keyed_objects, constraints=True)
-        cmds.refresh(suspend=False)
-    
-    # Key the original selection, before deleting their drivers
-    cmds.setKeyframe(sel, attribute='translateX')
-    cmds.setKeyframe(sel, attribute='translateY')
-    cmds.setKeyframe(sel, attribute='translateZ')
-    cmds.setKeyframe(sel, attribute='rotateX')
-    cmds.setKeyframe(sel, attribute='rotateY')
-    cmds.setKeyframe(sel, attribute='rotateZ')
-    # Delete their drivers.
-    cmds.select(sel)
-    mr_find_constraint_targets_and_drivers.mr_find_drivers_of_selected()
-    cmds.delete()
-    
-    # Remove keys on original selection (to not double the motion)
-    cmds.select(sel)
-    set_transform_values_to_default()
+        # Viewport refreshes are always turned back on, even if the bake fails.
+        with mr_utilities.suspended_refresh():
+            mr_bakeEngine.bake_offset_groups(keyed_objects, nulls_for_keyed_objects, start_time, end_time)
 
     """
     # Finish script by selecting the last item
@@ -200,6 +173,7 @@ def mr_createNullOffset_static():
     end_time = cmds.playbackOptions(q=True, max=True)
     
     keyed_objects = []
+    nulls_for_keyed_objects = []
     
     for item in sel:
         parent = cmds.listRelatives(item, parent=True)
@@ -218,64 +192,39 @@ def mr_createNullOffset_static():
             for attr in attrs:
                 cmds.setAttr(item + attr, lock=False)
 
+            # Create group
+            null = cmds.group(empty=True, name=item + "_offset_grp")
+
             # Check if the item has keyframes
             has_keyframes = cmds.keyframe(item, query=True, keyframeCount=True)
             if has_keyframes:
-                keyed_objects.append(item)            
+                # Keyed items are moved into their group when baking.
+                if parent:
+                    cmds.parent(null, parent[0], relative=True)
+                keyed_objects.append(item)
+                nulls_for_keyed_objects.append(null)
+
+            else:
+                # Match position and orientation
+                cmds.delete(cmds.parentConstraint(item, null))
 
+                # Parent nulls
+                if parent:
+                    cmds.parent(null, parent[0])
+                cmds.parent(item, null)
 
+    # Hold each keyed item's current pose in its null, and rebake its animation inside it from one pass of sampled matrices.
     if keyed_objects:
-        cmds.select(keyed_objects)
-        mr_bakeToWorldspace.mr_bakeToWorldspace("both")
+        # Viewport refreshes are always turned back on, even if the bake fails.
+        with mr_utilities.suspended_refresh():
+            mr_bakeEngine.bake_offset_groups(keyed_objects, nulls_for_keyed_objects, start_time, end_time, animate_groups=False)
 
+    # Lock attributes of offset groups
     for item in sel:
-        if parent and parent[0].endswith("_offset_grp"):
-            continue
-        elif item.endswith("_offset_grp"):
-            continue
-
-        else:
-            # Create group
-            null = cmds.group(empty=True, name=item + "_offset_grp")
-
-            # Match position and orientation
-            cmds.parentConstraint(item, null)
-            cmds.delete(null + "_parentConstraint1")
-
-            # Parent nulls
-            if parent:
-                cmds.parent(null, parent[0])
-            cmds.parent(item, null)
-
-            # Lock attributes of offset group
-            attrs += [".sx", ".sy", ".sz", ".v"]
-            for attr in attrs:
+        null = item + "_offset_grp"
+        if cmds.objExists(null) and cmds.listRelatives(item, parent=True) == [null]:
+            for attr in [".tx", ".ty", ".tz", ".rx", ".ry", ".rz", ".sx", ".sy", ".sz", ".v"]:
                 cmds.setAttr(null + attr, lock=True)
-    
-    if keyed_objects:
-        cmds.refresh(suspend=True)
-        cmds.bakeResults(
-            keyed_objects,
-            simulation=True,
-            time=(start_time, end_time),
-            attribute=['translateX', 'translateY', 'translateZ'],  # Only key translate attributes
-            sampleBy=1,
-            disableImplicitControl=True,
-            preserveOutsideKeys=True,
-            sparseAnimCurveBake=False,
-            removeBakedAttributeFromLayer=False,
-            removeBakedAnimFromLayer=False,
-            bakeOnOverrideLayer=False,
-            minimizeRotation=True,
-            controlPoints=False
-        )
-        cmds.filterCurve()
-        cmds.refresh(suspend=False)
-
-    # Delete drivers
-    cmds.select(sel)
-    mr_find_constraint_targets_and_drivers.mr_find_drivers_of_selected()
-    cmds.delete()
 
     """
     # Finish script by selecting the last item
@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_curveOffset.py
-# VERSION: 0003
+# VERSION: 0004
 #
 # CREATORS: Maria Robertson
 # CREDIT: Nicolas Prothais (for original np_curveOffset.mel script)
@@ -46,9 +46,7 @@ mr_curveOffset.offset_release()
 
 import maya.cmds as cmds
 
-import importlib
 import mr_utilities
-importlib.reload(mr_utilities)
 
 # ------------------------------------------------------------------------------ #
 def offset_press():
@@ -139,6 +137,9 @@ def offset_release():
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0004:
+#	- mr_utilities is imported without reloading it, so its caches and scene callbacks last between runs.
+#
 # 2024-02-02 - 0003:
 #	- Fixing error "Invalid arguments for flag 'time'.  Expected (time, [time]), got str", by passing time range as a tuple.
 #
@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_find_constraint_targets_and_drivers.py
-# VERSION: 0004
+# VERSION: 0008
 #
 # CREATORS: Maria Robertson
 # CREDIT: Tim van Huseen (for MEL version of Select the Constrainer)
@@ -31,6 +31,12 @@ mr_find_constraint_targets_and_drivers.mr_find_drivers_of_selected()
 
 mr_find_constraint_targets_and_drivers.mr_deselect_selected_if_constrained()
 
+# ---------------------------------------
+# REQUIREMENTS:
+# ---------------------------------------
+# The mr_utilities.py file, for ConstraintGraphIndex:
+# https://github.com/maria137-art/MayaAnimScripts/blob/main/mr_utilities.py
+#
 # ---------------------------------------
 # RESEARCH THAT HELPED:
 # ---------------------------------------
@@ -42,6 +48,18 @@ mr_find_constraint_targets_and_drivers.mr_deselect_selected_if_constrained()
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0008:
+# - mr_utilities is imported without reloading it, so its caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0007:
+# - mr_find_drivers_of_selected adds each target's drivers to the selection again, like before 0006, and prints them per target.
+#
+# 2026-10-17 - 0006:
+# - All three functions look objects up in one mr_utilities.ConstraintGraphIndex, built from every constraint at once,
+#   instead of querying each object and constraint, and probing up to 20 targets.
+# - mr_find_drivers_of_selected finds every target of a constraint, with no limit on how many.
+# - Added get_targets() and get_drivers(), for other tools to look objects up without changing the selection.
+#
 # 2023-12-28 - 0005:
 # - Updating mr_find_targets_of_selected, so it prints in the original order.
 # - Did this, as the reversed order inteferred with mr_tempPin_pivotFromSelectionSet 0008.
@@ -63,6 +81,56 @@ mr_find_constraint_targets_and_drivers.mr_deselect_selected_if_constrained()
 from collections import OrderedDict
 import maya.cmds as cmds
 
+import mr_utilities
+
+
+# ------------------------------------------------------------------------------ #
+def get_targets(objects, constraint_index=None):
+    """
+    Get the objects constrained by constraints connected to the given objects, in the order found.
+    For a driver, that's what it drives. For a constrained object, that's itself.
+
+    :param objects: Objects to look up.
+    :type objects: list(str)
+    :param constraint_index: An index to look objects up in. If None, one is built.
+    :type constraint_index: mr_utilities.ConstraintGraphIndex, optional
+    :return: The targets, without duplicates.
+    :rtype: list(str)
+
+    """
+    if constraint_index is None:
+        constraint_index = mr_utilities.ConstraintGraphIndex()
+
+    unique_targets = OrderedDict()
+    for obj in objects:
+        for constraint in constraint_index.constraints(obj):
+            target = constraint_index.parent(constraint)
+            if target:
+                unique_targets[target] = None
+    return list(unique_targets)
+
+
+# ------------------------------------------------------------------------------ #
+def get_drivers(objects, constraint_index=None):
+    """
+    Get the objects driving the given objects through constraints, however many targets each constraint has.
+
+    :param objects: Constrained objects to look up.
+    :type objects: list(str)
+    :param constraint_index: An index to look objects up in. If None, one is built.
+    :type constraint_index: mr_utilities.ConstraintGraphIndex, optional
+    :return: Each object mapped to its drivers, without duplicates, as {object: [drivers]}.
+    :rtype: OrderedDict
+
+    """
+    if constraint_index is None:
+        constraint_index = mr_utilities.ConstraintGraphIndex()
+
+    drivers = OrderedDict()
+    for obj in objects:
+        drivers[obj] = list(OrderedDict((link.driver, None) for link in constraint_index.drivers(obj)))
+    return drivers
+
 
 # ------------------------------------------------------------------------------ #
 def mr_find_targets_of_selected():
@@ -72,20 +140,8 @@ def mr_find_targets_of_selected():
         print("No objects selected.")
         return
 
-    unique_targets = OrderedDict()
-    
-    for obj in selected:
-        conns = cmds.listConnections(obj, type="constraint") or []
-         # Find parents of any of the constraint connections.
-        targets = cmds.listRelatives(conns, parent=True) or []
-        
-        # If a target is not yet in unique_targets, add it there.
-        for target in targets:
-            if target not in unique_targets:
-                unique_targets[target] = None
-
     # Maintain the original order list.
-    targets_in_order = list(unique_targets.keys())
+    targets_in_order = get_targets(selected)
 
     if targets_in_order:
         print("Targets found:")
@@ -105,29 +161,13 @@ def mr_find_drivers_of_selected():
         print("No objects selected.")
 
     else: 
-        for target_obj in selected:
-            constraints_of_selected = cmds.listRelatives(target_obj, typ="constraint")
-            
-            if constraints_of_selected:
+        for target_obj, drivers in get_drivers(selected).items():
+            if drivers:
                 print("Target: {}.".format(target_obj))       
                 
-                drivers = []
-                
-                for n in range(len(constraints_of_selected)):
-                    conns = cmds.listConnections(constraints_of_selected[n], connections=1)
-                    
-                    for mtrx in range(20):
-                        destination_connection = constraints_of_selected[n] + ".target[{}].targetParentMatrix".format(mtrx)
-                        
-                        try:
-                            index = conns.index(destination_connection)
-                            driver_obj = conns[index+1]
-                            if driver_obj not in drivers:
-                                cmds.select(driver_obj, add=True)
-                                drivers.append(driver_obj)
-                                print("Driver: {}.\n".format(driver_obj))       
-                        except ValueError:
-                            break
+                cmds.select(drivers, add=True)
+                for driver_obj in drivers:
+                    print("Driver: {}.\n".format(driver_obj))       
             else:
                 print("No constraints found.")
 
@@ -137,8 +177,7 @@ def mr_deselect_selected_if_constrained():
     if not selected:
         print("No objects selected.")
     else: 
-        for target_obj in selected:
-            constraints_of_selected = cmds.listRelatives(target_obj, typ="constraint")
-            
-            if constraints_of_selected:
-                cmds.select(target_obj, deselect=True)
+        constraint_index = mr_utilities.ConstraintGraphIndex()
+        constrained = [target_obj for target_obj in selected if constraint_index.drivers(target_obj)]
+        if constrained:
+            cmds.select(constrained, deselect=True)
@@ -0,0 +1,3583 @@
+"""
+# ------------------------------------------------------------------------------ #
+# SCRIPT: mr_mayaSimulator.py
+# VERSION: 0001
+#
+# CREATORS: Maria Robertson
+# ---------------------------------------
+#
+# ---------------------------------------
+# DESCRIPTION:
+# ---------------------------------------
+# A pure Python stand-in for the parts of maya.cmds and maya.mel that the scripts in this repo use.
+#
+# It keeps a small scene graph in memory (transforms, shapes, animation curves, animation layers
+# and constraints), and evaluates it the same way the tools expect Maya to, so the tools can be
+# profiled and regression tested outside of a Maya GUI session.
+#
+# It also includes generate_rig(), to build synthetic rigs of any size (10 to 10,000+ controls),
+# with keyed FK chains, locked attributes, hidden controls, animation layers and constraints.
+#
+# EXAMPLE USES:
+# ---------------------------------------
+# - Measure how a tool scales with rig size on a plain Linux machine.
+# - Check a tool still gives the same result after an optimisation.
+#
+# INSTRUCTIONS:
+# ---------------------------------------
+# Run install() BEFORE importing any of the tools.
+# The tools import maya.cmds when they're first imported, so they need to find the simulator there.
+#
+# Not everything in Maya is simulated. Some simplifications to be aware of:
+#   - Only the xyz rotate order is supported, and pivots, shear and joint orients are ignored.
+#   - Animation curves are evaluated as hermite splines, using Maya's tangent types as a guide.
+#   - Constraints are solved with the same maths Maya uses, but without pairBlend nodes by default.
+#     Keying a constrained attribute stores the keys until the constraint is deleted.
+#     Build rigs with generate_rig(pair_blends=True) to constrain keyed attributes through a pairBlend, like Maya does.
+#   - Graph Editor, Channel Box and panel queries return values stored on the scene,
+#     which can be set with set_ui_state().
+#
+# ---------------------------------------
+# RUN COMMAND:
+# ---------------------------------------
+import mr_mayaSimulator
+mr_mayaSimulator.install()
+
+rig = mr_mayaSimulator.generate_rig(controls=500, frames=200, layers=2, constraints=20)
+
+import maya.cmds as cmds
+import mr_bakeToWorldspace
+
+cmds.select(rig["controls"][:10])
+mr_bakeToWorldspace.main("both")
+
+# ------------------------------------------------------------------------------ #
+"""
+
+import bisect
+import fnmatch
+import math
+import random
+import re
+import sys
+import types
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                           NODE DEFINITIONS                           #
+#                                                                      #
+########################################################################
+
+# Every node type, with the types it inherits from. Used by any "type" flag, like cmds.ls(type="constraint").
+NODE_TYPE_INHERITANCE = {
+    "transform": ("dagNode", "transform"),
+    "joint": ("dagNode", "transform", "joint"),
+    "locator": ("dagNode", "shape", "locator"),
+    "nurbsCurve": ("dagNode", "shape", "curveShape", "nurbsCurve"),
+    "mesh": ("dagNode", "shape", "mesh"),
+    "pointConstraint": ("dagNode", "transform", "constraint", "pointConstraint"),
+    "orientConstraint": ("dagNode", "transform", "constraint", "orientConstraint"),
+    "parentConstraint": ("dagNode", "transform", "constraint", "parentConstraint"),
+    "scaleConstraint": ("dagNode", "transform", "constraint", "scaleConstraint"),
+    "aimConstraint": ("dagNode", "transform", "constraint", "aimConstraint"),
+    "animCurveTL": ("animCurve", "animCurveTL"),
+    "animCurveTA": ("animCurve", "animCurveTA"),
+    "animCurveTU": ("animCurve", "animCurveTU"),
+    "animCurveTT": ("animCurve", "animCurveTT"),
+    "animBlendNodeAdditive": ("animBlendNodeBase", "animBlendNodeAdditive"),
+    "animBlendNodeAdditiveDL": ("animBlendNodeBase", "animBlendNodeAdditiveDL"),
+    "animBlendNodeAdditiveDA": ("animBlendNodeBase", "animBlendNodeAdditiveDA"),
+    "animBlendNodeBoolean": ("animBlendNodeBase", "animBlendNodeBoolean"),
+    "animLayer": ("objectSet", "animLayer"),
+    "objectSet": ("objectSet",),
+    "mute": ("mute",),
+    "pairBlend": ("pairBlend",),
+}
+
+SHAPE_TYPES = ("locator", "nurbsCurve", "mesh")
+CONSTRAINT_TYPES = ("pointConstraint", "orientConstraint", "parentConstraint", "scaleConstraint", "aimConstraint")
+TANGENT_TYPES = ("auto", "spline", "linear", "flat", "step", "stepnext", "clamped", "plateau", "fixed")
+# Scenes always use film time. Like Maya, fixed tangent angles are measured against time in seconds.
+FRAMES_PER_SECOND = 24.0
+
+# (long name, short name, type, default, keyable)
+TRANSFORM_ATTRIBUTES = (
+    ("visibility", "v", "bool", True, True),
+    ("translateX", "tx", "doubleLinear", 0.0, True),
+    ("translateY", "ty", "doubleLinear", 0.0, True),
+    ("translateZ", "tz", "doubleLinear", 0.0, True),
+    ("rotateX", "rx", "doubleAngle", 0.0, True),
+    ("rotateY", "ry", "doubleAngle", 0.0, True),
+    ("rotateZ", "rz", "doubleAngle", 0.0, True),
+    ("scaleX", "sx", "double", 1.0, True),
+    ("scaleY", "sy", "double", 1.0, True),
+    ("scaleZ", "sz", "double", 1.0, True),
+    ("rotateOrder", "ro", "enum", 0, False),
+    ("rotatePivotX", "rpx", "doubleLinear", 0.0, False),
+    ("rotatePivotY", "rpy", "doubleLinear", 0.0, False),
+    ("rotatePivotZ", "rpz", "doubleLinear", 0.0, False),
+    ("lodVisibility", "lodv", "bool", True, False),
+    ("overrideEnabled", "ove", "bool", False, False),
+    ("overrideVisibility", "ovv", "bool", True, False),
+    ("overrideDisplayType", "ovdt", "enum", 0, False),
+)
+
+SHAPE_ATTRIBUTES = (
+    ("visibility", "v", "bool", True, False),
+    ("lodVisibility", "lodv", "bool", True, False),
+    ("overrideEnabled", "ove", "bool", False, False),
+    ("overrideVisibility", "ovv", "bool", True, False),
+    ("overrideDisplayType", "ovdt", "enum", 0, False),
+)
+
+LOCATOR_ATTRIBUTES = (
+    ("localPositionX", "lpx", "doubleLinear", 0.0, False),
+    ("localPositionY", "lpy", "doubleLinear", 0.0, False),
+    ("localPositionZ", "lpz", "doubleLinear", 0.0, False),
+    ("localScaleX", "lsx", "doubleLinear", 1.0, False),
+    ("localScaleY", "lsy", "doubleLinear", 1.0, False),
+    ("localScaleZ", "lsz", "doubleLinear", 1.0, False),
+)
+
+ANIMATION_LAYER_ATTRIBUTES = (
+    ("mute", "mte", "bool", False, False),
+    ("lock", "lck", "bool", False, False),
+    ("solo", "slo", "bool", False, False),
+    ("weight", "wgt", "double", 1.0, True),
+    ("override", "ovrd", "bool", False, False),
+    ("foregroundWeight", "fgwt", "double", 1.0, False),
+)
+
+BLEND_ATTRIBUTES = (
+    ("inputA", "ia", "double", 0.0, False),
+    ("inputB", "ib", "double", 0.0, False),
+    ("weightA", "wa", "double", 1.0, False),
+    ("weightB", "wb", "double", 1.0, False),
+    ("output", "o", "double", 0.0, False),
+)
+
+# Each pairBlend blends its first inputs (the keys) towards its second (the constraint), by its weight.
+PAIR_BLEND_ATTRIBUTES = (("weight", "w", "double", 1.0, False),) + tuple(
+    (f"{prefix}{channel}{axis}{suffix}", f"{prefix[0]}{channel[0].lower()}{axis.lower()}{suffix}", attribute_type, 0.0, False)
+    for channel, attribute_type in (("Translate", "doubleLinear"), ("Rotate", "doubleAngle"))
+    for axis in "XYZ"
+    for prefix, suffix in (("in", "1"), ("in", "2"), ("out", ""))
+)
+
+# The attribute each constraint type adds to a driven object, to drive the weight of its pairBlends.
+PAIR_BLEND_WEIGHT_ATTRIBUTES = {
+    "pointConstraint": "blendPoint",
+    "orientConstraint": "blendOrient",
+    "parentConstraint": "blendParent",
+    "aimConstraint": "blendAim",
+}
+
+CONSTRAINT_OUTPUT_ATTRIBUTES = (
+    ("constraintTranslateX", "ctx", "doubleLinear", 0.0, False),
+    ("constraintTranslateY", "cty", "doubleLinear", 0.0, False),
+    ("constraintTranslateZ", "ctz", "doubleLinear", 0.0, False),
+    ("constraintRotateX", "crx", "doubleAngle", 0.0, False),
+    ("constraintRotateY", "cry", "doubleAngle", 0.0, False),
+    ("constraintRotateZ", "crz", "doubleAngle", 0.0, False),
+    ("constraintScaleX", "csx", "double", 1.0, False),
+    ("constraintScaleY", "csy", "double", 1.0, False),
+    ("constraintScaleZ", "csz", "double", 1.0, False),
+)
+
+COMPOUND_ATTRIBUTES = {
+    "translate": ("t", ("translateX", "translateY", "translateZ")),
+    "rotate": ("r", ("rotateX", "rotateY", "rotateZ")),
+    "scale": ("s", ("scaleX", "scaleY", "scaleZ")),
+    "rotatePivot": ("rp", ("rotatePivotX", "rotatePivotY", "rotatePivotZ")),
+    "localScale": ("ls", ("localScaleX", "localScaleY", "localScaleZ")),
+    "localPosition": ("lp", ("localPositionX", "localPositionY", "localPositionZ")),
+    "constraintTranslate": ("ct", ("constraintTranslateX", "constraintTranslateY", "constraintTranslateZ")),
+    "constraintRotate": ("cr", ("constraintRotateX", "constraintRotateY", "constraintRotateZ")),
+}
+
+# Matrix attributes are computed from the DAG, and always read-only.
+MATRIX_ATTRIBUTES = {
+    "matrix": "m",
+    "worldMatrix": "wm",
+    "worldInverseMatrix": "wim",
+    "parentMatrix": "pm",
+    "parentInverseMatrix": "pim",
+}
+
+CURVE_TYPE_FROM_ATTRIBUTE_TYPE = {
+    "doubleLinear": "animCurveTL",
+    "doubleAngle": "animCurveTA",
+}
+
+BLEND_TYPE_FROM_ATTRIBUTE_TYPE = {
+    "doubleLinear": "animBlendNodeAdditiveDL",
+    "doubleAngle": "animBlendNodeAdditiveDA",
+    "bool": "animBlendNodeBoolean",
+    "enum": "animBlendNodeBoolean",
+}
+
+# MEL commands that only affect the UI, so can safely be ignored.
+IGNORED_MEL_COMMANDS = (
+    "buildTranslateMM",
+    "buildRotateMM",
+    "destroySTRSMarkingMenu",
+    "scriptEditorInfo",
+)
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                             MATRIX MATHS                             #
+#                                                                      #
+########################################################################
+
+# Matrices are tuples of 16 floats, stored row by row, using Maya's row vector convention:
+#   world_matrix = local_matrix * parent_world_matrix
+
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+
+# ------------------------------------------------------------------------------ #
+def multiply_matrices(a, b):
+    return tuple(
+        a[row * 4] * b[column] + a[row * 4 + 1] * b[4 + column] + a[row * 4 + 2] * b[8 + column] + a[row * 4 + 3] * b[12 + column]
+        for row in range(4)
+        for column in range(4)
+    )
+
+# ------------------------------------------------------------------------------ #
+def invert_matrix(m):
+    # Gauss-Jordan elimination, with partial pivoting.
+    rows = [list(m[i * 4:i * 4 + 4]) + [1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+    for column in range(4):
+        pivot = max(range(column, 4), key=lambda r: abs(rows[r][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            return IDENTITY
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        divisor = rows[column][column]
+        rows[column] = [value / divisor for value in rows[column]]
+        for r in range(4):
+            if r != column and rows[r][column]:
+                factor = rows[r][column]
+                rows[r] = [value - factor * pivot_value for value, pivot_value in zip(rows[r], rows[column])]
+    return tuple(value for row in rows for value in row[4:])
+
+# ------------------------------------------------------------------------------ #
+def rotation_matrix_from_euler(rotation):
+    """
+    Build a 3x3 rotation (as 3 row tuples) from xyz euler angles in degrees.
+    """
+    x, y, z = (math.radians(value) for value in rotation)
+    cx, sx, cy, sy, cz, sz = math.cos(x), math.sin(x), math.cos(y), math.sin(y), math.cos(z), math.sin(z)
+    return (
+        (cy * cz, cy * sz, -sy),
+        (sx * sy * cz - cx * sz, sx * sy * sz + cx * cz, sx * cy),
+        (cx * sy * cz + sx * sz, cx * sy * sz - sx * cz, cx * cy),
+    )
+
+# ------------------------------------------------------------------------------ #
+def euler_from_rotation_matrix(rows):
+    """
+    Get xyz euler angles in degrees from a 3x3 rotation, given as 3 normalised row tuples.
+    """
+    sy = max(-1.0, min(1.0, -rows[0][2]))
+    y = math.asin(sy)
+    if abs(sy) < 0.9999999:
+        x = math.atan2(rows[1][2], rows[2][2])
+        z = math.atan2(rows[0][1], rows[0][0])
+    else:
+        # Gimbal lock, so put all of the rotation into x.
+        x = math.atan2(-rows[2][1], rows[1][1])
+        z = 0.0
+    return (math.degrees(x), math.degrees(y), math.degrees(z))
+
+# ------------------------------------------------------------------------------ #
+def compose_matrix(translate, rotate, scale):
+    rows = rotation_matrix_from_euler(rotate)
+    return (
+        rows[0][0] * scale[0], rows[0][1] * scale[0], rows[0][2] * scale[0], 0.0,
+        rows[1][0] * scale[1], rows[1][1] * scale[1], rows[1][2] * scale[1], 0.0,
+        rows[2][0] * scale[2], rows[2][1] * scale[2], rows[2][2] * scale[2], 0.0,
+        translate[0], translate[1], translate[2], 1.0,
+    )
+
+# ------------------------------------------------------------------------------ #
+def decompose_matrix(m):
+    """
+    Split a matrix into translate, rotate (xyz degrees) and scale.
+    """
+    rows = [m[0:3], m[4:7], m[8:11]]
+    scale = [math.sqrt(sum(value * value for value in row)) or 1.0 for row in rows]
+    normalised = [tuple(value / length for value in row) for row, length in zip(rows, scale)]
+    return tuple(m[12:15]), euler_from_rotation_matrix(normalised), tuple(scale)
+
+# ------------------------------------------------------------------------------ #
+def quaternion_from_matrix(m):
+    rows = [m[0:3], m[4:7], m[8:11]]
+    lengths = [math.sqrt(sum(value * value for value in row)) or 1.0 for row in rows]
+    r = [[value / length for value in row] for row, length in zip(rows, lengths)]
+    trace = r[0][0] + r[1][1] + r[2][2]
+    if trace > 0.0:
+        s = math.sqrt(trace + 1.0) * 2.0
+        w = 0.25 * s
+        x = (r[1][2] - r[2][1]) / s
+        y = (r[2][0] - r[0][2]) / s
+        z = (r[0][1] - r[1][0]) / s
+    elif r[0][0] > r[1][1] and r[0][0] > r[2][2]:
+        s = math.sqrt(1.0 + r[0][0] - r[1][1] - r[2][2]) * 2.0
+        w = (r[1][2] - r[2][1]) / s
+        x = 0.25 * s
+        y = (r[1][0] + r[0][1]) / s
+        z = (r[2][0] + r[0][2]) / s
+    elif r[1][1] > r[2][2]:
+        s = math.sqrt(1.0 + r[1][1] - r[0][0] - r[2][2]) * 2.0
+        w = (r[2][0] - r[0][2]) / s
+        x = (r[1][0] + r[0][1]) / s
+        y = 0.25 * s
+        z = (r[2][1] + r[1][2]) / s
+    else:
+        s = math.sqrt(1.0 + r[2][2] - r[0][0] - r[1][1]) * 2.0
+        w = (r[0][1] - r[1][0]) / s
+        x = (r[2][0] + r[0][2]) / s
+        y = (r[2][1] + r[1][2]) / s
+        z = 0.25 * s
+    return (x, y, z, w)
+
+# ------------------------------------------------------------------------------ #
+def matrix_from_quaternion(q, translate=(0.0, 0.0, 0.0)):
+    x, y, z, w = q
+    return (
+        1 - 2 * (y * y + z * z), 2 * (x * y + z * w), 2 * (x * z - y * w), 0.0,
+        2 * (x * y - z * w), 1 - 2 * (x * x + z * z), 2 * (y * z + x * w), 0.0,
+        2 * (x * z + y * w), 2 * (y * z - x * w), 1 - 2 * (x * x + y * y), 0.0,
+        translate[0], translate[1], translate[2], 1.0,
+    )
+
+# ------------------------------------------------------------------------------ #
+def average_quaternions(quaternions, weights):
+    # Flip each quaternion into the same hemisphere as the first, before averaging.
+    reference = quaternions[0]
+    total = [0.0, 0.0, 0.0, 0.0]
+    for q, weight in zip(quaternions, weights):
+        if sum(a * b for a, b in zip(q, reference)) < 0.0:
+            q = tuple(-value for value in q)
+        for i in range(4):
+            total[i] += q[i] * weight
+    length = math.sqrt(sum(value * value for value in total)) or 1.0
+    return tuple(value / length for value in total)
+
+# ------------------------------------------------------------------------------ #
+def _normalise(vector):
+    length = math.sqrt(sum(value * value for value in vector))
+    if length < 1e-12:
+        return None
+    return tuple(value / length for value in vector)
+
+# ------------------------------------------------------------------------------ #
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+# ------------------------------------------------------------------------------ #
+def _frame_from_vectors(primary, secondary):
+    # An orthonormal frame, as 3 row vectors, with the primary axis first.
+    x = _normalise(primary) or (1.0, 0.0, 0.0)
+    z = _normalise(_cross(x, secondary)) or _normalise(_cross(x, (0.0, 0.0, 1.0))) or (0.0, 0.0, 1.0)
+    y = _cross(z, x)
+    return (x, y, z)
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                              SCENE DATA                              #
+#                                                                      #
+########################################################################
+
+class _Attribute(object):
+    __slots__ = ("long_name", "short_name", "type", "value", "default", "lock", "keyable", "dynamic")
+
+    def __init__(self, long_name, short_name, attribute_type, default, keyable, dynamic=False):
+        self.long_name = long_name
+        self.short_name = short_name
+        self.type = attribute_type
+        self.value = default
+        self.default = default
+        self.lock = False
+        self.keyable = keyable
+        self.dynamic = dynamic
+
+
+class _Key(object):
+    __slots__ = ("time", "value", "in_type", "out_type", "in_angle", "out_angle", "in_weight", "out_weight", "selected")
+
+    def __init__(self, time, value, in_type="auto", out_type="auto"):
+        self.time = float(time)
+        self.value = float(value)
+        self.in_type = in_type
+        self.out_type = out_type
+        self.in_angle = None
+        self.out_angle = None
+        self.in_weight = 1.0
+        self.out_weight = 1.0
+        self.selected = False
+
+
+class _Node(object):
+    def __init__(self, name, node_type):
+        self.name = name
+        self.type = node_type
+        self.parent = None
+        self.children = []
+        self.attributes = {}
+        self.short_names = {}
+        self.data = {}
+
+    def add_attribute(self, long_name, short_name, attribute_type, default, keyable, dynamic=False):
+        attribute = _Attribute(long_name, short_name, attribute_type, default, keyable, dynamic)
+        self.attributes[long_name] = attribute
+        if short_name:
+            self.short_names[short_name] = long_name
+        return attribute
+
+    def is_type(self, node_type):
+        return node_type in NODE_TYPE_INHERITANCE.get(self.type, (self.type,))
+
+    def is_dag(self):
+        return self.is_type("dagNode")
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                                 SCENE                                #
+#                                                                      #
+########################################################################
+
+class Scene(object):
+    """
+    An in-memory scene, with a method for each simulated maya.cmds command.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.sources = {}
+        self.destinations = {}
+        self.node_plugs = {}
+        self.selection = []
+        self.current_time = 1.0
+        self.playback_range = [1.0, 120.0]
+        self.animation_range = [1.0, 120.0]
+        self.auto_keyframe = False
+        self.refresh_suspended = False
+        # The main progress bar. Set cancel_progress_after to a step count to act like Esc is pressed once it's reached.
+        self.progress = {"active": False, "value": 0, "max": 100, "status": "", "interruptable": False}
+        self.cancel_progress_after = None
+        self.undo_chunk_depth = 0
+        self.undo_chunks_opened = 0
+        self.default_tangents = ("auto", "auto")
+        self.animation_layers = []
+        self.selected_animation_layers = []
+        self.selected_channels = []
+        self.focused_panel = "modelPanel4"
+        self.panel_display = {"nurbsCurves": True, "locators": True}
+        self.warnings = []
+        self.messages = []
+        # Values set on animated attributes, that last until the time changes.
+        self.tweaks = {}
+        # Keys set on constrained attributes, waiting for the constraint to be removed.
+        self.held_curves = {}
+        # If True, constraining a keyed attribute puts a pairBlend between it and its keys, instead of holding them.
+        self.pair_blends = False
+        self._cache = {}
+        self._counters = {}
+        self._prototypes = {}
+
+    # ------------------------------------------------------------------------------ #
+    def _touch(self):
+        if self._cache:
+            self._cache.clear()
+        # Any edit could change animation, so it counts as an animation curve edit.
+        self._notify("anim_curve_edited")
+
+    # ------------------------------------------------------------------------------ #
+    def unique_name(self, base):
+        """
+        Get a unique node name, counting up from 1 like Maya does.
+        """
+        if base not in self.nodes and not base[-1:].isdigit() and base not in ("",):
+            return base
+        stem = base.rstrip("0123456789") or base
+        count = self._counters.get(stem, 0)
+        while True:
+            count += 1
+            name = f"{stem}{count}"
+            if name not in self.nodes:
+                self._counters[stem] = count
+                return name
+
+    ########################################################################
+    #                            NODE CREATION                             #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def create_node(self, node_type, name=None, parent=None):
+        if name and name in self.nodes:
+            name = self.unique_name(name)
+        elif not name:
+            name = self.unique_name(node_type[0].lower() + node_type[1:] + "1")
+
+        node = _Node(name, node_type)
+        self.nodes[name] = node
+        self.node_plugs[name] = set()
+        self._add_static_attributes(node)
+
+        if parent:
+            self._set_parent(node, self.get_node(parent))
+
+        self._touch()
+        self._notify("node_added", name)
+        return node
+
+    # ------------------------------------------------------------------------------ #
+    def prototype(self, node_type):
+        """
+        Get an unregistered node holding the static attributes of a node type, for attributeQuery(type=...).
+        """
+        if node_type not in self._prototypes:
+            node = _Node(node_type, node_type)
+            self._add_static_attributes(node)
+            self._prototypes[node_type] = node
+        return self._prototypes[node_type]
+
+    # ------------------------------------------------------------------------------ #
+    def _add_static_attributes(self, node):
+        node_type = node.type
+        definitions = ()
+        if node.is_type("transform"):
+            definitions = TRANSFORM_ATTRIBUTES
+        elif node.is_type("shape"):
+            definitions = SHAPE_ATTRIBUTES + (LOCATOR_ATTRIBUTES if node_type == "locator" else ())
+        elif node_type == "animLayer":
+            definitions = ANIMATION_LAYER_ATTRIBUTES
+        elif node.is_type("animBlendNodeBase"):
+            definitions = BLEND_ATTRIBUTES
+        elif node.is_type("animCurve"):
+            definitions = (("output", "o", "double", 0.0, False),)
+            node.data["keys"] = []
+            node.data["times"] = []
+        elif node_type == "mute":
+            definitions = (("input", "i", "double", 0.0, False), ("mute", "m", "bool", True, True), ("hold", "h", "double", 0.0, False), ("output", "o", "double", 0.0, False))
+        elif node_type == "pairBlend":
+            definitions = PAIR_BLEND_ATTRIBUTES
+        for definition in definitions:
+            node.add_attribute(*definition)
+
+        if node.is_type("constraint"):
+            for definition in CONSTRAINT_OUTPUT_ATTRIBUTES:
+                node.add_attribute(*definition)
+            node.data["targets"] = []
+
+    # ------------------------------------------------------------------------------ #
+    def create_transform(self, name, parent=None, shape_type=None, node_type="transform"):
+        transform = self.create_node(node_type, name=name, parent=parent)
+        if shape_type:
+            self.create_node(shape_type, name=transform.name + "Shape", parent=transform.name)
+        return transform
+
+    # ------------------------------------------------------------------------------ #
+    def _notify(self, message, *args):
+        if _CALLBACKS:
+            _fire_callbacks(message, *args)
+
+    ########################################################################
+    #                          NAME RESOLUTION                             #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def get_node(self, name, required=True):
+        if isinstance(name, _Node):
+            return name
+        short = name.split(".")[0].split("|")[-1]
+        node = self.nodes.get(short)
+        if node is None and required:
+            raise ValueError(f"No object matches name: {name}")
+        return node
+
+    # ------------------------------------------------------------------------------ #
+    def full_path(self, node):
+        parts = []
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+        return "|" + "|".join(reversed(parts))
+
+    # ------------------------------------------------------------------------------ #
+    def format_name(self, node, long=False):
+        if long and node.is_dag():
+            return self.full_path(node)
+        return node.name
+
+    # ------------------------------------------------------------------------------ #
+    def shapes_of(self, node):
+        return [child for child in node.children if child.is_type("shape")]
+
+    # ------------------------------------------------------------------------------ #
+    def resolve_attribute(self, node, attribute, required=True):
+        """
+        Get the long name of an attribute, and the node it lives on.
+        Transforms forward unknown attributes to their first shape, like Maya does.
+        """
+        base = attribute.split("[")[0] if "." not in attribute else attribute
+        long_name = node.short_names.get(base, base)
+        if long_name in node.attributes or long_name in COMPOUND_ATTRIBUTES or long_name in MATRIX_ATTRIBUTES:
+            if long_name in COMPOUND_ATTRIBUTES and not all(child in node.attributes for child in COMPOUND_ATTRIBUTES[long_name][1]):
+                pass
+            else:
+                return node, long_name
+        for compound, (short, _children) in COMPOUND_ATTRIBUTES.items():
+            if base == short and all(child in node.attributes for child in COMPOUND_ATTRIBUTES[compound][1]):
+                return node, compound
+        for matrix_name, short in MATRIX_ATTRIBUTES.items():
+            if base == short and node.is_dag():
+                return node, matrix_name
+        if node.is_type("transform"):
+            for shape in self.shapes_of(node):
+                found = self.resolve_attribute(shape, attribute, required=False)
+                if found:
+                    return found
+        if base in ("ktv", "keyTimeValue") and node.is_type("animCurve"):
+            return node, "keyTimeValue"
+        if attribute in node.attributes:
+            return node, attribute
+        if required:
+            raise ValueError(f"No object matches name: {node.name}.{attribute}")
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    def split_plug(self, plug, required=True):
+        node_name, _, attribute = plug.partition(".")
+        node = self.get_node(node_name, required=required)
+        if node is None:
+            return None
+        if not attribute:
+            return node, None
+        found = self.resolve_attribute(node, attribute, required=required)
+        if found is None:
+            return None
+        return found
+
+    # ------------------------------------------------------------------------------ #
+    def plug_name(self, node, attribute):
+        if attribute in MATRIX_ATTRIBUTES:
+            return f"{node.name}.{attribute}[0]"
+        return f"{node.name}.{attribute}"
+
+    # ------------------------------------------------------------------------------ #
+    def canonical_plug(self, plug):
+        node_name, _, attribute = plug.partition(".")
+        node = self.get_node(node_name)
+        found = self.resolve_attribute(node, attribute, required=False)
+        if found is None:
+            # Free plugs, like constraint targets or animation layer members, are kept as they are.
+            return f"{node.name}.{attribute}"
+        return self.plug_name(*found)
+
+    ########################################################################
+    #                             CONNECTIONS                              #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def connect(self, source, destination):
+        source = self.canonical_plug(source)
+        destination = self.canonical_plug(destination)
+        if destination in self.sources:
+            self.disconnect(self.sources[destination], destination)
+        self.sources[destination] = source
+        self.destinations.setdefault(source, []).append(destination)
+        self.node_plugs[source.partition(".")[0]].add(source)
+        self.node_plugs[destination.partition(".")[0]].add(destination)
+        self._touch()
+        self._notify("connection", source, destination, True)
+
+    # ------------------------------------------------------------------------------ #
+    def disconnect(self, source, destination):
+        source = self.canonical_plug(source)
+        destination = self.canonical_plug(destination)
+        if self.sources.get(destination) != source:
+            return
+        del self.sources[destination]
+        destinations = self.destinations.get(source, [])
+        if destination in destinations:
+            destinations.remove(destination)
+        if not destinations:
+            self.destinations.pop(source, None)
+        self._touch()
+        self._notify("connection", source, destination, False)
+
+    # ------------------------------------------------------------------------------ #
+    def input_node(self, node, attribute):
+        source = self.sources.get(self.plug_name(node, attribute))
+        if source:
+            return self.nodes[source.partition(".")[0]], source.partition(".")[2]
+        return None
+
+    ########################################################################
+    #                              EVALUATION                              #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def value(self, node, attribute, time=None):
+        """
+        Evaluate a scalar attribute at the given time (or the current time).
+        """
+        if time is None:
+            time = self.current_time
+        key = (node.name, attribute, time)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        plug = self.plug_name(node, attribute)
+        if time == self.current_time and plug in self.tweaks:
+            result = self.tweaks[plug]
+        else:
+            source = self.sources.get(plug)
+            if source:
+                source_node_name, _, source_attribute = source.partition(".")
+                result = self.evaluate_output(self.nodes[source_node_name], source_attribute, time)
+            else:
+                result = node.attributes[attribute].value
+                if node.type == "animLayer" and attribute == "foregroundWeight":
+                    result = 0.0 if node.attributes["mute"].value else node.attributes["weight"].value
+        self._cache[key] = result
+        return result
+
+    # ------------------------------------------------------------------------------ #
+    def evaluate_output(self, node, attribute, time):
+        if node.is_type("animCurve"):
+            return self.evaluate_curve(node, time)
+
+        if node.is_type("animBlendNodeBase"):
+            a = self.value(node, "inputA", time)
+            b = self.value(node, "inputB", time)
+            weight = self.value(node, "weightB", time)
+            layer = node.data.get("layer")
+            if node.type == "animBlendNodeBoolean":
+                return b if weight >= 0.5 and layer and self.nodes[layer].attributes["override"].value else a
+            if layer and self.nodes[layer].attributes["override"].value:
+                return a + (b - a) * weight
+            return a + b * weight
+
+        if node.is_type("constraint") and attribute.startswith("constraint"):
+            return self.solve_constraint(node, time)[attribute]
+
+        if node.type == "pairBlend" and attribute.startswith("out"):
+            channel = attribute[len("out"):]
+            first = self.value(node, "in" + channel + "1", time)
+            second = self.value(node, "in" + channel + "2", time)
+            return first + (second - first) * self.value(node, "weight", time)
+
+        if node.type == "mute" and attribute == "output":
+            if self.value(node, "mute", time):
+                return node.attributes["hold"].value
+            return self.value(node, "input", time)
+
+        if attribute in node.attributes:
+            return self.value(node, attribute, time)
+        if attribute.split("[")[0] in MATRIX_ATTRIBUTES:
+            return self.matrix_value(node, attribute.split("[")[0], time)
+        return 0.0
+
+    # ------------------------------------------------------------------------------ #
+    def evaluate_curve(self, curve, time):
+        keys = curve.data["keys"]
+        if not keys:
+            return 0.0
+        times = curve.data["times"]
+        if time <= times[0]:
+            return keys[0].value
+        if time >= times[-1]:
+            return keys[-1].value
+
+        index = bisect.bisect_right(times, time) - 1
+        key_a, key_b = keys[index], keys[index + 1]
+        if key_a.out_type == "step":
+            return key_a.value
+        if key_b.in_type == "stepnext":
+            return key_b.value
+
+        span = key_b.time - key_a.time
+        slope_a = self.key_slope(keys, index, "out")
+        slope_b = self.key_slope(keys, index + 1, "in")
+        s = (time - key_a.time) / span
+        s2 = s * s
+        s3 = s2 * s
+        return (
+            (2 * s3 - 3 * s2 + 1) * key_a.value
+            + (s3 - 2 * s2 + s) * span * slope_a
+            + (-2 * s3 + 3 * s2) * key_b.value
+            + (s3 - s2) * span * slope_b
+        )
+
+    # ------------------------------------------------------------------------------ #
+    def key_slope(self, keys, index, side):
+        key = keys[index]
+        tangent_type = key.in_type if side == "in" else key.out_type
+        angle = key.in_angle if side == "in" else key.out_angle
+
+        if tangent_type == "fixed" and angle is not None:
+            return math.tan(math.radians(angle)) / FRAMES_PER_SECOND
+        if tangent_type in ("flat", "step", "stepnext"):
+            return 0.0
+
+        previous_key = keys[index - 1] if index > 0 else None
+        next_key = keys[index + 1] if index + 1 < len(keys) else None
+
+        if tangent_type == "linear":
+            neighbour = previous_key if side == "in" else next_key
+            neighbour = neighbour or previous_key or next_key
+            if neighbour is None:
+                return 0.0
+            return (key.value - neighbour.value) / (key.time - neighbour.time)
+
+        # Spline style tangents.
+        if previous_key is None or next_key is None:
+            if tangent_type in ("auto", "clamped", "plateau"):
+                return 0.0
+            neighbour = previous_key or next_key
+            if neighbour is None:
+                return 0.0
+            return (key.value - neighbour.value) / (key.time - neighbour.time)
+
+        if tangent_type in ("auto", "clamped", "plateau"):
+            is_extreme = (key.value - previous_key.value) * (next_key.value - key.value) <= 0.0
+            if is_extreme:
+                return 0.0
+        return (next_key.value - previous_key.value) / (next_key.time - previous_key.time)
+
+    # ------------------------------------------------------------------------------ #
+    def local_matrix(self, node, time):
+        if not node.is_type("transform"):
+            return IDENTITY
+        value = self.value
+        return compose_matrix(
+            (value(node, "translateX", time), value(node, "translateY", time), value(node, "translateZ", time)),
+            (value(node, "rotateX", time), value(node, "rotateY", time), value(node, "rotateZ", time)),
+            (value(node, "scaleX", time), value(node, "scaleY", time), value(node, "scaleZ", time)),
+        )
+
+    # ------------------------------------------------------------------------------ #
+    def world_matrix(self, node, time=None):
+        if time is None:
+            time = self.current_time
+        key = (node.name, "worldMatrix", time)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        matrix = self.local_matrix(node, time)
+        if node.parent is not None:
+            matrix = multiply_matrices(matrix, self.world_matrix(node.parent, time))
+        self._cache[key] = matrix
+        return matrix
+
+    # ------------------------------------------------------------------------------ #
+    def parent_matrix(self, node, time=None):
+        if node.parent is None:
+            return IDENTITY
+        return self.world_matrix(node.parent, time)
+
+    # ------------------------------------------------------------------------------ #
+    def matrix_value(self, node, attribute, time=None):
+        if attribute == "matrix":
+            return self.local_matrix(node, self.current_time if time is None else time)
+        if attribute == "worldMatrix":
+            return self.world_matrix(node, time)
+        if attribute == "worldInverseMatrix":
+            return invert_matrix(self.world_matrix(node, time))
+        if attribute == "parentMatrix":
+            return self.parent_matrix(node, time)
+        if attribute == "parentInverseMatrix":
+            return invert_matrix(self.parent_matrix(node, time))
+        raise ValueError(attribute)
+
+    # ------------------------------------------------------------------------------ #
+    def is_effectively_visible(self, node):
+        """
+        Check a DAG node and all of its parents are visible, the same way cmds.ls(visible=True) does.
+        """
+        while node is not None:
+            attributes = node.attributes
+            if "visibility" in attributes:
+                if not self.value(node, "visibility") or not attributes["lodVisibility"].value:
+                    return False
+                if attributes["overrideEnabled"].value and not attributes["overrideVisibility"].value:
+                    return False
+            node = node.parent
+        return True
+
+    ########################################################################
+    #                             CONSTRAINTS                              #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def _driver_world(self, target, time):
+        return self.world_matrix(self.nodes[target["driver"]], time)
+
+    # ------------------------------------------------------------------------------ #
+    def solve_constraint(self, constraint, time, use_offsets=True):
+        key = (constraint.name, "solve", time, use_offsets)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        data = constraint.data
+        driven = self.nodes[data["driven"]]
+        targets = [target for target in data["targets"] if target["weight"] > 0.0]
+        result = {}
+        for attribute in CONSTRAINT_OUTPUT_ATTRIBUTES:
+            result[attribute[0]] = attribute[3]
+        if not targets:
+            self._cache[key] = result
+            return result
+
+        weights = [target["weight"] for target in targets]
+        total_weight = sum(weights)
+        parent_inverse = invert_matrix(self.parent_matrix(driven, time))
+        constraint_type = constraint.type
+
+        if constraint_type == "pointConstraint":
+            world_position = [0.0, 0.0, 0.0]
+            for target, weight in zip(targets, weights):
+                matrix = self._driver_world(target, time)
+                for i in range(3):
+                    world_position[i] += matrix[12 + i] * weight / total_weight
+            local = multiply_matrices((1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, world_position[0], world_position[1], world_position[2], 1), parent_inverse)
+            offset = data.get("offset_translate", (0.0, 0.0, 0.0)) if use_offsets else (0.0, 0.0, 0.0)
+            for i, axis in enumerate("XYZ"):
+                result["constraintTranslate" + axis] = local[12 + i] + offset[i]
+
+        elif constraint_type in ("orientConstraint", "aimConstraint"):
+            if constraint_type == "orientConstraint":
+                quaternion = average_quaternions([quaternion_from_matrix(self._driver_world(target, time)) for target in targets], weights)
+                world = matrix_from_quaternion(quaternion)
+            else:
+                world = self._aim_matrix(constraint, driven, targets, weights, time)
+            if use_offsets and data.get("offset_matrix"):
+                world = multiply_matrices(data["offset_matrix"], world)
+            local = multiply_matrices(world, parent_inverse)
+            _translate, rotate, _scale = decompose_matrix(local)
+            for i, axis in enumerate("XYZ"):
+                result["constraintRotate" + axis] = rotate[i]
+
+        elif constraint_type == "parentConstraint":
+            positions = [0.0, 0.0, 0.0]
+            quaternions = []
+            for target, weight in zip(targets, weights):
+                world = self._driver_world(target, time)
+                if use_offsets and target.get("offset_matrix"):
+                    world = multiply_matrices(target["offset_matrix"], world)
+                quaternions.append(quaternion_from_matrix(world))
+                for i in range(3):
+                    positions[i] += world[12 + i] * weight / total_weight
+            world = matrix_from_quaternion(average_quaternions(quaternions, weights), positions)
+            translate, rotate, _scale = decompose_matrix(multiply_matrices(world, parent_inverse))
+            for i, axis in enumerate("XYZ"):
+                result["constraintTranslate" + axis] = translate[i]
+                result["constraintRotate" + axis] = rotate[i]
+
+        elif constraint_type == "scaleConstraint":
+            scale = [0.0, 0.0, 0.0]
+            for target, weight in zip(targets, weights):
+                _translate, _rotate, target_scale = decompose_matrix(self._driver_world(target, time))
+                for i in range(3):
+                    scale[i] += target_scale[i] * weight / total_weight
+            _translate, _rotate, parent_scale = decompose_matrix(self.parent_matrix(driven, time))
+            for i, axis in enumerate("XYZ"):
+                result["constraintScale" + axis] = scale[i] / parent_scale[i]
+
+        self._cache[key] = result
+        return result
+
+    # ------------------------------------------------------------------------------ #
+    def _aim_matrix(self, constraint, driven, targets, weights, time):
+        data = constraint.data
+        total_weight = sum(weights)
+        target_position = [0.0, 0.0, 0.0]
+        for target, weight in zip(targets, weights):
+            matrix = self._driver_world(target, time)
+            for i in range(3):
+                target_position[i] += matrix[12 + i] * weight / total_weight
+
+        # The driven object's own position, without its rotation.
+        local_translate = (self.value(driven, "translateX", time), self.value(driven, "translateY", time), self.value(driven, "translateZ", time))
+        position = multiply_matrices((1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0) + local_translate + (1,), self.parent_matrix(driven, time))[12:15]
+        aim_direction = tuple(t - p for t, p in zip(target_position, position))
+
+        world_up = data.get("world_up_vector", (0.0, 1.0, 0.0))
+        local_frame = _frame_from_vectors(data.get("aim_vector", (1.0, 0.0, 0.0)), data.get("up_vector", (0.0, 1.0, 0.0)))
+        world_frame = _frame_from_vectors(aim_direction, world_up)
+
+        # rotation = transpose(local_frame) * world_frame
+        rows = [[sum(local_frame[k][i] * world_frame[k][j] for k in range(3)) for j in range(3)] for i in range(3)]
+        return (
+            rows[0][0], rows[0][1], rows[0][2], 0.0,
+            rows[1][0], rows[1][1], rows[1][2], 0.0,
+            rows[2][0], rows[2][1], rows[2][2], 0.0,
+            0.0, 0.0, 0.0, 1.0,
+        )
+
+    # ------------------------------------------------------------------------------ #
+    def _update_constraint_offsets(self, constraint, maintain_offset):
+        data = constraint.data
+        driven = self.nodes[data["driven"]]
+        time = self.current_time
+        self._touch()
+        if not maintain_offset:
+            data["offset_translate"] = (0.0, 0.0, 0.0)
+            data["offset_matrix"] = None
+            for target in data["targets"]:
+                target["offset_matrix"] = None
+            return
+
+        if constraint.type == "pointConstraint":
+            solved = self.solve_constraint(constraint, time, use_offsets=False)
+            data["offset_translate"] = tuple(
+                self.value(driven, "translate" + axis) - solved["constraintTranslate" + axis] for axis in "XYZ"
+            )
+        elif constraint.type in ("orientConstraint", "aimConstraint"):
+            solved = self.solve_constraint(constraint, time, use_offsets=False)
+            solved_local = compose_matrix((0, 0, 0), [solved["constraintRotate" + axis] for axis in "XYZ"], (1, 1, 1))
+            current_local = compose_matrix((0, 0, 0), [self.value(driven, "rotate" + axis) for axis in "XYZ"], (1, 1, 1))
+            # offset * solved_local = current_local
+            data["offset_matrix"] = multiply_matrices(current_local, invert_matrix(solved_local))
+        elif constraint.type == "parentConstraint":
+            driven_world = self.world_matrix(driven, time)
+            for target in data["targets"]:
+                if target.get("offset_matrix") is None:
+                    target["offset_matrix"] = multiply_matrices(driven_world, invert_matrix(self._driver_world(target, time)))
+        self._touch()
+
+    # ------------------------------------------------------------------------------ #
+    def create_pair_blend(self, driven, constraint_type):
+        """
+        Create a pairBlend for a constraint on a keyed object, with its weight driven by a new blend attribute on the object.
+        """
+        blend = self.create_node("pairBlend")
+        name = PAIR_BLEND_WEIGHT_ATTRIBUTES[constraint_type]
+        index = 1
+        while f"{name}{index}" in driven.attributes:
+            index += 1
+        # Like Maya, the short name is the same as the long name.
+        weight_attribute = driven.add_attribute(f"{name}{index}", f"{name}{index}", "double", 1.0, True, dynamic=True)
+        self.connect(self.plug_name(driven, weight_attribute.long_name), blend.name + ".weight")
+        return blend
+
+    # ------------------------------------------------------------------------------ #
+    def release_pair_blend(self, plug):
+        """
+        Hand an attribute driven by a pairBlend back to the pairBlend's first input, like bakeResults and deleting constraints do.
+        The pairBlend is deleted once it drives nothing.
+        """
+        source = self.sources[plug]
+        blend_name, _, output_attribute = source.partition(".")
+        blend = self.nodes[blend_name]
+        first_input = "in" + output_attribute[len("out"):] + "1"
+        first_source = self.sources.get(f"{blend_name}.{first_input}")
+        if first_source:
+            self.connect(first_source, plug)
+        else:
+            self.disconnect(source, plug)
+            node, attribute = self.split_plug(plug)
+            node.attributes[attribute].value = blend.attributes[first_input].value
+
+        if not any(self.destinations.get(blend_plug) for blend_plug in self.node_plugs.get(blend_name, ()) if blend_plug.startswith(blend_name + ".out")):
+            self.delete_nodes([blend])
+
+    ########################################################################
+    #                           ANIMATION CURVES                           #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def set_curve_keys(self, curve, keys):
+        keys.sort(key=lambda key: key.time)
+        curve.data["keys"] = keys
+        curve.data["times"] = [key.time for key in keys]
+        self._touch()
+
+    # ------------------------------------------------------------------------------ #
+    def add_key(self, curve, time, value, in_type=None, out_type=None):
+        time = float(time)
+        keys = curve.data["keys"]
+        times = curve.data["times"]
+        index = bisect.bisect_left(times, time)
+        if index < len(times) and abs(times[index] - time) < 1e-6:
+            keys[index].value = float(value)
+            if in_type:
+                keys[index].in_type = in_type
+            if out_type:
+                keys[index].out_type = out_type
+        else:
+            key = _Key(time, value, in_type or self.default_tangents[0], out_type or self.default_tangents[1])
+            keys.insert(index, key)
+            times.insert(index, time)
+        self._touch()
+
+    # ------------------------------------------------------------------------------ #
+    def create_curve(self, node, attribute, name=None):
+        attribute_type = node.attributes[attribute].type
+        curve_type = CURVE_TYPE_FROM_ATTRIBUTE_TYPE.get(attribute_type, "animCurveTU")
+        return self.create_node(curve_type, name=self.unique_name(name or f"{node.name}_{attribute}"))
+
+    # ------------------------------------------------------------------------------ #
+    def curve_for_plug(self, node, attribute, create=False, layer=None):
+        """
+        Find the animation curve that should be keyed for an attribute.
+
+        With a layer, the curve on that layer is used. Otherwise, the curve on BaseAnimation.
+        Keys on constrained attributes are held until their constraint is removed, or go under the constraint's pairBlend.
+        """
+        plug = self.plug_name(node, attribute)
+        blends = self.layer_blends(node, attribute)
+
+        if layer and layer != "BaseAnimation":
+            blend = blends.get(layer)
+            if blend is None:
+                return None
+            found = self.input_node(blend, "inputB")
+            if found and found[0].is_type("animCurve"):
+                return found[0]
+            if not create:
+                return None
+            curve = self.create_curve(node, attribute, name=f"{blend.name}_inputB")
+            self.connect(curve.name + ".output", blend.name + ".inputB")
+            return curve
+
+        # Walk down the blend nodes, to the BaseAnimation input.
+        owner, owner_attribute = node, attribute
+        while True:
+            found = self.input_node(owner, owner_attribute)
+            if found is None:
+                break
+            source, source_attribute = found
+            if source.is_type("animCurve"):
+                return source
+            if source.is_type("animBlendNodeBase"):
+                owner, owner_attribute = source, "inputA"
+                continue
+            if source.type == "pairBlend":
+                # Keys go on the first input, under the constraint.
+                owner, owner_attribute = source, "in" + source_attribute[len("out"):] + "1"
+                continue
+            if source.is_type("constraint"):
+                held = self.held_curves.get(plug)
+                if held is None and create:
+                    held = self.create_curve(node, attribute)
+                    self.held_curves[plug] = held
+                return held
+            # Driven by another attribute, so can't be keyed.
+            return None
+
+        if not create:
+            return None
+        curve = self.create_curve(node, attribute)
+        value = self.value(owner, owner_attribute) if owner is node else owner.attributes[owner_attribute].value
+        self.connect(curve.name + ".output", self.plug_name(owner, owner_attribute))
+        if owner is not node:
+            owner.attributes[owner_attribute].value = value
+        return curve
+
+    # ------------------------------------------------------------------------------ #
+    def curves_of_plug(self, node, attribute):
+        """
+        All curves that animate an attribute, honouring animation layer selection like the Graph Editor does.
+        """
+        blends = self.layer_blends(node, attribute)
+        if blends:
+            selected = [layer for layer in self.selected_animation_layers if layer in blends or layer == "BaseAnimation"]
+            curves = []
+            for layer in selected or ["BaseAnimation"]:
+                curve = self.curve_for_plug(node, attribute, layer=layer)
+                if curve is not None:
+                    curves.append(curve)
+            return curves
+        curve = self.curve_for_plug(node, attribute)
+        return [curve] if curve is not None else []
+
+    # ------------------------------------------------------------------------------ #
+    def animated_attributes(self, node):
+        return [
+            attribute
+            for attribute in node.attributes
+            if self.plug_name(node, attribute) in self.sources or self.plug_name(node, attribute) in self.held_curves
+        ]
+
+    # ------------------------------------------------------------------------------ #
+    def curves_of_targets(self, targets, attribute=None):
+        curves = []
+        seen = set()
+        attributes = _as_list(attribute)
+        for target in targets:
+            node = self.get_node(target)
+            if node.is_type("animCurve"):
+                candidates = [node]
+            elif node.is_type("animBlendNodeBase"):
+                candidates = [found[0] for found in (self.input_node(node, "inputA"), self.input_node(node, "inputB")) if found and found[0].is_type("animCurve")]
+            else:
+                if "." in target:
+                    plugs = [self.split_plug(target)]
+                elif attributes:
+                    plugs = [found for found in (self.resolve_attribute(node, a, required=False) for a in attributes) if found]
+                else:
+                    plugs = [(node, a) for a in self.animated_attributes(node)]
+                candidates = []
+                for plug_node, plug_attribute in plugs:
+                    if plug_attribute in COMPOUND_ATTRIBUTES:
+                        for child in COMPOUND_ATTRIBUTES[plug_attribute][1]:
+                            candidates.extend(self.curves_of_plug(plug_node, child))
+                    else:
+                        candidates.extend(self.curves_of_plug(plug_node, plug_attribute))
+            for curve in candidates:
+                if curve.name not in seen:
+                    seen.add(curve.name)
+                    curves.append(curve)
+        return curves
+
+    # ------------------------------------------------------------------------------ #
+    def filter_keys(self, curve, time=None, index=None, selected=False, include_upper_bound=True):
+        keys = curve.data["keys"]
+        matches = []
+        start, end = _range(time)
+        # The index flag can be used more than once, e.g. index=[(0, 0), (4, 6)].
+        if isinstance(index, list) and len(index) > 1 and isinstance(index[0], (tuple, list)):
+            index_ranges = [_range(item) for item in index]
+        else:
+            index_ranges = [_range(index)] if index is not None else []
+        for i, key in enumerate(keys):
+            if selected and not key.selected:
+                continue
+            if start is not None and (key.time < start - 1e-6 or key.time > end + 1e-6):
+                continue
+            if start is not None and not include_upper_bound and end > start and abs(key.time - end) < 1e-6:
+                continue
+            if index_ranges and not any(index_start <= i <= index_end for index_start, index_end in index_ranges):
+                continue
+            matches.append((i, key))
+        return matches
+
+    # ------------------------------------------------------------------------------ #
+    def delete_curve_if_empty(self, curve):
+        if not curve.data["keys"]:
+            self.delete_nodes([curve])
+
+    ########################################################################
+    #                           ANIMATION LAYERS                           #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def layer_blends(self, node, attribute):
+        """
+        Get the blend node for each animation layer an attribute is on, ordered from the bottom layer up.
+        """
+        blends = {}
+        owner, owner_attribute = node, attribute
+        chain = []
+        while True:
+            found = self.input_node(owner, owner_attribute)
+            if found is None or not found[0].is_type("animBlendNodeBase"):
+                break
+            chain.append(found[0])
+            owner, owner_attribute = found[0], "inputA"
+        for blend in reversed(chain):
+            blends[blend.data["layer"]] = blend
+        return blends
+
+    # ------------------------------------------------------------------------------ #
+    def ensure_base_animation_layer(self):
+        if "BaseAnimation" not in self.nodes:
+            base = self.create_node("animLayer", name="BaseAnimation")
+            base.data["members"] = []
+            base.data["children"] = []
+            self.animation_layers.insert(0, "BaseAnimation")
+        return self.nodes["BaseAnimation"]
+
+    # ------------------------------------------------------------------------------ #
+    def create_animation_layer(self, name=None, override=False):
+        base = self.ensure_base_animation_layer()
+        layer = self.create_node("animLayer", name=self.unique_name(name or "AnimLayer1"))
+        layer.attributes["override"].value = bool(override)
+        layer.data["members"] = []
+        layer.data["parent"] = base.name
+        base.data["children"].append(layer.name)
+        self.animation_layers.append(layer.name)
+        return layer
+
+    # ------------------------------------------------------------------------------ #
+    def add_to_animation_layer(self, layer, node, attribute):
+        plug = self.plug_name(node, attribute)
+        if plug in layer.data["members"]:
+            return
+        attribute_type = node.attributes[attribute].type
+        blend_type = BLEND_TYPE_FROM_ATTRIBUTE_TYPE.get(attribute_type, "animBlendNodeAdditive")
+        blend = self.create_node(blend_type, name=self.unique_name(f"{node.name}_{attribute}_{layer.name}"))
+        blend.data["layer"] = layer.name
+
+        # Insert the blend node between the attribute and whatever currently drives it.
+        source = self.sources.get(plug)
+        if source:
+            self.disconnect(source, plug)
+            self.connect(source, blend.name + ".inputA")
+        else:
+            blend.attributes["inputA"].value = node.attributes[attribute].value
+        if layer.attributes["override"].value:
+            blend.attributes["inputB"].value = self.value(blend, "inputA")
+        self.connect(layer.name + ".foregroundWeight", blend.name + ".weightB")
+        self.connect(blend.name + ".output", plug)
+        self.connect(plug, f"{layer.name}.dagSetMembers[{len(layer.data['members'])}]")
+        layer.data["members"].append(plug)
+
+    # ------------------------------------------------------------------------------ #
+    def remove_from_animation_layer(self, layer, node, attribute):
+        plug = self.plug_name(node, attribute)
+        if plug not in layer.data["members"]:
+            return
+        blend = self.layer_blends(node, attribute).get(layer.name)
+        if blend is not None:
+            input_a = self.sources.get(blend.name + ".inputA")
+            outputs = list(self.destinations.get(blend.name + ".output", []))
+            layer_curve = self.input_node(blend, "inputB")
+            static_value = blend.attributes["inputA"].value
+            self.delete_nodes([blend])
+            for output in outputs:
+                if input_a:
+                    self.connect(input_a, output)
+                else:
+                    output_node, output_attribute = self.split_plug(output)
+                    output_node.attributes[output_attribute].value = static_value
+            if layer_curve and layer_curve[0].name in self.nodes:
+                self.delete_nodes([layer_curve[0]])
+        for member_plug in [p for p, d in list(self.sources.items()) if d == plug and p.startswith(layer.name + ".dagSetMembers")]:
+            self.disconnect(plug, member_plug)
+        layer.data["members"].remove(plug)
+        self._touch()
+
+    ########################################################################
+    #                               DELETING                               #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def delete_nodes(self, nodes):
+        to_delete = []
+
+        def collect(node):
+            if node.name in self.nodes and node not in to_delete:
+                to_delete.append(node)
+                for child in list(node.children):
+                    collect(child)
+
+        for node in nodes:
+            collect(node)
+
+        # Like Maya, a deleted constraint's pairBlends are removed, handing each attribute back to its keys.
+        for node in to_delete:
+            if not node.is_type("constraint"):
+                continue
+            for plug in list(self.node_plugs.get(node.name, ())):
+                for destination in list(self.destinations.get(plug, [])):
+                    blend = self.nodes.get(destination.partition(".")[0])
+                    if blend is None or blend.type != "pairBlend" or blend in to_delete:
+                        continue
+                    for blend_plug in list(self.node_plugs.get(blend.name, ())):
+                        for blend_destination in list(self.destinations.get(blend_plug, [])):
+                            if blend_plug.startswith(blend.name + ".out") and blend.name in self.nodes:
+                                self.release_pair_blend(blend_destination)
+
+        for node in to_delete:
+            if node.name not in self.nodes:
+                continue
+            # Attributes driven by a deleted node keep their current value.
+            for plug in list(self.node_plugs.get(node.name, ())):
+                for destination in list(self.destinations.get(plug, [])):
+                    destination_node_name = destination.partition(".")[0]
+                    if any(destination_node_name == n.name for n in to_delete):
+                        continue
+                    found = self.split_plug(destination, required=False)
+                    if found and found[1] in found[0].attributes:
+                        held_value = self.value(*found)
+                        self.disconnect(plug, destination)
+                        held = self.held_curves.pop(destination, None)
+                        if held is not None and held.name in self.nodes:
+                            self.connect(held.name + ".output", destination)
+                        else:
+                            found[0].attributes[found[1]].value = held_value
+                    else:
+                        self.disconnect(plug, destination)
+                source = self.sources.get(plug)
+                if source:
+                    self.disconnect(source, plug)
+                    source_node = self.nodes.get(source.partition(".")[0])
+                    # Animation curves left with nothing to drive get deleted, like in Maya.
+                    if source_node and source_node.is_type("animCurve") and not any(
+                        self.destinations.get(p) for p in self.node_plugs.get(source_node.name, ())
+                    ) and source_node not in to_delete:
+                        self.delete_nodes([source_node])
+
+            for plug, held in list(self.held_curves.items()):
+                if plug.partition(".")[0] == node.name or held is node:
+                    del self.held_curves[plug]
+
+            if node.parent is not None and node in node.parent.children:
+                node.parent.children.remove(node)
+            if node.name in self.selection:
+                self.selection.remove(node.name)
+            if node.type == "animLayer":
+                if node.name in self.animation_layers:
+                    self.animation_layers.remove(node.name)
+                if node.name in self.selected_animation_layers:
+                    self.selected_animation_layers.remove(node.name)
+                parent = self.nodes.get(node.data.get("parent", ""))
+                if parent is not None and node.name in parent.data.get("children", []):
+                    parent.data["children"].remove(node.name)
+            del self.nodes[node.name]
+            self.node_plugs.pop(node.name, None)
+            self._notify("node_removed", node.name)
+        self._touch()
+
+    # ------------------------------------------------------------------------------ #
+    def _set_parent(self, node, parent, keep_world=False):
+        world = self.world_matrix(node) if keep_world and node.is_type("transform") else None
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        if parent is not None:
+            parent.children.append(node)
+        self._touch()
+        if world is not None:
+            local = multiply_matrices(world, invert_matrix(self.parent_matrix(node)))
+            translate, rotate, scale = decompose_matrix(local)
+            for values, prefix in ((translate, "translate"), (rotate, "rotate"), (scale, "scale")):
+                for value, axis in zip(values, "XYZ"):
+                    attribute = node.attributes[prefix + axis]
+                    if self.plug_name(node, prefix + axis) not in self.sources:
+                        attribute.value = value
+            self._touch()
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                           HELPER FUNCTIONS                           #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def _as_list(value):
+    """
+    Flatten strings, lists and tuples of names into one list.
+    """
+    if value is None:
+        return []
+    if isinstance(value, (str, _Node)):
+        return [value]
+    flattened = []
+    for item in value:
+        flattened.extend(_as_list(item))
+    return flattened
+
+# ------------------------------------------------------------------------------ #
+def _range(value):
+    if value is None:
+        return None, None
+    if isinstance(value, (int, float)):
+        return float(value), float(value)
+    if isinstance(value, str):
+        start, _, end = value.partition(":")
+        return float(start), float(end or start)
+    value = list(value)
+    if len(value) == 1:
+        value = [value[0], value[0]]
+    if isinstance(value[0], (tuple, list)):
+        value = list(value[0]) * (2 if len(value[0]) == 1 else 1)
+    return float(value[0]), float(value[1])
+
+# ------------------------------------------------------------------------------ #
+def _aliases(**mapping):
+    """
+    Let a command accept Maya's short flag names, e.g. q=True for query=True.
+    """
+    mapping.setdefault("q", "query")
+    mapping.setdefault("e", "edit")
+
+    def decorator(function):
+        def wrapper(*args, **kwargs):
+            for short, long in mapping.items():
+                if short in kwargs:
+                    kwargs[long] = kwargs.pop(short)
+            return function(*args, **kwargs)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+    return decorator
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                               COMMANDS                               #
+#                                                                      #
+########################################################################
+
+class Commands(object):
+    """
+    The simulated maya.cmds commands. Each one works on the current scene.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    ########################################################################
+    #                         SELECTION AND LISTING                        #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(sl="selection", l="long", typ="type", v="visible", tl="tail", hd="head", tr="transforms", s="shapes", st="showType")
+    def ls(self, *names, selection=False, long=False, type=None, dag=False, visible=False, tail=None, head=None, transforms=False, shapes=False, showType=False, **_ignored):
+        scene = self.scene
+        results = []
+        names = _as_list(names)
+
+        if selection:
+            candidates = [(scene.nodes[name], None) for name in scene.selection if name in scene.nodes]
+        elif names:
+            candidates = []
+            for name in names:
+                node_name, dot, attribute = name.partition(".")
+                short = node_name.split("|")[-1]
+                if any(character in short for character in "*?["):
+                    candidates.extend((node, None) for node_key, node in scene.nodes.items() if fnmatch.fnmatchcase(node_key, short))
+                elif short in scene.nodes:
+                    candidates.append((scene.nodes[short], attribute if dot else None))
+        else:
+            candidates = [(node, None) for node in scene.nodes.values()]
+
+        types = _as_list(type)
+        if transforms:
+            types.append("transform")
+        if shapes:
+            types.append("shape")
+
+        for node, attribute in candidates:
+            if types and not any(node.is_type(t) for t in types):
+                continue
+            if (dag or visible) and not node.is_dag():
+                continue
+            if visible and not scene.is_effectively_visible(node):
+                continue
+            name = scene.format_name(node, long)
+            if attribute:
+                name = f"{name}.{attribute}"
+            results.append(name)
+            if showType:
+                results.append(node.type)
+
+        if tail:
+            results = results[-int(tail):]
+        if head:
+            results = results[:int(head)]
+        return results
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(r="replace", add="add", af="addFirst", d="deselect", cl="clear", hi="hierarchy", tgl="toggle", ne="noExpand")
+    def select(self, *objects, replace=False, add=False, deselect=False, clear=False, hierarchy=False, toggle=False, noExpand=False, **_ignored):
+        scene = self.scene
+        objects = _as_list(objects)
+        if clear:
+            scene.selection = []
+            return
+
+        names = []
+        for obj in objects:
+            node = scene.get_node(obj)
+            if node.type == "objectSet" and not noExpand:
+                names.extend(node.data.get("members", []))
+            else:
+                names.append(node.name)
+
+        if hierarchy:
+            if not names:
+                names = list(scene.selection)
+            expanded = []
+
+            def walk(node):
+                expanded.append(node.name)
+                for child in node.children:
+                    walk(child)
+
+            for name in names:
+                walk(scene.nodes[name])
+            names = expanded
+            if not objects:
+                replace = True
+
+        if deselect:
+            scene.selection = [name for name in scene.selection if name not in names]
+        elif toggle:
+            for name in names:
+                if name in scene.selection:
+                    scene.selection.remove(name)
+                else:
+                    scene.selection.append(name)
+        elif add:
+            scene.selection.extend(name for name in names if name not in scene.selection)
+        else:
+            scene.selection = []
+            scene.selection.extend(name for name in dict.fromkeys(names))
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(p="parent", c="children", s="shapes", ad="allDescendents", f="fullPath", typ="type", pa="path", ni="noIntermediate")
+    def listRelatives(self, *nodes, parent=False, children=False, shapes=False, allDescendents=False, fullPath=False, type=None, path=False, **_ignored):
+        scene = self.scene
+        nodes = _as_list(nodes) or list(scene.selection)
+        types = _as_list(type)
+        results = []
+        for name in nodes:
+            node = scene.get_node(name)
+            if parent:
+                relatives = [node.parent] if node.parent is not None else []
+            elif allDescendents:
+                relatives = []
+
+                def walk(current):
+                    for child in current.children:
+                        walk(child)
+                        relatives.append(child)
+
+                walk(node)
+            else:
+                relatives = list(node.children)
+                if shapes:
+                    relatives = [child for child in relatives if child.is_type("shape")]
+            for relative in relatives:
+                if types and not any(relative.is_type(t) for t in types):
+                    continue
+                formatted = scene.format_name(relative, fullPath or path)
+                if formatted not in results:
+                    results.append(formatted)
+        return results or None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(s="source", d="destination", p="plugs", c="connections", t="type", scn="skipConversionNodes", sh="shapes")
+    def listConnections(self, *targets, source=True, destination=True, plugs=False, connections=False, type=None, skipConversionNodes=False, **_ignored):
+        scene = self.scene
+        targets = _as_list(targets) or list(scene.selection)
+        types = _as_list(type)
+        results = []
+        for target in targets:
+            node_name, _, attribute = target.partition(".")
+            node = scene.get_node(node_name)
+            if attribute:
+                own_plugs = [scene.canonical_plug(target)]
+                resolved = scene.resolve_attribute(node, attribute, required=False)
+                if resolved and resolved[1] in COMPOUND_ATTRIBUTES:
+                    own_plugs.extend(scene.plug_name(node, child) for child in COMPOUND_ATTRIBUTES[resolved[1]][1])
+            else:
+                own_plugs = sorted(scene.node_plugs.get(node.name, ()), key=_plug_sort_key(node))
+
+            for own_plug in own_plugs:
+                others = []
+                if source and own_plug in scene.sources:
+                    others.append(scene.sources[own_plug])
+                if destination:
+                    others.extend(scene.destinations.get(own_plug, []))
+                for other in others:
+                    other_node = scene.nodes[other.partition(".")[0]]
+                    if types and not any(other_node.is_type(t) for t in types):
+                        continue
+                    if connections:
+                        results.append(own_plug)
+                    results.append(other if plugs else other_node.name)
+        return results or None
+
+    # ------------------------------------------------------------------------------ #
+    def objExists(self, name):
+        scene = self.scene
+        node_name, dot, attribute = name.partition(".")
+        node = scene.get_node(node_name, required=False)
+        if node is None:
+            return False
+        if not dot:
+            return True
+        return scene.resolve_attribute(node, attribute, required=False) is not None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(i="isType", it="isAType")
+    def objectType(self, name, isType=None, isAType=None, **_ignored):
+        node = self.scene.get_node(name)
+        if isType:
+            return node.type == isType
+        if isAType:
+            return node.is_type(isAType)
+        return node.type
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(i="inherited")
+    def nodeType(self, name, inherited=False, **_ignored):
+        node = self.scene.get_node(name)
+        if inherited:
+            return list(NODE_TYPE_INHERITANCE.get(node.type, (node.type,)))
+        return node.type
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(n="node", ex="exists", ld="listDefault", ln="longName", sn="shortName", k="keyable", at="attributeType")
+    def attributeQuery(self, attribute, node=None, type=None, exists=False, listDefault=False, longName=False, shortName=False, keyable=False, attributeType=False, **_ignored):
+        scene = self.scene
+        # With type, only the static attributes of that node type are queried, like Maya.
+        owner = scene.prototype(type) if type else scene.get_node(node)
+        found = scene.resolve_attribute(owner, attribute, required=False)
+        if exists:
+            return found is not None
+        if found is None:
+            raise RuntimeError(f"attributeQuery: Node '{node}' does not have attribute '{attribute}'.")
+        owner, long_name = found
+        if long_name in COMPOUND_ATTRIBUTES:
+            children = COMPOUND_ATTRIBUTES[long_name][1]
+            if listDefault:
+                return [float(owner.attributes[child].default) for child in children]
+            if longName:
+                return long_name
+            if shortName:
+                return COMPOUND_ATTRIBUTES[long_name][0]
+            if attributeType:
+                return "double3"
+            return None
+        attribute_data = owner.attributes.get(long_name)
+        if listDefault:
+            return [float(attribute_data.default)] if attribute_data is not None else None
+        if longName:
+            return long_name
+        if shortName:
+            return attribute_data.short_name if attribute_data is not None else MATRIX_ATTRIBUTES.get(long_name)
+        if keyable:
+            return attribute_data.keyable
+        if attributeType:
+            return attribute_data.type
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(k="keyable", u="unlocked", l="locked", s="scalar", nn="nodeName", ud="userDefined", st="string", cb="channelBox", sn="shortNames")
+    def listAttr(self, *targets, keyable=False, unlocked=False, locked=False, scalar=False, nodeName=False, userDefined=False, string=None, channelBox=False, shortNames=False, **_ignored):
+        scene = self.scene
+        targets = _as_list(targets) or list(scene.selection)
+        results = []
+        for target in targets:
+            node_name, dot, attribute = target.partition(".")
+            node = scene.get_node(node_name)
+            if dot:
+                found = scene.resolve_attribute(node, attribute, required=False)
+                candidates = [found[1]] if found else []
+            else:
+                candidates = list(node.attributes)
+            for name in candidates:
+                data = node.attributes.get(name)
+                if data is not None:
+                    if keyable and not data.keyable:
+                        continue
+                    if channelBox and data.keyable:
+                        continue
+                    if unlocked and data.lock:
+                        continue
+                    if locked and not data.lock:
+                        continue
+                    if userDefined and not data.dynamic:
+                        continue
+                elif keyable or unlocked or locked or userDefined or scalar:
+                    continue
+                if string and not fnmatch.fnmatchcase(name, string):
+                    continue
+                if shortNames:
+                    name = data.short_name if data is not None else MATRIX_ATTRIBUTES.get(name, name)
+                results.append(f"{node.name}.{name}" if nodeName else name)
+        return results or None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(sfd="sourceFromDestination", dfs="destinationFromSource", id="isDestination", isSource="isSource")
+    def connectionInfo(self, plug, sourceFromDestination=False, destinationFromSource=False, isDestination=False, isSource=False, **_ignored):
+        scene = self.scene
+        plug = scene.canonical_plug(plug)
+        if sourceFromDestination:
+            return scene.sources.get(plug, "")
+        if destinationFromSource:
+            return list(scene.destinations.get(plug, []))
+        if isDestination:
+            return plug in scene.sources
+        if isSource:
+            return plug in scene.destinations
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(inr="isNodeReferenced", f="filename")
+    def referenceQuery(self, name, isNodeReferenced=False, **_ignored):
+        if isNodeReferenced:
+            return False
+        return None
+
+    ########################################################################
+    #                              ATTRIBUTES                              #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(l="lock", k="keyable", t="time", typ="type", sl="silent", cb="channelBox")
+    def getAttr(self, plug, lock=False, keyable=False, time=None, type=False, channelBox=False, **_ignored):
+        scene = self.scene
+        node_name, _, attribute = plug.partition(".")
+        node = scene.get_node(node_name)
+        if attribute.split("[")[0] in ("ktv", "keyTimeValue") and node.is_type("animCurve"):
+            return self._get_key_time_values(node, attribute)
+
+        owner, long_name = scene.resolve_attribute(node, attribute)
+        if long_name in MATRIX_ATTRIBUTES:
+            if lock or keyable:
+                return False
+            if type:
+                return "matrix"
+            return list(scene.matrix_value(owner, long_name, time))
+        if long_name in COMPOUND_ATTRIBUTES:
+            children = COMPOUND_ATTRIBUTES[long_name][1]
+            if lock:
+                return False
+            if keyable:
+                return False
+            if type:
+                return "double3"
+            return [tuple(scene.value(owner, child, time) for child in children)]
+
+        data = owner.attributes[long_name]
+        if lock:
+            return data.lock
+        if keyable:
+            return data.keyable
+        if channelBox:
+            return not data.keyable
+        if type:
+            return data.type
+        value = scene.value(owner, long_name, time)
+        if data.type == "bool":
+            return bool(value)
+        if data.type == "enum":
+            return int(value)
+        return value
+
+    # ------------------------------------------------------------------------------ #
+    def _get_key_time_values(self, curve, attribute):
+        keys = curve.data["keys"]
+        index = attribute[attribute.find("[") + 1:attribute.find("]")] if "[" in attribute else "*"
+        if index == "*":
+            selected = keys
+        elif ":" in index:
+            start, end = (int(value) for value in index.split(":"))
+            selected = keys[start:end + 1]
+        else:
+            selected = [keys[int(index)]]
+        return [(key.time, key.value) for key in selected]
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(l="lock", k="keyable", typ="type", cb="channelBox")
+    def setAttr(self, plug, *values, lock=None, keyable=None, type=None, channelBox=None, **_ignored):
+        scene = self.scene
+        node_name, _, attribute = plug.partition(".")
+        node = scene.get_node(node_name)
+        if attribute.split("[")[0] in ("ktv", "keyTimeValue") and node.is_type("animCurve"):
+            # Locking the whole key array, e.g. to template a curve, has nothing to store here.
+            if values:
+                self._set_key_time_values(node, attribute, values)
+            return
+
+        owner, long_name = scene.resolve_attribute(node, attribute)
+        children = COMPOUND_ATTRIBUTES[long_name][1] if long_name in COMPOUND_ATTRIBUTES else (long_name,)
+        if long_name in MATRIX_ATTRIBUTES:
+            raise RuntimeError(f"setAttr: The attribute '{plug}' is read-only.")
+
+        for child in children:
+            data = owner.attributes[child]
+            if lock is not None:
+                data.lock = bool(lock)
+            if keyable is not None:
+                data.keyable = bool(keyable)
+            if channelBox is not None and channelBox:
+                data.keyable = False
+
+        if values:
+            if len(values) == 1 and isinstance(values[0], (list, tuple)):
+                values = tuple(values[0])
+            if len(values) != len(children):
+                raise RuntimeError(f"setAttr: Wrong number of values for '{plug}'.")
+            for child, value in zip(children, values):
+                self._set_value(owner, child, value)
+        scene._touch()
+
+    # ------------------------------------------------------------------------------ #
+    def _set_value(self, node, attribute, value):
+        scene = self.scene
+        data = node.attributes[attribute]
+        plug = scene.plug_name(node, attribute)
+        if data.lock:
+            raise RuntimeError(f"setAttr: The attribute '{plug}' is locked or connected and cannot be modified.")
+        source = scene.sources.get(plug)
+        if source:
+            source_node = scene.nodes[source.partition(".")[0]]
+            if source_node.is_type("animCurve") or source_node.is_type("animBlendNodeBase"):
+                # Like Maya, the new value lasts until the time changes.
+                scene.tweaks[plug] = float(value)
+                scene._touch()
+                return
+            raise RuntimeError(f"setAttr: The attribute '{plug}' is locked or connected and cannot be modified.")
+        if data.type == "bool":
+            value = bool(value)
+        elif data.type == "enum":
+            value = int(value)
+        elif data.type == "string":
+            value = str(value)
+        else:
+            value = float(value)
+        data.value = value
+
+    # ------------------------------------------------------------------------------ #
+    def _set_key_time_values(self, curve, attribute, values):
+        scene = self.scene
+        index = attribute[attribute.find("[") + 1:attribute.find("]")]
+        start, _, end = index.partition(":")
+        start = int(start)
+        end = int(end) if end else start
+        if len(values) == 1 and isinstance(values[0], (list, tuple)):
+            values = tuple(values[0])
+        if len(values) != (end - start + 1) * 2:
+            raise RuntimeError(f"setAttr: Wrong number of values for '{curve.name}.{attribute}'.")
+        keys = curve.data["keys"]
+        for offset, i in enumerate(range(start, end + 1)):
+            time, value = values[offset * 2], values[offset * 2 + 1]
+            if i < len(keys):
+                keys[i].time = float(time)
+                keys[i].value = float(value)
+            else:
+                keys.append(_Key(time, value, *scene.default_tangents))
+        scene.set_curve_keys(curve, keys)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(f="force", na="nextAvailable")
+    def connectAttr(self, source, destination, force=False, **_ignored):
+        scene = self.scene
+        destination_plug = scene.canonical_plug(destination)
+        if destination_plug in scene.sources and not force:
+            raise RuntimeError(f"connectAttr: '{destination}' is already connected.")
+        scene.connect(source, destination)
+
+    # ------------------------------------------------------------------------------ #
+    def disconnectAttr(self, source, destination, **_ignored):
+        self.scene.disconnect(source, destination)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(n="name", p="parent", ss="skipSelect")
+    def createNode(self, node_type, name=None, parent=None, skipSelect=False, **_ignored):
+        node = self.scene.create_node(node_type, name=name, parent=parent)
+        if node_type == "animLayer":
+            node.data.setdefault("members", [])
+        if not skipSelect and node.is_dag():
+            self.scene.selection = [node.name]
+        return node.name
+
+    # ------------------------------------------------------------------------------ #
+    def rename(self, old_name, new_name, **_ignored):
+        scene = self.scene
+        node = scene.get_node(old_name)
+        if new_name == node.name:
+            return new_name
+        new_name = scene.unique_name(new_name) if new_name in scene.nodes else new_name
+
+        def renamed(plug):
+            node_name, dot, attribute = plug.partition(".")
+            return new_name + dot + attribute if node_name == node.name else plug
+
+        scene.sources = {renamed(destination): renamed(source) for destination, source in scene.sources.items()}
+        scene.destinations = {renamed(source): [renamed(d) for d in destinations] for source, destinations in scene.destinations.items()}
+        scene.node_plugs = {name: {renamed(plug) for plug in plugs} for name, plugs in scene.node_plugs.items()}
+        scene.node_plugs[new_name] = scene.node_plugs.pop(node.name, set())
+        scene.selection = [new_name if name == node.name else name for name in scene.selection]
+        previous_name = node.name
+        del scene.nodes[node.name]
+        node.name = new_name
+        scene.nodes[new_name] = node
+        scene._touch()
+        scene._notify("name_changed", new_name, previous_name)
+        return new_name
+
+    ########################################################################
+    #                           DAG AND CREATION                           #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(ln="longName", sn="shortName", dt="dataType", at="attributeType", dv="defaultValue", k="keyable")
+    def addAttr(self, obj, longName=None, shortName=None, dataType=None, attributeType="double", defaultValue=0.0, keyable=False, **_ignored):
+        scene = self.scene
+        node = scene.get_node(obj)
+        if longName in node.attributes:
+            raise RuntimeError(f"addAttr: Found a conflicting attribute name '{longName}' on node '{node.name}'.")
+        if dataType == "string":
+            node.add_attribute(longName, shortName, "string", "", False, dynamic=True)
+        else:
+            node.add_attribute(longName, shortName, attributeType, float(defaultValue), bool(keyable), dynamic=True)
+        scene._touch()
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(n="name", p="position")
+    def spaceLocator(self, name=None, position=None, **_ignored):
+        scene = self.scene
+        transform = scene.create_transform(scene.unique_name(name or "locator1"), shape_type="locator")
+        scene.selection = [transform.name]
+        return [transform.name]
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(em="empty", n="name", w="world", p="parent")
+    def group(self, *objects, empty=False, name=None, world=False, parent=None, **_ignored):
+        scene = self.scene
+        objects = [] if empty else (_as_list(objects) or list(scene.selection))
+        group_parent = parent
+        if objects and not world and group_parent is None:
+            first_parent = scene.get_node(objects[0]).parent
+            group_parent = first_parent.name if first_parent is not None else None
+        group = scene.create_transform(scene.unique_name(name or "group1"), parent=group_parent)
+        for obj in objects:
+            scene._set_parent(scene.get_node(obj), group, keep_world=True)
+        scene.selection = [group.name]
+        return group.name
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(w="world", r="relative", a="absolute")
+    def parent(self, *objects, world=False, relative=False, **_ignored):
+        scene = self.scene
+        objects = _as_list(objects)
+        if world:
+            children, new_parent = objects, None
+        else:
+            children, new_parent = objects[:-1], scene.get_node(objects[-1])
+        results = []
+        for child in children:
+            node = scene.get_node(child)
+            scene._set_parent(node, new_parent, keep_world=not relative)
+            results.append(node.name)
+        return results
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(n="name")
+    def sets(self, *objects, name=None, **_ignored):
+        scene = self.scene
+        members = [scene.get_node(obj).name for obj in (_as_list(objects) or list(scene.selection))]
+        object_set = scene.create_node("objectSet", name=scene.unique_name(name or "set1"))
+        object_set.data["members"] = members
+        return object_set.name
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(sc="staticChannels", cn="constraints", c="channels", hi="hierarchy")
+    def delete(self, *objects, staticChannels=False, constraints=False, channels=False, **_ignored):
+        scene = self.scene
+        objects = _as_list(objects) or list(scene.selection)
+        nodes = [scene.get_node(obj) for obj in objects if scene.get_node(obj, required=False) is not None]
+
+        if staticChannels:
+            for node in nodes:
+                for curve in scene.curves_of_targets([node.name]):
+                    keys = curve.data["keys"]
+                    if keys and all(abs(key.value - keys[0].value) < 1e-9 for key in keys):
+                        for destination in list(scene.destinations.get(curve.name + ".output", [])):
+                            found = scene.split_plug(destination, required=False)
+                            scene.disconnect(curve.name + ".output", destination)
+                            if found and found[1] in found[0].attributes:
+                                found[0].attributes[found[1]].value = keys[0].value
+                        scene.delete_nodes([curve])
+            return
+
+        if constraints:
+            to_delete = []
+            for node in nodes:
+                if node.is_type("constraint"):
+                    to_delete.append(node)
+                    continue
+                to_delete.extend(child for child in node.children if child.is_type("constraint"))
+            scene.delete_nodes(to_delete)
+            return
+
+        if channels:
+            for node in nodes:
+                scene.delete_nodes(scene.curves_of_targets([node.name]))
+            return
+
+        scene.delete_nodes(nodes)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(ws="worldSpace", os="objectSpace", t="translation", ro="rotation", m="matrix", r="relative", a="absolute")
+    def xform(self, obj, query=False, worldSpace=False, objectSpace=False, translation=None, rotation=None, matrix=None, **_ignored):
+        scene = self.scene
+        node = scene.get_node(obj)
+        if query:
+            source = scene.world_matrix(node) if worldSpace else scene.local_matrix(node, scene.current_time)
+            if matrix:
+                return list(source)
+            translate, rotate, _scale = decompose_matrix(source)
+            if translation:
+                return list(translate)
+            if rotation:
+                return list(rotate)
+            return None
+
+        parent_inverse = invert_matrix(scene.parent_matrix(node)) if worldSpace else IDENTITY
+        if translation is not None:
+            if worldSpace:
+                local = multiply_matrices((1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0) + tuple(translation) + (1,), parent_inverse)
+                translation = local[12:15]
+            for value, axis in zip(translation, "XYZ"):
+                self._set_value(node, "translate" + axis, value)
+        if rotation is not None:
+            if worldSpace:
+                local = multiply_matrices(compose_matrix((0, 0, 0), rotation, (1, 1, 1)), parent_inverse)
+                rotation = decompose_matrix(local)[1]
+            for value, axis in zip(rotation, "XYZ"):
+                self._set_value(node, "rotate" + axis, value)
+        if matrix is not None:
+            local = multiply_matrices(tuple(matrix), parent_inverse)
+            translate, rotate, scale = decompose_matrix(local)
+            for values, prefix in ((translate, "translate"), (rotate, "rotate"), (scale, "scale")):
+                for value, axis in zip(values, "XYZ"):
+                    self._set_value(node, prefix + axis, value)
+        scene._touch()
+
+    ########################################################################
+    #                             CONSTRAINTS                              #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def _constrain(self, constraint_type, objects, maintainOffset=False, weight=1.0, skip=None, name=None, query=False, edit=False, targetList=False, weightAliasList=False, remove=False, **kwargs):
+        scene = self.scene
+        objects = _as_list(objects)
+        if not objects:
+            objects = list(scene.selection)
+
+        if query:
+            constraint = scene.get_node(objects[-1])
+            if not constraint.is_type("constraint"):
+                existing = [child for child in constraint.children if child.type == constraint_type]
+                if not existing:
+                    return None
+                constraint = existing[0]
+            if targetList:
+                return [target["driver"] for target in constraint.data["targets"]] or None
+            if weightAliasList:
+                return [f"{target['driver']}W{i}" for i, target in enumerate(constraint.data["targets"])] or None
+            return constraint.name
+
+        drivers, driven = objects[:-1], scene.get_node(objects[-1])
+        if not drivers:
+            raise RuntimeError(f"{constraint_type}: Select at least one target and one object to constrain.")
+
+        skip = [axis.lower() for axis in _as_list(skip)]
+        if "none" in skip:
+            skip = []
+
+        existing = [child for child in driven.children if child.type == constraint_type]
+        if existing:
+            constraint = existing[0]
+        else:
+            constraint = scene.create_node(constraint_type, name=scene.unique_name(name or f"{driven.name}_{constraint_type}1"), parent=driven.name)
+            constraint.data["driven"] = driven.name
+            constraint.data["skip"] = skip
+            constraint.data["aim_vector"] = tuple(kwargs.get("aimVector", (1.0, 0.0, 0.0)))
+            constraint.data["up_vector"] = tuple(kwargs.get("upVector", (0.0, 1.0, 0.0)))
+            constraint.data["world_up_vector"] = tuple(kwargs.get("worldUpVector", (0.0, 1.0, 0.0)))
+            scene.connect(scene.plug_name(driven, "parentInverseMatrix"), constraint.name + ".constraintParentInverseMatrix")
+
+        for driver_name in drivers:
+            driver = scene.get_node(driver_name)
+            if any(target["driver"] == driver.name for target in constraint.data["targets"]):
+                continue
+            index = len(constraint.data["targets"])
+            constraint.data["targets"].append({"driver": driver.name, "weight": float(weight), "offset_matrix": None})
+            weight_attribute = constraint.add_attribute(f"{driver.name}W{index}", f"w{index}", "double", float(weight), True, dynamic=True)
+            if constraint_type in ("pointConstraint", "parentConstraint", "aimConstraint"):
+                scene.connect(scene.plug_name(driver, "translate"), f"{constraint.name}.target[{index}].targetTranslate")
+            if constraint_type in ("orientConstraint", "parentConstraint"):
+                scene.connect(scene.plug_name(driver, "rotate"), f"{constraint.name}.target[{index}].targetRotate")
+            if constraint_type == "scaleConstraint":
+                scene.connect(scene.plug_name(driver, "scale"), f"{constraint.name}.target[{index}].targetScale")
+            scene.connect(scene.plug_name(driver, "parentMatrix"), f"{constraint.name}.target[{index}].targetParentMatrix")
+            scene.connect(f"{constraint.name}.{weight_attribute.long_name}", f"{constraint.name}.target[{index}].targetWeight")
+
+        scene._update_constraint_offsets(constraint, maintainOffset)
+
+        # Connect the outputs, for any axis not being skipped.
+        outputs = {
+            "pointConstraint": ("translate",),
+            "orientConstraint": ("rotate",),
+            "aimConstraint": ("rotate",),
+            "parentConstraint": ("translate", "rotate"),
+            "scaleConstraint": ("scale",),
+        }[constraint_type]
+        pair_blend = None
+        for prefix in outputs:
+            if prefix == "translate" and "skipTranslate" in kwargs:
+                axis_skip = [axis.lower() for axis in _as_list(kwargs["skipTranslate"])]
+            elif prefix == "rotate" and "skipRotate" in kwargs:
+                axis_skip = [axis.lower() for axis in _as_list(kwargs["skipRotate"])]
+            else:
+                axis_skip = constraint.data["skip"]
+            for axis in "XYZ":
+                if axis.lower() in axis_skip:
+                    continue
+                channel = f"{prefix[0].upper()}{prefix[1:]}{axis}"
+                destination = scene.plug_name(driven, prefix + axis)
+                output = f"{constraint.name}.constraint{channel}"
+                existing_source = scene.sources.get(destination)
+                if existing_source == output:
+                    continue
+                existing_node = scene.nodes[existing_source.partition(".")[0]] if existing_source else None
+                if existing_node is not None and existing_node.type == "pairBlend" and scene.sources.get(f"{existing_node.name}.in{channel}2") == output:
+                    continue
+                if driven.attributes[prefix + axis].lock:
+                    raise RuntimeError(f"{constraint_type}: Could not add constraint, because '{destination}' is locked.")
+                if existing_node is not None:
+                    if existing_node.is_type("constraint") or existing_node.type == "pairBlend":
+                        raise RuntimeError(f"{constraint_type}: '{destination}' is already constrained.")
+                    if existing_node.is_type("animCurve") and scene.pair_blends and constraint_type in PAIR_BLEND_WEIGHT_ATTRIBUTES:
+                        # Like Maya, blend from the keys to the constraint with a pairBlend.
+                        if pair_blend is None:
+                            pair_blend = scene.create_pair_blend(driven, constraint_type)
+                        scene.connect(existing_source, f"{pair_blend.name}.in{channel}1")
+                        scene.connect(output, f"{pair_blend.name}.in{channel}2")
+                        scene.connect(f"{pair_blend.name}.out{channel}", destination)
+                        continue
+                    # Keys are held until the constraint is removed, instead of making a pairBlend.
+                    scene.disconnect(existing_source, destination)
+                    if existing_node.is_type("animCurve"):
+                        scene.held_curves[destination] = existing_node
+                scene.connect(output, destination)
+        scene.selection = [constraint.name]
+        return [constraint.name]
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(mo="maintainOffset", w="weight", sk="skip", n="name", tl="targetList", wal="weightAliasList")
+    def pointConstraint(self, *objects, **kwargs):
+        return self._constrain("pointConstraint", objects, **kwargs)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(mo="maintainOffset", w="weight", sk="skip", n="name", tl="targetList", wal="weightAliasList")
+    def orientConstraint(self, *objects, **kwargs):
+        return self._constrain("orientConstraint", objects, **kwargs)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(mo="maintainOffset", w="weight", st="skipTranslate", sr="skipRotate", n="name", tl="targetList", wal="weightAliasList")
+    def parentConstraint(self, *objects, **kwargs):
+        return self._constrain("parentConstraint", objects, **kwargs)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(mo="maintainOffset", w="weight", sk="skip", n="name", tl="targetList", wal="weightAliasList")
+    def scaleConstraint(self, *objects, **kwargs):
+        return self._constrain("scaleConstraint", objects, **kwargs)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(mo="maintainOffset", w="weight", sk="skip", n="name", aim="aimVector", u="upVector", wut="worldUpType", wu="worldUpVector", tl="targetList")
+    def aimConstraint(self, *objects, worldUpType="vector", **kwargs):
+        return self._constrain("aimConstraint", objects, **kwargs)
+
+    ########################################################################
+    #                               KEYFRAMES                              #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def _key_targets(self, targets, attribute=None):
+        scene = self.scene
+        targets = _as_list(targets) or list(scene.selection)
+        return scene.curves_of_targets(targets, attribute)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(n="name", sl="selected", vc="valueChange", tc="timeChange", iv="indexValue", kc="keyframeCount", ev="eval", t="time", index="index", at="attribute", a="absolute", r="relative", o="option", iub="includeUpperBound", an="animation")
+    def keyframe(self, *targets, query=False, edit=False, name=False, selected=False, valueChange=None, timeChange=None, indexValue=False, keyframeCount=False, eval=False, time=None, index=None, attribute=None, absolute=False, relative=False, includeUpperBound=True, animation=None, **_ignored):
+        scene = self.scene
+        targets = _as_list(targets)
+        if selected and not targets:
+            curves = [node for node in scene.nodes.values() if node.is_type("animCurve") and any(key.selected for key in node.data["keys"])]
+        else:
+            curves = self._key_targets(targets, attribute)
+
+        if query:
+            if keyframeCount:
+                return sum(len(scene.filter_keys(curve, time, index, selected, includeUpperBound)) for curve in curves)
+            if eval:
+                start, _end = _range(time)
+                evaluate_time = scene.current_time if start is None else start
+                return [scene.evaluate_curve(curve, evaluate_time) for curve in curves] or None
+            if attribute is True:
+                return [scene.split_plug(scene.destinations[curve.name + ".output"][0])[1] for curve in curves if scene.destinations.get(curve.name + ".output")] or None
+
+            results = []
+            for curve in curves:
+                matches = scene.filter_keys(curve, time, index, selected, includeUpperBound)
+                if not matches:
+                    continue
+                if name:
+                    results.append(curve.name)
+                    continue
+                for i, key in matches:
+                    if indexValue:
+                        results.append(i)
+                    elif valueChange and timeChange:
+                        results.extend((key.time, key.value))
+                    elif valueChange:
+                        results.append(key.value)
+                    else:
+                        results.append(key.time)
+            return results or None
+
+        # Edit.
+        count = 0
+        for curve in curves:
+            matches = scene.filter_keys(curve, time, index, selected, includeUpperBound)
+            for _i, key in matches:
+                if valueChange is not None and valueChange is not True:
+                    key.value = key.value + valueChange if relative else float(valueChange)
+                if timeChange is not None and timeChange is not True:
+                    key.time = key.time + timeChange if relative else timeChange
+                count += 1
+            scene.set_curve_keys(curve, curve.data["keys"])
+        return count
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(at="attribute", v="value", t="time", al="animLayer", id="identity", itt="inTangentType", ott="outTangentType", bd="breakdown", s="shape")
+    def setKeyframe(self, *targets, attribute=None, value=None, time=None, animLayer=None, identity=False, inTangentType=None, outTangentType=None, **_ignored):
+        scene = self.scene
+        targets = _as_list(targets) or list(scene.selection)
+        attributes = _as_list(attribute)
+        times = [scene.current_time] if time is None else sorted({_range(time)[0], _range(time)[1]})
+        count = 0
+
+        for target in targets:
+            node = scene.get_node(target)
+            if node.is_type("animCurve"):
+                for key_time in times:
+                    key_value = scene.evaluate_curve(node, key_time) if value is None else value
+                    scene.add_key(node, key_time, key_value, inTangentType, outTangentType)
+                    count += 1
+                continue
+
+            if "." in target:
+                plugs = [scene.split_plug(target)]
+            elif attributes:
+                plugs = [found for found in (scene.resolve_attribute(node, a, required=False) for a in attributes) if found]
+            else:
+                plugs = [(node, name) for name, data in node.attributes.items() if data.keyable]
+
+            expanded = []
+            for plug_node, plug_attribute in plugs:
+                if plug_attribute in COMPOUND_ATTRIBUTES:
+                    expanded.extend((plug_node, child) for child in COMPOUND_ATTRIBUTES[plug_attribute][1])
+                elif plug_attribute in plug_node.attributes:
+                    expanded.append((plug_node, plug_attribute))
+
+            for plug_node, plug_attribute in expanded:
+                data = plug_node.attributes[plug_attribute]
+                if data.lock:
+                    continue
+                layer = animLayer
+                if layer and plug_node.type != "animLayer" and layer != "BaseAnimation" and layer not in scene.layer_blends(plug_node, plug_attribute):
+                    continue
+                # Read the values before a new curve is connected, as it has no keys to give them yet.
+                key_values = [self._key_value(plug_node, plug_attribute, key_time, value, layer, identity) for key_time in times]
+                curve = scene.curve_for_plug(plug_node, plug_attribute, create=True, layer=layer)
+                if curve is None:
+                    continue
+                for key_time, key_value in zip(times, key_values):
+                    scene.add_key(curve, key_time, key_value, inTangentType, outTangentType)
+                    count += 1
+                scene.tweaks.pop(scene.plug_name(plug_node, plug_attribute), None)
+        scene._touch()
+        return count
+
+    # ------------------------------------------------------------------------------ #
+    def _key_value(self, node, attribute, time, value, layer, identity):
+        scene = self.scene
+        if layer and layer != "BaseAnimation":
+            blend = scene.layer_blends(node, attribute)[layer]
+            is_override = scene.nodes[layer].attributes["override"].value
+            below = scene.value(blend, "inputA", time)
+            if identity:
+                return below if is_override else 0.0
+            current = scene.value(node, attribute, time) if value is None else value
+            return current if is_override else current - below
+        if value is not None:
+            return value
+        if scene.layer_blends(node, attribute):
+            curve = scene.curve_for_plug(node, attribute)
+            return scene.evaluate_curve(curve, time) if curve is not None and curve.data["keys"] else scene.value(node, attribute, time)
+        return scene.value(node, attribute, time)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(t="time", index="index", at="attribute", cl="clear", o="option", iub="includeUpperBound")
+    def cutKey(self, *targets, time=None, index=None, attribute=None, clear=False, includeUpperBound=True, **_ignored):
+        scene = self.scene
+        count = 0
+        for curve in self._key_targets(targets, attribute):
+            matches = scene.filter_keys(curve, time, index, False, includeUpperBound)
+            removed = {id(key) for _i, key in matches}
+            count += len(removed)
+            scene.set_curve_keys(curve, [key for key in curve.data["keys"] if id(key) not in removed])
+            if not curve.data["keys"]:
+                held_value = None
+                for destination in list(scene.destinations.get(curve.name + ".output", [])):
+                    found = scene.split_plug(destination, required=False)
+                    if found and found[1] in found[0].attributes:
+                        held_value = scene.value(*found)
+                        scene.disconnect(curve.name + ".output", destination)
+                        found[0].attributes[found[1]].value = held_value
+                scene.delete_nodes([curve])
+        return count
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(t="time", index="index", at="attribute", cl="clear", add="add", r="replace", rm="remove", tgl="toggle", k="keyframe")
+    def selectKey(self, *targets, time=None, index=None, attribute=None, clear=False, add=False, replace=False, remove=False, toggle=False, **_ignored):
+        scene = self.scene
+        if clear:
+            for node in scene.nodes.values():
+                if node.is_type("animCurve"):
+                    for key in node.data["keys"]:
+                        key.selected = False
+            return 0
+        if not add and not remove and not toggle:
+            self.selectKey(clear=True)
+        count = 0
+        for curve in self._key_targets(targets, attribute):
+            for _i, key in scene.filter_keys(curve, time, index):
+                key.selected = (not key.selected) if toggle else not remove
+                count += 1
+        return count
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(pri="preInfinite", poi="postInfinite", at="attribute")
+    def setInfinity(self, *targets, query=False, preInfinite=None, postInfinite=None, attribute=None, **_ignored):
+        # Infinity is stored, but curves always evaluate as "constant" outside their keys.
+        scene = self.scene
+        curves = self._key_targets(targets, attribute)
+        if query:
+            field = "pre_infinity" if preInfinite else "post_infinity"
+            return [curve.data.get(field, "constant") for curve in curves] or None
+        for curve in curves:
+            if preInfinite is not None:
+                curve.data["pre_infinity"] = str(preInfinite)
+            if postInfinite is not None:
+                curve.data["post_infinity"] = str(postInfinite)
+        scene._touch()
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(itt="inTangentType", ott="outTangentType", ia="inAngle", oa="outAngle", iw="inWeight", ow="outWeight", t="time", index="index", at="attribute", l="lock", wt="weightedTangents", g="global_")
+    def keyTangent(self, *targets, query=False, edit=False, inTangentType=None, outTangentType=None, inAngle=None, outAngle=None, inWeight=None, outWeight=None, time=None, index=None, attribute=None, lock=None, weightedTangents=None, global_=False, **_ignored):
+        scene = self.scene
+        targets = _as_list(targets)
+        if global_ and query:
+            return [scene.default_tangents[0] if inTangentType else scene.default_tangents[1]]
+        if not targets and not query and not scene.selection:
+            # With no targets, the default tangents are set.
+            scene.default_tangents = (inTangentType or scene.default_tangents[0], outTangentType or scene.default_tangents[1])
+            return None
+        curves = self._key_targets(targets, attribute)
+
+        if query:
+            results = []
+            for curve in curves:
+                keys = curve.data["keys"]
+                for i, key in scene.filter_keys(curve, time, index):
+                    if inTangentType:
+                        results.append(key.in_type)
+                    elif outTangentType:
+                        results.append(key.out_type)
+                    elif inAngle:
+                        results.append(key.in_angle if key.in_angle is not None else math.degrees(math.atan(scene.key_slope(keys, i, "in") * FRAMES_PER_SECOND)))
+                    elif outAngle:
+                        results.append(key.out_angle if key.out_angle is not None else math.degrees(math.atan(scene.key_slope(keys, i, "out") * FRAMES_PER_SECOND)))
+                    elif inWeight:
+                        results.append(key.in_weight)
+                    elif outWeight:
+                        results.append(key.out_weight)
+                    elif weightedTangents:
+                        results.append(False)
+            return results or None
+
+        for curve in curves:
+            for _i, key in scene.filter_keys(curve, time, index):
+                if inTangentType:
+                    key.in_type = inTangentType
+                if outTangentType:
+                    key.out_type = outTangentType
+                if inAngle is not None:
+                    key.in_angle, key.in_type = float(inAngle), "fixed"
+                if outAngle is not None:
+                    key.out_angle, key.out_type = float(outAngle), "fixed"
+                if inWeight is not None:
+                    key.in_weight = float(inWeight)
+                if outWeight is not None:
+                    key.out_weight = float(outWeight)
+        scene._touch()
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(t="time", index="index", at="attribute", vs="valueScale", vp="valuePivot", ts="timeScale", tp="timePivot", iub="includeUpperBound")
+    def scaleKey(self, *targets, time=None, index=None, attribute=None, valueScale=1.0, valuePivot=0.0, timeScale=1.0, timePivot=0.0, includeUpperBound=True, **_ignored):
+        scene = self.scene
+        count = 0
+        for curve in self._key_targets(targets, attribute):
+            for _i, key in scene.filter_keys(curve, time, index, False, includeUpperBound):
+                key.value = valuePivot + (key.value - valuePivot) * valueScale
+                key.time = timePivot + (key.time - timePivot) * timeScale
+                count += 1
+            scene.set_curve_keys(curve, curve.data["keys"])
+        return count
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(w="which", t="time", at="attribute")
+    def findKeyframe(self, *targets, which="next", time=None, attribute=None, **_ignored):
+        scene = self.scene
+        times = sorted({key.time for curve in self._key_targets(targets, attribute) for key in curve.data["keys"]})
+        now = scene.current_time if time is None else _range(time)[0]
+        if not times:
+            return now
+        if which == "first":
+            return times[0]
+        if which == "last":
+            return times[-1]
+        if which == "next":
+            later = [t for t in times if t > now + 1e-6]
+            return later[0] if later else times[0]
+        if which == "previous":
+            earlier = [t for t in times if t < now - 1e-6]
+            return earlier[-1] if earlier else times[-1]
+        return now
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(f="filter", sm="startTime", e="endTime")
+    def filterCurve(self, *targets, **_ignored):
+        """
+        Simulates the default Euler filter, removing 360 degree flips between keys.
+        """
+        scene = self.scene
+        targets = _as_list(targets) or list(scene.selection)
+        curves = []
+        for target in targets:
+            node = scene.get_node(target, required=False)
+            if node is None or node.is_type("constraint"):
+                continue
+            curves.extend(scene.curves_of_targets([node.name]))
+        for curve in curves:
+            if curve.type == "animCurveTA":
+                _unwrap_curve(curve)
+        scene._touch()
+        return len(curves)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(t="time", sb="sampleBy", sm="simulation", at="attribute", dic="disableImplicitControl", pok="preserveOutsideKeys", sac="sparseAnimCurveBake", mr="minimizeRotation", dl="destinationLayer", cp="controlPoints", rba="removeBakedAttributeFromLayer", rbal="removeBakedAnimFromLayer", bol="bakeOnOverrideLayer", s="shape")
+    def bakeResults(self, *objects, time=None, sampleBy=1, attribute=None, preserveOutsideKeys=False, minimizeRotation=False, destinationLayer=None, simulation=False, **_ignored):
+        scene = self.scene
+        objects = _as_list(objects) or list(scene.selection)
+        start, end = _range(time) if time is not None else tuple(scene.playback_range)
+        frames = []
+        frame = start
+        while frame <= end + 1e-6:
+            frames.append(frame)
+            frame += sampleBy
+
+        plugs = []
+        for obj in objects:
+            node = scene.get_node(obj)
+            if "." in obj:
+                plugs.append(scene.split_plug(obj))
+                continue
+            names = _as_list(attribute) or [name for name, data in node.attributes.items() if data.keyable]
+            for name in names:
+                found = scene.resolve_attribute(node, name, required=False)
+                if found is None:
+                    continue
+                if found[1] in COMPOUND_ATTRIBUTES:
+                    plugs.extend((found[0], child) for child in COMPOUND_ATTRIBUTES[found[1]][1])
+                elif found[1] in found[0].attributes and not found[0].attributes[found[1]].lock:
+                    plugs.append(found)
+
+        # Sample everything first, before changing any connections.
+        samples = {}
+        for frame in frames:
+            for plug in plugs:
+                samples.setdefault(plug, []).append(scene.value(plug[0], plug[1], frame))
+
+        for (node, attribute), values in samples.items():
+            plug = scene.plug_name(node, attribute)
+            if destinationLayer and destinationLayer != "BaseAnimation" and destinationLayer in scene.layer_blends(node, attribute):
+                curve = scene.curve_for_plug(node, attribute, create=True, layer=destinationLayer)
+            else:
+                source = scene.sources.get(plug)
+                source_node = scene.nodes[source.partition(".")[0]] if source else None
+                if source_node is not None and source_node.type == "pairBlend":
+                    # Bake onto the keys under the pairBlend, and remove it.
+                    scene.release_pair_blend(plug)
+                elif source_node is not None and not (source_node.is_type("animCurve") or source_node.is_type("animBlendNodeBase")):
+                    scene.disconnect(source, plug)
+                    held = scene.held_curves.pop(plug, None)
+                    if held is not None and held.name in scene.nodes:
+                        scene.connect(held.name + ".output", plug)
+                curve = scene.curve_for_plug(node, attribute, create=True)
+            if curve is None:
+                continue
+            keys = curve.data["keys"]
+            if preserveOutsideKeys:
+                keys = [key for key in keys if key.time < start - 1e-6 or key.time > end + 1e-6]
+            else:
+                keys = []
+            keys.extend(_Key(frame, value, *scene.default_tangents) for frame, value in zip(frames, values))
+            scene.set_curve_keys(curve, keys)
+            if minimizeRotation and curve.type == "animCurveTA":
+                _unwrap_curve(curve)
+            scene.tweaks.pop(plug, None)
+        scene._touch()
+        return len(samples)
+
+    ########################################################################
+    #                           ANIMATION LAYERS                           #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(at="attribute", ra="removeAttribute", aso="addSelectedObjects", sel="selected", l="lock", m="mute", o="override", w="weight", c="children", p="parent", r="root", fur="forceUIRefresh", ex="exists")
+    def animLayer(self, name=None, query=False, edit=False, attribute=None, removeAttribute=None, addSelectedObjects=False, selected=None, lock=None, mute=None, override=None, weight=None, children=False, parent=None, root=False, exists=False, **_ignored):
+        scene = self.scene
+
+        if query:
+            if root:
+                return "BaseAnimation" if "BaseAnimation" in scene.nodes else None
+            if exists:
+                return name in scene.nodes and scene.nodes[name].type == "animLayer"
+            layer = scene.get_node(name)
+            if attribute:
+                return list(layer.data.get("members", [])) or None
+            if children:
+                return list(layer.data.get("children", [])) or None
+            if parent:
+                return layer.data.get("parent")
+            if selected:
+                return layer.name in scene.selected_animation_layers
+            if lock:
+                return layer.attributes["lock"].value
+            if mute:
+                return layer.attributes["mute"].value
+            if override:
+                return layer.attributes["override"].value
+            if weight:
+                return layer.attributes["weight"].value
+            return None
+
+        if edit:
+            layer = scene.get_node(name)
+            if addSelectedObjects:
+                for obj in list(scene.selection):
+                    node = scene.nodes[obj]
+                    for attribute_name, data in node.attributes.items():
+                        if data.keyable and not data.lock:
+                            scene.add_to_animation_layer(layer, node, attribute_name)
+            for plug in _as_list(attribute):
+                found = scene.split_plug(plug)
+                children_names = COMPOUND_ATTRIBUTES[found[1]][1] if found[1] in COMPOUND_ATTRIBUTES else (found[1],)
+                for child in children_names:
+                    scene.add_to_animation_layer(layer, found[0], child)
+            for plug in _as_list(removeAttribute):
+                found = scene.split_plug(plug)
+                children_names = COMPOUND_ATTRIBUTES[found[1]][1] if found[1] in COMPOUND_ATTRIBUTES else (found[1],)
+                for child in children_names:
+                    scene.remove_from_animation_layer(layer, found[0], child)
+            if selected is not None:
+                if selected and layer.name not in scene.selected_animation_layers:
+                    scene.selected_animation_layers.append(layer.name)
+                elif not selected and layer.name in scene.selected_animation_layers:
+                    scene.selected_animation_layers.remove(layer.name)
+            for flag, attribute_name in ((lock, "lock"), (mute, "mute"), (override, "override")):
+                if flag is not None:
+                    layer.attributes[attribute_name].value = bool(flag)
+            if weight is not None:
+                layer.attributes["weight"].value = float(weight)
+            scene._touch()
+            return layer.name
+
+        layer = scene.create_animation_layer(name=name, override=bool(override))
+        return layer.name
+
+    ########################################################################
+    #                           TIME AND SETTINGS                          #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(l="linear", a="angle", t="time")
+    def currentUnit(self, query=False, linear=False, angle=False, time=False, **_ignored):
+        # Scenes always use Maya's default units.
+        if linear:
+            return "cm"
+        if angle:
+            return "deg"
+        if time:
+            return "film"
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(min="minTime", max="maxTime", ast="animationStartTime", aet="animationEndTime")
+    def playbackOptions(self, query=False, edit=False, minTime=None, maxTime=None, animationStartTime=None, animationEndTime=None, **_ignored):
+        scene = self.scene
+        if query:
+            if minTime:
+                return scene.playback_range[0]
+            if maxTime:
+                return scene.playback_range[1]
+            if animationStartTime:
+                return scene.animation_range[0]
+            if animationEndTime:
+                return scene.animation_range[1]
+            return None
+        if minTime is not None:
+            scene.playback_range[0] = float(minTime)
+        if maxTime is not None:
+            scene.playback_range[1] = float(maxTime)
+        if animationStartTime is not None:
+            scene.animation_range[0] = float(animationStartTime)
+        if animationEndTime is not None:
+            scene.animation_range[1] = float(animationEndTime)
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(u="update")
+    def currentTime(self, time=None, query=False, edit=False, update=True, **_ignored):
+        scene = self.scene
+        if query or time is None:
+            return scene.current_time
+        scene.current_time = float(time)
+        scene.tweaks.clear()
+        scene._touch()
+        return scene.current_time
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(st="state")
+    def autoKeyframe(self, query=False, edit=False, state=None, **_ignored):
+        scene = self.scene
+        if query:
+            return scene.auto_keyframe
+        if state is not None:
+            scene.auto_keyframe = bool(state)
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(su="suspend", f="force", cv="currentView")
+    def refresh(self, suspend=None, **_ignored):
+        if suspend is not None:
+            self.scene.refresh_suspended = bool(suspend)
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(ock="openChunk", cck="closeChunk", cn="chunkName", st="state", swf="stateWithoutFlush")
+    def undoInfo(self, query=False, openChunk=False, closeChunk=False, state=None, **_ignored):
+        scene = self.scene
+        if openChunk:
+            scene.undo_chunk_depth += 1
+            scene.undo_chunks_opened += 1
+        if closeChunk:
+            scene.undo_chunk_depth = max(0, scene.undo_chunk_depth - 1)
+        if query:
+            return True
+        return None
+
+    ########################################################################
+    #                                  UI                                  #
+    ########################################################################
+
+    # ------------------------------------------------------------------------------ #
+    def warning(self, message="", **_ignored):
+        self.scene.warnings.append(str(message))
+
+    # ------------------------------------------------------------------------------ #
+    def confirmDialog(self, message="", **_ignored):
+        self.scene.messages.append(str(message))
+        return "Confirm"
+
+    # ------------------------------------------------------------------------------ #
+    def inViewMessage(self, message="", **_ignored):
+        self.scene.messages.append(str(message))
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(b="batch")
+    def about(self, batch=False, **_ignored):
+        # Act like the interactive UI, so progress bars are used.
+        if batch:
+            return False
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(bp="beginProgress", ep="endProgress", ii="isInterruptable", st="status", max="maxValue", s="step", ic="isCancelled", pr="progress")
+    def progressBar(self, name=None, query=False, edit=False, beginProgress=False, endProgress=False, isInterruptable=None,
+                    status=None, maxValue=None, step=None, isCancelled=False, progress=None, **_ignored):
+        state = self.scene.progress
+        if query:
+            if isCancelled:
+                cancel_after = self.scene.cancel_progress_after
+                return bool(state["active"] and state["interruptable"] and cancel_after is not None and state["value"] >= cancel_after)
+            if progress:
+                return state["value"]
+            if maxValue:
+                return state["max"]
+            if status:
+                return state["status"]
+            return None
+
+        if beginProgress:
+            state.update(active=True, value=0, interruptable=bool(isInterruptable))
+        if endProgress:
+            state.update(active=False, value=0)
+        if status is not None:
+            state["status"] = str(status)
+        if maxValue is not None:
+            state["max"] = int(maxValue)
+        if step is not None:
+            state["value"] = min(state["value"] + int(step), state["max"])
+        if progress is not None and not query:
+            state["value"] = int(progress)
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(wf="withFocus", to="typeOf", up="underPointer")
+    def getPanel(self, withFocus=False, typeOf=None, underPointer=False, **_ignored):
+        if typeOf:
+            return "modelPanel" if str(typeOf).startswith("modelPanel") else "scriptedPanel"
+        return self.scene.focused_panel
+
+    # ------------------------------------------------------------------------------ #
+    def modelEditor(self, panel=None, query=False, **kwargs):
+        if query:
+            for flag in kwargs:
+                return self.scene.panel_display.get(flag, True)
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(si="selectItem")
+    def treeView(self, name=None, query=False, selectItem=False, **_ignored):
+        if query and selectItem:
+            return list(self.scene.selected_animation_layers) or None
+        return None
+
+    # ------------------------------------------------------------------------------ #
+    @_aliases(ssa="selectedShapeAttributes", sma="selectedMainAttributes", sha="selectedHistoryAttributes", soa="selectedOutputAttributes")
+    def channelBox(self, name=None, query=False, selectedShapeAttributes=False, selectedMainAttributes=False, selectedHistoryAttributes=False, selectedOutputAttributes=False, **_ignored):
+        if query and selectedMainAttributes:
+            return list(self.scene.selected_channels) or None
+        return None
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                                  MEL                                 #
+#                                                                      #
+########################################################################
+
+class Mel(object):
+    """
+    The handful of MEL procedures the tools call through maya.mel.eval().
+    """
+
+    def __init__(self, commands):
+        self.commands = commands
+
+    # ------------------------------------------------------------------------------ #
+    def eval(self, command):
+        result = None
+        for statement in (part.strip() for part in command.split(";")):
+            if statement:
+                result = self._evaluate(statement)
+        return result
+
+    # ------------------------------------------------------------------------------ #
+    def _evaluate(self, statement):
+        cmds = self.commands
+        scene = cmds.scene
+        name = re.split(r"[\s(]", statement, maxsplit=1)[0]
+
+        if name in IGNORED_MEL_COMMANDS:
+            return None
+        if name == "buildAnimLayerArray":
+            return list(scene.animation_layers)
+        if name == "getSelectedAnimLayer" or "getSelectedAnimLayer" in statement:
+            return list(scene.selected_animation_layers)
+        if name == "setSelectedForAllLayers":
+            state = int(re.search(r"\d", statement).group())
+            scene.selected_animation_layers = list(scene.animation_layers) if state else []
+            return None
+        if "gMainProgressBar" in statement:
+            return "MainProgressBar"
+        if name == "global" and "gChannelBoxName" in statement:
+            return "mainChannelBox"
+        if name.startswith("$temp"):
+            return "mainChannelBox"
+        if name == "plugNode":
+            plug = statement.split(None, 1)[1].strip()
+            return scene.get_node(plug).name
+        if name == "layerEditorSelectObjectAnimLayer":
+            members = []
+            for layer in scene.selected_animation_layers:
+                for plug in scene.nodes[layer].data.get("members", []):
+                    node_name = plug.partition(".")[0]
+                    if node_name not in members:
+                        members.append(node_name)
+            cmds.select(members, replace=True)
+            return None
+        if name in ("SetKeyTranslate", "SetKeyRotate", "SetKeyScale"):
+            attribute = {"SetKeyTranslate": "translate", "SetKeyRotate": "rotate", "SetKeyScale": "scale"}[name]
+            if scene.selection:
+                cmds.setKeyframe(list(scene.selection), attribute=attribute)
+            return None
+        raise RuntimeError(f"The simulator doesn't support this MEL yet: {statement}")
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                             INSTALLATION                             #
+#                                                                      #
+########################################################################
+
+_SCENE = None
+_MODULES = {}
+_ORIGINAL_MODULES = {}
+# Registered OpenMaya callbacks, as {id: (message, function, client data)}.
+_CALLBACKS = {}
+_NEXT_CALLBACK_ID = [1]
+
+
+class _CommandModule(types.ModuleType):
+    """
+    A module that sends every attribute lookup to the current scene's commands.
+    """
+
+    def __init__(self, name, getter):
+        super(_CommandModule, self).__init__(name)
+        self._getter = getter
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self._getter(), name)
+
+    def __dir__(self):
+        return [name for name in dir(self._getter()) if not name.startswith("_") and name != "scene" and name != "commands"]
+
+
+class _MGlobal(object):
+    @staticmethod
+    def displayWarning(message):
+        get_scene().warnings.append(str(message))
+
+    @staticmethod
+    def displayInfo(message):
+        get_scene().messages.append(str(message))
+
+    @staticmethod
+    def displayError(message):
+        get_scene().messages.append(str(message))
+
+
+class _MPlug(object):
+    def __init__(self, plug):
+        self._plug = plug
+
+    def name(self):
+        return self._plug
+
+
+class _MObject(object):
+    def __init__(self, node_name=None):
+        self.node_name = node_name
+
+    def isNull(self):
+        return self.node_name is None
+
+
+def _add_callback(message, function, client_data):
+    callback_id = _NEXT_CALLBACK_ID[0]
+    _NEXT_CALLBACK_ID[0] += 1
+    _CALLBACKS[callback_id] = (message, function, client_data)
+    return callback_id
+
+
+class _MDGMessage(object):
+    @staticmethod
+    def addConnectionCallback(function, clientData=None):
+        return _add_callback("connection", function, clientData)
+
+    @staticmethod
+    def addNodeAddedCallback(function, nodeType="dependNode", clientData=None):
+        return _add_callback("node_added", function, clientData)
+
+    @staticmethod
+    def addNodeRemovedCallback(function, nodeType="dependNode", clientData=None):
+        return _add_callback("node_removed", function, clientData)
+
+
+class _MNodeMessage(object):
+    @staticmethod
+    def addNameChangedCallback(node, function, clientData=None):
+        # Like Maya, a null MObject listens to every node.
+        return _add_callback("name_changed", function, clientData)
+
+
+class _MAnimMessage(object):
+    @staticmethod
+    def addAnimCurveEditedCallback(function, clientData=None):
+        return _add_callback("anim_curve_edited", function, clientData)
+
+
+class _MMessage(object):
+    @staticmethod
+    def removeCallback(callback_id):
+        if callback_id not in _CALLBACKS:
+            raise RuntimeError(f"Callback {callback_id} doesn't exist.")
+        del _CALLBACKS[callback_id]
+
+# ------------------------------------------------------------------------------ #
+def _fire_callbacks(message, *args):
+    for callback_message, function, client_data in list(_CALLBACKS.values()):
+        if callback_message != message:
+            continue
+        if message == "connection":
+            source, destination, made = args
+            function(_MPlug(source), _MPlug(destination), made, client_data)
+        elif message == "name_changed":
+            new_name, previous_name = args
+            function(_MObject(new_name), previous_name, client_data)
+        else:
+            function(_MObject(args[0] if args else None), client_data)
+
+
+class _MDagPath(object):
+    def __init__(self, other=None):
+        self._node = other._node if isinstance(other, _MDagPath) else None
+
+    def fullPathName(self):
+        return get_scene().full_path(self._node)
+
+    def partialPathName(self):
+        return self._node.name
+
+    def apiTypeStr(self):
+        return self._node.type
+
+
+class _MDataPlug(object):
+    """
+    An MPlug with a value, as returned by MFnDependencyNode.findPlug().
+    """
+
+    def __init__(self, node=None, attribute=None):
+        self._node = node
+        self._attribute = attribute
+
+    def name(self):
+        return f"{self._node.name}.{self._attribute}"
+
+    def partialName(self, *_flags):
+        return self._attribute
+
+    def isCompound(self):
+        return self._attribute in COMPOUND_ATTRIBUTES
+
+    def numChildren(self):
+        return len(COMPOUND_ATTRIBUTES[self._attribute][1]) if self.isCompound() else 0
+
+    def child(self, index):
+        return _MDataPlug(self._node, COMPOUND_ATTRIBUTES[self._attribute][1][index])
+
+    def asBool(self):
+        return bool(get_scene().value(self._node, self._attribute))
+
+    def asInt(self):
+        return int(get_scene().value(self._node, self._attribute))
+
+    def asDouble(self, context=None):
+        # Like Maya, the API gives angles in radians, its internal unit.
+        time = _MDGContext.time_of(context)
+        value = float(get_scene().value(self._node, self._attribute, time))
+        if self._node.attributes[self._attribute].type == "doubleAngle":
+            value = math.radians(value)
+        return value
+
+    def elementByLogicalIndex(self, index):
+        return _MDataPlug(self._node, self._attribute.split("[")[0] + f"[{index}]")
+
+    def asMObject(self, context=None):
+        time = _MDGContext.time_of(context)
+        attribute = self._attribute.split("[")[0]
+        if attribute not in MATRIX_ATTRIBUTES:
+            raise RuntimeError(f"(kFailure): {self.name()} isn't a matrix plug")
+        return _MMatrixData(get_scene().matrix_value(self._node, attribute, time))
+
+
+class _MTime(object):
+    kFilm = 6
+
+    def __init__(self, value=0.0, unit=6):
+        self._value = float(value)
+
+    def value(self):
+        return self._value
+
+    @staticmethod
+    def uiUnit():
+        return _MTime.kFilm
+
+
+class _MDGContext(object):
+    # Contexts made current by _MDGContextGuard, innermost last.
+    _current = []
+
+    def __init__(self, time=None):
+        self._time = time
+
+    @staticmethod
+    def time_of(context):
+        # The time to evaluate at: the given context's, the guarded one's, or None for the current time.
+        if context is None and _MDGContext._current:
+            context = _MDGContext._current[-1]
+        return context._time.value() if context is not None and context._time is not None else None
+
+
+class _MDGContextGuard(object):
+    # Like Maya 2022's, makes a context current until the guard is deleted.
+    def __init__(self, context):
+        self._context = context
+        _MDGContext._current.append(context)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self._restore()
+
+    def __del__(self):
+        self._restore()
+
+    def _restore(self):
+        if self._context is not None:
+            _MDGContext._current.remove(self._context)
+            self._context = None
+
+
+class _MMatrix(object):
+    def __init__(self, values):
+        self._values = list(values)
+
+    def __call__(self, row, column):
+        return self._values[row * 4 + column]
+
+
+class _MMatrixData(_MObject):
+    def __init__(self, values):
+        _MObject.__init__(self, "matrixData")
+        self._values = list(values)
+
+
+class _MFnMatrixData(object):
+    def __init__(self, data):
+        self._data = data
+
+    def matrix(self):
+        return _MMatrix(self._data._values)
+
+
+class _MSelectionList(object):
+    def __init__(self):
+        self._nodes = []
+
+    def add(self, name):
+        node_name, _, attribute = name.partition(".")
+        node = get_scene().get_node(node_name)
+        if attribute:
+            owner, long_name = get_scene().resolve_attribute(node, attribute)
+            index = attribute[attribute.find("["):] if "[" in attribute else ""
+            self._nodes.append((owner, long_name + index))
+        else:
+            self._nodes.append((node, None))
+
+    def length(self):
+        return len(self._nodes)
+
+    def getDagPath(self, index, path):
+        path._node = self._nodes[index][0]
+
+    def getPlug(self, index, plug):
+        node, attribute = self._nodes[index]
+        if attribute is None:
+            raise RuntimeError(f"(kInvalidParameter): {node.name} isn't a plug")
+        plug._node, plug._attribute = node, attribute
+
+
+class _MFnDagNode(object):
+    def __init__(self, path=None):
+        self._node = path._node if path is not None else None
+
+    def findPlug(self, attribute, want_networked_plug=False):
+        found = get_scene().resolve_attribute(self._node, attribute, required=False)
+        if found is None or found[0] is not self._node:
+            raise RuntimeError(f"(kInvalidParameter): No plug named '{attribute}' on {self._node.name}")
+        return _MDataPlug(self._node, found[1])
+
+    def typeName(self):
+        return self._node.type
+
+    def name(self):
+        return self._node.name
+
+
+class _MItDag(object):
+    """
+    Depth first iteration over every DAG node, like OpenMaya.MItDag().
+    """
+    kDepthFirst = 0
+    kBreadthFirst = 1
+
+    def __init__(self, traversal_type=0, filter_type=0):
+        self._items = []
+
+        def walk(node, depth):
+            self._items.append((node, depth))
+            for child in node.children:
+                walk(child, depth + 1)
+
+        for node in list(get_scene().nodes.values()):
+            if node.is_dag() and node.parent is None:
+                walk(node, 1)
+        self._index = 0
+
+    def isDone(self):
+        return self._index >= len(self._items)
+
+    def next(self):
+        self._index += 1
+
+    def depth(self):
+        return self._items[self._index][1]
+
+    def getPath(self, path):
+        path._node = self._items[self._index][0]
+
+    def fullPathName(self):
+        return get_scene().full_path(self._items[self._index][0])
+
+    def partialPathName(self):
+        return self._items[self._index][0].name
+
+
+class _MVector(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __sub__(self, other):
+        return _MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __add__(self, other):
+        return _MVector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __mul__(self, scalar):
+        return _MVector(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normal(self):
+        length = self.length() or 1.0
+        return _MVector(self.x / length, self.y / length, self.z / length)
+
+# ------------------------------------------------------------------------------ #
+def get_scene():
+    """
+    Get the current simulated scene, creating one if needed.
+    """
+    global _SCENE
+    if _SCENE is None:
+        new_scene()
+    return _SCENE
+
+# ------------------------------------------------------------------------------ #
+def get_commands():
+    return _MODULES["commands"]
+
+# ------------------------------------------------------------------------------ #
+def new_scene():
+    """
+    Replace the current scene with an empty one, the same as File > New Scene.
+    """
+    global _SCENE
+    if _SCENE is not None and _CALLBACKS:
+        # Like File > New Scene, let callbacks know the old nodes are gone.
+        _fire_callbacks("node_removed", None)
+    _SCENE = Scene()
+    _MODULES["commands"] = Commands(_SCENE)
+    _MODULES["mel"] = Mel(_MODULES["commands"])
+    return _SCENE
+
+# ------------------------------------------------------------------------------ #
+def install():
+    """
+    Make "import maya.cmds" (and maya.mel, maya.OpenMaya, maya.OpenMayaAnim, maya.api.OpenMaya and pymel.core) use the simulator.
+    """
+    get_scene()
+
+    maya = types.ModuleType("maya")
+    maya.__path__ = []
+    cmds = _CommandModule("maya.cmds", lambda: _MODULES["commands"])
+    mel = _CommandModule("maya.mel", lambda: _MODULES["mel"])
+    open_maya = types.ModuleType("maya.OpenMaya")
+    open_maya.MGlobal = _MGlobal
+    open_maya.MDGMessage = _MDGMessage
+    open_maya.MNodeMessage = _MNodeMessage
+    open_maya.MObject = _MObject
+    open_maya.MMessage = _MMessage
+    open_maya.MItDag = _MItDag
+    open_maya.MDagPath = _MDagPath
+    open_maya.MFnDagNode = _MFnDagNode
+    open_maya.MSelectionList = _MSelectionList
+    open_maya.MPlug = _MDataPlug
+    open_maya.MTime = _MTime
+    open_maya.MDGContext = _MDGContext
+    open_maya.MDGContextGuard = _MDGContextGuard
+    open_maya.MFnMatrixData = _MFnMatrixData
+    open_maya_anim = types.ModuleType("maya.OpenMayaAnim")
+    open_maya_anim.MAnimMessage = _MAnimMessage
+    api = types.ModuleType("maya.api")
+    api.__path__ = []
+    api_open_maya = types.ModuleType("maya.api.OpenMaya")
+    api_open_maya.MVector = _MVector
+    api_open_maya.MGlobal = _MGlobal
+    api_open_maya.MDGMessage = _MDGMessage
+    api_open_maya.MMessage = _MMessage
+    pymel = types.ModuleType("pymel")
+    pymel.__path__ = []
+    pymel_core = types.ModuleType("pymel.core")
+
+    maya.cmds, maya.mel, maya.OpenMaya, maya.OpenMayaAnim, maya.api = cmds, mel, open_maya, open_maya_anim, api
+    api.OpenMaya = api_open_maya
+    pymel.core = pymel_core
+
+    modules = {
+        "maya": maya,
+        "maya.cmds": cmds,
+        "maya.mel": mel,
+        "maya.OpenMaya": open_maya,
+        "maya.OpenMayaAnim": open_maya_anim,
+        "maya.api": api,
+        "maya.api.OpenMaya": api_open_maya,
+        "pymel": pymel,
+        "pymel.core": pymel_core,
+    }
+    for name, module in modules.items():
+        if name not in _ORIGINAL_MODULES:
+            _ORIGINAL_MODULES[name] = sys.modules.get(name)
+        sys.modules[name] = module
+    return modules
+
+# ------------------------------------------------------------------------------ #
+def uninstall():
+    """
+    Restore whatever maya modules were there before install().
+    """
+    for name, module in _ORIGINAL_MODULES.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    _ORIGINAL_MODULES.clear()
+
+# ------------------------------------------------------------------------------ #
+def set_ui_state(selected_channels=None, selected_animation_layers=None, panel_display=None, focused_panel=None):
+    """
+    Set what the simulated Channel Box, Animation Layer Editor and model panel report back to the tools.
+    """
+    scene = get_scene()
+    if selected_channels is not None:
+        scene.selected_channels = list(selected_channels)
+    if selected_animation_layers is not None:
+        scene.selected_animation_layers = list(selected_animation_layers)
+    if panel_display is not None:
+        scene.panel_display.update(panel_display)
+    if focused_panel is not None:
+        scene.focused_panel = focused_panel
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                             RIG GENERATOR                            #
+#                                                                      #
+########################################################################
+
+# ------------------------------------------------------------------------------ #
+def generate_rig(
+    controls=100,
+    frames=100,
+    layers=0,
+    constraints=0,
+    key_step=5,
+    chain_length=5,
+    hidden_ratio=0.1,
+    locked_ratio=0.1,
+    seed=0,
+    new=True,
+    pair_blends=False
+):
+    """
+    Build a synthetic rig, with keyed FK chains of NURBS curve controls.
+
+    :param controls: Number of controls to create.
+    :type controls: int
+    :param frames: Length of the playback range. Keys are set across all of it.
+    :type frames: int
+    :param layers: Number of additive animation layers. Each one holds a share of the controls, with their own keys.
+    :type layers: int
+    :param constraints: Number of extra controls parent constrained to their own keyed driver locator.
+    :type constraints: int
+    :param key_step: Frames between keys.
+    :type key_step: int
+    :param chain_length: Controls per FK chain. Chain children have locked translates.
+    :type chain_length: int
+    :param hidden_ratio: Share of controls that are hidden, or drawn as reference.
+    :type hidden_ratio: float
+    :param locked_ratio: Share of controls with locked and hidden scale attributes.
+    :type locked_ratio: float
+    :param seed: Seed for the random values, so the same arguments always build the same rig.
+    :type seed: int
+    :param new: If True, start from an empty scene.
+    :type new: bool
+    :param pair_blends: If True, constraining keyed attributes afterwards puts a pairBlend between them and their keys, like Maya.
+    :type pair_blends: bool
+    :return: Names of what was created, under "controls", "drivers", "constrained", "layers" and "root".
+    :rtype: dict
+
+    """
+    scene = new_scene() if new else get_scene()
+    rng = random.Random(seed)
+    scene.pair_blends = pair_blends
+    scene.playback_range = [1.0, float(frames)]
+    scene.animation_range = [1.0, float(frames)]
+    scene.current_time = 1.0
+    key_frames = list(range(1, frames + 1, max(1, key_step)))
+    if key_frames[-1] != frames:
+        key_frames.append(frames)
+
+    root = scene.create_transform("rig_grp")
+    controls_group = scene.create_transform("controls_grp", parent=root.name)
+
+    def key_attribute(node, attribute, amplitude, base=0.0):
+        curve = scene.create_curve(node, attribute)
+        phase = rng.uniform(0.0, math.pi * 2)
+        period = rng.uniform(20.0, 60.0)
+        curve.data["keys"] = [
+            _Key(frame, base + amplitude * math.sin(phase + frame / period * math.pi * 2))
+            for frame in key_frames
+        ]
+        curve.data["times"] = [float(frame) for frame in key_frames]
+        scene.connect(curve.name + ".output", scene.plug_name(node, attribute))
+
+    names = {"root": root.name, "controls": [], "drivers": [], "constrained": [], "layers": []}
+
+    # ---------------------------------------
+    # 01. FK CHAINS OF CONTROLS.
+    # ---------------------------------------
+    previous = None
+    for i in range(controls):
+        is_chain_root = i % max(1, chain_length) == 0
+        parent = controls_group if is_chain_root else previous
+        control = scene.create_transform(f"ctrl_{i:05d}", parent=parent.name, shape_type="nurbsCurve")
+        names["controls"].append(control.name)
+
+        if is_chain_root:
+            control.attributes["translateX"].value = rng.uniform(-50.0, 50.0)
+            control.attributes["translateZ"].value = rng.uniform(-50.0, 50.0)
+            for axis in "XYZ":
+                key_attribute(control, "translate" + axis, rng.uniform(1.0, 10.0), control.attributes["translate" + axis].value)
+        else:
+            control.attributes["translateY"].value = 10.0
+            for axis in "XYZ":
+                control.attributes["translate" + axis].lock = True
+                control.attributes["translate" + axis].keyable = False
+        for axis in "XYZ":
+            key_attribute(control, "rotate" + axis, rng.uniform(5.0, 45.0))
+
+        if rng.random() < locked_ratio:
+            for axis in "XYZ":
+                control.attributes["scale" + axis].lock = True
+                control.attributes["scale" + axis].keyable = False
+
+        if rng.random() < hidden_ratio:
+            shape = scene.shapes_of(control)[0]
+            if rng.random() < 0.5:
+                shape.attributes["overrideEnabled"].value = True
+                shape.attributes["overrideDisplayType"].value = 2
+            else:
+                shape.attributes["visibility"].value = False
+        previous = control
+
+    # ---------------------------------------
+    # 01. CONSTRAINED CONTROLS.
+    # ---------------------------------------
+    commands = get_commands()
+    for i in range(constraints):
+        driver = scene.create_transform(f"driver_{i:04d}", parent=root.name, shape_type="locator")
+        for axis in "XYZ":
+            key_attribute(driver, "translate" + axis, rng.uniform(1.0, 20.0), rng.uniform(-50.0, 50.0))
+            key_attribute(driver, "rotate" + axis, rng.uniform(5.0, 90.0))
+        driven = scene.create_transform(f"constrained_{i:04d}", parent=controls_group.name, shape_type="nurbsCurve")
+        driven.attributes["translateY"].value = rng.uniform(0.0, 20.0)
+        commands.parentConstraint(driver.name, driven.name, maintainOffset=True)
+        names["drivers"].append(driver.name)
+        names["constrained"].append(driven.name)
+
+    # ---------------------------------------
+    # 01. ANIMATION LAYERS.
+    # ---------------------------------------
+    for layer_index in range(layers):
+        layer = scene.create_animation_layer(name=f"AnimLayer{layer_index + 1}")
+        names["layers"].append(layer.name)
+        members = names["controls"][layer_index::layers + 1]
+        for control_name in members:
+            control = scene.nodes[control_name]
+            for axis in "XYZ":
+                attribute = "rotate" + axis
+                scene.add_to_animation_layer(layer, control, attribute)
+                blend = scene.layer_blends(control, attribute)[layer.name]
+                curve = scene.create_curve(control, attribute, name=f"{blend.name}_inputB")
+                layer_key_frames = key_frames[::4] or key_frames
+                curve.data["keys"] = [_Key(frame, rng.uniform(-10.0, 10.0)) for frame in layer_key_frames]
+                curve.data["times"] = [float(frame) for frame in layer_key_frames]
+                scene.connect(curve.name + ".output", blend.name + ".inputB")
+
+    scene.selection = []
+    scene._touch()
+    return names
+
+# ------------------------------------------------------------------------------ #
+def _unwrap_curve(curve):
+    keys = curve.data["keys"]
+    for previous, key in zip(keys, keys[1:]):
+        while key.value - previous.value > 180.0:
+            key.value -= 360.0
+        while key.value - previous.value < -180.0:
+            key.value += 360.0
+
+# ------------------------------------------------------------------------------ #
+def _plug_sort_key(node):
+    order = {name: i for i, name in enumerate(node.attributes)}
+
+    def sort_key(plug):
+        attribute = plug.partition(".")[2]
+        return (order.get(attribute.split("[")[0], len(order)), attribute)
+    return sort_key
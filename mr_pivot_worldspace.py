@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_pivot_worldspace.py
-# VERSION: 0004
+# VERSION: 0015
 #
 # CREATORS: Maria Robertson 
 # CREDIT: Daniel Fotheringham
@@ -28,6 +28,8 @@
 #          - If nothing is selected, the pivot will be created at origin.
 #          - If one or more objects are selected, the pivot will be created at the average position and orientation that
 #            the object/s are travelling in, between the current and next frame.
+#          - With a motion_window, the pivot's Z axis points the way the object/s travel over that many frames either side
+#            of the current frame, with Y kept as close to world up as it can be.
 #
 # PHASE 2 - SELECT OBJECTS TO BE PIVOTED:
 #     If TEMP_PIVOT_loc exists with no children, create baked offset locators inside the pivot
@@ -50,6 +52,33 @@ importlib.reload(mr_pivot_worldspace)
 mr_pivot_worldspace.main("all")
 mr_pivot_worldspace.main("current_frame")
 
+# Lighter curves, keyed only where needed to stay within a tolerance (in scene units and degrees):
+mr_pivot_worldspace.main("all", tolerance=0.01)
+
+# Remove the keys each baked curve can do without afterwards, instead of running filterCurve:
+mr_pivot_worldspace.main("all", reduce_keys=True)
+
+# Only key where the selected objects already had keys, with tangents solved to follow the motion in between:
+mr_pivot_worldspace.main("all", keep_key_timing=True)
+
+# For very long ranges, bake 500 frames at a time with a progress bar. Press Esc to cancel:
+mr_pivot_worldspace.main("all", chunk_size=500)
+
+# When baking the same objects again, only sample the frames whose upstream keys changed since the last bake:
+mr_pivot_worldspace.main("all", incremental=True)
+
+# Point the new pivot the way the selection travels over 3 frames either side of the current frame, instead of to the next frame:
+mr_pivot_worldspace.main("all", motion_window=3)
+
+# ---------------------------------------
+# REQUIREMENTS:
+# ---------------------------------------
+# The mr_utilities.py file, for support functions:
+# https://github.com/maria137-art/MayaAnimScripts/blob/main/mr_utilities.py
+#
+# For the tolerance, reduce_keys, keep_key_timing, chunk_size and incremental options, the mr_bakeEngine.py file and NumPy.
+# Creating the pivot from a selection also uses the mr_bakeEngine.py file and NumPy.
+#
 # ---------------------------------------
 # RESEARCH THAT HELPED:
 # ---------------------------------------
@@ -57,13 +86,49 @@ mr_pivot_worldspace.main("current_frame")
 # 
 # WISH LIST:
 # ---------------------------------------
-# - Save control keys + tangents, and apply it to the bake
-# - Delete redundant keys
 # - Bake everything into the new pivot at once, rather one at a time
 # 
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0015:
+# - Added incremental option for baking the whole range, only sampling frames whose upstream keys changed since the last bake.
+#
+# 2026-10-17 - 0014:
+# - mr_utilities and mr_bakeEngine are imported without reloading them, so their caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0013:
+# - Controls are constrained to their baked offset locators with mr_utilities.constrain_unlocked_in_bulk(), all at once.
+#   Channels with every axis locked are skipped, instead of erroring.
+#
+# 2026-10-17 - 0012:
+# - Added motion_window option, to point a new pivot's Z axis the way the selection travels,
+#   fitted with mr_utilities.get_motion_pivot_matrices() over that many frames either side, without changing the current time.
+#
+# 2026-10-17 - 0011:
+# - Baking the whole range bakes objects in groups ordered by mr_bakeEngine.get_bake_order(), each without simulation.
+#   Only objects caught in, or driven by, a constraint cycle are simulated, with a warning.
+#
+# 2026-10-17 - 0010:
+# - The pivot is placed at the selection's average with mr_utilities.get_average_transform(), on both frames at once,
+#   instead of temporary point and orient constraints.
+#
+# 2026-10-17 - 0009:
+# - Added chunk_size option, to bake long ranges a chunk at a time with a progress bar. Esc cancels, keeping the pivot.
+# - Viewport refreshes are turned back on even if baking fails.
+#
+# 2026-10-17 - 0008:
+# - Added keep_key_timing option for baking the whole range, keying only on the selected objects' original key times.
+#
+# 2026-10-17 - 0007:
+# - Added reduce_keys option for baking the whole range, using mr_bakeEngine.reduce_object_curves() instead of filterCurve.
+#
+# 2026-10-17 - 0006:
+# - Added tolerance option for baking the whole range, using mr_bakeEngine.bake_attributes() to key only the frames needed.
+#
+# 2026-10-17 - 0005:
+# - Reading the pivot's position on the current and next frame with mr_utilities.sample_plugs(), instead of 6 getAttr calls.
+#
 # 2023-12-28 - 0004:
 # - Adjusting check for valid run command inputs.
 #
@@ -83,12 +148,16 @@ import maya.cmds as cmds
 import maya.api.OpenMaya as om
 import maya.mel as mel
 
+import math
 import importlib
 import mr_find_constraint_targets_and_drivers
 importlib.reload(mr_find_constraint_targets_and_drivers)
+import mr_utilities
+import mr_bakeEngine
 
 
-def main(bake_range=None):
+def main(bake_range=None, tolerance=None, reduce_keys=False, keep_key_timing=False, chunk_size=None, motion_window=None,
+         incremental=False):
     # -------------------------------------------------------------------
     # 01. CHECK IF bake_range IS CORRECT.
     # -------------------------------------------------------------------
@@ -122,7 +191,10 @@ def main(bake_range=None):
             if bake_range == "current_frame":
                 bake_current_frame(pivot_children)
             elif bake_range == "all":
-                bake_and_delete_constraints(startTime, endTime)
+                # If the bake was cancelled, keep the pivot to try again.
+                if not bake_and_delete_constraints(startTime, endTime, tolerance, reduce_keys, keep_key_timing, chunk_size,
+                                                   incremental):
+                    return
 
             cmds.delete(temp_pivot)
 
@@ -181,7 +253,10 @@ def main(bake_range=None):
             if bake_range == "current_frame":
                 bake_current_frame(pivot_locators)
             elif bake_range == "all":
-                bake_and_delete_constraints(startTime, endTime)
+                if not bake_and_delete_constraints(startTime, endTime, tolerance, reduce_keys, keep_key_timing, chunk_size,
+                                                   incremental):
+                    cmds.delete(pivot_locators)
+                    return
 
             """
             # Constrain controls to baked offset locators.
@@ -189,10 +264,8 @@ def main(bake_range=None):
                 cmds.pointConstraint(pivot_locators[i], sel[i])
                 cmds.orientConstraint(pivot_locators[i], sel[i], mo=True)
             """
-            # Constrain controls to baked offset locators.
-            for i in range(len(pivot_locators)):
-                constrain_unlocked_translates(pivot_locators[i], sel[i])
-                constrain_unlocked_rotates(pivot_locators[i], sel[i])   
+            # Constrain controls to baked offset locators, all at once.
+            mr_utilities.constrain_unlocked_in_bulk(pivot_locators, sel, "both")
 
             cmds.select(temp_pivot)
 
@@ -214,60 +287,71 @@ def main(bake_range=None):
             cmds.setAttr(f"{temp_pivot}.localScaleX", 100)
             cmds.setAttr(f"{temp_pivot}.localScaleY", 100)
 
-            # Average position and rotation of temp_pivot between selected.
-            for item in sel:
-                cmds.pointConstraint(item, temp_pivot)
-                cmds.orientConstraint(item, temp_pivot)
-
             # Declare time.
             current_frame = cmds.currentTime(q=True)
             next_frame = current_frame + 1
 
             # -------------------------------------------------------------------
-            # 03. AIM PIVOT LOCATOR IN DIRECTION OF MOVEMENT, BASED ON CURRENT FRAME
+            # 03. WITH A MOTION WINDOW, POINT THE PIVOT WHERE THE SELECTION TRAVELS, FITTED OVER THE WINDOW.
             # -------------------------------------------------------------------
-            # Research for using vector data: 
-            # https://forums.cgsociety.org/t/find-position-between-2-points/1286034/4
-            # Research on error "An array expression element must be a scalar value"
-            # https://forums.cgsociety.org/t/n-array-expression-element-must-be-a-scalar-value/1203879
-
-            # Get coordinates of worldspace locator attached to object.
-            a1 = cmds.getAttr(temp_pivot + ".translateX", time=current_frame)
-            a2 = cmds.getAttr(temp_pivot + ".translateY", time=current_frame)
-            a3 = cmds.getAttr(temp_pivot + ".translateZ", time=current_frame)
-
-            b1 = cmds.getAttr(temp_pivot + ".translateX", time=next_frame)
-            b2 = cmds.getAttr(temp_pivot + ".translateY", time=next_frame)
-            b3 = cmds.getAttr(temp_pivot + ".translateZ", time=next_frame)
-
-            cmds.delete(temp_pivot, constraints=True)
-
-            # Convert to MVector.
-            v1 = om.MVector(a1, a2, a3)
-            v2 = om.MVector(b1, b2, b3)
+            # Sampled in one read, without changing the current time.
+            if motion_window:
+                matrix = mr_utilities.get_motion_pivot_matrices([sel], current_frame, motion_window)[0]
+                linear_scale = mr_utilities.LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+                rotation = mr_bakeEngine.get_euler_rotations(matrix).tolist()
+                if cmds.currentUnit(query=True, angle=True) == "rad":
+                    rotation = [math.radians(angle) for angle in rotation]
+                cmds.xform(temp_pivot, worldSpace=True, translation=(matrix[3, :3] * linear_scale).tolist())
+                cmds.xform(temp_pivot, worldSpace=True, rotation=rotation)
 
-            # Calculate direction vector.
-            d = v1 - v2
-
-            # Normalise.
-            normalized_d = d.normal()
-
-            # Convert back to float.
-            new_p = [normalized_d.x, normalized_d.y, normalized_d.z]
-
-            # Aim based on World Up Vector on next frame.
-            cmds.currentTime(next_frame)
-
-            cmds.aimConstraint(
-                last_in_selected,
-                temp_pivot,
-                aimVector=(1, 0, 0),
-                upVector=(0, 1, 0),
-                worldUpType="vector",
-                worldUpVector=new_p
-            )
-            cmds.delete(temp_pivot, constraints=True)
-            cmds.currentTime(current_frame)
+            # -------------------------------------------------------------------
+            # 03. OTHERWISE, AIM IT BASED ON THE CURRENT AND NEXT FRAME.
+            # -------------------------------------------------------------------
+            else:
+                # Average position and rotation of selected, on both frames at once, without constraints.
+                positions, quaternions = mr_utilities.get_average_transform(sel, [current_frame, next_frame])
+
+                # Place temp_pivot at the average on the current frame.
+                rotation = mr_bakeEngine.get_euler_rotations(mr_utilities.get_matrices_from_quaternions(quaternions[0])).tolist()
+                if cmds.currentUnit(query=True, angle=True) == "rad":
+                    rotation = [math.radians(angle) for angle in rotation]
+                cmds.xform(temp_pivot, worldSpace=True, translation=positions[0].tolist())
+                cmds.xform(temp_pivot, worldSpace=True, rotation=rotation)
+
+                # -------------------------------------------------------------------
+                # 04. AIM PIVOT LOCATOR IN DIRECTION OF MOVEMENT, BASED ON CURRENT FRAME
+                # -------------------------------------------------------------------
+                # Research for using vector data: 
+                # https://forums.cgsociety.org/t/find-position-between-2-points/1286034/4
+                # Research on error "An array expression element must be a scalar value"
+                # https://forums.cgsociety.org/t/n-array-expression-element-must-be-a-scalar-value/1203879
+
+                # Convert to MVector.
+                v1 = om.MVector(*positions[0])
+                v2 = om.MVector(*positions[1])
+
+                # Calculate direction vector.
+                d = v1 - v2
+
+                # Normalise.
+                normalized_d = d.normal()
+
+                # Convert back to float.
+                new_p = [normalized_d.x, normalized_d.y, normalized_d.z]
+
+                # Aim based on World Up Vector on next frame.
+                cmds.currentTime(next_frame)
+
+                cmds.aimConstraint(
+                    last_in_selected,
+                    temp_pivot,
+                    aimVector=(1, 0, 0),
+                    upVector=(0, 1, 0),
+                    worldUpType="vector",
+                    worldUpVector=new_p
+                )
+                cmds.delete(temp_pivot, constraints=True)
+                cmds.currentTime(current_frame)
 
             cmds.select(sel)
             print("Run mr_changeWorldspacePivot again when ready, to bake selected objects under the pivot.\n")
@@ -295,25 +379,67 @@ def main(bake_range=None):
 #                                                                      #
 ########################################################################
 
-def bake_and_delete_constraints(startTime, endTime):
-    cmds.refresh(suspend=True)
-
-    cmds.bakeResults(
-        simulation=True,
-        time=(startTime, endTime),
-        sampleBy=1,
-        disableImplicitControl=True,
-        preserveOutsideKeys=True,
-        sparseAnimCurveBake=False,
-        removeBakedAttributeFromLayer=False,
-        removeBakedAnimFromLayer=False,
-        bakeOnOverrideLayer=False
-    )
-
-    cmds.delete(staticChannels=True)
-    cmds.filterCurve()
-    cmds.delete(constraints=True)
-    cmds.refresh(suspend=False)
+def bake_and_delete_constraints(startTime, endTime, tolerance=None, reduce_keys=False, keep_key_timing=False, chunk_size=None,
+                                incremental=False):
+    # Returns False if the bake was cancelled, leaving the constraints in place.
+    # Viewport refreshes are always turned back on, even if the bake fails.
+    with mr_utilities.suspended_refresh():
+        # With a tolerance, only key the frames each channel needs to stay within it.
+        # Keeping key timing only keys where the objects already had keys.
+        # With a chunk_size, long ranges are baked a chunk at a time, with a progress bar. Esc cancels.
+        # Incremental bakes reuse values from the last bake of each channel, wherever nothing upstream changed.
+        # Values are sampled without moving the time slider, so this doesn't simulate dynamics.
+        if tolerance is not None or keep_key_timing or chunk_size or incremental:
+            object_attributes = []
+            for obj in cmds.ls(selection=True):
+                for attr in ["translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ"]:
+                    if not cmds.getAttr(f"{obj}.{attr}", lock=True):
+                        object_attributes.append(f"{obj}.{attr}")
+
+            key_times = None
+            if keep_key_timing:
+                key_times = mr_bakeEngine.get_key_times(cmds.ls(selection=True), startTime, endTime)
+            try:
+                mr_bakeEngine.bake_attributes(
+                    object_attributes, startTime, endTime, tolerance=tolerance, key_times=key_times, chunk_size=chunk_size,
+                    incremental=incremental
+                )
+            except mr_bakeEngine.BakeCancelled as error:
+                cmds.warning(str(error))
+                return False
+            cmds.delete(constraints=True)
+            return True
+
+        # Bake objects in the order they depend on each other, so each group can bake without simulation.
+        # Only objects caught in, or driven by, a constraint cycle need simulating.
+        objects = cmds.ls(selection=True)
+        bake_groups, simulated_objects, cycles = mr_bakeEngine.get_bake_order(objects)
+        for cycle in cycles:
+            cmds.warning("Constraint cycle found, baking what it drives with simulation: " + ", ".join(cycle))
+
+        bake_options = dict(
+            time=(startTime, endTime),
+            sampleBy=1,
+            disableImplicitControl=True,
+            preserveOutsideKeys=True,
+            sparseAnimCurveBake=False,
+            removeBakedAttributeFromLayer=False,
+            removeBakedAnimFromLayer=False,
+            bakeOnOverrideLayer=False
+        )
+        for bake_group in bake_groups:
+            cmds.bakeResults(bake_group, simulation=False, **bake_options)
+        if simulated_objects:
+            cmds.bakeResults(simulated_objects, simulation=True, **bake_options)
+
+        cmds.delete(staticChannels=True)
+        # Remove keys the baked curves can do without.
+        if reduce_keys:
+            mr_bakeEngine.reduce_object_curves(cmds.ls(selection=True))
+        else:
+            cmds.filterCurve()
+        cmds.delete(constraints=True)
+    return True
 
 ##################################################################################################################################################
 
@@ -332,39 +458,3 @@ def lock_hide_attribute(source, attr):
     source_attr = source + "." + attr
     cmds.setAttr(source_attr, keyable=False)
     cmds.setAttr(source_attr, lock=True)
-
-##################################################################################################################################################
-    
-def constrain_unlocked_translates(driver, item):
-    # Check if translate X, Y, Z are locked
-    skip_trans_axes = []
-    if cmds.getAttr(item + ".translateX", lock=True):
-        skip_trans_axes.append("x")
-    if cmds.getAttr(item + ".translateY", lock=True):
-        skip_trans_axes.append("y")
-    if cmds.getAttr(item + ".translateZ", lock=True):
-        skip_trans_axes.append("z")
-
-    # Apply point constraint with skipping specified axes
-    if skip_trans_axes:
-        cmds.pointConstraint(driver, item, maintainOffset=True, weight=1, skip=skip_trans_axes)
-    else:
-        cmds.pointConstraint(driver, item, maintainOffset=True, weight=1)
-
-##################################################################################################################################################
-
-def constrain_unlocked_rotates(driver, item):
-    # Check if rotate X, Y, Z are locked
-    skip_rot_axes = []
-    if cmds.getAttr(item + ".rotateX", lock=True):
-        skip_rot_axes.append("x")
-    if cmds.getAttr(item + ".rotateY", lock=True):
-        skip_rot_axes.append("y")
-    if cmds.getAttr(item + ".rotateZ", lock=True):
-        skip_rot_axes.append("z")
-
-    # Apply orient constraint with skipping specified axes
-    if skip_rot_axes:
-        cmds.orientConstraint(driver, item, maintainOffset=True, weight=1, skip=skip_rot_axes)
-    else:
-        cmds.orientConstraint(driver, item, maintainOffset=True, weight=1)
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_selectVisibleControls.py
-# VERSION: 0010
+# VERSION: 0013
 #
 # CREATORS: Maria Robertson
 # ---------------------------------------
@@ -44,17 +44,17 @@ mr_selectVisibleControls.select_visible_curves_and_keyed_locators_in_panel()
 
 import maya.cmds as cmds
 
-import importlib
 import mr_utilities
-importlib.reload(mr_utilities)
 
 # ------------------------------------------------------------------------------ #
-def get_visible_NURBS_curves_in_panel(only_keyed=False):
+def get_visible_NURBS_curves_in_panel(only_keyed=False, display_states=None):
     """
     Get a list of visible NURBS curve transform nodes in the current Maya modelPanel.
     
     :param only_keyed: If True, only return nodes that have keys on them.
     :type only_keyed: bool
+    :param display_states: States from mr_utilities.get_dag_display_states(), to reuse. If None, they're read from the scene.
+    :type display_states: dict, optional
     :return: List of visible NURBS curve transform nodes.
     :rtype: list (str)
     """
@@ -67,45 +67,22 @@ def get_visible_NURBS_curves_in_panel(only_keyed=False):
     if not cmds.modelEditor(modelPanel, query=True, nurbsCurves=True):
         return []
    
-   # Get all visible nurb curves.
-    visible_transforms = cmds.ls(type='transform', visible=True, dag=True)
-    visible_nurbs_curve_transforms = (
-        node 
-        for node in visible_transforms
-        if (
-            # Check the node.
-            mr_utilities.is_nurbs_curve(node) and
-            mr_utilities.is_visible(node) and
-
-            # Check if at least one its shapes are visible.
-            any(
-                mr_utilities.is_visible(shape) 
-                for shape in cmds.listRelatives(node, shapes=True) or ()
-
-            # Check if at least one of its shapes have their Drawing Override set to Normal.
-            ) and 
-            any(
-                (
-                    # Fetch the overrideDisplayType attribute for the shape.
-                    cmds.getAttr(f"{shape}.overrideDisplayType") == 0
-                    
-                    # If it's an integer, check if it's equal to 0.
-                    if isinstance(cmds.getAttr(f"{shape}.overrideDisplayType"), int)
-
-                    # If it's a list, check if any shape in it is 0.
-                    else any(
-                        override == 0
-                        for override in cmds.getAttr(f"{shape}.overrideDisplayType")
-                    )
-                )
-                for shape in cmds.listRelatives(node, shapes=True) or ()
-            ) and
-
-            # Check its parent's visibility.
-            mr_utilities.are_parents_visible(node)
-        )
-    )
-
+    # Get the visibility of every DAG node at once.
+    # This includes parents, drawing overrides and display layers, and hides Template or Reference shapes.
+    visibility_map = mr_utilities.get_dag_visibility_map(normal_display_only=True, display_states=display_states)
+
+    # Get transforms with at least one visible NURBS curve shape.
+    visible_nurbs_curve_transforms = []
+    found_transforms = set()
+    for shape in cmds.ls(type="nurbsCurve", long=True) or []:
+        if not visibility_map.get(shape):
+            continue
+        transform = shape.rsplit("|", 1)[0]
+        if transform not in found_transforms:
+            found_transforms.add(transform)
+            visible_nurbs_curve_transforms.append(transform)
+    # Give names the way ls does, not full paths.
+    visible_nurbs_curve_transforms = cmds.ls(visible_nurbs_curve_transforms) if visible_nurbs_curve_transforms else []
 
     # OPTIONAL - Select only keyed visible NURBS curves.
     if only_keyed:
@@ -116,12 +93,14 @@ def get_visible_NURBS_curves_in_panel(only_keyed=False):
         # print(f'Found {len(visible_nurbs_curve_transforms)} valid NURBS curves.')
 
 # ------------------------------------------------------------------------------ #
-def get_visible_locators_in_panel(only_keyed=False):
+def get_visible_locators_in_panel(only_keyed=False, display_states=None):
     """
     Get a list of visible locators in the current Maya modelPanel.
     
     :param only_keyed: If True, only return nodes that are keyed.
     :type only_keyed: bool
+    :param display_states: States from mr_utilities.get_dag_display_states(), to reuse. If None, they're read from the scene.
+    :type display_states: dict, optional
     :return: Generator of visible locator transform nodes.
     :rtype: generator (str)
     """
@@ -135,16 +114,15 @@ def get_visible_locators_in_panel(only_keyed=False):
         return []
 
     # Get transforms of visible locators.
-    visible_locator_shapes = cmds.ls(type="locator", visible=True)
-    visible_locator_shapes = (
-        shape for shape in visible_locator_shapes
-        if (
-            mr_utilities.is_visible(shape)
-        )
-    )
-
-    for shape in visible_locator_shapes:
-        loc_transform = cmds.listRelatives(shape, parent=True)[0]
+    visibility_map = mr_utilities.get_dag_visibility_map(display_states=display_states)
+    visible_locator_transforms = list(dict.fromkeys(
+        shape.rsplit("|", 1)[0] for shape in cmds.ls(type="locator", long=True) or []
+        if visibility_map.get(shape)
+    ))
+    # Give names the way ls does, not full paths.
+    visible_locator_transforms = cmds.ls(visible_locator_transforms) if visible_locator_transforms else []
+
+    for loc_transform in visible_locator_transforms:
         
         # OPTIONAL - Select only keyed visible locators.
         if only_keyed:
@@ -159,9 +137,12 @@ def select_visible_curves_and_keyed_locators_in_panel():
     Selects visible NURBS curves and visible keyed locators in the current Maya model panel.
 
     """
-    curves = get_visible_NURBS_curves_in_panel(only_keyed=False)
+    # Read the visibility of every DAG node once, for both curves and locators.
+    display_states = mr_utilities.get_dag_display_states()
+
+    curves = get_visible_NURBS_curves_in_panel(only_keyed=False, display_states=display_states)
 
-    keyed_locators = get_visible_locators_in_panel(only_keyed=True)
+    keyed_locators = get_visible_locators_in_panel(only_keyed=True, display_states=display_states)
 
     cmds.select(curves, replace=True)
     cmds.select(keyed_locators, add=True)
@@ -171,6 +152,20 @@ def select_visible_curves_and_keyed_locators_in_panel():
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0013:
+#   - Visible curves and locators are named like cmds.ls() gives, by shortest unique name, instead of by full DAG path as in 0011.
+#   - select_visible_curves_and_keyed_locators_in_panel() reads the scene's visibility once, with mr_utilities.get_dag_display_states(),
+#     and shares it between both searches.
+#
+# 2026-10-17 - 0012:
+#   - mr_utilities is imported without reloading it, so its caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0011:
+#   - get_visible_NURBS_curves_in_panel() and get_visible_locators_in_panel()
+#       - Now use mr_utilities.get_dag_visibility_map(), which reads each node's visibility once for the whole scene,
+#         instead of checking every node's parents and shapes with separate queries.
+#       - Drawing override visibility and display layers are now taken into account too.
+#
 # 2024-05-27 - 0010:
 #   - get_visible_NURBS_curves_in_panel()
 #       - Edits based on working with unfinished rigs (that had part of its control shapes hidden).
@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_tempPin.py
-# VERSION: 0011
+# VERSION: 0015
 #
 # CREATORS: Maria Robertson
 # ---------------------------------------
@@ -39,6 +39,10 @@
 #   - "average"
 #   - "last_selected"
 #
+# With use_constraints=False, nothing is constrained while the pin exists, which keeps playback fast when pinning many controls.
+# Each object's offset from its pin is stored on the pin instead, and objects are keyed straight from it when the script runs again.
+# Objects won't follow the pin until then.
+#
 # ---------------------------------------
 # RUN COMMANDS:
 # ---------------------------------------
@@ -59,24 +63,43 @@ mr_tempPin.multiple("both", "last_selected")
 mr_tempPin.multiple("translate", "last_selected")
 mr_tempPin.multiple("rotate", "last_selected")
 
+# Pins that don't constrain anything until objects are keyed:
+mr_tempPin.single("both", use_constraints=False)
+mr_tempPin.multiple("both", "average", use_constraints=False)
+
 # ---------------------------------------
 # REQUIREMENTS: 
 # ---------------------------------------
 # Must have mr_find_constraint_targets_and_drivers.py in order to use mr_find_targets_of_selected()
 #
+# The mr_utilities.py and mr_bakeEngine.py files, and NumPy, to place pins without constraints.
+#
 # ------------------------------------------------------------------------------ #
 """
 
 import maya.cmds as cmds
 import maya.mel as mel
 
+import json
+
 import importlib
 import mr_find_constraint_targets_and_drivers
 importlib.reload(mr_find_constraint_targets_and_drivers)
+import mr_utilities
+import mr_bakeEngine
+
+# NumPy ships with Maya 2022 and later.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Attribute on pins made with use_constraints=False, holding the mode and each object's offset from the pin.
+PIN_OFFSETS_ATTRIBUTE = "tempPinOffsets"
 
 ##################################################################################################################################################
 
-def single(mode=None):
+def single(mode=None, use_constraints=True):
     temp_pin = "TEMP_worldspace_locator"
 
     # -------------------------------------------------------------------
@@ -90,7 +113,10 @@ def single(mode=None):
     # 00. CHECK IF TEMP PIN ALREADY EXISTS.
     # -------------------------------------------------------------------
     if cmds.objExists(temp_pin):
-        key_targets(temp_pin)
+        if is_matrix_pin(temp_pin):
+            key_targets_from_offsets([temp_pin])
+        else:
+            key_targets(temp_pin)
         cmds.delete(temp_pin)
 
         # Refresh the viewport.
@@ -110,10 +136,19 @@ def single(mode=None):
         cmds.setAttr(loc + "Shape.localScaleY", 10)
         cmds.setAttr(loc + "Shape.localScaleZ", 10)
 
-        match_average_position_of_objects(sel, loc)
-
+        if use_constraints:
+            match_average_position_of_objects(sel, loc)
+        else:
+            # Place the pin and remember each object's offset from it, without constraints.
+            pin_matrices = get_pin_matrices(sel)
+            pin_matrix = get_average_pin_matrix(pin_matrices)
+            set_world_matrix(loc, pin_matrix)
+            store_pin_offsets(loc, sel, pin_matrices["world"] @ np.linalg.inv(pin_matrix), mode)
+
+        if use_constraints:
+            # Constrain every object at once, reading which attributes are locked once per object.
+            mr_utilities.constrain_unlocked_in_bulk(loc, sel, mode)
         for item in sel:
-            constrain_unlocked_attributes(loc, item, mode)
             lock_and_hide_same_attributes(loc, item, mode)
 
         # Set a blank keyframe, to remember the frame the loc was created on.
@@ -123,7 +158,7 @@ def single(mode=None):
 
 ##################################################################################################################################################
 
-def multiple(mode=None, position=None):
+def multiple(mode=None, position=None, use_constraints=True):
     temp_pin_group = "TEMP_worldspace_locator_grp"
 
     # -------------------------------------------------------------------
@@ -141,7 +176,10 @@ def multiple(mode=None, position=None):
     # -------------------------------------------------------------------
     if cmds.objExists(temp_pin_group):
         children = cmds.listRelatives(temp_pin_group, children=True)
-        key_targets(children)
+        if is_matrix_pin(children[0]):
+            key_targets_from_offsets(children)
+        else:
+            key_targets(children)
         cmds.delete(temp_pin_group)
 
     # -------------------------------------------------------------------
@@ -160,12 +198,22 @@ def multiple(mode=None, position=None):
             # Create a group.
             cmds.group(empty=True, name=temp_pin_group)
 
+            # Without constraints, every object's pivot is read at once, to place everything from.
+            pin_matrices = None if use_constraints else get_pin_matrices(sel)
+
             if position == "average":
-                match_average_position_of_objects(sel, temp_pin_group)
+                if use_constraints:
+                    match_average_position_of_objects(sel, temp_pin_group)
+                else:
+                    set_world_matrix(temp_pin_group, get_average_pin_matrix(pin_matrices))
             if position == "last_selected":
-                match_position_of_object(sel[-1], temp_pin_group)
+                if use_constraints:
+                    match_position_of_object(sel[-1], temp_pin_group)
+                else:
+                    set_world_matrix(temp_pin_group, pin_matrices["pivot"][-1])
 
-            for item in sel:
+            locators = []
+            for i, item in enumerate(sel):
                 # Create a locator.
                 loc = cmds.spaceLocator(name=("TEMP_worldspace_" + item + "_loc"))[0]
                 cmds.setAttr(loc + "Shape.localScaleX", 10)
@@ -173,16 +221,24 @@ def multiple(mode=None, position=None):
                 cmds.setAttr(loc + "Shape.localScaleZ", 10)
 
                 # Position and orient it at its target.
-                cmds.pointConstraint(item, loc)
-                cmds.orientConstraint(item, loc)
-                cmds.delete(loc, constraints=True)
+                if use_constraints:
+                    match_position_of_object(item, loc)
+                else:
+                    set_world_matrix(loc, pin_matrices["pivot"][i])
 
                 # Parent into temp_pin_group.
-                cmds.parent(loc, temp_pin_group)
+                loc = cmds.parent(loc, temp_pin_group)[0]
+                locators.append(loc)
 
-                constrain_unlocked_attributes(loc, item, mode)
+                if not use_constraints:
+                    offset = pin_matrices["world"][i] @ np.linalg.inv(pin_matrices["pivot"][i])
+                    store_pin_offsets(loc, [item], offset[None], mode)
                 lock_and_hide_same_attributes(loc, item, mode)
 
+            if use_constraints:
+                # Constrain every object to its locator at once, reading which attributes are locked once per object.
+                mr_utilities.constrain_unlocked_in_bulk(locators, sel, mode)
+
             # Set a blank keyframe, to remember the frame the temp_pin_group was created on.
             cmds.setKeyframe(temp_pin_group)
             cmds.select(temp_pin_group)
@@ -195,35 +251,135 @@ def multiple(mode=None, position=None):
 
 ########################################################################
 #                                                                      #
-#                         SUPPORTING FUNCTIONS                         #
+#                          MATRIX PIN FUNCTIONS                        #
 #                                                                      #
 ########################################################################
 
-# Place the target at the average position and orientation of source objects.
-def match_average_position_of_objects(sources, target):
-    constraints = []
-    for item in sources:
-        point_constraint = cmds.pointConstraint(item, target)
-        orient_constraint = cmds.orientConstraint(item, target)
+# Pins made with use_constraints=False store each object's world matrix relative to the pin, in PIN_OFFSETS_ATTRIBUTE.
+# Running the script again multiplies those offsets by where the pin is now, and keys the objects there with mr_bakeEngine.key_world_matrices().
+
+def get_pin_matrices(objects):
+    """
+    Read the world matrix of each object on the current frame, with one TimeSampler,
+    and the matrix a pin should match: its rotation without scale, at its rotate pivot.
+
+    :param objects: Objects to pin.
+    :type objects: list(str)
+    :return: {"world": world matrices, "pivot": pin matrices}, both shaped (objects, 4, 4), in centimetres.
+    :rtype: dict
+
+    """
+    if np is None:
+        raise ImportError("Pins without constraints need NumPy, which ships with Maya 2022 and later.")
+    current_time = cmds.currentTime(query=True)
+    world_matrices = mr_bakeEngine.sample_world_matrices(objects, [current_time])[:, 0]
+
+    # Pivots are in the current linear unit, but matrices are in centimetres.
+    linear_scale = mr_utilities.LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    rotate_pivots = [cmds.getAttr(obj + ".rotatePivot")[0] for obj in objects]
+    pivot_matrices = mr_bakeEngine.get_pivot_matrices(world_matrices, np.array(rotate_pivots) / linear_scale)
+    return {"world": world_matrices, "pivot": pivot_matrices}
+
+##################################################################################################################################################
+
+def get_average_pin_matrix(pin_matrices):
+    """
+    Average the pin matrices from get_pin_matrices(), like point and orient constraining to every object at once.
+    Positions are averaged, and rotations are averaged as quaternions, the same as mr_utilities.get_average_transform().
+    """
+    pivots = pin_matrices["pivot"]
+    average = np.eye(4)
+    average[3, :3] = pivots[:, 3, :3].mean(axis=0)
+    quaternion = mr_utilities.get_average_quaternions(mr_utilities.get_quaternions_from_matrices(pivots))
+    average[:3, :3] = mr_utilities.get_matrices_from_quaternions(quaternion)
+    return average
+
+##################################################################################################################################################
+
+def set_world_matrix(node, matrix):
+    # Place a node at a world matrix without scale, in centimetres.
+    linear_scale = mr_utilities.LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    rotation = mr_bakeEngine.get_euler_rotations(matrix, cmds.getAttr(node + ".rotateOrder"))
+    if cmds.currentUnit(query=True, angle=True) == "rad":
+        rotation = np.radians(rotation)
+    cmds.xform(node, worldSpace=True, translation=(matrix[3, :3] * linear_scale).tolist())
+    cmds.xform(node, worldSpace=True, rotation=rotation.tolist())
+
+##################################################################################################################################################
+
+def store_pin_offsets(pin, objects, offsets, mode):
+    # Remember each object's world matrix relative to the pin, and which attributes to key.
+    if not cmds.attributeQuery(PIN_OFFSETS_ATTRIBUTE, node=pin, exists=True):
+        cmds.addAttr(pin, longName=PIN_OFFSETS_ATTRIBUTE, dataType="string")
+    data = {"mode": mode, "offsets": {obj: offset.ravel().tolist() for obj, offset in zip(objects, offsets)}}
+    cmds.setAttr(pin + "." + PIN_OFFSETS_ATTRIBUTE, json.dumps(data), type="string")
+
+##################################################################################################################################################
+
+def is_matrix_pin(pin):
+    return cmds.attributeQuery(PIN_OFFSETS_ATTRIBUTE, node=pin, exists=True)
+
+##################################################################################################################################################
+
+def key_targets_from_offsets(pins):
+    """
+    Key every object stored on the pins where the pins have moved them to, on the current frame, in one batched solve.
+    """
+    # ---------------------------------------
+    # 01. READ EACH PIN'S OBJECTS AND OFFSETS.
+    # ---------------------------------------
+    objects = []
+    offsets = []
+    pin_indices = []
+    attributes_by_mode = {
+        "both": ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ"),
+        "translate": ("translateX", "translateY", "translateZ"),
+        "rotate": ("rotateX", "rotateY", "rotateZ"),
+    }
+    modes = {}
+    for pin_index, pin in enumerate(pins):
+        data = json.loads(cmds.getAttr(pin + "." + PIN_OFFSETS_ATTRIBUTE))
+        for obj, offset in data["offsets"].items():
+            if not cmds.objExists(obj):
+                continue
+            objects.append(obj)
+            offsets.append(np.array(offset).reshape(4, 4))
+            pin_indices.append(pin_index)
+            modes.setdefault(data["mode"], []).append(len(objects) - 1)
+    if not objects:
+        return
 
-        constraints.extend(point_constraint)
-        constraints.extend(orient_constraint)
-    # Delete with variables instead of cmds.delete(constraints=True), because if the target it a null, it gets deleted when constraints are removed.
-    cmds.delete(constraints)
+    # ---------------------------------------
+    # 01. KEY EVERYTHING WHERE ITS PIN HAS MOVED IT.
+    # ---------------------------------------
+    pin_worlds = mr_bakeEngine.sample_world_matrices(pins, [cmds.currentTime(query=True)])[:, 0]
+    world_matrices = np.array(offsets) @ pin_worlds[pin_indices]
+    for mode, indices in modes.items():
+        mr_bakeEngine.key_world_matrices([objects[i] for i in indices], world_matrices[indices], attributes_by_mode[mode])
 
 ##################################################################################################################################################
 
+########################################################################
+#                                                                      #
+#                         SUPPORTING FUNCTIONS                         #
+#                                                                      #
+########################################################################
+
 # Place the target at the average position and orientation of source objects.
-def match_position_of_object(source, target):
-    constraints = []
+def match_average_position_of_objects(sources, target):
+    # Averaged from one read of their world matrices, instead of a point and orient constraint per object.
+    position, quaternion = mr_utilities.get_average_transform(sources)
+    linear_scale = mr_utilities.LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    matrix = np.eye(4)
+    matrix[:3, :3] = mr_utilities.get_matrices_from_quaternions(quaternion)
+    matrix[3, :3] = position / linear_scale
+    set_world_matrix(target, matrix)
 
-    point_constraint = cmds.pointConstraint(source, target)
-    orient_constraint = cmds.orientConstraint(source, target)
+##################################################################################################################################################
 
-    constraints.extend(point_constraint)
-    constraints.extend(orient_constraint)
-    # Delete with variables instead of cmds.delete(constraints=True), because if the target it a null, it gets deleted when constraints are removed.
-    cmds.delete(constraints)
+# Place the target at the position and orientation of the source object.
+def match_position_of_object(source, target):
+    match_average_position_of_objects([source], target)
 
 
 ##################################################################################################################################################
@@ -269,67 +425,29 @@ def lock_and_hide_same_attributes(source, target, mode):
         for attr in translation_attributes:
             lock_hide_attribute(source, attr)
 
-##################################################################################################################################################
-
-def constrain_unlocked_attributes(driver, target, mode):
-    if mode == "both":
-        constrain_unlocked_translates(driver, target)
-        constrain_unlocked_rotates(driver, target)
-
-    elif mode == "translate":
-        constrain_unlocked_translates(driver, target)
-
-    elif mode == "rotate":
-        constrain_unlocked_rotates(driver, target)
-
-##################################################################################################################################################
-    
-def constrain_unlocked_translates(driver, item):
-    # Check if translate X, Y, Z are locked
-    skip_trans_axes = []
-    if cmds.getAttr(item + ".translateX", lock=True):
-        skip_trans_axes.append("x")
-    if cmds.getAttr(item + ".translateY", lock=True):
-        skip_trans_axes.append("y")
-    if cmds.getAttr(item + ".translateZ", lock=True):
-        skip_trans_axes.append("z")
-
-    if skip_trans_axes:
-        if skip_trans_axes == ['x', 'y', 'z']:
-            return
-        else:
-            # Apply point constraint with skipping specified axes
-            cmds.pointConstraint(driver, item, maintainOffset=True, weight=1, skip=skip_trans_axes)
-    else:
-        cmds.pointConstraint(driver, item, maintainOffset=True, weight=1)
-
-##################################################################################################################################################
-
-def constrain_unlocked_rotates(driver, item):
-    # Check if rotate X, Y, Z are locked
-    skip_rot_axes = []
-    if cmds.getAttr(item + ".rotateX", lock=True):
-        skip_rot_axes.append("x")
-    if cmds.getAttr(item + ".rotateY", lock=True):
-        skip_rot_axes.append("y")
-    if cmds.getAttr(item + ".rotateZ", lock=True):
-        skip_rot_axes.append("z")
-
-    if skip_rot_axes:
-        if skip_rot_axes == ['x', 'y', 'z']:
-            return
-        else:
-            # Apply orient constraint with skipping specified axes
-            cmds.orientConstraint(driver, item, maintainOffset=True, weight=1, skip=skip_rot_axes)
-    else:
-        cmds.orientConstraint(driver, item, maintainOffset=True, weight=1)
-
 
 """
 ##################################################################################################################################################
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0015:
+#   - mr_utilities is imported without reloading it, so its caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0014:
+#   - Objects are constrained to their pins with mr_utilities.constrain_unlocked_in_bulk(), all at once.
+#   - Removed constrain_unlocked_attributes(), constrain_unlocked_translates() and constrain_unlocked_rotates(), now in mr_utilities.py.
+#
+# 2026-10-17 - 0013:
+#   - match_average_position_of_objects() and match_position_of_object() use mr_utilities.get_average_transform(),
+#     instead of creating and deleting a point and orient constraint per object.
+#   - Pins made with use_constraints=False average rotations as quaternions too.
+#
+# 2026-10-17 - 0012:
+#   - Added use_constraints option to single() and multiple().
+#       - When False, pins are placed and objects' offsets stored from one read of their world matrices, without constraints.
+#       - Running the script again keys every object from its offset and its pin's new position, with mr_bakeEngine.key_world_matrices().
+#
 # 2024-01-18 - 0011:
 #   - Refresh viewport after deleting tempPin, to reflect changes on animation layers while BaseAnimation is locked.
 #   - Moved changlog to the bottom.
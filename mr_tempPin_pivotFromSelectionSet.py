@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_tempPin_pivotFromSelectionSet.py
-# VERSION: 0009
+# VERSION: 0011
 #
 # CREATORS: Maria Robertson
 # ---------------------------------------
@@ -56,16 +56,26 @@ mr_tempPin_pivotFromSelectionSet.pivot_from_follow_selection_set("both", "range"
 mr_tempPin_pivotFromSelectionSet.pivot_from_follow_selection_set("translate", "frame")
 mr_tempPin_pivotFromSelectionSet.pivot_from_follow_selection_set("translate", "range")
 
+# For "range", a tolerance (in scene units and degrees) keys the pivot only where needed to stay within it:
+mr_tempPin_pivotFromSelectionSet.pivot_from_follow_selection_set("both", "range", tolerance=0.01)
+
 # ---------------------------------------
 # REQUIREMENTS: 
 # ---------------------------------------
 # This script requires functions from the following files:
 # 	- mr_find_constraint_targets_and_drivers.py
 # 	- mr_utilities.py
+# 	- mr_bakeEngine.py, and NumPy, for the tolerance option.
 #
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0011:
+#	- mr_utilities and mr_bakeEngine are imported without reloading them, so their caches and scene callbacks last between runs.
+#
+# 2026-10-17 - 0010:
+#	- Added tolerance option for "range", using mr_bakeEngine.bake_attributes() to key only the frames needed.
+#
 # 2024-01-14 - 0009:
 #	- Added are_translations_or_rotations_constrained().
 #		- Before, script would error if object had unconstrained translates and rotates, but constrained scales.
@@ -103,9 +113,8 @@ import importlib
 import mr_find_constraint_targets_and_drivers
 importlib.reload(mr_find_constraint_targets_and_drivers)
 
-import importlib
 import mr_utilities
-importlib.reload(mr_utilities)
+import mr_bakeEngine
 
 ########################################################################
 #                                                                      #
@@ -136,7 +145,7 @@ def create_follow_selection_set():
 ########################################################################
 
 # ------------------------------------------------------------------------------ #
-def pivot_from_follow_selection_set(mode=None, time=None):
+def pivot_from_follow_selection_set(mode=None, time=None, tolerance=None):
 	if mode != "both" and mode != "translate":
 		cmds.warning("Please input a valid manipulation mode.")
 		return
@@ -231,13 +240,18 @@ def pivot_from_follow_selection_set(mode=None, time=None):
 			attributes = ["translateX", "translateY", "translateZ","rotateX", "rotateY", "rotateZ"]
 
 			cmds.refresh(suspend=True)
-			cmds.bakeResults(
-				temp_pivot_offset_group,
-				attribute=attributes,
-				simulation=False,
-				time=(start_time, end_time)
-			)
-			cmds.delete(temp_pivot_offset_group, staticChannels=True)
+			if tolerance is None:
+				cmds.bakeResults(
+					temp_pivot_offset_group,
+					attribute=attributes,
+					simulation=False,
+					time=(start_time, end_time)
+				)
+				cmds.delete(temp_pivot_offset_group, staticChannels=True)
+			else:
+				# Only key the frames each channel needs to stay within the tolerance.
+				object_attributes = [temp_pivot_offset_group + "." + attribute for attribute in attributes]
+				mr_bakeEngine.bake_attributes(object_attributes, start_time, end_time, tolerance=tolerance)
 			cmds.refresh(suspend=False)
 
 		cmds.delete(point_constraint)
@@ -1,7 +1,7 @@
 """
 # ------------------------------------------------------------------------------ #
 # SCRIPT: mr_utilities.py
-# VERSION: 0030
+# VERSION: 0055
 #
 # CREATORS: Maria Robertson
 # CREDIT: Morgan Loomis, Tom Bailey
@@ -32,11 +32,20 @@ mr_utilities.#
 # ------------------------------------------------------------------------------ #
 """
 
+import collections
+import contextlib
 import inspect
 import maya.cmds as cmds
 import maya.mel as mel
 import pymel.core as pm
 from maya import OpenMaya
+from maya import OpenMayaAnim
+
+# NumPy ships with Maya 2022 and later. Only the keyframe array and time sampling functions need it.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 ##################################################################################################################################################
 
@@ -46,6 +55,86 @@ from maya import OpenMaya
 #                                                                      #
 ########################################################################
 
+class AnimationLayerIndex(object):
+    """
+    A scene-wide map of which nodes and attributes are on which animation layers.
+
+    Every animation layer is queried once when the index is made, so build one at the start of an operation
+    and look objects up in it, instead of querying Maya again for each object.
+    The index isn't updated when layers change, so make a new one for the next operation.
+
+    :param animation_layers: Animation layers to index. If none are given, all animation layers in the scene are used.
+    :type animation_layers: list(str), optional
+
+    :Example:
+
+    >>> layer_index = AnimationLayerIndex()
+    >>> layer_index.layers("pSphere1")
+    ['AnimLayer1', 'AnimLayer2']
+    >>> layer_index.get_layered_attributes("pSphere1")
+    {'AnimLayer1': ['translateX', 'translateY'], 'AnimLayer2': ['rotateY']}
+
+    """
+
+    def __init__(self, animation_layers=None):
+        if animation_layers is None:
+            animation_layers = get_all_animation_layers() or []
+
+        # Layers are kept in the order given, which for buildAnimLayerArray is bottom to top.
+        self._layer_order = {layer: i for i, layer in enumerate(animation_layers)}
+        # {animation layer: {node: set(attributes)}}
+        self._layer_members = {}
+        # {node: set(animation layers)}
+        self._node_layers = {}
+
+        for layer in animation_layers:
+            members = {}
+            for plug in cmds.animLayer(layer, query=True, attribute=True) or []:
+                node = plug.split(".")[0]
+                members.setdefault(node, set()).add(plug.split(".")[-1])
+                self._node_layers.setdefault(node, set()).add(layer)
+            self._layer_members[layer] = members
+
+    # ------------------------------------------------------------------------------ #
+    def layers(self, node):
+        """
+        Get the animation layers the node has attributes on, from bottom to top.
+        """
+        return sorted(self._node_layers.get(node, ()), key=self._layer_order.get)
+
+    # ------------------------------------------------------------------------------ #
+    def nodes(self, layer):
+        """
+        Get the nodes with attributes on the animation layer.
+        """
+        return list(self._layer_members.get(layer, ()))
+
+    # ------------------------------------------------------------------------------ #
+    def attributes(self, layer, node):
+        """
+        Get the names of the node's attributes that are on the animation layer, sorted.
+        """
+        return sorted(self._layer_members.get(layer, {}).get(node, ()))
+
+    # ------------------------------------------------------------------------------ #
+    def get_layered_attributes(self, node, animation_layers=None):
+        """
+        Get a dictionary of {animation layer: [attributes]} for the node, in the same form as mr_utilities.get_layered_attributes().
+
+        :param node: The node to look up.
+        :type node: str
+        :param animation_layers: Only include these animation layers.
+        :type animation_layers: list(str), optional
+        :return: Animation layers mapped to the node's attributes on them.
+        :rtype: dict
+
+        """
+        layers = self.layers(node)
+        if animation_layers is not None:
+            animation_layers = set(animation_layers)
+            layers = [layer for layer in layers if layer in animation_layers]
+        return {layer: self.attributes(layer, node) for layer in layers}
+
 # ------------------------------------------------------------------------------ #
 def delete_empty_animation_layers(animation_layers):
     """
@@ -209,6 +298,167 @@ def modify_objects_on_animation_layers(modify="add", objects=None, animation_lay
 #                                                                      #
 ########################################################################
 
+# The shared attribute metadata cache.
+_ATTRIBUTE_METADATA_CACHE = None
+
+
+class AttributeMetadataCache(object):
+    """
+    A memoized store of attribute details that don't change between nodes of the same type:
+    whether it exists, long and short names, default values, data type and whether it's numeric.
+
+    Static attributes are stored once per (node type, attribute), so 200 identical controls cost one lookup per attribute name.
+    User defined attributes can differ between nodes, so they fall back to one entry per (node, attribute).
+    Each detail is only queried the first time it's asked for, and the least recently used entries are dropped past max_entries.
+
+    :param max_entries: How many attributes to remember.
+    :type max_entries: int
+
+    :Example:
+
+    >>> cache = get_attribute_metadata_cache()
+    >>> cache.default("pSphere1", "sx")
+    [1.0]
+    >>> cache.long_name("pSphere1", "sx")
+    'scaleX'
+
+    """
+
+    numeric_types = ("float", "doubleLinear", "doubleAngle", "double")
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        # {(node type, attribute): {detail: value}}, or {(node type, attribute, node): {detail: value}} for user defined attributes.
+        # None means the attribute isn't static for that node type.
+        self._entries = collections.OrderedDict()
+
+    # ------------------------------------------------------------------------------ #
+    def invalidate(self, dynamic_only=False):
+        """
+        Forget remembered attributes.
+
+        :param dynamic_only: Only forget user defined attributes, which can be added, edited or deleted on individual nodes.
+        :type dynamic_only: bool
+
+        """
+        if not dynamic_only:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if len(key) == 3]:
+            del self._entries[key]
+
+    # ------------------------------------------------------------------------------ #
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    # ------------------------------------------------------------------------------ #
+    def _entry(self, node, attr):
+        # ---------------------------------------
+        # 01. STATIC ATTRIBUTES, SHARED BY EVERY NODE OF THE SAME TYPE.
+        # ---------------------------------------
+        node_type = get_connection_cache().node_type(node)
+        key = (node_type, attr)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            entry = self._entries[key]
+        else:
+            entry = self._remember(key, {} if cmds.attributeQuery(attr, type=node_type, exists=True) else None)
+        if entry is not None:
+            return entry
+
+        # ---------------------------------------
+        # 01. USER DEFINED ATTRIBUTES, PER NODE.
+        # ---------------------------------------
+        key = (node_type, attr, node)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        # Missing attributes aren't remembered, in case they're added later.
+        if not cmds.attributeQuery(attr, node=node, exists=True):
+            return None
+        return self._remember(key, {})
+
+    # ------------------------------------------------------------------------------ #
+    def _detail(self, node, attr, detail, query):
+        entry = self._entry(node, attr)
+        if entry is None:
+            return None
+        if detail not in entry:
+            entry[detail] = query()
+        return entry[detail]
+
+    # ------------------------------------------------------------------------------ #
+    def exists(self, node, attr):
+        """
+        Check if the node has the attribute, like cmds.attributeQuery(exists=True).
+        """
+        return self._entry(node, attr) is not None
+
+    # ------------------------------------------------------------------------------ #
+    def long_name(self, node, attr):
+        """
+        Get the long name of an attribute, or None if it doesn't exist.
+        """
+        return self._detail(node, attr, "long_name", lambda: cmds.attributeQuery(attr, node=node, longName=True))
+
+    # ------------------------------------------------------------------------------ #
+    def short_name(self, node, attr):
+        """
+        Get the short name of an attribute, or None if it doesn't exist.
+        """
+        return self._detail(node, attr, "short_name", lambda: cmds.attributeQuery(attr, node=node, shortName=True))
+
+    # ------------------------------------------------------------------------------ #
+    def default(self, node, attr):
+        """
+        Get the default values of an attribute as a list, like cmds.attributeQuery(listDefault=True).
+        """
+        return self._detail(node, attr, "default", lambda: cmds.attributeQuery(attr, node=node, listDefault=True))
+
+    # ------------------------------------------------------------------------------ #
+    def data_type(self, node, attr):
+        """
+        Get the data type of an attribute, like cmds.getAttr(type=True).
+        """
+        return self._detail(node, attr, "data_type", lambda: cmds.getAttr(f"{node}.{attr}", type=True))
+
+    # ------------------------------------------------------------------------------ #
+    def is_numeric(self, node, attr):
+        """
+        Check if an attribute holds a number that can be reset or offset. Booleans and enums don't count.
+        """
+        return self._detail(node, attr, "numeric", lambda: self.data_type(node, attr) in self.numeric_types)
+
+# ------------------------------------------------------------------------------ #
+def get_attribute_metadata_cache():
+    """
+    Get the shared attribute metadata cache.
+
+    :return: The shared cache.
+    :rtype: AttributeMetadataCache
+
+    """
+    global _ATTRIBUTE_METADATA_CACHE
+    if _ATTRIBUTE_METADATA_CACHE is None:
+        _ATTRIBUTE_METADATA_CACHE = AttributeMetadataCache()
+    return _ATTRIBUTE_METADATA_CACHE
+
+# ------------------------------------------------------------------------------ #
+def invalidate_attribute_metadata_cache(dynamic_only=False):
+    """
+    Clear the shared attribute metadata cache.
+    Needed after editing or deleting user defined attributes with cmds.addAttr() or cmds.deleteAttr(), or reloading a plug-in.
+
+    :param dynamic_only: Only forget user defined attributes.
+    :type dynamic_only: bool
+
+    """
+    if _ATTRIBUTE_METADATA_CACHE is not None:
+        _ATTRIBUTE_METADATA_CACHE.invalidate(dynamic_only=dynamic_only)
+
 # ------------------------------------------------------------------------------ #
 def clear_keys(reset_selected_attributes=True):
     """
@@ -248,7 +498,8 @@ def clear_keys(reset_selected_attributes=True):
         if not attributes:
             continue
 
-        valid_attributes = [attr for attr in attributes if cmds.attributeQuery(attr, node=item, exists=True)]
+        attribute_metadata = get_attribute_metadata_cache()
+        valid_attributes = [attr for attr in attributes if attribute_metadata.exists(item, attr)]
         if not valid_attributes: 
             continue
 
@@ -307,6 +558,8 @@ def reset_attributes_to_default_value(
     :type reset_selected_attributes: bool
     :param reset_non_numeric_attributes: If True, reset only numeric attributes.
     :type reset_non_numeric_attributes: bool
+    :return: The summary from set_attributes_to_default_values(), including any attributes that were skipped.
+    :rtype: dict
 
     :Example:
 
@@ -323,6 +576,11 @@ def reset_attributes_to_default_value(
     if not selection:
         return
 
+    attribute_metadata = get_attribute_metadata_cache()
+
+    # Everything from untemplating curves to setting values goes in one chunk, so the whole reset undoes in one step.
+    cmds.undoInfo(openChunk=True)
+
     # ---------------------------------------
     # 01. DISABLE AUTOKEYFRAME, TO AVOID SPAM IN THE LOG.
     # ---------------------------------------
@@ -331,6 +589,8 @@ def reset_attributes_to_default_value(
         cmds.autoKeyframe(state=False)
 
     try:
+        object_attributes_to_reset = []
+
         # ---------------------------------------
         # 01. FOR EVERY OBJECT.
         # ---------------------------------------
@@ -354,11 +614,11 @@ def reset_attributes_to_default_value(
             if attributes:
                 for attr in attributes:
                     # Check if it exists.
-                    if cmds.attributeQuery(attr, node=obj, exists=True):
+                    if attribute_metadata.exists(obj, attr):
 
                         # Skip if non-numeric attributes should be ignored.
                         if not reset_non_numeric_attributes:
-                            if not is_attribute_numeric(obj, attr):
+                            if not attribute_metadata.is_numeric(obj, attr):
                                 continue
                         valid_attributes.append(attr)
                     else:
@@ -386,35 +646,15 @@ def reset_attributes_to_default_value(
             for curve in animation_curves:
                 set_animation_curve_template_state(curve, lock_state=False)
 
-            # ---------------------------------------
-            # 01. RESET ATTRIBUTES TO DEFAULT VALUES.
-            # ---------------------------------------
-            for obj_attr in valid_object_attributes:
-                obj, attr = obj_attr.split('.')
-
-                # Get the default value and check if the attribute is keyed.
-                defaultValue = cmds.attributeQuery(attr, node=obj, listDefault=True)
-                if defaultValue:
-                    defaultValue = defaultValue[0]
-                    has_keyframes = cmds.keyframe(obj_attr, query=True, keyframeCount=True)
-
-                    try:
-                        # Using a try, as don't know yet how to query if an attribute is connected.
-                        # e.g. ERROR: setAttr: The attribute 'rivet.translateX' is locked or connected and cannot be modified.
-
-                        # Set the attribute to its default value.
-                        cmds.setAttr(obj_attr, defaultValue)
-                        # Only set keys if the attribute already is keyed.
-                        if has_keyframes:
-                            cmds.setKeyframe(obj, attribute=attr, value=defaultValue)
-                    except:
-                        print(f"{obj_attr} could not be reset.")
-                    finally:
-                        continue
+            object_attributes_to_reset.extend(valid_object_attributes)
 
-                else:
-                    # print(f"Attribute {attr} has no default value on object {obj}.")
-                    continue
+        # ---------------------------------------
+        # 01. RESET ATTRIBUTES TO DEFAULT VALUES.
+        # ---------------------------------------
+        # Done for all objects at once, so keys are set with one call.
+        summary = set_attributes_to_default_values(object_attributes_to_reset)
+        if summary["skipped"]:
+            print(f"{len(summary['skipped'])} attributes could not be reset: {', '.join(summary['skipped'])}")
 
     # ---------------------------------------
     # 01. RESTORE AUTOKEYFRAME STATE
@@ -422,7 +662,226 @@ def reset_attributes_to_default_value(
     finally:
         if original_autoKey_state:
             cmds.autoKeyframe(state=True)
-  
+        cmds.undoInfo(closeChunk=True)
+
+    return summary
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                       CONNECTION CACHE FUNCTIONS                     #
+#                                                                      #
+########################################################################
+
+# The shared connection cache, and ids of the callbacks that keep it up to date.
+_CONNECTION_CACHE = None
+
+# importlib.reload() runs this module again, so remove callbacks added by the previous import first.
+for _callback_id in globals().get("_CONNECTION_CACHE_CALLBACK_IDS", []):
+    try:
+        OpenMaya.MMessage.removeCallback(_callback_id)
+    except RuntimeError:
+        pass
+_CONNECTION_CACHE_CALLBACK_IDS = []
+
+
+class ConnectionGraphCache(object):
+    """
+    A memoized map of DG connections and node types, filled in one node at a time as they're queried.
+
+    Each node is queried with 3 commands the first time it's needed, then every question about its connections is a dictionary lookup.
+    Nodes are cached by their shortest unique names, like cmds.ls() gives, and can be asked about by long or partial DAG paths too.
+    Cached nodes are forgotten when Maya reports a connection being made or broken on them.
+    Everything is forgotten when a node is added, removed or renamed, or invalidate() is called.
+
+    :Example:
+
+    >>> cache = get_connection_cache()
+    >>> cache.source("pSphere1.translateX")
+    'pSphere1_translateX.output'
+    >>> cache.node_type("pSphere1_translateX")
+    'animCurveTL'
+
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._incoming = {}
+        self._outgoing = {}
+        self._node_types = {}
+        # DAG paths mapped to the shortest unique names they were resolved to.
+        self._names = {}
+
+    # ------------------------------------------------------------------------------ #
+    def invalidate(self, nodes=None):
+        """
+        Forget cached connections, for the given nodes or for everything.
+
+        :param nodes: Nodes to forget. If None, the whole cache is cleared and the generation counter goes up.
+        :type nodes: list(str), optional
+
+        """
+        if nodes is None:
+            self.generation += 1
+            self._incoming = {}
+            self._outgoing = {}
+            self._node_types = {}
+            self._names = {}
+            return
+        for node in nodes:
+            node = self._name(node)
+            self._incoming.pop(node, None)
+            self._outgoing.pop(node, None)
+
+    # ------------------------------------------------------------------------------ #
+    def _name(self, node):
+        # Long and partial DAG paths are cached by the shortest unique name they resolve to, the same name connections are listed by.
+        if "|" not in node:
+            return node
+        name = self._names.get(node)
+        if name is None:
+            name = self._names[node] = (cmds.ls(node) or [node])[0]
+        return name
+
+    # ------------------------------------------------------------------------------ #
+    def _load(self, node):
+        # ---------------------------------------
+        # 01. QUERY INCOMING AND OUTGOING CONNECTIONS.
+        # ---------------------------------------
+        # Both return pairs of [plug on this node, plug on the other node].
+        incoming = cmds.listConnections(node, source=True, destination=False, connections=True, plugs=True) or []
+        outgoing = cmds.listConnections(node, source=False, destination=True, connections=True, plugs=True) or []
+
+        incoming_map = {}
+        for own_plug, other_plug in zip(incoming[::2], incoming[1::2]):
+            incoming_map[own_plug.split(".", 1)[1]] = other_plug
+        outgoing_map = {}
+        for own_plug, other_plug in zip(outgoing[::2], outgoing[1::2]):
+            outgoing_map.setdefault(own_plug.split(".", 1)[1], []).append(other_plug)
+        self._incoming[node] = incoming_map
+        self._outgoing[node] = outgoing_map
+
+        # ---------------------------------------
+        # 01. QUERY NODE TYPES OF THIS NODE AND ITS NEIGHBOURS, IN ONE GO.
+        # ---------------------------------------
+        nodes = {node}
+        nodes.update(plug.split(".")[0] for plug in incoming[1::2])
+        nodes.update(plug.split(".")[0] for plug in outgoing[1::2])
+        nodes.difference_update(self._node_types)
+        if nodes:
+            shown_types = cmds.ls(list(nodes), showType=True) or []
+            self._node_types.update(zip(shown_types[::2], shown_types[1::2]))
+
+    # ------------------------------------------------------------------------------ #
+    def _split(self, plug):
+        node, _, attr = plug.partition(".")
+        node = self._name(node)
+        if node not in self._incoming:
+            self._load(node)
+        # Connections are listed by long attribute name, so convert short names once per attribute.
+        if attr and "[" not in attr and "." not in attr and attr not in self._incoming[node] and attr not in self._outgoing[node]:
+            attr = get_attribute_metadata_cache().long_name(node, attr) or attr
+        return node, attr
+
+    # ------------------------------------------------------------------------------ #
+    def source(self, plug):
+        """
+        Get the source plug connected to the given plug, or None.
+        """
+        node, attr = self._split(plug)
+        return self._incoming[node].get(attr)
+
+    # ------------------------------------------------------------------------------ #
+    def destinations(self, plug):
+        """
+        Get the plugs the given plug is connected to, as a list.
+        """
+        node, attr = self._split(plug)
+        return list(self._outgoing[node].get(attr, []))
+
+    # ------------------------------------------------------------------------------ #
+    def incoming(self, node):
+        """
+        Get a dictionary of all incoming connections to a node, as {attribute: source plug}.
+        """
+        node = self._name(node)
+        if node not in self._incoming:
+            self._load(node)
+        return self._incoming[node]
+
+    # ------------------------------------------------------------------------------ #
+    def node_type(self, node):
+        """
+        Get the node type of a node, as given by cmds.nodeType().
+        """
+        node = self._name(node)
+        node_type = self._node_types.get(node)
+        if node_type is None:
+            node_type = self._node_types[node] = cmds.nodeType(node)
+        return node_type
+
+# ------------------------------------------------------------------------------ #
+def get_connection_cache():
+    """
+    Get the shared connection cache. The first time, this also adds the callbacks that keep it up to date.
+
+    :return: The shared cache.
+    :rtype: ConnectionGraphCache
+
+    """
+    global _CONNECTION_CACHE
+    if _CONNECTION_CACHE is None:
+        _CONNECTION_CACHE = ConnectionGraphCache()
+        add_connection_cache_callbacks()
+    return _CONNECTION_CACHE
+
+# ------------------------------------------------------------------------------ #
+def invalidate_connection_cache():
+    """
+    Clear the shared connection cache, and bump its generation counter.
+    Only needed if the scene is changed in a way Maya doesn't send callbacks for.
+    """
+    if _CONNECTION_CACHE is not None:
+        _CONNECTION_CACHE.invalidate()
+
+# ------------------------------------------------------------------------------ #
+def add_connection_cache_callbacks():
+    """
+    Add DG callbacks, so the shared connection cache forgets anything that changes.
+    """
+    remove_connection_cache_callbacks()
+
+    def connection_changed(source_plug, destination_plug, made, client_data=None):
+        # Plug names can use partial DAG paths, which invalidate() resolves to the names nodes are cached by.
+        if _CONNECTION_CACHE is not None:
+            _CONNECTION_CACHE.invalidate([source_plug.name().split(".")[0], destination_plug.name().split(".")[0]])
+
+    def node_added_or_removed(node, client_data=None):
+        invalidate_connection_cache()
+        # A new node can reuse a deleted node's name, with different user defined attributes.
+        invalidate_attribute_metadata_cache(dynamic_only=True)
+
+    def name_changed(node, previous_name, client_data=None):
+        # Renaming changes the node's cached name, every plug naming it, and possibly other nodes' shortest unique names.
+        invalidate_connection_cache()
+        invalidate_attribute_metadata_cache(dynamic_only=True)
+
+    _CONNECTION_CACHE_CALLBACK_IDS.append(OpenMaya.MDGMessage.addConnectionCallback(connection_changed))
+    _CONNECTION_CACHE_CALLBACK_IDS.append(OpenMaya.MDGMessage.addNodeAddedCallback(node_added_or_removed))
+    _CONNECTION_CACHE_CALLBACK_IDS.append(OpenMaya.MDGMessage.addNodeRemovedCallback(node_added_or_removed))
+    # A null MObject listens for every node being renamed.
+    _CONNECTION_CACHE_CALLBACK_IDS.append(OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject(), name_changed))
+
+# ------------------------------------------------------------------------------ #
+def remove_connection_cache_callbacks():
+    """
+    Remove the callbacks added by add_connection_cache_callbacks().
+    """
+    for callback_id in _CONNECTION_CACHE_CALLBACK_IDS:
+        OpenMaya.MMessage.removeCallback(callback_id)
+    del _CONNECTION_CACHE_CALLBACK_IDS[:]
+
 ##################################################################################################################################################
 
 ########################################################################
@@ -431,6 +890,284 @@ def reset_attributes_to_default_value(
 #                                                                      #
 ########################################################################
 
+# One constraint target driving one object, as found by ConstraintGraphIndex.
+ConstraintLink = collections.namedtuple("ConstraintLink", ["driver", "driven", "constraint", "constraint_type", "target_index"])
+
+
+class ConstraintGraphIndex(object):
+    """
+    A scene-wide map of which objects drive which through constraints, in both directions.
+
+    Every constraint and pairBlend node is queried together when the index is made, with one listConnections call each way,
+    so looking up an object's drivers or driven objects is a dictionary lookup, however many targets a constraint has.
+    Constraint outputs that go through a pairBlend, from blending with keys, are followed through it to the object they drive.
+    Like AnimationLayerIndex, build one at the start of an operation. It isn't updated when constraints change.
+    Objects are named by their shortest unique names, like cmds.ls() gives, and can be looked up by long or partial DAG paths too.
+
+    :Example:
+
+    >>> constraint_index = ConstraintGraphIndex()
+    >>> constraint_index.drivers("pSphere1")
+    [ConstraintLink(driver='locator1', driven='pSphere1', constraint='pSphere1_parentConstraint1', constraint_type='parentConstraint', target_index=0)]
+    >>> constraint_index.weight(constraint_index.drivers("pSphere1")[0])
+    1.0
+    >>> constraint_index.driven("locator1")
+    ['pSphere1']
+
+    """
+
+    def __init__(self):
+        # {driven: [ConstraintLink]} and {driver: [ConstraintLink]}, in the order they were found.
+        self._links_by_driven = {}
+        self._links_by_driver = {}
+        self._links_by_constraint = {}
+        # {constraint: parent}
+        self._constraint_parents = {}
+        # {(constraint, target index): weight plug}
+        self._weight_plugs = {}
+        self._weights = {}
+
+        # ---------------------------------------
+        # 01. FIND EVERY CONSTRAINT AND PAIRBLEND, AND THEIR PARENTS.
+        # ---------------------------------------
+        # Nodes are kept by their shortest unique names, like listConnections gives, so objects with the same short name stay apart.
+        shown_types = cmds.ls(type=["constraint", "pairBlend"], showType=True) or []
+        long_paths = cmds.ls(type=["constraint", "pairBlend"], long=True) or []
+        node_types = {}
+        parent_paths = {}
+        for node, node_type, path in zip(shown_types[::2], shown_types[1::2], long_paths):
+            node_types[node] = node_type
+            if node_type != "pairBlend":
+                parent_paths[node] = path.rsplit("|", 1)[0] if "|" in path.strip("|") else None
+        if not node_types:
+            return
+
+        unique_parent_paths = list(dict.fromkeys(path for path in parent_paths.values() if path))
+        parent_names = (cmds.ls(unique_parent_paths) or []) if unique_parent_paths else []
+        # ls should keep the order it was given, but look each parent up if any went missing.
+        if len(parent_names) != len(unique_parent_paths):
+            parent_names = [cmds.ls(path)[0] for path in unique_parent_paths]
+        parent_names = dict(zip(unique_parent_paths, parent_names))
+        self._constraint_parents = {node: parent_names.get(path) for node, path in parent_paths.items()}
+
+        # ---------------------------------------
+        # 01. QUERY ALL OF THEIR CONNECTIONS AT ONCE.
+        # ---------------------------------------
+        # Both return pairs of [plug on an indexed node, plug on the other node].
+        nodes = list(node_types)
+        incoming = cmds.listConnections(nodes, source=True, destination=False, connections=True, plugs=True) or []
+        outgoing = cmds.listConnections(nodes, source=False, destination=True, connections=True, plugs=True) or []
+
+        # {constraint: {target index: driver}}, from every input of each target apart from its weight.
+        targets = {}
+        for own_plug, other_plug in zip(incoming[::2], incoming[1::2]):
+            node, _, attr = own_plug.partition(".")
+            driver = other_plug.split(".")[0]
+            if node_types.get(node) in (None, "pairBlend") or not attr.startswith("target["):
+                continue
+            # Weights are usually driven by the constraint's own weight attributes, like locator1W0, so read those.
+            if attr.endswith(".targetWeight"):
+                self._weight_plugs[(node, int(attr[len("target["):attr.index("]")]))] = other_plug
+                continue
+            # Skip the constraint's own attributes, connected back into it.
+            if driver == node:
+                continue
+            target_index = int(attr[len("target["):attr.index("]")])
+            targets.setdefault(node, {}).setdefault(target_index, driver)
+
+        # {node: [destination nodes]}, from constraint outputs and pairBlend outputs.
+        destinations = {}
+        for own_plug, other_plug in zip(outgoing[::2], outgoing[1::2]):
+            node, _, attr = own_plug.partition(".")
+            if node_types.get(node) != "pairBlend" and not attr.startswith("constraint"):
+                continue
+            destination = other_plug.split(".")[0]
+            if destination != node and destination not in destinations.setdefault(node, []):
+                destinations[node].append(destination)
+
+        # ---------------------------------------
+        # 01. LINK EACH TARGET TO WHAT ITS CONSTRAINT DRIVES.
+        # ---------------------------------------
+        for constraint, constraint_targets in targets.items():
+            driven_nodes = []
+            for destination in destinations.get(constraint, []):
+                # Follow pairBlends through to the object, as they only blend the constraint with keys.
+                resolved = destinations.get(destination, []) if node_types.get(destination) == "pairBlend" else [destination]
+                driven_nodes.extend(node for node in resolved if node not in driven_nodes)
+            # A constraint that isn't connected to anything yet still belongs to its parent.
+            if not driven_nodes and self._constraint_parents.get(constraint):
+                driven_nodes = [self._constraint_parents[constraint]]
+
+            for target_index in sorted(constraint_targets):
+                for driven in driven_nodes:
+                    link = ConstraintLink(constraint_targets[target_index], driven, constraint, node_types[constraint], target_index)
+                    self._links_by_driven.setdefault(driven, []).append(link)
+                    self._links_by_driver.setdefault(link.driver, []).append(link)
+                    self._links_by_constraint.setdefault(constraint, []).append(link)
+
+    # ------------------------------------------------------------------------------ #
+    def _name(self, node):
+        # Long and partial DAG paths are looked up by their shortest unique name, which the index is keyed by.
+        if "|" in node and node not in self._links_by_driven and node not in self._links_by_driver and node not in self._constraint_parents:
+            names = cmds.ls(node)
+            if names:
+                return names[0]
+        return node
+
+    # ------------------------------------------------------------------------------ #
+    def drivers(self, node):
+        """
+        Get a ConstraintLink for each constraint target driving the node.
+        """
+        return list(self._links_by_driven.get(self._name(node), ()))
+
+    # ------------------------------------------------------------------------------ #
+    def driven(self, node):
+        """
+        Get the objects the node drives through constraints, in the order they were found.
+        """
+        return list(collections.OrderedDict((link.driven, None) for link in self._links_by_driver.get(self._name(node), ())))
+
+    # ------------------------------------------------------------------------------ #
+    def driven_links(self, node):
+        """
+        Get a ConstraintLink for each object the node drives through constraints.
+        """
+        return list(self._links_by_driver.get(self._name(node), ()))
+
+    # ------------------------------------------------------------------------------ #
+    def constraint_links(self, constraint):
+        """
+        Get a ConstraintLink for each target of a constraint, and each object it drives.
+        """
+        return list(self._links_by_constraint.get(self._name(constraint), ()))
+
+    # ------------------------------------------------------------------------------ #
+    def constraints(self, node):
+        """
+        Get the constraints the node drives or is driven by, in the order they were found.
+        """
+        node = self._name(node)
+        links = self._links_by_driven.get(node, []) + self._links_by_driver.get(node, [])
+        return list(collections.OrderedDict((link.constraint, None) for link in links))
+
+    # ------------------------------------------------------------------------------ #
+    def parent(self, constraint):
+        """
+        Get the transform a constraint is parented under, or None.
+        """
+        return self._constraint_parents.get(self._name(constraint))
+
+    # ------------------------------------------------------------------------------ #
+    def weight(self, link):
+        """
+        Get the current weight of a link's constraint target. Each weight is only read once.
+        """
+        key = (link.constraint, link.target_index)
+        if key not in self._weights:
+            weight_plug = self._weight_plugs.get(key, f"{link.constraint}.target[{link.target_index}].targetWeight")
+            self._weights[key] = cmds.getAttr(weight_plug)
+        return self._weights[key]
+
+# ------------------------------------------------------------------------------ #
+class ConstraintBatch(object):
+    """
+    The constraints made by one call of constrain_unlocked_in_bulk(), so they can all be deleted together.
+    """
+    def __init__(self, constraints=None):
+        self.constraints = list(constraints or [])
+
+    def __len__(self):
+        return len(self.constraints)
+
+    def __iter__(self):
+        return iter(self.constraints)
+
+    # ------------------------------------------------------------------------------ #
+    def delete(self):
+        """
+        Delete every constraint in the batch that still exists, in one delete command.
+        """
+        existing = cmds.ls(self.constraints)
+        if existing:
+            cmds.delete(existing)
+        self.constraints = []
+
+# ------------------------------------------------------------------------------ #
+def constrain_unlocked_in_bulk(drivers, targets, modes, maintain_offset=True):
+    """
+    Constrain many targets to follow their drivers, skipping locked attributes.
+    Lock states are read once per target, and every constraint is made in one undo chunk.
+
+    :param drivers: The objects to control each target, or one object to control them all.
+    :type drivers: list or str
+    :param targets: The objects to be constrained.
+    :type targets: list
+    :param modes: The type of constraints to use for each target, or one type for them all.
+                  Supported modes are 'both', 'translate', and 'rotate'.
+    :type modes: list or str
+    :param maintain_offset: Whether targets keep their current offset from their drivers.
+    :type maintain_offset: bool
+
+    :return: The constraints made, to delete them all with its delete() method.
+    :rtype: ConstraintBatch
+    """
+    constraint_commands = {"translate": cmds.pointConstraint, "rotate": cmds.orientConstraint}
+    mode_channels = {
+        "translate": ("translate",),
+        "rotate": ("rotate",),
+        "both": ("translate", "rotate"),
+    }
+
+    if isinstance(drivers, str):
+        drivers = [drivers] * len(targets)
+    if isinstance(modes, str):
+        modes = [modes] * len(targets)
+
+    # -------------------------------------------------------------------
+    # 01. READ WHICH ATTRIBUTES ARE LOCKED, ONCE PER TARGET.
+    # -------------------------------------------------------------------
+    locked_attributes = {}
+    for target in targets:
+        if target not in locked_attributes:
+            locked_attributes[target] = set(cmds.listAttr(target, locked=True) or [])
+
+    # -------------------------------------------------------------------
+    # 02. WORK OUT THE AXES TO SKIP FOR EACH CONSTRAINT.
+    # -------------------------------------------------------------------
+    jobs = []
+    invalid_modes = False
+    for driver, target, mode in zip(drivers, targets, modes):
+        if mode not in mode_channels:
+            invalid_modes = True
+            continue
+
+        for channel in mode_channels[mode]:
+            skip_axes = [axis for axis in "xyz" if channel + axis.upper() in locked_attributes[target]]
+            # Nothing to constrain if every axis is locked.
+            if len(skip_axes) == 3:
+                continue
+            jobs.append((constraint_commands[channel], driver, target, skip_axes))
+
+    if invalid_modes:
+        display_viewport_warning("Invalid mode. Supported modes are 'both', 'translate', and 'rotate'.")
+
+    # -------------------------------------------------------------------
+    # 03. CREATE EVERY CONSTRAINT IN ONE UNDO CHUNK.
+    # -------------------------------------------------------------------
+    constraints = []
+    cmds.undoInfo(openChunk=True)
+    try:
+        for constraint_command, driver, target, skip_axes in jobs:
+            if skip_axes:
+                constraints.extend(constraint_command(driver, target, maintainOffset=maintain_offset, skip=skip_axes))
+            else:
+                constraints.extend(constraint_command(driver, target, maintainOffset=maintain_offset))
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return ConstraintBatch(constraints)
+
 # ------------------------------------------------------------------------------ #
 def constrain_unlocked_attributes(driver, target, mode):
     """
@@ -443,18 +1180,10 @@ def constrain_unlocked_attributes(driver, target, mode):
     :param mode: The type of constraints to use.
     :type mode: str
 
+    :return: The constraints made.
+    :rtype: ConstraintBatch
     """
-    mode_functions = {
-        "translate": (constrain_unlocked_translates,),
-        "rotate": (constrain_unlocked_rotates,),
-        "both": (constrain_unlocked_translates, constrain_unlocked_rotates),
-    }
-
-    if mode in mode_functions:
-        for func in mode_functions[mode]:
-            func(driver, target)
-    else:
-        display_viewport_warning("Invalid mode. Supported modes are 'both', 'translate', and 'rotate'.")
+    return constrain_unlocked_in_bulk([driver], [target], [mode])
 
 # ------------------------------------------------------------------------------ 
 def constrain_unlocked_rotates(driver, item):
@@ -466,23 +1195,7 @@ def constrain_unlocked_rotates(driver, item):
     :param item: The object to be constrained.
     :type item: str
     """
-    # Check if rotate X, Y, Z are locked.
-    skip_rot_axes = []
-    if cmds.getAttr(item + ".rotateX", lock=True):
-        skip_rot_axes.append("x")
-    if cmds.getAttr(item + ".rotateY", lock=True):
-        skip_rot_axes.append("y")
-    if cmds.getAttr(item + ".rotateZ", lock=True):
-        skip_rot_axes.append("z")
-
-    if skip_rot_axes:
-        if skip_rot_axes == ['x', 'y', 'z']:
-            return
-        else:
-            # Apply orient constraint with skipping specified axes.
-            cmds.orientConstraint(driver, item, maintainOffset=True, skip=skip_rot_axes)
-    else:
-        cmds.orientConstraint(driver, item, maintainOffset=True)
+    return constrain_unlocked_in_bulk([driver], [item], ["rotate"])
 
 # ------------------------------------------------------------------------------ #
 def constrain_unlocked_translates(driver, item):
@@ -494,23 +1207,7 @@ def constrain_unlocked_translates(driver, item):
     :param item: The object to be constrained.
     :type item: str
     """
-    # Check if translate X, Y, Z are locked.
-    skip_trans_axes = []
-    if cmds.getAttr(item + ".translateX", lock=True):
-        skip_trans_axes.append("x")
-    if cmds.getAttr(item + ".translateY", lock=True):
-        skip_trans_axes.append("y")
-    if cmds.getAttr(item + ".translateZ", lock=True):
-        skip_trans_axes.append("z")
-
-    if skip_trans_axes:
-        if skip_trans_axes == ['x', 'y', 'z']:
-            return
-        else:
-            # Apply point constraint with skipping specified axes.
-            cmds.pointConstraint(driver, item, maintainOffset=True, skip=skip_trans_axes)
-    else:
-        cmds.pointConstraint(driver, item, maintainOffset=True)
+    return constrain_unlocked_in_bulk([driver], [item], ["translate"])
 
 ##################################################################################################################################################
 
@@ -570,7 +1267,7 @@ def is_attribute_connected_as_destination(obj_attr):
 
     """
     obj, attr = obj_attr.split('.')
-    source_connection = cmds.connectionInfo(obj_attr, sourceFromDestination=True)
+    source_connection = get_connection_cache().source(obj_attr) or ""
 
     # nodes_to_check = [['pointOnSurfaceInfo','pos'],['loft','loft'],['fourByFourMatrix','mat'],['decomposeMatrix','dcp']]  
     nodes_to_check = ['pos','loft','mat','dcp']
@@ -592,9 +1289,12 @@ def is_attribute_muted(obj_attr):
     :rtype: bool
 
     """
-    source_nodes = cmds.listConnections(obj_attr, source=True, type="mute")
-    if source_nodes:
-        return cmds.getAttr("{}.mute".format(source_nodes[0]))
+    connection_cache = get_connection_cache()
+    source = connection_cache.source(obj_attr)
+    if source:
+        source_node = source.split(".")[0]
+        if connection_cache.node_type(source_node) == "mute":
+            return cmds.getAttr("{}.mute".format(source_node))
 
     return False
 
@@ -611,15 +1311,14 @@ def is_attribute_numeric(obj, attr):
     :rtype: bool
 
     """
-    object_attribute_name = f"{obj}.{attr}"
+    attribute_metadata = get_attribute_metadata_cache()
 
-    if not cmds.attributeQuery(attr, node=obj, exists=True):
+    if not attribute_metadata.exists(obj, attr):
         # cmds.warning(f"Attribute \"{attr}\" not found on {obj}")
         return
 
-    attrType = cmds.getAttr(object_attribute_name, type=True)
-    # return attrType in ["float", "bool", "doubleLinear", "doubleAngle", "double"]
-    return attrType in ["float", "doubleLinear", "doubleAngle", "double"]
+    # The data type is looked up once per node type and attribute, see AttributeMetadataCache.numeric_types.
+    return attribute_metadata.is_numeric(obj, attr)
 
 # ------------------------------------------------------------------------------ #
 def is_constrained(node):
@@ -653,13 +1352,18 @@ def is_constrained(node):
 
     '''
     accepted_constraint_types = ['pairBlend', 'constraint', 'parentConstraint', 'pointConstraint', 'orientConstraint', 'scaleConstraint']
-    connections = cmds.listConnections(node, source=True, destination=False, plugs=False)
-    if not connections:
+    connection_cache = get_connection_cache()
+    if "." in node:
+        source = connection_cache.source(node)
+        sources = [source] if source else []
+    else:
+        sources = list(connection_cache.incoming(node).values())
+    if not sources:
         return False, None, None
 
     # Get rid of duplicates.
-    connections = list(set(connections))   
-    accepted_connections = [conn for conn in connections if cmds.objectType(conn) in accepted_constraint_types]
+    connections = list(set(source.split(".")[0] for source in sources))
+    accepted_connections = [conn for conn in connections if connection_cache.node_type(conn) in accepted_constraint_types]
     if accepted_connections:
         constraint_relatives = cmds.listRelatives(node, type='constraint')
         return True, accepted_connections, constraint_relatives
@@ -728,7 +1432,7 @@ def is_object_attribute_connected_to_referenced_animation_curve(object_attribute
     node = attribute_parts[0]
     attr = '.'.join(attribute_parts[1:])
 
-    if cmds.attributeQuery(attr, node=node, exists=True):
+    if get_attribute_metadata_cache().exists(node, attr):
         # Get the attribute's connection.
         connections = cmds.listConnections(f'{node}.{attr}', source=True, destination=False, plugs=True)
 
@@ -802,14 +1506,150 @@ def get_animation_curves_from_object_attributes(object_attributes, filter_refere
                 if is_object_attribute_connected_to_referenced_animation_curve(obj_attr):
                     continue
 
-            get_attr_connection = cmds.listConnections(obj_attr, destination=False, source=True)
+            connection_cache = get_connection_cache()
+            get_attr_connection = connection_cache.source(obj_attr)
             # This should be better than just formatting the attribute name to replace . and _, as if the object or attribute gets renamed,
             # it's animation curve won't be renamed and match it, unless its deleted and created again.
             if get_attr_connection:
-                get_animation_curve = cmds.ls(get_attr_connection[0], type=("animCurveTL", "animCurveTU", "animCurveTA", "animCurveTT"))
+                source_node = get_attr_connection.split(".")[0]
+                if connection_cache.node_type(source_node) in ("animCurveTL", "animCurveTU", "animCurveTA", "animCurveTT"):
+                    yield source_node
 
-                for curve in get_animation_curve:
-                    yield curve
+# ------------------------------------------------------------------------------ #
+def get_attribute_state_snapshot(selection=None, attributes=None):
+    """
+    Get the state of every attribute of the given objects, using a few bulk queries instead of several per attribute.
+    
+    Use this instead of calling is_attribute_muted(), is_constrained() and is_attribute_connected_as_destination() in a loop,
+    as each of those query Maya again for every attribute.
+
+    :param selection: List of objects to query.
+    :type selection: list(str), optional
+    :param attributes: Attributes to query on each object. If None, use the keyable scalar attributes of each object.
+    :type attributes: list(str), optional
+    :return: A dictionary of object attributes that exist, with a dictionary of their state:
+             - "lock": True if locked.
+             - "keyable": True if keyable.
+             - "muted": True if connected to an active mute node.
+             - "constrained": True if driven by a constraint or pairBlend node.
+             - "connected": True if driven by one of the nodes is_attribute_connected_as_destination() checks for.
+             - "source": The connected source attribute, or None.
+             - "source_type": The node type of the connected source, or None.
+             - "numeric": True if the attribute type is a float, double, doubleLinear or doubleAngle.
+    :rtype: dict
+
+    :Example:
+
+    >>> snapshot = get_attribute_state_snapshot(["pSphere1"], ["translateX", "rotateY"])
+    >>> print(snapshot["pSphere1.translateX"])
+    {'lock': False, 'keyable': True, 'muted': False, 'constrained': True, 'connected': False, 'source': 'pSphere1_pointConstraint1.constraintTranslateX', 'source_type': 'pointConstraint', 'numeric': True}
+
+    """
+    accepted_constraint_types = ['pairBlend', 'constraint', 'parentConstraint', 'pointConstraint', 'orientConstraint', 'scaleConstraint']
+    numeric_types = ["float", "doubleLinear", "doubleAngle", "double"]
+    connected_node_names = ['pos','loft','mat','dcp']
+
+    if not selection:
+        return {}
+    if isinstance(selection, str):
+        selection = [selection]
+    selection = list(selection)
+
+    # ---------------------------------------
+    # 01. GET ATTRIBUTE NAMES AND STATES, ONCE PER OBJECT.
+    # ---------------------------------------
+    snapshot = {}
+    long_names = {}
+    dynamic_attributes = set()
+
+    for obj in selection:
+        keyable_attributes = cmds.listAttr(obj, keyable=True, scalar=True) or []
+        locked_attributes = set(cmds.listAttr(obj, locked=True) or [])
+        # listConnections names nodes by their shortest unique names, so long and partial DAG paths are matched by those.
+        node_name = (cmds.ls(obj) or [obj])[0] if "|" in obj else obj
+        dynamic_attributes.update(f"{node_name}.{attr}" for attr in cmds.listAttr(obj, userDefined=True) or [])
+
+        if attributes:
+            # Map short and long names to long names, to match attributes given either way.
+            all_attributes = cmds.listAttr(obj) or []
+            short_attributes = cmds.listAttr(obj, shortNames=True) or []
+            name_map = dict(zip(all_attributes, all_attributes))
+            name_map.update(zip(short_attributes, all_attributes))
+            object_attributes = [attr for attr in attributes if attr in name_map]
+        else:
+            name_map = dict(zip(keyable_attributes, keyable_attributes))
+            object_attributes = keyable_attributes
+
+        keyable_attributes = set(keyable_attributes)
+        for attr in object_attributes:
+            long_name = name_map[attr]
+            object_attribute = f"{obj}.{attr}"
+            long_names[f"{node_name}.{long_name}"] = object_attribute
+            snapshot[object_attribute] = {
+                "lock": long_name in locked_attributes,
+                "keyable": long_name in keyable_attributes,
+                "muted": False,
+                "constrained": False,
+                "connected": False,
+                "source": None,
+                "source_type": None,
+                "numeric": False,
+            }
+
+    if not snapshot:
+        return snapshot
+
+    # ---------------------------------------
+    # 01. GET INCOMING CONNECTIONS OF ALL OBJECTS AT ONCE.
+    # ---------------------------------------
+    # Returns pairs of [destination attribute, source attribute].
+    connections = cmds.listConnections(selection, source=True, destination=False, connections=True, plugs=True) or []
+    sources = {}
+    for destination, source in zip(connections[::2], connections[1::2]):
+        # Destinations come back with long attribute names, so map them to the names that were asked for.
+        object_attribute = long_names.get(destination, destination)
+        if object_attribute in snapshot:
+            sources[object_attribute] = source
+
+    # ---------------------------------------
+    # 01. GET SOURCE NODE TYPES, IN BULK.
+    # ---------------------------------------
+    source_nodes = list(set(source.split(".")[0] for source in sources.values()))
+    source_types = {}
+    mute_states = {}
+    if source_nodes:
+        shown_types = cmds.ls(source_nodes, showType=True) or []
+        source_types = dict(zip(shown_types[::2], shown_types[1::2]))
+        for mute_node in [node for node, node_type in source_types.items() if node_type == "mute"]:
+            mute_states[mute_node] = cmds.getAttr(f"{mute_node}.mute")
+
+    for object_attribute, source in sources.items():
+        source_node = source.split(".")[0]
+        state = snapshot[object_attribute]
+        state["source"] = source
+        state["source_type"] = source_types.get(source_node)
+        state["muted"] = bool(mute_states.get(source_node, False))
+        state["constrained"] = state["source_type"] in accepted_constraint_types
+        state["connected"] = any(source.startswith(node_name + ".") for node_name in connected_node_names)
+
+    # ---------------------------------------
+    # 01. GET NUMERIC TYPES, ONCE PER NODE TYPE AND ATTRIBUTE.
+    # ---------------------------------------
+    # Static attributes have the same type on every node of the same type, so only user defined ones are queried individually.
+    shown_types = cmds.ls(selection, showType=True) or []
+    node_types = dict(zip(shown_types[::2], shown_types[1::2]))
+    attribute_types = {}
+    for long_object_attribute, object_attribute in long_names.items():
+        obj, _, long_name = long_object_attribute.partition(".")
+        if long_object_attribute in dynamic_attributes:
+            key = long_object_attribute
+        else:
+            key = (node_types.get(obj), long_name)
+        if key not in attribute_types:
+            attribute_types[key] = cmds.getAttr(long_object_attribute, type=True)
+        snapshot[object_attribute]["numeric"] = attribute_types[key] in numeric_types
+
+    return snapshot
 
 # ------------------------------------------------------------------------------ #
 def get_channel_from_animation_curve(curve, plugs=True):
@@ -841,9 +1681,10 @@ def get_channel_from_animation_curve(curve, plugs=True):
     if '.' in curve:
         curve, attr = curve.split('.')
 
-    nodeType = cmds.nodeType(curve)
+    connection_cache = get_connection_cache()
+    nodeType = connection_cache.node_type(curve)
     if nodeType.startswith('animCurveT') or nodeType.startswith('animBlendNode'):
-        source = cmds.listConnections(curve+'.output', source=False, plugs=plugs)
+        source = _get_destinations_from_cache(connection_cache, curve+'.output', plugs)
         if not source and nodeType=='animBlendNodeAdditiveRotation':
             #if we haven't found a connection from .output, then it may be a node that uses outputX, outputY, etc.
             #get the proper attribute by using the last letter of the input attribute, which should be X, Y, etc.
@@ -852,13 +1693,106 @@ def get_channel_from_animation_curve(curve, plugs=True):
             if plugs:
                 attrSuffix = attr[-1]
 
-            source = cmds.listConnections(curve+'.output'+attrSuffix, source=False, plugs=plugs)
+            source = _get_destinations_from_cache(connection_cache, curve+'.output'+attrSuffix, plugs)
         if source:
-            nodeType = cmds.nodeType(source[0])
+            nodeType = connection_cache.node_type(source[0].split('.')[0])
             if nodeType.startswith('animCurveT') or nodeType.startswith('animBlendNode'):
                 return get_channel_from_animation_curve(source[0], plugs=plugs)
             return source[0]
 
+# ------------------------------------------------------------------------------ #
+def _get_destinations_from_cache(connection_cache, plug, plugs=True):
+    # Same as cmds.listConnections(plug, source=False, plugs=plugs), but from the connection cache.
+    destinations = connection_cache.destinations(plug)
+    if not plugs:
+        destinations = list(dict.fromkeys(destination.split(".")[0] for destination in destinations))
+    return destinations or None
+
+# ------------------------------------------------------------------------------ #
+def get_dag_display_states():
+    """
+    Get the effective visibility and display type of every DAG node in the scene, in one pass from the top of the hierarchy down.
+
+    Each node is only read once, and inherits the result of its parent, instead of checking all of its parents again.
+    A node is visible if it and all of its parents have:
+        - visibility and lodVisibility on.
+        - overrideVisibility on, if overrideEnabled is on.
+    Display layers are included, as they drive the drawing overrides of their members.
+    The display type is the overrideDisplayType in effect, from the node or its nearest parent with one: 0 Normal, 1 Template or 2 Reference.
+
+    :return: Full DAG paths of each node, with (visible, display type).
+    :rtype: dict
+
+    :Example:
+
+    >>> display_states = get_dag_display_states()
+    >>> display_states["|rig_grp|controls_grp|arm_ctrl"]
+    (True, 0)
+
+    """
+    display_states = {}
+    # The visible state and display type of the last node found at each depth, so children can inherit them.
+    parent_states = {0: (True, 0)}
+
+    iterator = OpenMaya.MItDag(OpenMaya.MItDag.kDepthFirst)
+    while not iterator.isDone():
+        depth = iterator.depth()
+        path = OpenMaya.MDagPath()
+        iterator.getPath(path)
+        full_path = path.fullPathName()
+
+        if not full_path:
+            # The world node.
+            iterator.next()
+            continue
+
+        parent_visible, parent_display_type = parent_states.get(depth - 1, (True, 0))
+        visible = parent_visible
+        display_type = parent_display_type
+
+        if visible:
+            node = OpenMaya.MFnDagNode(path)
+            try:
+                visible = node.findPlug("visibility", False).asBool() and node.findPlug("lodVisibility", False).asBool()
+                if visible and node.findPlug("overrideEnabled", False).asBool():
+                    visible = node.findPlug("overrideVisibility", False).asBool()
+                    display_type = node.findPlug("overrideDisplayType", False).asInt() or display_type
+            except RuntimeError:
+                # Nodes without display attributes, like the underworld of a NURBS surface, take their parent's state.
+                pass
+
+        parent_states[depth] = (visible, display_type)
+        display_states[full_path] = (visible, display_type)
+        iterator.next()
+
+    return display_states
+
+# ------------------------------------------------------------------------------ #
+def get_dag_visibility_map(normal_display_only=False, display_states=None):
+    """
+    Get the effective visibility of every DAG node in the scene, from get_dag_display_states().
+
+    :param normal_display_only: If True, nodes drawn as Template or Reference (in their own or any parent's drawing overrides) are not visible.
+    :type normal_display_only: bool
+    :param display_states: States from get_dag_display_states(), to reuse instead of reading the scene again.
+    :type display_states: dict, optional
+    :return: Full DAG paths of each node, with True if visible.
+    :rtype: dict
+
+    :Example:
+
+    >>> visibility_map = get_dag_visibility_map(normal_display_only=True)
+    >>> visibility_map["|rig_grp|controls_grp|arm_ctrl"]
+    True
+
+    """
+    if display_states is None:
+        display_states = get_dag_display_states()
+    return {
+        full_path: visible and (display_type == 0 or not normal_display_only)
+        for full_path, (visible, display_type) in display_states.items()
+    }
+
 # ------------------------------------------------------------------------------ #
 def get_keyed_nodes(objects_to_check=None):
 
@@ -875,7 +1809,7 @@ def get_keyed_nodes(objects_to_check=None):
     return keyed_objects
     
 # ------------------------------------------------------------------------------ #
-def get_layered_attributes(obj, filter_selected_animation_layers=False):
+def get_layered_attributes(obj, filter_selected_animation_layers=False, layer_index=None):
     """
     Find attributes connected to the specified object that are on animation layers.
 
@@ -883,6 +1817,8 @@ def get_layered_attributes(obj, filter_selected_animation_layers=False):
     :type obj: str
     :param filter_selected_animation_layers: Whether the script should only process selected animation layers.
     :type filter_selected_animation_layers: bool
+    :param layer_index: An index to look the object up in, instead of querying Maya. Useful when looping over many objects.
+    :type layer_index: AnimationLayerIndex, optional
     :return: A dictionary mapping animation layers to their respective layered attributes.
     :rtype: dict or None
 
@@ -904,16 +1840,22 @@ def get_layered_attributes(obj, filter_selected_animation_layers=False):
     # ---------------------------------------
     # 01. GET CONNECTED ANIMATION LAYERS.
     # ---------------------------------------
-    animation_layers = cmds.listConnections(obj, type="animLayer")
+    if layer_index is not None:
+        animation_layers = layer_index.layers(obj)
+    else:
+        animation_layers = cmds.listConnections(obj, type="animLayer")
     if not animation_layers:
         display_viewport_warning("No animation layers connected.")
         return
     # Remove duplicates.
-    animation_layers = list(set(animation_layers))
+    animation_layers = list(dict.fromkeys(animation_layers))
 
     if filter_selected_animation_layers:
         animation_layers = filter_for_selected_animation_layers(animation_layers)
 
+    if layer_index is not None:
+        return layer_index.get_layered_attributes(obj, animation_layers or [])
+
     # ---------------------------------------
     # 01. GET CONNECTED ATTRIBUTES.
     # ---------------------------------------
@@ -931,15 +1873,14 @@ def get_layered_attributes(obj, filter_selected_animation_layers=False):
             long_name_layered_attributes = cmds.animLayer(layer, query=True, attribute=True)
             if long_name_layered_attributes:
 
-                layer_attributes = []
+                # A dictionary keeps the order attributes were found in, and skips duplicates without searching a list.
+                layer_attributes = {}
                 for attr in long_name_layered_attributes:
                     # Ignore shape node attributes.
                     if not shape_node or (not attr.startswith(shape_node + ".") and attr.startswith(obj + ".")):
-                        attr_names = attr.split('.')[-1]
-                        if attr_names not in layer_attributes:
-                            layer_attributes.append(attr_names)
+                        layer_attributes[attr.split('.')[-1]] = None
 
-                layered_attributes_dict[layer] = layer_attributes
+                layered_attributes_dict[layer] = list(layer_attributes)
 
     return layered_attributes_dict
 
@@ -994,27 +1935,19 @@ def get_object_attributes(
     if isinstance(selection, str):
         selection = [selection]
 
-    for obj in selection:
-        # If attributes not provided, get keyable attributes.
-        if not attributes:
-            # Not sure if these should be included: scalar=True, hasData=True,
-            attributes = cmds.listAttr(obj, keyable=True, scalar=True) or []
+    # Get the state of all attributes at once, then filter them without querying Maya again.
+    snapshot = get_attribute_state_snapshot(list(selection), attributes)
 
-        for attr in attributes:
-            object_attribute = f"{obj}.{attr}"
-
-            if cmds.objExists(object_attribute):
-                if filter_locked and cmds.getAttr(object_attribute, lock=True):
-                    continue
-                if filter_muted and is_attribute_muted(object_attribute):
-                    continue
-                if filter_constrained:
-                    has_constraint, conns, constraint_relatives = is_constrained(object_attribute)
-                    if has_constraint:
-                        continue
-                if filter_connected and is_attribute_connected_as_destination(object_attribute):
-                    continue
-                yield object_attribute
+    for object_attribute, state in snapshot.items():
+        if filter_locked and state["lock"]:
+            continue
+        if filter_muted and state["muted"]:
+            continue
+        if filter_constrained and state["constrained"]:
+            continue
+        if filter_connected and state["connected"]:
+            continue
+        yield object_attribute
 
     """
     # Different ways to query if an object attribute exists.
@@ -1070,7 +2003,9 @@ def get_selected_channels(longName=False, node_to_query=None):
     if longName:
         if not node_to_query:
             display_viewport_warning("Please specify a node_to_query.")
-        selectedAttrs = [cmds.attributeQuery(attr, longName=True, node=node_to_query) for attr in selectedAttrs]
+        attribute_metadata = get_attribute_metadata_cache()
+        # Skip channels the node doesn't have, like shape attributes when querying a transform.
+        selectedAttrs = [attribute_metadata.long_name(node_to_query, attr) for attr in selectedAttrs if attribute_metadata.exists(node_to_query, attr)]
     return selectedAttrs
 
 # ------------------------------------------------------------------------------ #
@@ -1115,6 +2050,531 @@ def get_selection_generator():
 
 ##################################################################################################################################################
 
+########################################################################
+#                                                                      #
+#                       KEYFRAME ARRAY FUNCTIONS                       #
+#                                                                      #
+########################################################################
+
+# Fields of the NumPy structured arrays used by get_keyframe_arrays() and set_keyframe_arrays().
+KEYFRAME_ARRAY_FIELDS = [
+    ("time", "f8"),
+    ("value", "f8"),
+    ("in_tangent_type", "U16"),
+    ("out_tangent_type", "U16"),
+    ("in_angle", "f8"),
+    ("out_angle", "f8"),
+    ("in_weight", "f8"),
+    ("out_weight", "f8"),
+    ("selected", "?"),
+]
+
+# ------------------------------------------------------------------------------ #
+def get_keyframe_arrays(animation_curves):
+    """
+    Read every key of many animation curves at once, as NumPy structured arrays.
+
+    Each key detail is queried for all curves with a single command, instead of curve by curve or key by key.
+    Curves with selected keys need one more query each, to find which keys are selected.
+
+    :param animation_curves: Animation curves to read.
+    :type animation_curves: list(str) or str
+    :return: {animation curve: structured array with the fields in KEYFRAME_ARRAY_FIELDS}, one row per key.
+             The arrays are views of one shared array, so copy one before keeping it around after editing others.
+    :rtype: dict
+
+    :Example:
+
+    >>> keys = get_keyframe_arrays(["pSphere1_translateX", "pSphere1_translateY"])
+    >>> keys["pSphere1_translateX"]["time"]
+    array([ 1., 12., 24.])
+    >>> keys["pSphere1_translateX"]["value"][keys["pSphere1_translateX"]["selected"]]
+    array([3.5])
+
+    """
+    if np is None:
+        raise ImportError("get_keyframe_arrays() needs NumPy, which ships with Maya 2022 and later.")
+
+    if isinstance(animation_curves, str):
+        animation_curves = [animation_curves]
+    animation_curves = list(dict.fromkeys(animation_curves or []))
+    if not animation_curves:
+        return {}
+
+    # ---------------------------------------
+    # 01. COUNT KEYS ON EACH CURVE.
+    # ---------------------------------------
+    # Key indices start at 0 again for every curve, which shows where one curve's keys end and the next begin.
+    indices = cmds.keyframe(animation_curves, query=True, indexValue=True) or []
+    starts = [i for i, index in enumerate(indices) if index == 0]
+    if len(starts) == len(animation_curves):
+        offsets = starts + [len(indices)]
+    else:
+        # A curve with no keys leaves no trace, so count them one by one instead.
+        counts = [cmds.keyframe(curve, query=True, keyframeCount=True) for curve in animation_curves]
+        offsets = [0] + np.cumsum(counts).tolist()
+
+    keys = np.zeros(offsets[-1], dtype=KEYFRAME_ARRAY_FIELDS)
+    if not len(keys):
+        return {curve: keys[0:0] for curve in animation_curves}
+
+    # ---------------------------------------
+    # 01. READ EACH KEY DETAIL FOR ALL CURVES.
+    # ---------------------------------------
+    keys["time"] = cmds.keyframe(animation_curves, query=True, timeChange=True)
+    keys["value"] = cmds.keyframe(animation_curves, query=True, valueChange=True)
+    keys["in_tangent_type"] = cmds.keyTangent(animation_curves, query=True, inTangentType=True)
+    keys["out_tangent_type"] = cmds.keyTangent(animation_curves, query=True, outTangentType=True)
+    keys["in_angle"] = cmds.keyTangent(animation_curves, query=True, inAngle=True)
+    keys["out_angle"] = cmds.keyTangent(animation_curves, query=True, outAngle=True)
+    keys["in_weight"] = cmds.keyTangent(animation_curves, query=True, inWeight=True)
+    keys["out_weight"] = cmds.keyTangent(animation_curves, query=True, outWeight=True)
+
+    # ---------------------------------------
+    # 01. MARK SELECTED KEYS.
+    # ---------------------------------------
+    curve_offsets = {curve: offsets[i] for i, curve in enumerate(animation_curves)}
+    for curve in cmds.keyframe(animation_curves, query=True, selected=True, name=True) or []:
+        selected_indices = cmds.keyframe(curve, query=True, selected=True, indexValue=True) or []
+        keys["selected"][curve_offsets[curve] + np.asarray(selected_indices, dtype=int)] = True
+
+    return {curve: keys[offsets[i]:offsets[i + 1]] for i, curve in enumerate(animation_curves)}
+
+# ------------------------------------------------------------------------------ #
+def set_keyframe_arrays(animation_curve, keys, set_tangents=True, start_index=0):
+    """
+    Replace all keys on an animation curve, from a NumPy structured array like the ones get_keyframe_arrays() returns.
+
+    Times and values are written with one setAttr, and tangent types with one keyTangent per type.
+    Only keys with fixed tangents need their own keyTangent call, to set their angles and weights.
+
+    :param animation_curve: The animation curve to write to.
+    :type animation_curve: str
+    :param keys: Keys to write, sorted by time. Needs "time" and "value" fields. Tangent fields are optional.
+    :type keys: numpy.ndarray
+    :param set_tangents: If False, new keys get Maya's default tangents and existing ones keep theirs.
+    :type set_tangents: bool
+    :param start_index: Index to write the first key at. Keys before it are kept, so a long curve can be written a chunk at a time.
+    :type start_index: int
+
+    :Example:
+
+    >>> keys = get_keyframe_arrays("pSphere1_translateX")["pSphere1_translateX"]
+    >>> keys["value"] *= 2.0
+    >>> set_keyframe_arrays("pSphere1_translateX", keys)
+
+    """
+    if np is None:
+        raise ImportError("set_keyframe_arrays() needs NumPy, which ships with Maya 2022 and later.")
+
+    key_count = len(keys)
+    if not key_count and not start_index:
+        # Maya deletes curves that lose all their keys.
+        cmds.cutKey(animation_curve, clear=True)
+        return
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        # ---------------------------------------
+        # 01. REMOVE EXTRA KEYS, THEN WRITE TIMES AND VALUES.
+        # ---------------------------------------
+        end_index = start_index + key_count
+        old_key_count = cmds.keyframe(animation_curve, query=True, keyframeCount=True) or 0
+        if old_key_count > end_index:
+            cmds.cutKey(animation_curve, index=(end_index, old_key_count - 1), clear=True)
+        if not key_count:
+            return
+
+        time_values = np.column_stack((keys["time"], keys["value"])).ravel().tolist()
+        cmds.setAttr(f"{animation_curve}.ktv[{start_index}:{end_index - 1}]", *time_values)
+
+        # ---------------------------------------
+        # 01. SET TANGENTS.
+        # ---------------------------------------
+        fields = keys.dtype.names
+        if not set_tangents or "in_tangent_type" not in fields:
+            return
+
+        for field, flag in (("in_tangent_type", "inTangentType"), ("out_tangent_type", "outTangentType")):
+            for tangent_type in np.unique(keys[field]):
+                if not tangent_type or tangent_type == "fixed":
+                    continue
+                index = [(int(i), int(i)) for i in np.flatnonzero(keys[field] == tangent_type) + start_index]
+                cmds.keyTangent(animation_curve, edit=True, index=index, **{flag: str(tangent_type)})
+
+        if "in_angle" not in fields:
+            return
+        is_weighted = (cmds.keyTangent(animation_curve, query=True, weightedTangents=True) or [False])[0]
+        for i in np.flatnonzero((keys["in_tangent_type"] == "fixed") | (keys["out_tangent_type"] == "fixed")):
+            key = keys[i]
+            tangent_flags = {}
+            if key["in_tangent_type"] == "fixed":
+                tangent_flags["inAngle"] = float(key["in_angle"])
+                if is_weighted:
+                    tangent_flags["inWeight"] = float(key["in_weight"])
+            if key["out_tangent_type"] == "fixed":
+                tangent_flags["outAngle"] = float(key["out_angle"])
+                if is_weighted:
+                    tangent_flags["outWeight"] = float(key["out_weight"])
+            cmds.keyTangent(animation_curve, edit=True, index=(int(i) + start_index, int(i) + start_index), **tangent_flags)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+##################################################################################################################################################
+
+########################################################################
+#                                                                      #
+#                        TIME SAMPLING FUNCTIONS                       #
+#                                                                      #
+########################################################################
+
+# How many of each linear unit make one centimetre, Maya's internal unit.
+LINEAR_UNITS_PER_CENTIMETRE = {
+    "mm": 10.0,
+    "cm": 1.0,
+    "m": 0.01,
+    "km": 0.00001,
+    "in": 1.0 / 2.54,
+    "ft": 1.0 / 30.48,
+    "yd": 1.0 / 91.44,
+    "mi": 1.0 / 160934.4,
+}
+
+# Frames per second of each named time unit. Other rates are named like "12fps".
+FRAMES_PER_SECOND = {
+    "game": 15.0,
+    "film": 24.0,
+    "pal": 25.0,
+    "ntsc": 30.0,
+    "show": 48.0,
+    "palf": 50.0,
+    "ntscf": 60.0,
+    "sec": 1.0,
+    "millisec": 1000.0,
+    "min": 1.0 / 60.0,
+    "hour": 1.0 / 3600.0,
+}
+
+# The shared time sample cache, and ids of the callbacks that clear it when animation changes.
+_TIME_SAMPLE_CACHE = None
+
+# importlib.reload() runs this module again, so remove callbacks added by the previous import first.
+for _callback_id in globals().get("_TIME_SAMPLE_CACHE_CALLBACK_IDS", []):
+    try:
+        OpenMaya.MMessage.removeCallback(_callback_id)
+    except RuntimeError:
+        pass
+_TIME_SAMPLE_CACHE_CALLBACK_IDS = []
+
+
+class TimeSampler(object):
+    """
+    Read plugs over time as one frames x channels NumPy array, without changing the current time or baking anything.
+
+    Each source is turned into API plugs once. Every frame is then evaluated through its own OpenMaya.MDGContext,
+    set with OpenMaya.MDGContextGuard where Maya has it,
+    reading all plugs before moving to the next frame, so Maya can reuse what it evaluated for that frame.
+
+    Sources can be:
+        - Numeric plugs, e.g. "pSphere1.translateX", giving 1 channel.
+        - Compound plugs, e.g. "pSphere1.translate", giving 1 channel per child.
+        - Matrix plugs, e.g. "pSphere1.worldMatrix[0]", giving 16 channels in row order.
+        - Transforms, e.g. "pSphere1", as a short way of writing its worldMatrix[0].
+
+    Values are in Maya's current units, like cmds.getAttr() gives. Matrices are in centimetres, like Maya stores them.
+    The unit of each channel is listed in .units, as "linear", "angle" or None.
+
+    :param sources: Plugs or transforms to sample.
+    :type sources: list(str)
+
+    :Example:
+
+    >>> sampler = TimeSampler(["pSphere1.translate", "pCube1.rotateY"])
+    >>> sampler.channels
+    ['pSphere1.translateX', 'pSphere1.translateY', 'pSphere1.translateZ', 'pCube1.rotateY']
+    >>> sampler.sample((1, 3)).shape
+    (3, 4)
+
+    """
+
+    def __init__(self, sources):
+        if np is None:
+            raise ImportError("TimeSampler needs NumPy, which ships with Maya 2022 and later.")
+        self.sources = list(sources)
+        self.channels = []
+        # [(MPlug, is matrix)], in channel order.
+        self._plugs = []
+        # The unit of each channel, as "linear", "angle" or None.
+        self.units = []
+        for source in self.sources:
+            self._add_source(source)
+
+    # ------------------------------------------------------------------------------ #
+    def _add_source(self, source):
+        node, _, attr = source.partition(".")
+        if not attr:
+            attr = "worldMatrix[0]"
+
+        selection = OpenMaya.MSelectionList()
+        selection.add(f"{node}.{attr}")
+        plug = OpenMaya.MPlug()
+        selection.getPlug(0, plug)
+
+        metadata_cache = get_attribute_metadata_cache()
+        if metadata_cache.data_type(node, attr.split("[")[0]) == "matrix":
+            self._plugs.append((plug, True))
+            self.channels.extend(f"{node}.{attr}[{index}]" for index in range(16))
+            self.units.extend([None] * 16)
+            return
+
+        plugs = [plug.child(index) for index in range(plug.numChildren())] if plug.isCompound() else [plug]
+        for channel_plug in plugs:
+            # The long attribute name, without the node name.
+            channel_attr = channel_plug.partialName(False, False, False, False, False, True)
+            data_type = metadata_cache.data_type(node, channel_attr)
+            self._plugs.append((channel_plug, False))
+            self.channels.append(f"{node}.{channel_attr}")
+            self.units.append({"doubleLinear": "linear", "doubleAngle": "angle"}.get(data_type))
+
+    # ------------------------------------------------------------------------------ #
+    def _unit_scales(self):
+        # The API gives centimetres and radians, so convert them to the current units like getAttr() would.
+        linear_scale = LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+        angle_scale = 1.0 if cmds.currentUnit(query=True, angle=True) == "rad" else 180.0 / np.pi
+        scales = {"linear": linear_scale, "angle": angle_scale, None: 1.0}
+        return np.array([scales[unit] for unit in self.units])
+
+    # ------------------------------------------------------------------------------ #
+    def _read_row(self, row, context=None):
+        # Read every plug into one row, in the given context, or the current one if None.
+        column = 0
+        for plug, is_matrix in self._plugs:
+            if is_matrix:
+                matrix_data = plug.asMObject(context) if context is not None else plug.asMObject()
+                matrix = OpenMaya.MFnMatrixData(matrix_data).matrix()
+                row[column:column + 16] = [matrix(matrix_row, matrix_column) for matrix_row in range(4) for matrix_column in range(4)]
+                column += 16
+            else:
+                row[column] = plug.asDouble(context) if context is not None else plug.asDouble()
+                column += 1
+
+    # ------------------------------------------------------------------------------ #
+    def sample(self, frames=None, use_cache=False):
+        """
+        Evaluate every channel at every frame.
+
+        :param frames: Frames to sample, in any form get_sample_frames() takes. If None, every frame of the playback range.
+        :type frames: tuple or list(float) or numpy.ndarray, optional
+        :param use_cache: Reuse an earlier result for the same channels and frames, if no animation has changed since.
+            Cached arrays are read-only, so copy them before editing.
+        :type use_cache: bool
+        :return: Values shaped (frames, channels).
+        :rtype: numpy.ndarray
+
+        """
+        frames = get_sample_frames(frames)
+        scales = self._unit_scales()
+
+        if use_cache:
+            key = (tuple(self.channels), frames.tobytes(), scales.tobytes())
+            samples = get_time_sample_cache().get(key)
+            if samples is not None:
+                return samples
+
+        samples = np.empty((len(frames), len(self.channels)))
+        time_unit = OpenMaya.MTime.uiUnit()
+        # Maya 2022 and later evaluate in a context set with MDGContextGuard. Passing a context to each read is obsolete there.
+        context_guard = getattr(OpenMaya, "MDGContextGuard", None)
+        for frame_index, frame in enumerate(frames):
+            context = OpenMaya.MDGContext(OpenMaya.MTime(float(frame), time_unit))
+            if context_guard is None:
+                self._read_row(samples[frame_index], context)
+                continue
+            guard = context_guard(context)
+            try:
+                self._read_row(samples[frame_index])
+            finally:
+                # The previous context is restored when the guard is deleted.
+                del guard
+        samples *= scales
+
+        if use_cache:
+            get_time_sample_cache().store(key, samples)
+        return samples
+
+
+class TimeSampleCache(object):
+    """
+    Results of TimeSampler.sample(), kept until any animation changes.
+
+    Maya doesn't say which plugs an animation change affects, so any animation curve edit,
+    connection change, or node being added or removed clears everything.
+    Plain setAttr() changes to unanimated attributes aren't noticed. Call invalidate_time_sample_cache() after those.
+
+    :param max_entries: How many results to remember. The least recently used are dropped first.
+    :type max_entries: int
+
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+
+    # ------------------------------------------------------------------------------ #
+    def invalidate(self):
+        """
+        Forget every result.
+        """
+        self._entries.clear()
+
+    # ------------------------------------------------------------------------------ #
+    def get(self, key):
+        """
+        Get a remembered result, or None.
+        """
+        samples = self._entries.get(key)
+        if samples is not None:
+            self._entries.move_to_end(key)
+        return samples
+
+    # ------------------------------------------------------------------------------ #
+    def store(self, key, samples):
+        """
+        Remember a result. It's made read-only, as the same array is handed to every caller.
+        """
+        samples.flags.writeable = False
+        self._entries[key] = samples
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+# ------------------------------------------------------------------------------ #
+def get_sample_frames(frames=None):
+    """
+    Turn the ways of asking for frames into one array of frames.
+
+    :param frames: One of:
+        - None, for every frame of the playback range.
+        - A (start, end) or (start, end, step) tuple, including the end. The step can be a sub-frame, e.g. 0.5.
+        - A list or array of frames, which can be sparse or out of order.
+    :type frames: tuple or list(float) or numpy.ndarray, optional
+    :return: The frames.
+    :rtype: numpy.ndarray
+
+    :Example:
+
+    >>> get_sample_frames((1, 2, 0.5))
+    array([1. , 1.5, 2. ])
+
+    """
+    if frames is None:
+        frames = (cmds.playbackOptions(query=True, min=True), cmds.playbackOptions(query=True, max=True))
+
+    if not isinstance(frames, tuple):
+        return np.asarray(frames, dtype=float).ravel()
+
+    start, end = float(frames[0]), float(frames[1])
+    step = float(frames[2]) if len(frames) > 2 else 1.0
+    samples = np.arange(start, end + step * 0.5, step, dtype=float)
+    samples = samples[samples <= end + 1e-6]
+    # Always end on the last frame, even if the step doesn't land on it.
+    if not len(samples) or samples[-1] < end - 1e-6:
+        samples = np.append(samples, end)
+    return samples
+
+# ------------------------------------------------------------------------------ #
+def get_frames_per_second():
+    """
+    Get the frame rate of the current time unit.
+    Tangent angles are measured against time in seconds, so this turns slopes per frame into angles and back.
+
+    :return: Frames per second.
+    :rtype: float
+
+    :Example:
+
+    >>> get_frames_per_second()
+    24.0
+
+    """
+    time_unit = cmds.currentUnit(query=True, time=True)
+    if time_unit in FRAMES_PER_SECOND:
+        return FRAMES_PER_SECOND[time_unit]
+    return float(time_unit.replace("fps", ""))
+
+# ------------------------------------------------------------------------------ #
+def sample_plugs(sources, frames=None, use_cache=False):
+    """
+    Read plugs over time as one frames x channels NumPy array, without changing the current time.
+    A shortcut for TimeSampler(sources).sample(frames), which explains the sources it takes.
+
+    :param sources: Plugs or transforms to sample.
+    :type sources: list(str)
+    :param frames: Frames to sample, in any form get_sample_frames() takes. If None, every frame of the playback range.
+    :type frames: tuple or list(float) or numpy.ndarray, optional
+    :param use_cache: Reuse an earlier result, if no animation has changed since. Cached arrays are read-only.
+    :type use_cache: bool
+    :return: Values shaped (frames, channels).
+    :rtype: numpy.ndarray
+
+    :Example:
+
+    >>> sample_plugs(["pSphere1.translate"], [1, 10])
+    array([[0. , 0. , 0. ],
+           [2.5, 0. , 1. ]])
+
+    """
+    return TimeSampler(sources).sample(frames, use_cache=use_cache)
+
+# ------------------------------------------------------------------------------ #
+def get_time_sample_cache():
+    """
+    Get the shared time sample cache. The first time, this also adds the callbacks that clear it.
+
+    :return: The shared cache.
+    :rtype: TimeSampleCache
+
+    """
+    global _TIME_SAMPLE_CACHE
+    if _TIME_SAMPLE_CACHE is None:
+        _TIME_SAMPLE_CACHE = TimeSampleCache()
+        add_time_sample_cache_callbacks()
+    return _TIME_SAMPLE_CACHE
+
+# ------------------------------------------------------------------------------ #
+def invalidate_time_sample_cache():
+    """
+    Clear the shared time sample cache.
+    Needed after changes Maya doesn't send animation callbacks for, like setting an unanimated attribute.
+    """
+    if _TIME_SAMPLE_CACHE is not None:
+        _TIME_SAMPLE_CACHE.invalidate()
+
+# ------------------------------------------------------------------------------ #
+def add_time_sample_cache_callbacks():
+    """
+    Add callbacks, so the shared time sample cache is cleared when animation changes.
+    """
+    remove_time_sample_cache_callbacks()
+
+    def animation_changed(*args):
+        invalidate_time_sample_cache()
+
+    _TIME_SAMPLE_CACHE_CALLBACK_IDS.append(OpenMayaAnim.MAnimMessage.addAnimCurveEditedCallback(animation_changed))
+    _TIME_SAMPLE_CACHE_CALLBACK_IDS.append(OpenMaya.MDGMessage.addConnectionCallback(animation_changed))
+    _TIME_SAMPLE_CACHE_CALLBACK_IDS.append(OpenMaya.MDGMessage.addNodeAddedCallback(animation_changed))
+    _TIME_SAMPLE_CACHE_CALLBACK_IDS.append(OpenMaya.MDGMessage.addNodeRemovedCallback(animation_changed))
+
+# ------------------------------------------------------------------------------ #
+def remove_time_sample_cache_callbacks():
+    """
+    Remove the callbacks added by add_time_sample_cache_callbacks().
+    """
+    for callback_id in _TIME_SAMPLE_CACHE_CALLBACK_IDS:
+        OpenMaya.MMessage.removeCallback(callback_id)
+    del _TIME_SAMPLE_CACHE_CALLBACK_IDS[:]
+
+##################################################################################################################################################
+
 ########################################################################
 #                                                                      #
 #                           MESSAGE FUNCTIONS                          #
@@ -1251,6 +2711,93 @@ def set_animation_curve_template_state(animation_curves, lock_state=False):
             if cmds.objExists(full_name):
                 cmds.setAttr(full_name, lock=lock_state)
 
+# ------------------------------------------------------------------------------ #
+def set_attributes_to_default_values(object_attributes):
+    """
+    Set object attributes to their default values, in one undo chunk.
+    Attributes that were already keyed get keyed at their default value, with one setKeyframe call per distinct default value.
+
+    Everything is worked out before anything changes, so a failure on one attribute doesn't stop the others.
+    Attributes that can't be reset are returned with the reason, rather than printed one by one.
+
+    :param object_attributes: Object attributes to reset, e.g. ["pSphere1.translateX", "pSphere1.rotateY"].
+    :type object_attributes: list(str)
+    :return: A dictionary with:
+             - "reset": object attributes that were reset.
+             - "keyed": object attributes that were also keyed.
+             - "skipped": {object attribute: reason} for anything that couldn't be reset.
+    :rtype: dict
+
+    :Example:
+
+    >>> summary = set_attributes_to_default_values(["pSphere1.translateX", "pSphere1.rotateY"])
+    >>> print(summary["skipped"])
+    {'pSphere1.rotateY': 'no default value'}
+
+    """
+    summary = {"reset": [], "keyed": [], "skipped": {}}
+    attribute_metadata = get_attribute_metadata_cache()
+    connection_cache = get_connection_cache()
+
+    # ---------------------------------------
+    # 01. GET DEFAULT VALUES AND KEYED STATES FOR EVERY OBJECT ATTRIBUTE.
+    # ---------------------------------------
+    to_reset = []
+    for object_attribute in object_attributes:
+        obj, _, attr = object_attribute.partition(".")
+
+        default_value = attribute_metadata.default(obj, attr)
+        if not default_value:
+            summary["skipped"][object_attribute] = "no default value"
+            continue
+
+        # Attributes driven straight by a time based animation curve are keyed.
+        # Driven keys (animCurveU*) are left alone, as keying them would overwrite a driven key instead.
+        # Other sources, like animation layer blend nodes, need asking where the keys are.
+        source = connection_cache.source(object_attribute)
+        source_type = connection_cache.node_type(source.split(".")[0]) if source is not None else ""
+        if source is None:
+            is_keyed = False
+        elif source_type.startswith("animCurveT"):
+            is_keyed = True
+        elif source_type.startswith("animCurveU"):
+            summary["skipped"][object_attribute] = "driven key"
+            continue
+        else:
+            is_keyed = bool(cmds.keyframe(object_attribute, query=True, keyframeCount=True))
+
+        to_reset.append((object_attribute, default_value[0], is_keyed))
+
+    if not to_reset:
+        return summary
+
+    # ---------------------------------------
+    # 01. SET VALUES, THEN KEY THE ATTRIBUTES THAT WERE ALREADY KEYED.
+    # ---------------------------------------
+    # {default value: [object attributes]}, usually just 0.0 and 1.0.
+    to_key = {}
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        for object_attribute, default_value, is_keyed in to_reset:
+            try:
+                cmds.setAttr(object_attribute, default_value)
+            except RuntimeError as error:
+                # e.g. ERROR: setAttr: The attribute 'rivet.translateX' is locked or connected and cannot be modified.
+                summary["skipped"][object_attribute] = str(error).strip()
+                continue
+            summary["reset"].append(object_attribute)
+            if is_keyed:
+                summary["keyed"].append(object_attribute)
+                to_key.setdefault(default_value, []).append(object_attribute)
+
+        for default_value, keyed_object_attributes in to_key.items():
+            cmds.setKeyframe(keyed_object_attributes, value=default_value)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return summary
+
 # ------------------------------------------------------------------------------ #
 def set_corresponding_attribute_states(source, target, mode, keyable=False, lock=True):
     """
@@ -1292,6 +2839,96 @@ def set_attribute_state(source, attr, keyable=False, lock=True):
     cmds.setAttr(source_attr, keyable=keyable)
     cmds.setAttr(source_attr, lock=lock)
 
+# ------------------------------------------------------------------------------ #
+@contextlib.contextmanager
+def suspended_refresh():
+    """
+    Suspend viewport refreshes while a block runs, and always turn them back on after, even if the block fails.
+
+    :Example:
+
+    >>> with suspended_refresh():
+    ...     cmds.bakeResults("locator1", time=(1, 1000))
+
+    """
+    cmds.refresh(suspend=True)
+    try:
+        yield
+    finally:
+        cmds.refresh(suspend=False)
+
+# ------------------------------------------------------------------------------ #
+class MainProgressBar(object):
+    """
+    Maya's main progress bar, used as a context manager so it always ends, even if the work it shows fails.
+    Pressing Esc asks to cancel, which the work checks for with is_cancelled() between steps.
+    In batch mode, where there's no progress bar, it does nothing and is never cancelled.
+
+    :Example:
+
+    >>> with MainProgressBar(len(chunks), "Baking...") as progress_bar:
+    ...     for chunk in chunks:
+    ...         if progress_bar.is_cancelled():
+    ...             break
+    ...         bake(chunk)
+    ...         progress_bar.step()
+
+    :param maximum: How many steps make the whole task.
+    :type maximum: int
+    :param status: Text shown next to the progress bar.
+    :type status: str
+    :param interruptable: If True, Esc can cancel.
+    :type interruptable: bool
+
+    """
+
+    def __init__(self, maximum, status="", interruptable=True):
+        self.maximum = max(int(maximum), 1)
+        self.status = status
+        self.interruptable = interruptable
+        self.progress_bar = None
+
+    # ------------------------------------------------------------------------------ #
+    def __enter__(self):
+        if not cmds.about(batch=True):
+            self.progress_bar = mel.eval("$temp_progress_bar = $gMainProgressBar")
+            cmds.progressBar(
+                self.progress_bar,
+                edit=True,
+                beginProgress=True,
+                isInterruptable=self.interruptable,
+                status=self.status,
+                maxValue=self.maximum
+            )
+        return self
+
+    # ------------------------------------------------------------------------------ #
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.progress_bar:
+            cmds.progressBar(self.progress_bar, edit=True, endProgress=True)
+            self.progress_bar = None
+        return False
+
+    # ------------------------------------------------------------------------------ #
+    def step(self, amount=1, status=None):
+        """
+        Move the progress bar along, optionally changing its text.
+        """
+        if not self.progress_bar:
+            return
+        if status is not None:
+            cmds.progressBar(self.progress_bar, edit=True, status=status)
+        cmds.progressBar(self.progress_bar, edit=True, step=amount)
+
+    # ------------------------------------------------------------------------------ #
+    def is_cancelled(self):
+        """
+        Check if Esc was pressed to cancel.
+        """
+        if not self.progress_bar:
+            return False
+        return bool(cmds.progressBar(self.progress_bar, query=True, isCancelled=True))
+
 ##################################################################################################################################################
 
 ########################################################################
@@ -1315,11 +2952,368 @@ def distribute_objects(x_distance=0):
         new_translate_x = i * x_distance
         cmds.setAttr(obj + ".translateX", new_translate_x)
 
+# ------------------------------------------------------------------------------ #
+def get_average_transform(objects, frames=None):
+    """
+    Get the average world position and orientation of objects, like point and orient constraining something to all of them,
+    from one read of their world matrices and rotate pivots, without making any constraints.
+
+    Positions are the mean of each object's rotate pivot in world space, which is what pointConstraint follows.
+    Orientations are the mean of each object's quaternion, from get_average_quaternions().
+
+    :param objects: Objects to average.
+    :type objects: list(str)
+    :param frames: If given, frames to average at, in any form get_sample_frames() takes. If None, only the current time.
+    :type frames: tuple or list(float) or numpy.ndarray, optional
+    :return: Positions in the current linear unit, and quaternions as (x, y, z, w).
+             Shaped (3,) and (4,) for the current time, or (frames, 3) and (frames, 4) with frames.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+
+    :Example:
+
+    >>> get_average_transform(["pSphere1", "pCube1"])
+    (array([2.5, 0. , 1. ]), array([0.   , 0.383, 0.   , 0.924]))
+    >>> positions, quaternions = get_average_transform(["pSphere1", "pCube1"], (1, 120))
+    >>> positions.shape
+    (120, 3)
+
+    """
+    if np is None:
+        raise ImportError("get_average_transform() needs NumPy, which ships with Maya 2022 and later.")
+
+    sample_frames = get_sample_frames([cmds.currentTime(query=True)] if frames is None else frames)
+
+    # ---------------------------------------
+    # 01. READ EVERY WORLD MATRIX AND ROTATE PIVOT AT ONCE, AND AVERAGE THEM.
+    # ---------------------------------------
+    matrices, world_pivots = _sample_world_pivots(objects, sample_frames)
+    linear_scale = LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    positions = world_pivots.mean(axis=1) * linear_scale
+    quaternions = get_average_quaternions(get_quaternions_from_matrices(matrices))
+
+    if frames is None:
+        return positions[0], quaternions[0]
+    return positions, quaternions
+
+# ------------------------------------------------------------------------------ #
+def get_motion_pivot_matrices(object_groups, frame=None, window=3):
+    """
+    Get a pivot matrix for each group of objects, at their average position, with Z pointing the way they travel around a frame,
+    and Y as close to world up as it can be. Baked inside it, travelling in a straight line only moves along translate Z.
+
+    Every object's world matrix and rotate pivot is read over the window with one TimeSampler, for every group at once,
+    without changing the current time. Each group's averaged path is fitted with its principal axis, from one batched
+    singular value decomposition, pointing from where the path starts to where it ends.
+
+    :param object_groups: Groups of objects, one group per pivot.
+    :type object_groups: list(list(str))
+    :param frame: The frame to fit around, and place each pivot at. If None, the current time.
+    :type frame: float, optional
+    :param window: How many frames either side of the frame to fit the direction over.
+    :type window: int
+    :return: World matrices shaped (groups, 4, 4), in centimetres.
+             Groups that don't move keep world orientation.
+    :rtype: numpy.ndarray
+
+    :Example:
+
+    >>> get_motion_pivot_matrices([["hips_ctrl"], ["hand_L_ctrl", "hand_R_ctrl"]], 24, window=4).shape
+    (2, 4, 4)
+
+    """
+    if np is None:
+        raise ImportError("get_motion_pivot_matrices() needs NumPy, which ships with Maya 2022 and later.")
+
+    if frame is None:
+        frame = cmds.currentTime(query=True)
+    sample_frames = np.arange(frame - window, frame + window + 1, dtype=float)
+
+    # ---------------------------------------
+    # 01. READ EVERY OBJECT'S PATH AT ONCE, AND AVERAGE EACH GROUP'S.
+    # ---------------------------------------
+    objects = list(collections.OrderedDict.fromkeys(obj for group in object_groups for obj in group))
+    object_indices = {obj: index for index, obj in enumerate(objects)}
+    world_pivots = _sample_world_pivots(objects, sample_frames)[1]
+    # Shaped (groups, frames, 3).
+    paths = np.stack([world_pivots[:, [object_indices[obj] for obj in group]].mean(axis=1) for group in object_groups])
+
+    # ---------------------------------------
+    # 01. FIT EACH PATH'S MAIN DIRECTION.
+    # ---------------------------------------
+    centred_paths = paths - paths.mean(axis=1, keepdims=True)
+    directions = np.linalg.svd(centred_paths, full_matrices=False)[2][:, 0]
+    # The principal axis has no sign, so point it the way the path goes.
+    travel = paths[:, -1] - paths[:, 0]
+    directions *= np.where(np.einsum("ij,ij->i", directions, travel) < 0.0, -1.0, 1.0)[:, np.newaxis]
+    still = np.linalg.norm(centred_paths, axis=(1, 2)) <= 1e-9
+    directions[still] = (0.0, 0.0, 1.0)
+
+    # ---------------------------------------
+    # 01. BUILD THE MATRICES.
+    # ---------------------------------------
+    # Row vectors, like Maya: the rows are the X, Y and Z axes, then the position.
+    x_axes = np.cross((0.0, 1.0, 0.0), directions)
+    # Straight up or down has no sideways direction to use, so keep world X.
+    vertical = np.linalg.norm(x_axes, axis=-1) <= 1e-6
+    x_axes[vertical] = (1.0, 0.0, 0.0)
+    x_axes /= np.linalg.norm(x_axes, axis=-1, keepdims=True)
+
+    matrices = np.zeros((len(object_groups), 4, 4))
+    matrices[:, 0, :3] = x_axes
+    matrices[:, 1, :3] = np.cross(directions, x_axes)
+    matrices[:, 2, :3] = directions
+    matrices[:, 3, :3] = paths[:, window]
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+# ------------------------------------------------------------------------------ #
+def _sample_world_pivots(objects, frames):
+    # Each object's world matrix, and its rotate pivot in world space, both in centimetres and shaped (frames, objects, ...).
+    count = len(objects)
+    samples = sample_plugs(list(objects) + [f"{obj}.rotatePivot" for obj in objects], frames)
+    matrices = samples[:, :16 * count].reshape(len(frames), count, 4, 4)
+    # Pivots are in the current linear unit, but matrices are in centimetres.
+    linear_scale = LINEAR_UNITS_PER_CENTIMETRE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+    pivots = samples[:, 16 * count:].reshape(len(frames), count, 3) / linear_scale
+    # Row vectors, like Maya: world point = local point * matrix.
+    world_pivots = matrices[..., 3, :3] + np.einsum("...i,...ij->...j", pivots, matrices[..., :3, :3])
+    return matrices, world_pivots
+
+# ------------------------------------------------------------------------------ #
+def get_average_quaternions(quaternions):
+    """
+    Average orientations, given as quaternions.
+
+    A quaternion and its negative are the same orientation, so each one is first flipped into the same hemisphere as the first,
+    so they don't cancel out. The mean is then normalised. Over many frames, each average is also flipped to match the one before,
+    so the result stays continuous.
+
+    :param quaternions: Quaternions as (x, y, z, w), shaped (..., objects, 4).
+    :type quaternions: numpy.ndarray
+    :return: Unit quaternions, shaped (..., 4).
+    :rtype: numpy.ndarray
+
+    """
+    quaternions = np.array(quaternions, dtype=float)
+    signs = np.sign(np.sum(quaternions * quaternions[..., :1, :], axis=-1, keepdims=True))
+    averages = np.sum(quaternions * np.where(signs == 0.0, 1.0, signs), axis=-2)
+    averages /= np.linalg.norm(averages, axis=-1, keepdims=True)
+
+    if averages.ndim == 2 and len(averages) > 1:
+        flips = np.sign(np.sum(averages[1:] * averages[:-1], axis=-1))
+        averages[1:] *= np.cumprod(np.where(flips == 0.0, 1.0, flips))[:, None]
+    return averages
+
+# ------------------------------------------------------------------------------ #
+def get_quaternions_from_matrices(matrices):
+    """
+    Turn the rotation of matrices into quaternions, ignoring scale.
+
+    :param matrices: Matrices in Maya's row vector form, shaped (..., 4, 4) or (..., 3, 3).
+    :type matrices: numpy.ndarray
+    :return: Unit quaternions as (x, y, z, w), shaped (..., 4).
+    :rtype: numpy.ndarray
+
+    """
+    rows = np.array(matrices[..., :3, :3], dtype=float)
+    lengths = np.linalg.norm(rows, axis=-1, keepdims=True)
+    rows /= np.where(lengths == 0.0, 1.0, lengths)
+    # Negative scale leaves a mirrored matrix, which has no rotation, so flip it back.
+    rows[np.linalg.det(rows) < 0.0] *= -1.0
+
+    # Transpose to the column vector form the formulas are written for.
+    r = np.swapaxes(rows, -1, -2)
+    trace = r[..., 0, 0] + r[..., 1, 1] + r[..., 2, 2]
+
+    # Shepperd's method: work from whichever of w, x, y or z is largest, so nothing is divided by a value near 0,
+    # like w is for rotations near 180 degrees.
+    candidates = np.empty(rows.shape[:-2] + (4, 4))
+    # Largest w.
+    scale = np.sqrt(np.maximum(1.0 + trace, 1e-12)) * 2.0
+    candidates[..., 0, :] = np.stack([(r[..., 2, 1] - r[..., 1, 2]) / scale, (r[..., 0, 2] - r[..., 2, 0]) / scale,
+                                      (r[..., 1, 0] - r[..., 0, 1]) / scale, scale / 4.0], axis=-1)
+    # Largest x.
+    scale = np.sqrt(np.maximum(1.0 + r[..., 0, 0] - r[..., 1, 1] - r[..., 2, 2], 1e-12)) * 2.0
+    candidates[..., 1, :] = np.stack([scale / 4.0, (r[..., 0, 1] + r[..., 1, 0]) / scale,
+                                      (r[..., 0, 2] + r[..., 2, 0]) / scale, (r[..., 2, 1] - r[..., 1, 2]) / scale], axis=-1)
+    # Largest y.
+    scale = np.sqrt(np.maximum(1.0 - r[..., 0, 0] + r[..., 1, 1] - r[..., 2, 2], 1e-12)) * 2.0
+    candidates[..., 2, :] = np.stack([(r[..., 0, 1] + r[..., 1, 0]) / scale, scale / 4.0,
+                                      (r[..., 1, 2] + r[..., 2, 1]) / scale, (r[..., 0, 2] - r[..., 2, 0]) / scale], axis=-1)
+    # Largest z.
+    scale = np.sqrt(np.maximum(1.0 - r[..., 0, 0] - r[..., 1, 1] + r[..., 2, 2], 1e-12)) * 2.0
+    candidates[..., 3, :] = np.stack([(r[..., 0, 2] + r[..., 2, 0]) / scale, (r[..., 1, 2] + r[..., 2, 1]) / scale,
+                                      scale / 4.0, (r[..., 1, 0] - r[..., 0, 1]) / scale], axis=-1)
+
+    largest = np.argmax(np.stack([trace, r[..., 0, 0], r[..., 1, 1], r[..., 2, 2]], axis=-1), axis=-1)
+    quaternions = np.take_along_axis(candidates, largest[..., None, None], axis=-2)[..., 0, :]
+    # Keep w positive, like before, so the same rotation always gives the same quaternion.
+    quaternions[quaternions[..., 3] < 0.0] *= -1.0
+    return quaternions / np.linalg.norm(quaternions, axis=-1, keepdims=True)
+
+# ------------------------------------------------------------------------------ #
+def get_matrices_from_quaternions(quaternions):
+    """
+    Turn quaternions into rotation matrices. The opposite of get_quaternions_from_matrices().
+
+    :param quaternions: Quaternions as (x, y, z, w), shaped (..., 4).
+    :type quaternions: numpy.ndarray
+    :return: Rotation matrices in Maya's row vector form, shaped (..., 3, 3).
+    :rtype: numpy.ndarray
+
+    """
+    quaternions = np.asarray(quaternions, dtype=float)
+    x, y, z, w = np.moveaxis(quaternions / np.linalg.norm(quaternions, axis=-1, keepdims=True), -1, 0)
+    r = np.empty(quaternions.shape[:-1] + (3, 3))
+    r[..., 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    r[..., 0, 1] = 2.0 * (x * y - z * w)
+    r[..., 0, 2] = 2.0 * (x * z + y * w)
+    r[..., 1, 0] = 2.0 * (x * y + z * w)
+    r[..., 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    r[..., 1, 2] = 2.0 * (y * z - x * w)
+    r[..., 2, 0] = 2.0 * (x * z - y * w)
+    r[..., 2, 1] = 2.0 * (y * z + x * w)
+    r[..., 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    # Back to Maya's row vector form.
+    return np.swapaxes(r, -1, -2)
+
 """
 ##################################################################################################################################################
 # ---------------------------------------
 # CHANGELOG:
 # ---------------------------------------
+# 2026-10-17 - 0055:
+#   - reset_attributes_to_default_value() opens its undo chunk before untemplating curves and turning autoKeyframe off,
+#     so the whole reset undoes in one step.
+#
+# 2026-10-17 - 0054:
+#   - ConnectionGraphCache caches nodes by their shortest unique names, so long DAG paths share entries with short names,
+#     and connection callbacks forget them whichever name form Maya reports.
+#   - Renaming a node clears the connection cache, with an MNodeMessage name changed callback.
+#   - is_constrained() looks an attribute's source up once.
+#
+# 2026-10-17 - 0053:
+#   - Added ConstraintGraphIndex.constraint_links(), to look up every target of a constraint.
+#
+# 2026-10-17 - 0052:
+#   - get_quaternions_from_matrices() uses Shepperd's method, working from the largest of w, x, y and z,
+#     as taking signs from the matrix gave wrong axes for rotations near 180 degrees.
+#
+# 2026-10-17 - 0051:
+#   - set_attributes_to_default_values() only counts attributes driven by animCurveT* curves as keyed,
+#     and skips ones driven by driven keys, instead of keying over them.
+#
+# 2026-10-17 - 0050:
+#   - Added get_dag_display_states(), the one scene pass behind get_dag_visibility_map(),
+#     so tools needing more than one kind of visibility only read the scene once.
+#   - get_dag_visibility_map() takes display_states to reuse.
+#
+# 2026-10-17 - 0049:
+#   - get_attribute_state_snapshot() matches connections of objects given by long or partial DAG paths,
+#     which were reported as unconnected before.
+#
+# 2026-10-17 - 0048:
+#   - TimeSampler sets each frame's context with MDGContextGuard where Maya has it, instead of the obsolete plug.asDouble(context).
+#     Older versions still pass the context to each read.
+#
+# 2026-10-17 - 0047:
+#   - FRAMES_PER_SECOND has the sec, millisec, min and hour time units, so get_frames_per_second() no longer fails on them.
+#
+# 2026-10-17 - 0046:
+#   - ConstraintGraphIndex keeps objects by their shortest unique names instead of their last path part,
+#     so objects with the same short name under different parents are no longer merged.
+#   - ConstraintGraphIndex lookups take long or partial DAG paths too.
+#
+# 2026-10-17 - 0045:
+#   - Added constrain_unlocked_in_bulk(), to constrain many objects at once, reading lock states once per object
+#     and making every constraint in one undo chunk.
+#   - Added ConstraintBatch, to delete all the constraints it made in one call.
+#   - constrain_unlocked_attributes(), constrain_unlocked_translates() and constrain_unlocked_rotates() now use it.
+#
+# 2026-10-17 - 0044:
+#   - Added get_motion_pivot_matrices(), to point pivots the way groups of objects travel, fitted over a window of frames in one read.
+#   - get_average_transform() shares its sampling with it.
+#
+# 2026-10-17 - 0043:
+#   - Added ConstraintGraphIndex and ConstraintLink, mapping constraint drivers to driven objects and back from one pass over
+#     every constraint and pairBlend, with no limit on targets.
+#
+# 2026-10-17 - 0042:
+#   - Added get_average_transform(), to average objects' world positions and orientations without constraints, over many frames at once.
+#   - Added get_average_quaternions(), get_quaternions_from_matrices() and get_matrices_from_quaternions().
+#
+# 2026-10-17 - 0041:
+#   - Added suspended_refresh(), which always turns viewport refreshes back on, even if what runs inside it fails.
+#   - Added MainProgressBar, for Maya's main progress bar with Esc to cancel.
+#   - set_keyframe_arrays() takes a start_index, to write a long curve a chunk at a time.
+#
+# 2026-10-17 - 0040:
+#   - Added FRAMES_PER_SECOND and get_frames_per_second(), to turn slopes per frame into tangent angles.
+#
+# 2026-10-17 - 0039:
+#   - TimeSampler.units is public, so callers know which channels are distances and angles.
+#
+# 2026-10-17 - 0038:
+#   - Added time sampling functions, which need NumPy:
+#       - TimeSampler and sample_plugs() read plugs, compounds, matrices or transforms' world matrices over many frames
+#         as one frames x channels array, through an MDGContext per frame instead of moving the time slider or baking.
+#       - get_sample_frames() takes playback ranges, (start, end, step) ranges with sub-frames, or sparse lists of frames.
+#       - Optional TimeSampleCache of results, cleared by animation curve, connection and node callbacks.
+#
+# 2026-10-17 - 0037:
+#   - Added keyframe array functions, which need NumPy:
+#       - get_keyframe_arrays() reads times, values, tangents and selection of many animation curves with one query per detail.
+#       - set_keyframe_arrays() replaces all keys on a curve with one setAttr, and one keyTangent per tangent type.
+#
+# 2026-10-17 - 0036:
+#   - Added set_attributes_to_default_values().
+#       - Gets every default value and keyed state first, then sets them all in one undo chunk.
+#       - Keys already keyed attributes with one setKeyframe call per default value, instead of one per attribute.
+#       - Returns a summary of skipped attributes and why, instead of printing a line for each.
+#   - reset_attributes_to_default_value():
+#       - Collects attributes from every object, then resets them with set_attributes_to_default_values().
+#       - Returns its summary.
+#
+# 2026-10-17 - 0035:
+#   - Added AttributeMetadataCache and get_attribute_metadata_cache().
+#       - Remembers if attributes exist, their long and short names, default values, data types and whether they're numeric.
+#       - Static attributes are looked up once per node type, user defined attributes once per node. Oldest entries are dropped past a limit.
+#   - These now use the metadata cache instead of querying Maya for every object:
+#       - reset_attributes_to_default_value()
+#       - is_attribute_numeric()
+#       - get_selected_channels(longName=True), which now also skips channels the node doesn't have.
+#       - is_object_attribute_connected_to_referenced_animation_curve()
+#       - ConnectionGraphCache, when converting short attribute names.
+#
+# 2026-10-17 - 0034:
+#   - Added AnimationLayerIndex, a map of animation layer -> node -> attributes and node -> animation layers for the whole scene.
+#   - get_layered_attributes():
+#       - Added layer_index argument, to look objects up in an AnimationLayerIndex instead of querying Maya.
+#       - Skip duplicate attributes with a dictionary instead of searching a list.
+#
+# 2026-10-17 - 0033:
+#   - Added get_dag_visibility_map().
+#       - It walks the DAG once and works out every node's visibility and display type, passing them down from parent to child.
+#       - Used by mr_selectVisibleControls instead of checking each control's parents one by one.
+#
+# 2026-10-17 - 0032:
+#   - Added a shared connection cache, with ConnectionGraphCache and get_connection_cache().
+#       - Each node's connections and node types are queried once, then remembered.
+#       - DG connection, node added and node removed callbacks clear what changed. invalidate_connection_cache() clears it manually.
+#   - These now use the connection cache instead of querying Maya on every call:
+#       - is_attribute_connected_as_destination()
+#       - is_attribute_muted()
+#       - is_constrained()
+#       - get_animation_curves_from_object_attributes()
+#       - get_channel_from_animation_curve()
+#
+# 2026-10-17 - 0031:
+#   - Added get_attribute_state_snapshot().
+#       - Gets lock, keyable, muted, constrained, connected source and numeric states of all attributes of a selection in a few bulk queries.
+#   - get_object_attributes()
+#       - Now filters the snapshot in memory, instead of querying Maya several times for every attribute.
+#       - Keyable attributes are now listed for each object, instead of reusing the first object's list for all of them.
+#
 # 2024-03-02 - 0030:
 #       - is_object_attribute_connected_to_referenced_animation_curve()
 #           - Changing how .split splits object_attribute to node and attr,